@@ -97,7 +97,7 @@ def process_module(module_name: str) -> str:
         if stripped.startswith("# cdef ") and not stripped.startswith("# cdef void"):
             # Check if this looks like a member declaration (not a function)
             # Member declarations typically have: cdef type name or cdef public type name
-            if any(kw in stripped for kw in ["argv", "argc", "ptr", "inputs", "outputs", "ptr_owner", "sound_ui"]):
+            if any(kw in stripped for kw in ["argv", "argc", "ptr", "inputs", "outputs", "ptr_owner", "sound_ui", "__weakref__"]):
                 line = line.replace("# cdef ", "cdef ")
 
         output_lines.append(line)
@@ -125,6 +125,7 @@ from libc.stdlib cimport malloc, free
 from libcpp.string cimport string
 from libcpp.vector cimport vector
 from libcpp.map cimport map
+from libcpp.unordered_set cimport unordered_set
 from cython.operator cimport dereference as deref, preincrement as inc
 
 # -----------------------------------------------------------------------------
@@ -1,3 +1,4 @@
+import importlib
 import os
 import sys
 
@@ -29,4 +30,29 @@ if sys.platform == "win32":
             os.add_dll_directory(_dll_path)
             break
 
-from .interp import get_version as get_version
+
+# Submodules are loaded on first attribute access (PEP 562) so that
+# ``import cyfaust`` and ``python -m cyfaust --help`` stay cheap: libfaust
+# is only loaded once a submodule that links against it is actually used.
+_SUBMODULES = ("common", "interp", "box", "signal", "player")
+
+# Top-level names re-exported from a submodule.
+_LAZY_ATTRS = {
+    "get_version": "interp",
+    "available_backends": "backends",
+}
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    if name in _LAZY_ATTRS:
+        module = importlib.import_module(f".{_LAZY_ATTRS[name]}", __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_SUBMODULES) | set(_LAZY_ATTRS))
@@ -12,7 +12,7 @@ Commands:
     info        Show DSP information (metadata, inputs, outputs)
     play        Play a Faust DSP file with RtAudio
     params      List all DSP parameters (sliders, buttons, etc.)
-    validate    Check a Faust DSP file for errors
+    validate    Check Faust DSP files for errors
     bitcode     Save/load DSP factory as bitcode
     json        Export DSP metadata as JSON
 
@@ -26,89 +26,123 @@ Examples:
 
 import argparse
 import json as json_module
-import re
 import signal
 import sys
 import os
 import time
 from pathlib import Path
 
-# Regex patterns for parsing Faust UI elements from expanded DSP code
-_SLIDER_RE = (
-    r'{kind}\s*\(\s*"([^"]+)"\s*,'
-    r"\s*([^,]+)\s*,\s*([^,]+)\s*,\s*([^,]+)\s*,\s*([^)]+)\)"
-)
-_UI_PATTERNS = [
-    (_SLIDER_RE.format(kind="vslider"), "vslider"),
-    (_SLIDER_RE.format(kind="hslider"), "hslider"),
-    (_SLIDER_RE.format(kind="nentry"), "nentry"),
-    (r'button\s*\(\s*"([^"]+)"\s*\)', "button"),
-    (r'checkbox\s*\(\s*"([^"]+)"\s*\)', "checkbox"),
-    (r'vbargraph\s*\(\s*"([^"]+)"\s*,\s*([^,]+)\s*,\s*([^)]+)\)', "vbargraph"),
-    (r'hbargraph\s*\(\s*"([^"]+)"\s*,\s*([^,]+)\s*,\s*([^)]+)\)', "hbargraph"),
-]
+# UI item types that group other items in the Faust JSON description
+_UI_GROUP_TYPES = ("vgroup", "hgroup", "tgroup")
 
+# Numeric fields reported for each widget type
+_UI_RANGE_FIELDS = ("init", "min", "max", "step")
 
-def get_cyfaust_imports():
-    """Import cyfaust modules, handling both dynamic and static builds."""
-    try:
-        from cyfaust.interp import (
-            get_version,
-            create_dsp_factory_from_file,
-            create_dsp_factory_from_string,
-            expand_dsp_from_file,
-            generate_auxfiles_from_file,
-            RtAudioDriver,
-            read_dsp_factory_from_bitcode_file,
-        )
-        from cyfaust.box import (
-            create_source_from_boxes,
-            dsp_to_boxes,
-            create_lib_context,
-            destroy_lib_context,
-        )
 
-        return {
-            "get_version": get_version,
-            "create_dsp_factory_from_file": create_dsp_factory_from_file,
-            "create_dsp_factory_from_string": create_dsp_factory_from_string,
-            "expand_dsp_from_file": expand_dsp_from_file,
-            "generate_auxfiles_from_file": generate_auxfiles_from_file,
-            "create_source_from_boxes": create_source_from_boxes,
-            "dsp_to_boxes": dsp_to_boxes,
-            "create_lib_context": create_lib_context,
-            "destroy_lib_context": destroy_lib_context,
-            "RtAudioDriver": RtAudioDriver,
-            "read_dsp_factory_from_bitcode_file": read_dsp_factory_from_bitcode_file,
-        }
-    except ImportError:
-        from cyfaust.cyfaust import (  # type: ignore[import-untyped]
-            get_version,
-            create_dsp_factory_from_file,
-            create_dsp_factory_from_string,
-            expand_dsp_from_file,
-            generate_auxfiles_from_file,
-            create_source_from_boxes,
-            dsp_to_boxes,
-            create_lib_context,
-            destroy_lib_context,
-            RtAudioDriver,
-            read_dsp_factory_from_bitcode_file,
-        )
+def collect_params(ui_items):
+    """Flatten the 'ui' tree of a Faust JSON description into a widget list.
 
-        return {
-            "get_version": get_version,
-            "create_dsp_factory_from_file": create_dsp_factory_from_file,
-            "create_dsp_factory_from_string": create_dsp_factory_from_string,
-            "expand_dsp_from_file": expand_dsp_from_file,
-            "generate_auxfiles_from_file": generate_auxfiles_from_file,
-            "create_source_from_boxes": create_source_from_boxes,
-            "dsp_to_boxes": dsp_to_boxes,
-            "create_lib_context": create_lib_context,
-            "destroy_lib_context": destroy_lib_context,
-            "RtAudioDriver": RtAudioDriver,
-            "read_dsp_factory_from_bitcode_file": read_dsp_factory_from_bitcode_file,
+    Each entry has 'type', 'label' and 'address', plus 'init'/'min'/'max'/'step'
+    where the widget has them and 'meta' when it declares metadata.
+    """
+    params = []
+    for item in ui_items:
+        if item.get("type") in _UI_GROUP_TYPES:
+            params.extend(collect_params(item.get("items", [])))
+            continue
+        param = {
+            "type": item["type"],
+            "label": item["label"],
+            "address": item.get("address", ""),
         }
+        for field in _UI_RANGE_FIELDS:
+            if field in item:
+                param[field] = item[field]
+        if item.get("meta"):
+            param["meta"] = item["meta"]
+        params.append(param)
+    return params
+
+
+def collect_metadata(meta_items):
+    """Convert the 'meta' list of a Faust JSON description into a dict."""
+    metadata = {}
+    for entry in meta_items:
+        metadata.update(entry)
+    return metadata
+
+
+# Where each name used by the CLI lives in the dynamic build. The static build
+# exposes all of them from the single ``cyfaust.cyfaust`` extension.
+_IMPORT_MODULES = {
+    "get_version": "cyfaust.interp",
+    "create_dsp_factory_from_file": "cyfaust.interp",
+    "create_dsp_factory_from_string": "cyfaust.interp",
+    "expand_dsp_from_file": "cyfaust.interp",
+    "generate_auxfiles_from_file": "cyfaust.interp",
+    "RtAudioDriver": "cyfaust.interp",
+    "HotSwapDsp": "cyfaust.interp",
+    "read_dsp_factory_from_bitcode_file": "cyfaust.interp",
+    "create_source_from_boxes": "cyfaust.box",
+    "dsp_to_boxes": "cyfaust.box",
+    "create_lib_context": "cyfaust.box",
+    "destroy_lib_context": "cyfaust.box",
+}
+
+
+class _LazyImports(dict):
+    """Name -> object mapping that imports each cyfaust name on first lookup.
+
+    Only the extension modules a command actually uses get loaded (and with
+    them libfaust), so cheap commands such as ``--help`` never touch them.
+    """
+
+    def __missing__(self, name):
+        import importlib
+
+        try:
+            module = importlib.import_module(_IMPORT_MODULES[name])
+        except ImportError:
+            module = importlib.import_module("cyfaust.cyfaust")
+        value = getattr(module, name)
+        self[name] = value
+        return value
+
+
+_imports = _LazyImports()
+
+
+def get_cyfaust_imports():
+    """Import cyfaust modules, handling both dynamic and static builds.
+
+    Returns a mapping whose entries are resolved lazily on first access.
+    """
+    return _imports
+
+
+def open_cache(args):
+    """Return the artifact cache selected by the command-line options, or None."""
+    if getattr(args, "no_cache", False):
+        return None
+    from cyfaust.cache import ArtifactCache
+
+    max_size = args.cache_max_size * 1024 * 1024 if args.cache_max_size else None
+    return ArtifactCache(args.cache_dir, max_size=max_size)
+
+
+def cache_key(cache, imports, path, *parts, sha_key=None):
+    """Key a cached artifact by the expanded SHA of a DSP file, or None.
+
+    The file is expanded to compute its SHA unless sha_key is given.
+    """
+    if cache is None:
+        return None
+    if sha_key is None:
+        result = imports["expand_dsp_from_file"](path)
+        if result is None:
+            return None
+        sha_key, _expanded_code = result
+    return cache.key(sha_key, imports["get_version"](), *parts)
 
 
 def cmd_version(args):
@@ -119,34 +153,42 @@ def cmd_version(args):
     return 0
 
 
-def cmd_compile(args):
-    """Compile Faust DSP to target backend."""
-    imports = get_cyfaust_imports()
+# Map backend names
+_BACKENDS = {
+    "cpp": "cpp",
+    "c++": "cpp",
+    "c": "c",
+    "rust": "rust",
+    "codebox": "codebox",
+}
 
-    if not os.path.exists(args.input):
-        print(f"Error: File not found: {args.input}", file=sys.stderr)
-        return 1
+# Output file suffix for each backend in batch mode
+_BACKEND_SUFFIXES = {
+    "cpp": ".cpp",
+    "c": ".c",
+    "rust": ".rs",
+    "codebox": ".codebox",
+}
 
-    # Map backend names
-    backend_map = {
-        "cpp": "cpp",
-        "c++": "cpp",
-        "c": "c",
-        "rust": "rust",
-        "codebox": "codebox",
-    }
 
-    backend = backend_map.get(args.backend.lower())
-    if not backend:
-        print(
-            f"Error: Unknown backend '{args.backend}'. Choose from: cpp, c, rust, codebox",
-            file=sys.stderr,
-        )
-        return 1
+def compile_to_source(args, path, backend, imports, sha_key=None):
+    """Compile a DSP file to backend source code.
+
+    sha_key is the expanded SHA key of the file, computed if not given.
+
+    Returns (source, None) on success or (None, error message) on failure.
+    """
+    name = Path(path).stem
+
+    # Reuse previously generated source for unchanged DSP code
+    cache = open_cache(args)
+    key = cache_key(cache, imports, path, "source", backend, name, sha_key=sha_key)
+    source = cache.get_text(key) if key else None
+    if source is not None:
+        return source, None
 
     # Read DSP file content
-    name = Path(args.input).stem
-    with open(args.input, "r") as f:
+    with open(path, "r") as f:
         dsp_content = f.read()
 
     # Initialize library context for box operations
@@ -155,26 +197,127 @@ def cmd_compile(args):
         # Create box from DSP content
         box = imports["dsp_to_boxes"](name, dsp_content)
         if box is None:
-            print(f"Error: Failed to parse DSP file: {args.input}", file=sys.stderr)
-            return 1
+            return None, f"Failed to parse DSP file: {path}"
 
         # Generate source code
         source = imports["create_source_from_boxes"](name, box, backend)
         if source is None:
-            print(f"Error: Failed to generate {backend} code", file=sys.stderr)
-            return 1
+            return None, f"Failed to generate {backend} code"
+    finally:
+        imports["destroy_lib_context"]()
+
+    if key:
+        cache.put_text(key, source)
+    return source, None
+
 
-        # Output
-        if args.output:
-            with open(args.output, "w") as f:
-                f.write(source)
-            print(f"Generated {backend} code: {args.output}")
+def print_batch_result(result):
+    """Print one compile/bitcode batch result as a human-readable line."""
+    if result["status"] == "ok":
+        suffix = f" (same as {result['duplicate_of']})" if "duplicate_of" in result else ""
+        print(f"OK: {result['file']} -> {result['output']}{suffix}", flush=True)
+    else:
+        print(f"ERROR: {result['file']}", flush=True)
+        for line in result.get("error", "").splitlines():
+            print(f"  {line}", flush=True)
+
+
+def run_batch_command(args, tasks, work, duplicate, printer, failed, failure=None):
+    """Run a batch, streaming results as JSON lines or via printer.
+
+    failure builds the result of a file whose processing raised (see
+    run_batch). Returns 1 if failed(result) is true for any result, 0
+    otherwise.
+    """
+    from cyfaust.batch import failed_result, resolve_jobs, run_batch
+
+    failures = []
+
+    def emit(result):
+        if args.jsonl:
+            print(json_module.dumps(result), flush=True)
         else:
-            print(source)
+            printer(result)
+        if failed(result):
+            failures.append(result["file"])
 
-        return 0
-    finally:
-        imports["destroy_lib_context"]()
+    run_batch(
+        tasks, work, duplicate, emit, jobs=resolve_jobs(args.jobs), failure=failure or failed_result
+    )
+    if not args.jsonl:
+        print(f"{len(tasks)} file(s) processed, {len(failures)} failed")
+    return 1 if failures else 0
+
+
+def cmd_compile(args):
+    """Compile Faust DSP to target backend."""
+    from cyfaust.batch import compile_file, copy_duplicate, expand_inputs, output_paths
+
+    inputs = expand_inputs(args.input)
+
+    backend = _BACKENDS.get(args.backend.lower())
+    if not backend:
+        print(
+            f"Error: Unknown backend '{args.backend}'. Choose from: cpp, c, rust, codebox",
+            file=sys.stderr,
+        )
+        return 1
+
+    if len(inputs) > 1 or args.outdir or args.jsonl:
+        if not args.outdir:
+            print("Error: --outdir is required in batch mode", file=sys.stderr)
+            return 1
+        outputs = output_paths(inputs, args.outdir, _BACKEND_SUFFIXES[backend])
+        # Only the cache options are sent to worker processes
+        options = argparse.Namespace(
+            no_cache=args.no_cache, cache_dir=args.cache_dir, cache_max_size=args.cache_max_size
+        )
+        return run_batch_command(
+            args,
+            [(path, (options, backend, outputs[path])) for path in inputs],
+            compile_file,
+            lambda original, path: copy_duplicate(original, path, outputs),
+            print_batch_result,
+            lambda result: result["status"] != "ok",
+        )
+
+    path = inputs[0]
+    if not os.path.exists(path):
+        print(f"Error: File not found: {path}", file=sys.stderr)
+        return 1
+
+    source, error = compile_to_source(args, path, backend, get_cyfaust_imports())
+    if source is None:
+        print(f"Error: {error}", file=sys.stderr)
+        return 1
+
+    # Output
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(source)
+        print(f"Generated {backend} code: {args.output}")
+    else:
+        print(source)
+
+    return 0
+
+
+def generate_diagram(args, imports):
+    """Return the SVG diagrams of args.input as {file name: SVG text}, or None."""
+    from cyfaust.auxfiles import diagram_from_file
+
+    # Reuse previously generated diagrams for unchanged DSP code
+    cache = open_cache(args)
+    key = cache_key(cache, imports, args.input, "svg", Path(args.input).stem)
+    if key:
+        files = cache.get_tree(key)
+        if files is not None:
+            return {name: content.decode("utf8") for name, content in files.items()}
+
+    svgs = diagram_from_file(args.input)
+    if svgs and key:
+        cache.put_tree(key, svgs)
+    return svgs
 
 
 def cmd_diagram(args):
@@ -185,31 +328,28 @@ def cmd_diagram(args):
         print(f"Error: File not found: {args.input}", file=sys.stderr)
         return 1
 
+    svgs = generate_diagram(args, imports)
+    if not svgs or "process.svg" not in svgs:
+        print("Error: Failed to generate SVG diagram", file=sys.stderr)
+        return 1
+
+    if args.stdout:
+        sys.stdout.write(svgs["process.svg"])
+        return 0
+
     # Determine output directory
     if args.output:
-        output_dir = str(Path(args.output).parent or ".")
-        svg_option = "-svg"
-        output_option = "-O"
-        output_path = output_dir
+        output_path = str(Path(args.output).parent or ".")
     else:
-        output_dir = "."
-        svg_option = "-svg"
-        output_option = "-O"
-        output_path = output_dir
-
-    # Generate SVG using auxfiles
-    result = imports["generate_auxfiles_from_file"](
-        args.input, svg_option, output_option, output_path
-    )
+        output_path = "."
 
-    if result:
-        name = Path(args.input).stem
-        svg_dir = Path(output_path) / f"{name}-svg"
-        print(f"Generated SVG diagram in: {svg_dir}")
-        return 0
-    else:
-        print("Error: Failed to generate SVG diagram", file=sys.stderr)
-        return 1
+    name = Path(args.input).stem
+    svg_dir = Path(output_path) / f"{name}-svg"
+    svg_dir.mkdir(parents=True, exist_ok=True)
+    for file_name, content in svgs.items():
+        (svg_dir / file_name).write_text(content)
+    print(f"Generated SVG diagram in: {svg_dir}")
+    return 0
 
 
 def cmd_expand(args):
@@ -327,9 +467,22 @@ def cmd_play(args):
     except Exception:
         pass  # May not be needed for all DSPs
 
+    # In watch mode the driver plays a container the reloaded DSP is swapped into
+    reloader = None
+    if args.watch:
+        from cyfaust.watch import HotReloader
+
+        fade_samples = max(1, round(args.fade * sample_rate / 1000))
+        player = imports["HotSwapDsp"](dsp, fade_samples, factory)
+        reloader = HotReloader(
+            args.input, player, sample_rate, imports["create_dsp_factory_from_file"]
+        )
+    else:
+        player = dsp
+
     # Create and initialize audio driver
     driver = imports["RtAudioDriver"](sample_rate, buffer_size)
-    if not driver.init(dsp):
+    if not driver.init(player):
         print("Error: Failed to initialize audio driver", file=sys.stderr)
         return 1
 
@@ -351,9 +504,13 @@ def cmd_play(args):
     print(f"  Inputs: {dsp.get_numinputs()}, Outputs: {dsp.get_numoutputs()}")
     if args.duration:
         print(f"  Duration: {args.duration} seconds")
+    if reloader:
+        print(f"  Watching: {', '.join(reloader.watcher.mtimes)}")
     print("Press Ctrl+C to stop...")
 
     driver.start()
+    if reloader:
+        reloader.start()
 
     try:
         if args.duration:
@@ -366,6 +523,8 @@ def cmd_play(args):
             while running[0]:
                 time.sleep(0.1)
     finally:
+        if reloader:
+            reloader.stop()
         driver.stop()
         print("Stopped.")
 
@@ -373,52 +532,20 @@ def cmd_play(args):
 
 
 def cmd_params(args):
-    """List all DSP parameters by parsing the expanded code."""
+    """List all DSP parameters from the compiled DSP user interface."""
     imports = get_cyfaust_imports()
 
     if not os.path.exists(args.input):
         print(f"Error: File not found: {args.input}", file=sys.stderr)
         return 1
 
-    # Expand DSP to get all UI elements
-    result = imports["expand_dsp_from_file"](args.input)
-    if result is None:
-        print("Error: Failed to expand DSP", file=sys.stderr)
+    factory = imports["create_dsp_factory_from_file"](args.input)
+    if factory is None:
+        print(f"Error: Failed to create DSP factory from: {args.input}", file=sys.stderr)
         return 1
 
-    sha_key, expanded_code = result
-
-    # Parse the expanded code to find UI elements
-    params = []
-    for pattern, ui_type in _UI_PATTERNS:
-        for match in re.finditer(pattern, expanded_code):
-            if ui_type in ["vslider", "hslider", "nentry"]:
-                params.append(
-                    {
-                        "type": ui_type,
-                        "label": match.group(1),
-                        "init": match.group(2).strip(),
-                        "min": match.group(3).strip(),
-                        "max": match.group(4).strip(),
-                        "step": match.group(5).strip(),
-                    }
-                )
-            elif ui_type in ["button", "checkbox"]:
-                params.append(
-                    {
-                        "type": ui_type,
-                        "label": match.group(1),
-                    }
-                )
-            elif ui_type in ["vbargraph", "hbargraph"]:
-                params.append(
-                    {
-                        "type": ui_type,
-                        "label": match.group(1),
-                        "min": match.group(2).strip(),
-                        "max": match.group(3).strip(),
-                    }
-                )
+    description = json_module.loads(factory.get_json())
+    params = collect_params(description.get("ui", []))
 
     if not params:
         print(f"No parameters found in: {args.input}")
@@ -433,61 +560,77 @@ def cmd_params(args):
             print(f"      Init: {p['init']}, Range: [{p['min']}, {p['max']}], Step: {p['step']}")
         elif "min" in p:
             print(f"      Range: [{p['min']}, {p['max']}]")
+        if args.verbose:
+            print(f"      Address: {p['address']}")
+            for entry in p.get("meta", []):
+                for key, value in entry.items():
+                    print(f"      {key}: {value}")
 
     return 0
 
 
-def cmd_validate(args):
-    """Validate a Faust DSP file for errors."""
-    imports = get_cyfaust_imports()
+def print_validation(result):
+    """Print a validation result in human-readable form."""
+    if result.get("error"):
+        print(result["error"])
+    if result["status"] == "invalid":
+        print(f"INVALID: {result['file']}")
+        print(f"  {result['reason']}")
+    elif result["status"] == "warning":
+        print(f"WARNING: {result['file']}")
+        print(f"  {result['reason']}")
+        for w in result["warnings"]:
+            print(f"  Warning: {w}")
+    else:
+        print(f"VALID: {result['file']}")
+        print(f"  Name: {result['name']}")
+        print(f"  Inputs: {result['inputs']}, Outputs: {result['outputs']}")
+        if result["warnings"]:
+            print(f"  Warnings ({len(result['warnings'])}):")
+            for w in result["warnings"]:
+                print(f"    - {w}")
+    if "duplicate_of" in result:
+        print(f"  Same expanded code as: {result['duplicate_of']}")
+    sys.stdout.flush()
 
-    if not os.path.exists(args.input):
-        print(f"Error: File not found: {args.input}", file=sys.stderr)
-        return 1
 
-    # Try to create factory - this will catch compile errors
-    factory = imports["create_dsp_factory_from_file"](args.input)
+def validation_failed(result, strict):
+    """Return True if a validation result should fail the command."""
+    if result["status"] == "invalid":
+        return True
+    return strict and (result["status"] == "warning" or bool(result["warnings"]))
 
-    if factory is None:
-        print(f"INVALID: {args.input}")
-        print("  Failed to compile DSP")
-        return 1
 
-    # Check for warnings
-    warnings = factory.get_warning_messages()
+def cmd_validate(args):
+    """Validate Faust DSP files for errors."""
+    from cyfaust.batch import expand_inputs, same_duplicate, validate_file
+
+    inputs = expand_inputs(args.input)
+
+    if len(inputs) > 1 or args.jsonl:
+        return run_batch_command(
+            args,
+            [(path, ()) for path in inputs],
+            validate_file,
+            same_duplicate,
+            print_validation,
+            lambda result: validation_failed(result, args.strict),
+            lambda path, error: {
+                "file": path,
+                "status": "invalid",
+                "reason": "Failed to process DSP",
+                "error": error,
+            },
+        )
 
-    # Try to create DSP instance
-    dsp = factory.create_dsp_instance()
-    if dsp is None:
-        print(f"INVALID: {args.input}")
-        print("  Failed to create DSP instance")
+    path = inputs[0]
+    if not os.path.exists(path):
+        print(f"Error: File not found: {path}", file=sys.stderr)
         return 1
 
-    # Initialize and check basic properties
-    dsp.init(44100)
-    num_inputs = dsp.get_numinputs()
-    num_outputs = dsp.get_numoutputs()
-
-    if num_outputs == 0 and num_inputs == 0:
-        print(f"WARNING: {args.input}")
-        print("  DSP has no inputs or outputs")
-        if warnings:
-            for w in warnings:
-                print(f"  Warning: {w}")
-        return 0 if not args.strict else 1
-
-    print(f"VALID: {args.input}")
-    print(f"  Name: {factory.get_name()}")
-    print(f"  Inputs: {num_inputs}, Outputs: {num_outputs}")
-
-    if warnings:
-        print(f"  Warnings ({len(warnings)}):")
-        for w in warnings:
-            print(f"    - {w}")
-        if args.strict:
-            return 1
-
-    return 0
+    result = validate_file(path)
+    print_validation(result)
+    return 1 if validation_failed(result, args.strict) else 0
 
 
 def cmd_bitcode(args):
@@ -495,17 +638,35 @@ def cmd_bitcode(args):
     imports = get_cyfaust_imports()
 
     if args.mode == "save":
+        from cyfaust.batch import copy_duplicate, expand_inputs, output_paths, save_bitcode_file
+
+        inputs = expand_inputs(args.input)
+        if len(inputs) > 1 or args.outdir or args.jsonl:
+            if not args.outdir:
+                print("Error: --outdir is required in batch mode", file=sys.stderr)
+                return 1
+            outputs = output_paths(inputs, args.outdir, ".fbc")
+            return run_batch_command(
+                args,
+                [(path, (outputs[path],)) for path in inputs],
+                save_bitcode_file,
+                lambda original, path: copy_duplicate(original, path, outputs),
+                print_batch_result,
+                lambda result: result["status"] != "ok",
+            )
+
         # Save DSP to bitcode
-        if not os.path.exists(args.input):
-            print(f"Error: File not found: {args.input}", file=sys.stderr)
+        path = inputs[0]
+        if not os.path.exists(path):
+            print(f"Error: File not found: {path}", file=sys.stderr)
             return 1
 
-        factory = imports["create_dsp_factory_from_file"](args.input)
+        factory = imports["create_dsp_factory_from_file"](path)
         if factory is None:
-            print(f"Error: Failed to create DSP factory from: {args.input}", file=sys.stderr)
+            print(f"Error: Failed to create DSP factory from: {path}", file=sys.stderr)
             return 1
 
-        output_path = args.output or (Path(args.input).stem + ".fbc")
+        output_path = args.output or (Path(path).stem + ".fbc")
         # Use factory method to write bitcode
         result = factory.write_to_bitcode_file(output_path)
 
@@ -518,13 +679,17 @@ def cmd_bitcode(args):
 
     elif args.mode == "load":
         # Load bitcode and show info
-        if not os.path.exists(args.input):
-            print(f"Error: File not found: {args.input}", file=sys.stderr)
+        if len(args.input) != 1:
+            print("Error: bitcode load takes a single file", file=sys.stderr)
+            return 1
+        path = args.input[0]
+        if not os.path.exists(path):
+            print(f"Error: File not found: {path}", file=sys.stderr)
             return 1
 
-        factory = imports["read_dsp_factory_from_bitcode_file"](args.input)
+        factory = imports["read_dsp_factory_from_bitcode_file"](path)
         if factory is None:
-            print(f"Error: Failed to load bitcode from: {args.input}", file=sys.stderr)
+            print(f"Error: Failed to load bitcode from: {path}", file=sys.stderr)
             return 1
 
         dsp = factory.create_dsp_instance()
@@ -534,7 +699,7 @@ def cmd_bitcode(args):
 
         dsp.init(44100)
 
-        print(f"Loaded bitcode: {args.input}")
+        print(f"Loaded bitcode: {path}")
         print(f"  Name: {factory.get_name()}")
         print(f"  SHA Key: {factory.get_sha_key()}")
         print(f"  Inputs: {dsp.get_numinputs()}, Outputs: {dsp.get_numoutputs()}")
@@ -565,63 +730,25 @@ def cmd_json(args):
 
     dsp.init(44100)
 
+    # UI tree, metadata and I/O counts in one walk of the instance
+    description = json_module.loads(dsp.ui_json())
+
     # Build JSON structure
     data = {
         "file": args.input,
         "name": factory.get_name(),
         "sha_key": factory.get_sha_key(),
         "compile_options": factory.get_compile_options(),
-        "inputs": dsp.get_numinputs(),
-        "outputs": dsp.get_numoutputs(),
+        "inputs": description["inputs"],
+        "outputs": description["outputs"],
         "sample_rate": dsp.get_samplerate(),
+        "metadata": collect_metadata(description.get("meta", [])),
     }
 
-    # Add metadata
-    try:
-        meta = dsp.metadata()
-        if meta:
-            data["metadata"] = meta
-    except Exception:
-        data["metadata"] = {}
-
-    # Parse parameters from expanded code
-    result = imports["expand_dsp_from_file"](args.input)
-    if result:
-        sha_key, expanded_code = result
-
-        params = []
-        for pattern, ui_type in _UI_PATTERNS:
-            for match in re.finditer(pattern, expanded_code):
-                if ui_type in ["vslider", "hslider", "nentry"]:
-                    params.append(
-                        {
-                            "type": ui_type,
-                            "label": match.group(1),
-                            "init": match.group(2).strip(),
-                            "min": match.group(3).strip(),
-                            "max": match.group(4).strip(),
-                            "step": match.group(5).strip(),
-                        }
-                    )
-                elif ui_type in ["button", "checkbox"]:
-                    params.append(
-                        {
-                            "type": ui_type,
-                            "label": match.group(1),
-                        }
-                    )
-                elif ui_type in ["vbargraph", "hbargraph"]:
-                    params.append(
-                        {
-                            "type": ui_type,
-                            "label": match.group(1),
-                            "min": match.group(2).strip(),
-                            "max": match.group(3).strip(),
-                        }
-                    )
-
-        if params:
-            data["parameters"] = params
+    params = collect_params(description.get("ui", []))
+    if params:
+        data["parameters"] = params
+    data["ui"] = description.get("ui", [])
 
     # Add libraries
     libs = factory.get_library_list()
@@ -647,6 +774,41 @@ def cmd_json(args):
     return 0
 
 
+def add_cache_arguments(parser):
+    """Add the artifact cache options to a subcommand parser."""
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Do not read or write the artifact cache"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="Artifact cache directory (default: $CYFAUST_CACHE_DIR or ~/.cache/cyfaust)",
+    )
+    parser.add_argument(
+        "--cache-max-size",
+        type=int,
+        help="Maximum artifact cache size in MiB before least recently used entries "
+        "are evicted (default: 256)",
+    )
+
+
+def add_batch_arguments(parser, outdir=True):
+    """Add the batch processing options to a subcommand parser."""
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of files processed in parallel (0: one per CPU, default: 1)",
+    )
+    if outdir:
+        parser.add_argument(
+            "--outdir", help="Output directory for batch mode (mirrors the input layout)"
+        )
+    parser.add_argument(
+        "--jsonl", action="store_true", help="Stream one JSON result per line as files complete"
+    )
+
+
 def main():
     """Main entry point."""
     parser = argparse.ArgumentParser(
@@ -660,6 +822,9 @@ Examples:
   cyfaust play osc.dsp -d 5
   cyfaust params synth.dsp
   cyfaust validate filter.dsp
+  cyfaust validate -j 0 --jsonl dsp/
+  cyfaust compile -j 4 --outdir build/ "dsp/**/*.dsp"
+  cyfaust play synth.dsp --watch
   cyfaust bitcode save synth.dsp -o synth.fbc
   cyfaust json instrument.dsp --pretty
 """,
@@ -673,7 +838,9 @@ Examples:
 
     # compile command
     compile_parser = subparsers.add_parser("compile", help="Compile Faust DSP to target backend")
-    compile_parser.add_argument("input", help="Input Faust DSP file")
+    compile_parser.add_argument(
+        "input", nargs="+", help="Input Faust DSP file(s), directories or glob patterns"
+    )
     compile_parser.add_argument(
         "-b",
         "--backend",
@@ -682,12 +849,20 @@ Examples:
         help="Target backend (default: cpp)",
     )
     compile_parser.add_argument("-o", "--output", help="Output file (default: stdout)")
+    add_cache_arguments(compile_parser)
+    add_batch_arguments(compile_parser)
     compile_parser.set_defaults(func=cmd_compile)
 
     # diagram command
     diagram_parser = subparsers.add_parser("diagram", help="Generate SVG block diagram")
     diagram_parser.add_argument("input", help="Input Faust DSP file")
     diagram_parser.add_argument("-o", "--output", help="Output directory for SVG files")
+    diagram_parser.add_argument(
+        "--stdout",
+        action="store_true",
+        help="Write the top-level SVG diagram to stdout instead of creating files",
+    )
+    add_cache_arguments(diagram_parser)
     diagram_parser.set_defaults(func=cmd_diagram)
 
     # expand command
@@ -714,6 +889,18 @@ Examples:
     play_parser.add_argument(
         "-b", "--buffersize", type=int, default=512, help="Buffer size in samples (default: 512)"
     )
+    play_parser.add_argument(
+        "-w",
+        "--watch",
+        action="store_true",
+        help="Reload the DSP when it or an included file changes, crossfading to the new version",
+    )
+    play_parser.add_argument(
+        "--fade",
+        type=float,
+        default=50.0,
+        help="Crossfade duration in milliseconds for --watch (default: 50)",
+    )
     play_parser.set_defaults(func=cmd_play)
 
     # params command
@@ -725,9 +912,12 @@ Examples:
     params_parser.set_defaults(func=cmd_params)
 
     # validate command
-    validate_parser = subparsers.add_parser("validate", help="Check a Faust DSP file for errors")
-    validate_parser.add_argument("input", help="Input Faust DSP file")
+    validate_parser = subparsers.add_parser("validate", help="Check Faust DSP files for errors")
+    validate_parser.add_argument(
+        "input", nargs="+", help="Input Faust DSP file(s), directories or glob patterns"
+    )
     validate_parser.add_argument("--strict", action="store_true", help="Treat warnings as errors")
+    add_batch_arguments(validate_parser, outdir=False)
     validate_parser.set_defaults(func=cmd_validate)
 
     # bitcode command
@@ -737,10 +927,15 @@ Examples:
         choices=["save", "load"],
         help="Operation mode: save DSP to bitcode, or load and display info",
     )
-    bitcode_parser.add_argument("input", help="Input file (DSP for save, bitcode for load)")
+    bitcode_parser.add_argument(
+        "input",
+        nargs="+",
+        help="Input file(s) (DSP files, directories or glob patterns for save, bitcode for load)",
+    )
     bitcode_parser.add_argument(
         "-o", "--output", help="Output bitcode file (for save mode, default: <name>.fbc)"
     )
+    add_batch_arguments(bitcode_parser)
     bitcode_parser.set_defaults(func=cmd_bitcode)
 
     # json command
@@ -0,0 +1,16 @@
+"""Access to the extension modules from the pure Python modules.
+
+The dynamic build has one extension module per API (common, interp, box,
+signal, player), the static build a single cyfaust.cyfaust module holding
+all of them.
+"""
+
+import importlib
+
+
+def extension_module(name):
+    """Return the extension module of an API, e.g. "box", in either build."""
+    try:
+        return importlib.import_module(f"cyfaust.{name}")
+    except ImportError:
+        return importlib.import_module("cyfaust.cyfaust")
@@ -0,0 +1,412 @@
+"""Static cost estimation of signal graphs.
+
+estimate_cost() walks the normal-form signals of a DSP, as returned by
+boxes_to_signals() or simplify_to_normal_form2(), and counts what makes it
+expensive to run: operations by class, delay-line memory, table sizes and
+recursion. This takes milliseconds, without compiling or running the DSP,
+e.g. to decide whether a DSP fits in a realtime budget.
+
+Each node is classified by rate: constant, control rate (depending only on
+UI controls and constants, so computed once per block) or sample rate.
+Operations are counted separately for the sample and control rates, and a
+weighted sum of them gives a relative cost per sample. calibrate() scales
+the weights to nanoseconds per sample from benchmarks of reference DSPs:
+
+Example:
+    >>> from cyfaust.analysis import estimate_cost
+    >>> cost = estimate_cost('import("stdfaust.lib"); process = fi.lowpass(4, 1000);')
+    >>> cost["operations"]["transcendental"], cost["recursions"]
+"""
+
+import statistics
+
+from cyfaust._api import extension_module
+
+# Relative cost of one operation of each class at sample rate
+DEFAULT_WEIGHTS = {
+    "arithmetic": 1.0,
+    "division": 4.0,
+    "math": 2.0,
+    "transcendental": 20.0,
+    "select": 1.0,
+    "delay": 1.0,
+    "table_read": 2.0,
+    "foreign": 20.0,
+}
+
+# Mathematical functions by cost class, by xtended name
+_TRANSCENDENTAL = frozenset(
+    ["acos", "asin", "atan", "atan2", "cos", "exp", "exp10", "log", "log10", "pow", "sin", "tan"]
+)
+_DIVISION = frozenset(["fmod", "remainder"])
+
+_CONSTANT, _CONTROL, _SAMPLE = 0, 1, 2
+_RATES = ("constant", "control", "sample")
+
+
+## ---------------------------------------------------------------------------
+## graph walk
+
+
+class _Estimator:
+    """Classify the nodes of a signal graph by rate and operation class."""
+
+    def __init__(self, api):
+        self.api = api
+        kind = api.SigKind
+        op = api.SOperator
+        self.kind = kind
+        self.division_ops = {op.kDiv, op.kRem}
+        # nodes whose value is set by the user, once per block
+        self.controls = {
+            kind.kSigHSlider,
+            kind.kSigVSlider,
+            kind.kSigNumEntry,
+            kind.kSigButton,
+            kind.kSigCheckbox,
+            kind.kSigSoundfile,
+            kind.kSigFVar,
+        }
+        # nodes computed at sample rate whatever their operands
+        self.sampled = {
+            kind.kSigInput,
+            kind.kSigDelay1,
+            kind.kSigDelay,
+            kind.kSigPrefix,
+            kind.kSigProj,
+            kind.kSigRec,
+        }
+        self.rates = {}
+        self.intervals = {}
+
+    def operation(self, kind, attrs):
+        """Return the cost class of a node, or None if it costs nothing."""
+        k = self.kind
+        if kind == k.kSigBinOp:
+            return "division" if attrs["op"] in self.division_ops else "arithmetic"
+        if kind == k.kSigXtended:
+            name = attrs["name"]
+            if name in _TRANSCENDENTAL:
+                return "transcendental"
+            return "division" if name in _DIVISION else "math"
+        if kind in (k.kSigIntCast, k.kSigFloatCast):
+            return "arithmetic"
+        if kind == k.kSigSelect2:
+            return "select"
+        if kind in (k.kSigDelay1, k.kSigDelay, k.kSigPrefix):
+            return "delay"
+        if kind in (k.kSigReadTable, k.kSigSoundfileBuffer):
+            return "table_read"
+        if kind == k.kSigFFun:
+            return "foreign"
+        return None
+
+    def rate(self, node, kind, children):
+        if kind in self.sampled:
+            rate = _SAMPLE
+        elif kind in self.controls:
+            rate = _CONTROL
+        else:
+            # operands not rated yet are on a recursive loop
+            rate = max((self.rates.get(c.id, _SAMPLE) for c in children), default=_CONSTANT)
+        self.rates[node.id] = rate
+        return rate
+
+    def interval(self, node):
+        """Return (low, high) bounds of a signal's values, or None if unknown.
+
+        Operands are bounded first, from an explicit stack as signal graphs
+        can be nested deeper than Python's recursion limit.
+        """
+        intervals = self.intervals
+        work = [(node, None)]
+        while work:
+            current, signal = work.pop()
+            if signal is not None:
+                intervals[current.id] = self._interval(*signal)
+            elif current.id not in intervals:
+                intervals[current.id] = None  # cut recursive loops
+                signal = self.api.classify_signal(current)
+                work.append((current, signal))
+                work.extend((c, None) for c in self._operands(*signal))
+        return intervals[node.id]
+
+    def _operands(self, kind, children, attrs):
+        """Return the operands a node's bounds are computed from."""
+        k = self.kind
+        if kind in (k.kSigHSlider, k.kSigVSlider, k.kSigNumEntry, k.kSigSelect2):
+            return children[1:3]
+        if kind in (k.kSigIntCast, k.kSigFloatCast):
+            return children[:1]
+        if kind in (k.kSigXtended, k.kSigBinOp):
+            return children
+        return []
+
+    def _interval(self, kind, children, attrs):
+        k = self.kind
+        op = self.api.SOperator
+        bounds = [self.intervals[c.id] for c in self._operands(kind, children, attrs)]
+        if kind in (k.kSigInt, k.kSigReal):
+            return attrs["value"], attrs["value"]
+        if kind in (k.kSigButton, k.kSigCheckbox):
+            return 0, 1
+        if not bounds or None in bounds:
+            return None
+        if kind in (k.kSigHSlider, k.kSigVSlider, k.kSigNumEntry):
+            return bounds[0][0], bounds[1][1]
+        if kind in (k.kSigIntCast, k.kSigFloatCast):
+            return bounds[0]
+        if kind == k.kSigSelect2:
+            return min(bounds[0][0], bounds[1][0]), max(bounds[0][1], bounds[1][1])
+        if kind == k.kSigXtended and attrs["name"] in ("min", "max") and len(bounds) == 2:
+            pick = min if attrs["name"] == "min" else max
+            return pick(bounds[0][0], bounds[1][0]), pick(bounds[0][1], bounds[1][1])
+        if kind == k.kSigXtended and attrs["name"] == "abs":
+            low, high = bounds[0]
+            return (0 if low <= 0 <= high else min(abs(low), abs(high))), max(abs(low), abs(high))
+        if kind == k.kSigBinOp and attrs["op"] in (op.kAdd, op.kSub, op.kMul):
+            (a, b), (c, d) = bounds
+            if attrs["op"] == op.kAdd:
+                return a + c, b + d
+            if attrs["op"] == op.kSub:
+                return a - d, b - c
+            products = (a * c, a * d, b * c, b * d)
+            return min(products), max(products)
+        return None
+
+
+## ---------------------------------------------------------------------------
+## public API
+
+
+def estimate_cost(signals, weights=None, block_size=512, name="FaustDSP", args=()):
+    """Estimate the cost of computing a DSP from its signals, without compiling it.
+
+    Args:
+        signals: normal-form Signal or SignalVector of the current signal
+            context, as returned by boxes_to_signals(), or Faust source code,
+            converted to signals in a box context of its own
+        weights: relative cost of an operation of each class at sample rate,
+            e.g. as returned by calibrate(); DEFAULT_WEIGHTS if None
+        block_size: block size over which control-rate operations are spread
+        name: name of the Faust program, for source code
+        args: Faust compiler options, for source code
+
+    Returns:
+        dict with:
+
+        - "nodes": number of distinct nodes
+        - "rates": number of nodes computed once ("constant"), once per
+          block ("control") and once per sample ("sample")
+        - "operations" / "control_operations": number of operations of each
+          class ("arithmetic", "division", "math", "transcendental",
+          "select", "delay", "table_read", "foreign") at sample rate and at
+          control rate
+        - "delay_lines", "delay_memory": number of delayed signals and
+          samples of delay memory, a delay line per signal being as long as
+          its longest delay
+        - "unbounded_delays": number of delays whose length could not be
+          bounded, not included in "delay_memory"
+        - "tables", "table_memory": sizes of the tables and their sum
+        - "recursions": number of recursive definitions (groups of
+          mutually recursive signals)
+        - "recursion_depth": largest number of recursive definitions nested
+          in each other
+        - "cost": weighted sum of the operations per sample
+
+        or None if source code fails to compile (the error is printed).
+    """
+    if isinstance(signals, str):
+        box_api = extension_module("box")
+        with box_api.box_context():
+            box = box_api.dsp_to_boxes(name, signals, *args)
+            if box is None:
+                return None
+            return estimate_cost(box_api.boxes_to_signals(box), weights, block_size)
+    api = extension_module("signal")
+    if not isinstance(signals, (api.Signal, api.SignalVector)):
+        raise TypeError("signals must be a Signal, a SignalVector or Faust source code")
+    weights = DEFAULT_WEIGHTS if weights is None else weights
+    estimator = _Estimator(api)
+    k = api.SigKind
+
+    rates = [0, 0, 0]
+    operations = [dict.fromkeys(DEFAULT_WEIGHTS, 0) for _ in _RATES]
+    delays = {}
+    unbounded = 0
+    tables = []
+    recursions = []
+    for node in api.walk_signal(signals):
+        kind, children, attrs = api.classify_signal(node)
+        rate = estimator.rate(node, kind, children)
+        rates[rate] += 1
+        operation = estimator.operation(kind, attrs)
+        if operation is not None:
+            operations[rate][operation] += 1
+        if kind in (k.kSigDelay1, k.kSigPrefix):
+            length = 1
+        elif kind == k.kSigDelay:
+            bounds = estimator.interval(children[1])
+            if bounds is None:
+                unbounded += 1
+                length = 0
+            else:
+                length = max(int(bounds[1]), 0)
+        else:
+            length = None
+        if length is not None:
+            delayed = children[-1] if kind == k.kSigPrefix else children[0]
+            delays[delayed.id] = max(delays.get(delayed.id, 0), length)
+        elif kind == k.kSigWriteTable:
+            size = estimator.interval(children[0])
+            tables.append(0 if size is None else int(size[1]))
+        elif kind == k.kSigRec:
+            recursions.append(node)
+
+    depth = _recursion_depth(api, signals, recursions)
+    cost = sum(weights.get(op, 0.0) * n for op, n in operations[_SAMPLE].items())
+    cost += sum(weights.get(op, 0.0) * n for op, n in operations[_CONTROL].items()) / block_size
+    return {
+        "nodes": sum(rates),
+        "rates": dict(zip(_RATES, rates)),
+        "operations": operations[_SAMPLE],
+        "control_operations": operations[_CONTROL],
+        "delay_lines": len(delays),
+        "delay_memory": sum(delays.values()),
+        "unbounded_delays": unbounded,
+        "tables": tables,
+        "table_memory": sum(tables),
+        "recursions": len(recursions),
+        "recursion_depth": depth,
+        "cost": cost,
+    }
+
+
+def value_bounds(signal):
+    """Return (low, high) bounds of the values of a signal, or None if unknown.
+
+    Bounds follow constants and the ranges of UI controls through casts,
+    select2, min, max, abs, additions, subtractions and products, as used
+    by estimate_cost() to bound delay lengths and table sizes.
+    """
+    api = extension_module("signal")
+    if not isinstance(signal, api.Signal):
+        raise TypeError("signal must be a Signal")
+    return _Estimator(api).interval(signal)
+
+
+def _recursion_depth(api, signals, recursions):
+    """Return the largest number of recursive definitions nested in each other.
+
+    A recursion refers to the recursions it is nested in, through their
+    variables, and to those nested in it, through their outputs: together
+    they form a loop of the graph of references between recursions, whose
+    outermost recursion is the first one reached from the outputs. Removing
+    it leaves the loops nested one level deeper, and so on.
+    """
+    k = api.SigKind
+
+    def references(nodes):
+        # recursions reached from nodes without going through another one
+        found, seen, stack = [], set(), list(reversed(nodes))
+        while stack:
+            node = stack.pop()
+            if node.id in seen:
+                continue
+            seen.add(node.id)
+            kind, children, _ = api.classify_signal(node)
+            if kind == k.kSigRec:
+                found.append(node.id)
+            else:
+                stack.extend(reversed(children))
+        return found
+
+    edges = {r.id: references(list(api.classify_signal(r)[1])) for r in recursions}
+    outputs = list(signals) if isinstance(signals, api.SignalVector) else [signals]
+    depth = 0
+    work = [(references(outputs), set(edges), 1)]
+    while work:
+        starts, within, level = work.pop()
+        for outermost, *nested in _loops(starts, edges, within):
+            depth = max(depth, level)
+            work.append((edges[outermost], set(nested), level + 1))
+    return depth
+
+
+def _loops(starts, edges, within):
+    """Return the strongly connected components of a graph restricted to within.
+
+    This is Tarjan's algorithm with an explicit stack, walking from starts:
+    each component is listed from the first of its nodes that was reached.
+    """
+    index, low = {}, {}
+    stack, on_stack, components = [], set(), []
+    for start in starts:
+        if start not in within or start in index:
+            continue
+        work = [(start, 0)]
+        while work:
+            key, position = work.pop()
+            successors = [s for s in edges[key] if s in within]
+            if position == 0:
+                index[key] = low[key] = len(index)
+                stack.append(key)
+                on_stack.add(key)
+            else:
+                low[key] = min(low[key], low[successors[position - 1]])
+            for i in range(position, len(successors)):
+                child = successors[i]
+                if child not in index:
+                    work.append((key, i + 1))
+                    work.append((child, 0))
+                    break
+                if child in on_stack:
+                    low[key] = min(low[key], index[child])
+            else:
+                if low[key] == index[key]:
+                    component = []
+                    while not component or component[-1] != key:
+                        component.append(stack.pop())
+                        on_stack.discard(component[-1])
+                    components.append(component[::-1])
+    return components
+
+
+def calibrate(sources, weights=None, backend="auto", sample_rate=48000, block_size=512):
+    """Scale cost weights to nanoseconds per sample from benchmarks.
+
+    Each reference DSP is compiled, timed with backends.time_factory() and
+    estimated with estimate_cost(); the weights are scaled by the median
+    ratio of measured to estimated cost, so that estimate_cost() with the
+    returned weights gives "cost" in nanoseconds per sample for this machine
+    and backend.
+
+    Args:
+        sources: Faust source code of reference DSPs, preferably similar to
+            the DSPs to estimate
+        weights: relative weights to scale; DEFAULT_WEIGHTS if None
+        backend: backend to benchmark, as for backends.compile()
+        sample_rate: sample rate of the benchmark
+        block_size: block size of the benchmark
+
+    Returns:
+        dict of weights.
+
+    Raises:
+        ValueError: if no reference DSP compiles to a DSP with a cost.
+    """
+    from cyfaust.backends import compile, time_factory
+
+    weights = DEFAULT_WEIGHTS if weights is None else weights
+    ratios = []
+    for source in sources:
+        estimate = estimate_cost(source, weights, block_size)
+        factory = compile(source, backend)
+        if estimate is None or factory is None or estimate["cost"] <= 0:
+            continue
+        seconds = time_factory(factory, sample_rate, block_size)
+        ratios.append(seconds * 1e9 / block_size / estimate["cost"])
+    if not ratios:
+        raise ValueError("no reference DSP could be compiled and benchmarked")
+    scale = statistics.median(ratios)
+    return {op: weight * scale for op, weight in weights.items()}
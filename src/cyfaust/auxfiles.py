@@ -0,0 +1,99 @@
+"""In-memory generation of Faust auxiliary files (SVG, XML, JSON, ...).
+
+libfaust always writes auxiliary files such as block diagrams to disk. The
+functions here run the generation in a private temporary directory and
+return the results as bytes keyed by their path relative to it, so callers
+never have to locate or clean up the generated files.
+
+Example:
+    >>> from cyfaust.auxfiles import diagram_from_file
+    >>> svgs = diagram_from_file("osc.dsp")
+    >>> svgs["process.svg"][:5]
+    '<?xml'
+"""
+
+import os
+import tempfile
+
+from cyfaust._api import extension_module
+
+
+def _read_tree(directory):
+    """Read every file below directory into a {relative/path: bytes} dict."""
+    files = {}
+    for root, _dirs, names in os.walk(directory):
+        for name in names:
+            path = os.path.join(root, name)
+            key = os.path.relpath(path, directory).replace(os.sep, "/")
+            with open(path, "rb") as f:
+                files[key] = f.read()
+    return dict(sorted(files.items()))
+
+
+def auxfiles_from_file(filename, *args):
+    """Generate auxiliary files from a DSP file and return them in memory.
+
+    Args:
+        filename: path to the Faust DSP file
+        *args: Faust options selecting what to generate (e.g. "-svg", "-xml", "-json")
+
+    Returns:
+        dict mapping each generated file's relative path to its content as
+        bytes, or None if generation failed (the error is printed).
+    """
+    generate = extension_module("interp").generate_auxfiles_from_file
+    with tempfile.TemporaryDirectory(prefix="cyfaust-aux-") as tmpdir:
+        if not generate(filename, *args, "-O", tmpdir):
+            return None
+        return _read_tree(tmpdir)
+
+
+def auxfiles_from_string(name_app, dsp_content, *args):
+    """Generate auxiliary files from DSP source code and return them in memory.
+
+    Args:
+        name_app: name of the Faust program (used to name generated files)
+        dsp_content: Faust source code
+        *args: Faust options selecting what to generate (e.g. "-svg", "-xml", "-json")
+
+    Returns:
+        dict mapping each generated file's relative path to its content as
+        bytes, or None if generation failed (the error is printed).
+    """
+    generate = extension_module("interp").generate_auxfiles_from_string
+    with tempfile.TemporaryDirectory(prefix="cyfaust-aux-") as tmpdir:
+        if not generate(name_app, dsp_content, *args, "-O", tmpdir):
+            return None
+        return _read_tree(tmpdir)
+
+
+def _svg_tree(files):
+    """Keep the SVG files of a <name>-svg directory, keyed by file name."""
+    if files is None:
+        return None
+    svgs = {}
+    for path, content in files.items():
+        folder, _, name = path.rpartition("/")
+        if folder.endswith("-svg") and name.endswith(".svg"):
+            svgs[name] = content.decode("utf8")
+    return svgs
+
+
+def diagram_from_file(filename, *args):
+    """Generate the SVG block diagrams of a DSP file in memory.
+
+    Returns:
+        dict mapping SVG file names (the top-level diagram is "process.svg")
+        to SVG text, or None if generation failed.
+    """
+    return _svg_tree(auxfiles_from_file(filename, "-svg", *args))
+
+
+def diagram_from_string(name_app, dsp_content, *args):
+    """Generate the SVG block diagrams of DSP source code in memory.
+
+    Returns:
+        dict mapping SVG file names (the top-level diagram is "process.svg")
+        to SVG text, or None if generation failed.
+    """
+    return _svg_tree(auxfiles_from_string(name_app, dsp_content, "-svg", *args))
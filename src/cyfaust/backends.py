@@ -0,0 +1,102 @@
+"""Backend-independent compilation of Faust DSP code.
+
+Every backend produces a DspFactory whose instances are Dsp objects with
+the same interface (init, compute, build_user_interface, ...) and can be
+played by RtAudioDriver, so code does not need to branch on the backend.
+
+compile() picks the fastest available backend: LLVM when cyfaust was built
+with it, the interpreter otherwise. With benchmark=True every candidate is
+compiled and timed on a few blocks of silence and the fastest one is used.
+
+Example:
+    >>> from cyfaust.backends import compile
+    >>> factory = compile('import("stdfaust.lib"); process = os.osc(440);')
+    >>> dsp = factory.create_dsp_instance()
+    >>> dsp.init(48000)
+"""
+
+import time
+
+from cyfaust._api import extension_module
+
+BACKENDS = ("auto", "interp", "llvm", "native")
+
+
+def available_backends():
+    """Return the backends that can be used, fastest first.
+
+    "native" needs a C compiler at run time and is only used when requested.
+    """
+    backends = ["interp"]
+    if hasattr(extension_module("interp"), "LlvmDspFactory"):
+        backends.insert(0, "llvm")
+    return backends
+
+
+def create_factory(source, backend, name="FaustDSP", args=()):
+    """Compile Faust code with one backend, returning a DspFactory or None."""
+    interp = extension_module("interp")
+    if backend == "interp":
+        return interp.create_dsp_factory_from_string(name, source, *args)
+    if backend == "llvm":
+        if not hasattr(interp, "LlvmDspFactory"):
+            print("LLVM backend not available in this build")
+            return None
+        return interp.llvm_create_cached_dsp_factory_from_string(name, source, "", -1, *args)
+    if backend == "native":
+        from cyfaust.native import compile_native
+
+        return compile_native(source, name=name, args=tuple(args))
+    raise ValueError(f"unknown backend {backend!r}, expected one of {BACKENDS}")
+
+
+def _buffer(channels, frames):
+    """Return a zeroed C-contiguous float32 [channels, frames] buffer."""
+    channels = max(channels, 1)
+    return memoryview(bytearray(4 * channels * frames)).cast("f", [channels, frames])
+
+
+def time_factory(factory, sample_rate=48000, block_size=512, blocks=64):
+    """Return the mean time in seconds to compute one block with an instance of factory."""
+    dsp = factory.create_dsp_instance()
+    dsp.init(sample_rate)
+    inputs = _buffer(dsp.get_numinputs(), block_size)
+    outputs = _buffer(dsp.get_numoutputs(), block_size)
+    dsp.compute(block_size, inputs, outputs)  # warm up
+    start = time.perf_counter()
+    for _ in range(blocks):
+        dsp.compute(block_size, inputs, outputs)
+    return (time.perf_counter() - start) / blocks
+
+
+def compile(source, backend="auto", name="FaustDSP", args=(), benchmark=False, sample_rate=48000):
+    """Compile Faust code to a DspFactory with the given or the fastest backend.
+
+    Args:
+        source: Faust DSP code
+        backend: "auto", "interp", "llvm" or "native"
+        name: name of the Faust program
+        args: Faust compiler options (e.g. ("-vec",))
+        benchmark: with backend="auto", compile with every available
+            backend and keep the one computing fastest
+        sample_rate: sample rate used for the benchmark
+
+    Returns:
+        DspFactory, or None on error (the error is printed).
+    """
+    if backend != "auto":
+        return create_factory(source, backend, name, args)
+
+    candidates = available_backends()
+    if not benchmark or len(candidates) == 1:
+        return create_factory(source, candidates[0], name, args)
+
+    best, best_time = None, None
+    for candidate in candidates:
+        factory = create_factory(source, candidate, name, args)
+        if factory is None:
+            continue
+        elapsed = time_factory(factory, sample_rate)
+        if best_time is None or elapsed < best_time:
+            best, best_time = factory, elapsed
+    return best
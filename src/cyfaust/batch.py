@@ -0,0 +1,267 @@
+"""Parallel batch processing of Faust DSP files for the command-line interface.
+
+Files are spread over a process pool. Each file is first expanded to get the
+SHA key of its self-contained code; files whose expanded code was already
+seen in the run are not processed again but reported as duplicates of the
+first one. Results are handed back one by one as they complete, so they can
+be streamed (e.g. as JSON lines).
+
+Worker functions live here rather than in ``cyfaust.__main__`` so that they
+can be pickled by reference whichever way the CLI was started.
+"""
+
+import contextlib
+import glob
+import io
+import os
+import shutil
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from pathlib import Path
+
+# Characters that make an input argument a glob pattern
+_GLOB_CHARS = "*?["
+
+
+def expand_inputs(patterns):
+    """Expand CLI inputs into a list of DSP files.
+
+    Directories are searched recursively for ``*.dsp`` files and glob
+    patterns (including ``**``) are expanded, so batches work even where the
+    shell does not expand them. Other arguments are kept as given, so that
+    missing files are reported by the command.
+    """
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            paths.extend(sorted(str(p) for p in Path(pattern).rglob("*.dsp")))
+        elif not os.path.exists(pattern) and any(c in pattern for c in _GLOB_CHARS):
+            paths.extend(sorted(glob.glob(pattern, recursive=True)))
+        else:
+            paths.append(pattern)
+    # Drop repeated arguments, keeping the first occurrence
+    return list(dict.fromkeys(paths))
+
+
+def output_paths(paths, outdir, suffix):
+    """Map each input to ``outdir``, mirroring the layout below their common parent."""
+    absolute = [os.path.abspath(p) for p in paths]
+    if len(absolute) == 1:
+        root = os.path.dirname(absolute[0])
+    else:
+        root = os.path.commonpath([os.path.dirname(p) for p in absolute])
+    return {
+        path: str(Path(outdir) / Path(os.path.relpath(full, root)).with_suffix(suffix))
+        for path, full in zip(paths, absolute)
+    }
+
+
+def call_quietly(function, *args):
+    """Call function, returning (result, text it printed to stdout).
+
+    libfaust wrappers print compilation errors; capturing them keeps worker
+    output from interleaving with streamed results.
+    """
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer):
+        result = function(*args)
+    return result, buffer.getvalue().strip()
+
+
+class InlineExecutor:
+    """Executor running tasks synchronously in the calling process (for -j 1)."""
+
+    def submit(self, function, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(function(*args, **kwargs))
+        except BaseException as exc:
+            future.set_exception(exc)
+        return future
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+def resolve_jobs(jobs):
+    """Return the number of worker processes for a -j value (0 means all CPUs)."""
+    if not jobs or jobs < 1:
+        return os.cpu_count() or 1
+    return jobs
+
+
+def failed_result(path, error):
+    """Result for a file whose processing raised an exception."""
+    return {"file": path, "status": "error", "error": error}
+
+
+def run_batch(tasks, work, duplicate, emit, jobs=1, failure=failed_result):
+    """Process DSP files, skipping those whose expanded code was already seen.
+
+    Args:
+        tasks: list of (path, extra_args) pairs; work is called as
+            ``work(path, *extra_args, sha_key=sha_key)`` in a worker process
+        work: picklable function returning a result dict for one file; it
+            gets the expanded SHA key computed for deduplication (None if
+            the code could not be expanded) so as not to expand it again
+        duplicate: called in this process as ``duplicate(original_result, path)``
+            for a file with the same expanded code as an already processed one,
+            returning its result dict
+        emit: called in this process with each result dict as it completes
+        jobs: number of worker processes (1 runs everything in this process)
+        failure: called in this process as ``failure(path, error)`` when
+            processing a file raises, e.g. on a file that is not UTF-8,
+            returning its result dict; error is the exception as text. The
+            other files of the batch are still processed.
+    """
+    extra = dict(tasks)
+    seen = {}  # expanded SHA key -> first path
+    done = {}  # first path -> its result
+    waiting = {}  # first path -> duplicates waiting for its result
+
+    executor = InlineExecutor() if jobs == 1 else ProcessPoolExecutor(max_workers=jobs)
+    with executor as pool:
+        pending = {pool.submit(expanded_sha, path): ("key", path) for path in extra}
+        while pending:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            # Handle in submission order so earlier files become the originals
+            for future in [f for f in pending if f in finished]:
+                stage, path = pending.pop(future)
+                try:
+                    value = future.result()
+                except Exception as exc:
+                    stage, value = "failed", failure(path, f"{type(exc).__name__}: {exc}")
+                if stage == "key":
+                    sha_key = value
+                    original = seen.get(sha_key) if sha_key else None
+                    if original is None:
+                        if sha_key:
+                            seen[sha_key] = path
+                        future = pool.submit(work, path, *extra[path], sha_key=sha_key)
+                        pending[future] = ("work", path)
+                    elif original in done:
+                        emit(duplicate(done[original], path))
+                    else:
+                        waiting.setdefault(original, []).append(path)
+                else:
+                    result = value
+                    done[path] = result
+                    emit(result)
+                    for other in waiting.pop(path, []):
+                        emit(duplicate(result, other))
+
+
+def copy_duplicate(original, path, outputs):
+    """Result for a duplicate whose output is a copy of the original's output."""
+    result = dict(original, file=path, duplicate_of=original["file"])
+    if original.get("status") == "ok":
+        output = outputs[path]
+        if output != original["output"]:
+            os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+            shutil.copyfile(original["output"], output)
+        result["output"] = output
+    return result
+
+
+def same_duplicate(original, path):
+    """Result for a duplicate that shares the original's result."""
+    return dict(original, file=path, duplicate_of=original["file"])
+
+
+## ---------------------------------------------------------------------------
+## worker functions
+
+
+def _imports():
+    from cyfaust.__main__ import get_cyfaust_imports
+
+    return get_cyfaust_imports()
+
+
+def expanded_sha(path):
+    """Return the SHA key of the expanded code of a DSP file, or None."""
+    if not os.path.exists(path):
+        return None
+    result, _output = call_quietly(_imports()["expand_dsp_from_file"], path)
+    return result[0] if result else None
+
+
+def validate_file(path, sha_key=None):
+    """Validate one DSP file, returning a result dict."""
+    result = {"file": path}
+    if not os.path.exists(path):
+        result.update(status="invalid", reason="File not found")
+        return result
+
+    factory, output = call_quietly(_imports()["create_dsp_factory_from_file"], path)
+    if factory is None:
+        result.update(status="invalid", reason="Failed to compile DSP", error=output)
+        return result
+
+    dsp = factory.create_dsp_instance()
+    if dsp is None:
+        result.update(status="invalid", reason="Failed to create DSP instance")
+        return result
+
+    dsp.init(44100)
+    result.update(
+        name=factory.get_name(),
+        sha_key=factory.get_sha_key(),
+        inputs=dsp.get_numinputs(),
+        outputs=dsp.get_numoutputs(),
+        warnings=list(factory.get_warning_messages()),
+    )
+    if result["inputs"] == 0 and result["outputs"] == 0:
+        result.update(status="warning", reason="DSP has no inputs or outputs")
+    else:
+        result["status"] = "valid"
+    return result
+
+
+def compile_file(path, args, backend, output, sha_key=None):
+    """Compile one DSP file to backend source written to output.
+
+    sha_key is the expanded SHA key of the file if already known, used to
+    look up and store the generated source in the cache.
+    """
+    from cyfaust.__main__ import compile_to_source
+
+    result = {"file": path, "backend": backend, "output": output}
+    if not os.path.exists(path):
+        result.update(status="error", error="File not found")
+        return result
+
+    (source, error), printed = call_quietly(
+        compile_to_source, args, path, backend, _imports(), sha_key
+    )
+    if source is None:
+        result.update(status="error", error="\n".join(filter(None, [printed, error])))
+        return result
+
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        f.write(source)
+    result["status"] = "ok"
+    return result
+
+
+def save_bitcode_file(path, output, sha_key=None):
+    """Compile one DSP file and save its factory as bitcode to output."""
+    result = {"file": path, "output": output}
+    if not os.path.exists(path):
+        result.update(status="error", error="File not found")
+        return result
+
+    factory, printed = call_quietly(_imports()["create_dsp_factory_from_file"], path)
+    if factory is None:
+        result.update(status="error", error=printed or "Failed to create DSP factory")
+        return result
+
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    if not factory.write_to_bitcode_file(output):
+        result.update(status="error", error="Failed to write bitcode file")
+        return result
+    result["status"] = "ok"
+    return result
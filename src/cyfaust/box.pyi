@@ -1,5 +1,5 @@
 from enum import IntEnum
-from typing import Iterator
+from typing import Any, Iterable, Iterator
 
 from .signal import SignalVector
 
@@ -26,6 +26,55 @@ class SOperator(IntEnum):
     kOR = 15
     kXOR = 16
 
+class BoxKind(IntEnum):
+    kBoxInt = 0
+    kBoxReal = 1
+    kBoxWire = 2
+    kBoxCut = 3
+    kBoxSeq = 4
+    kBoxPar = 5
+    kBoxSplit = 6
+    kBoxMerge = 7
+    kBoxRec = 8
+    kBoxRoute = 9
+    kBoxPrim = 10
+    kBoxXtended = 11
+    kBoxFFun = 12
+    kBoxFConst = 13
+    kBoxFVar = 14
+    kBoxButton = 15
+    kBoxCheckbox = 16
+    kBoxHSlider = 17
+    kBoxVSlider = 18
+    kBoxNumEntry = 19
+    kBoxHBargraph = 20
+    kBoxVBargraph = 21
+    kBoxHGroup = 22
+    kBoxVGroup = 23
+    kBoxTGroup = 24
+    kBoxWaveform = 25
+    kBoxSoundfile = 26
+    kBoxSlot = 27
+    kBoxSymbolic = 28
+    kBoxIdent = 29
+    kBoxAbstr = 30
+    kBoxAppl = 31
+    kBoxAccess = 32
+    kBoxWithLocalDef = 33
+    kBoxMetadata = 34
+    kBoxCase = 35
+    kBoxComponent = 36
+    kBoxLibrary = 37
+    kBoxEnvironment = 38
+    kBoxIPar = 39
+    kBoxISeq = 40
+    kBoxISum = 41
+    kBoxIProd = 42
+    kBoxInputs = 43
+    kBoxOutputs = 44
+    kBoxError = 45
+    kBoxOther = 46
+
 # -- Context manager --
 
 class box_context:
@@ -39,6 +88,8 @@ class BoxVector:
     def __iter__(self) -> Iterator[Box]: ...
     def add(self, b: Box) -> None: ...
     def create_source(self, name_app: str, lang: str, *args: str) -> str: ...
+    def walk(self, order: str = "post", unique: bool = True) -> Iterator[Box]: ...
+    def __reduce__(self) -> tuple[Any, tuple[bytes]]: ...
 
 # -- Box --
 
@@ -47,6 +98,12 @@ class Box:
     outputs: int
 
     def __init__(self, value: int | float | None = None) -> None: ...
+    @property
+    def id(self) -> int: ...
+    def is_same(self, other: Box) -> bool: ...
+    def classify(self) -> tuple[BoxKind, tuple[Box, ...], dict[str, object]]: ...
+    def walk(self, order: str = "post", unique: bool = True) -> Iterator[Box]: ...
+    def __reduce__(self) -> tuple[Any, tuple[bytes]]: ...
     @staticmethod
     def from_int(value: int) -> Box: ...
     @staticmethod
@@ -184,6 +241,7 @@ def box_or_number(var: Box | float | int) -> Box: ...
 
 def create_lib_context() -> None: ...
 def destroy_lib_context() -> None: ...
+def intern_boxes(enabled: bool = True) -> bool: ...
 def dsp_to_boxes(name_app: str, dsp_content: str, *args: str) -> Box | None: ...
 def get_box_type(b: Box) -> tuple[int, int] | None: ...
 def boxes_to_signals(b: Box) -> SignalVector | None: ...
@@ -214,6 +272,9 @@ def box_par(x: Box, y: Box) -> Box: ...
 def box_par3(x: Box, y: Box, z: Box) -> Box: ...
 def box_par4(a: Box, b: Box, c: Box, d: Box) -> Box: ...
 def box_par5(a: Box, b: Box, c: Box, d: Box, e: Box) -> Box: ...
+def box_par_n(boxes: BoxVector | Iterable[Box]) -> Box: ...
+def box_seq_n(boxes: BoxVector | Iterable[Box]) -> Box: ...
+def box_sum_n(boxes: BoxVector | Iterable[Box]) -> Box: ...
 def box_split(x: Box, y: Box) -> Box: ...
 def box_merge(x: Box, y: Box) -> Box: ...
 def box_rec(x: Box, y: Box) -> Box: ...
@@ -387,3 +448,8 @@ def getparams_box_hbargraph(b: Box) -> dict[str, object]: ...
 def getparams_box_hgroup(b: Box) -> dict[str, object]: ...
 def getparams_box_hslider(b: Box) -> dict[str, object]: ...
 def getparams_box_inputs(t: Box) -> dict[str, object]: ...
+
+# -- Classification and traversal --
+
+def classify_box(b: Box) -> tuple[BoxKind, tuple[Box, ...], dict[str, object]]: ...
+def walk_box(root: Box | BoxVector, order: str = "post", unique: bool = True) -> Iterator[Box]: ...
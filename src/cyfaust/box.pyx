@@ -1,7 +1,10 @@
 # distutils: language = c++
 
 from libc.stdlib cimport malloc, free
+from libc.stdint cimport uintptr_t
 from libcpp.string cimport string
+from libcpp.unordered_set cimport unordered_set
+from libcpp.vector cimport vector
 
 from . cimport faust_box as fb
 from . cimport faust_signal as fs
@@ -42,6 +45,34 @@ def box_or_number(var: Box | float | int) -> Box:
     raise TypeError("argument must be of type float or int or boxReal or boxInt")
 
 
+# Box wrappers by tree node address while interning (see intern_boxes())
+cdef object _box_intern = None
+
+def intern_boxes(bint enabled=True) -> bool:
+    """Share one Box wrapper per tree node.
+
+    libfaust trees are hash-consed: equal expressions are the same node.
+    While interning, boxes returned by the box functions are the same Python
+    object for the same node, so that Python-side state and identity checks
+    follow the node. Wrappers are held weakly and are freed when unused.
+
+    returns whether interning was enabled before.
+    """
+    global _box_intern
+    from weakref import WeakValueDictionary
+    cdef bint previous = _box_intern is not None
+    if enabled and _box_intern is None:
+        _box_intern = WeakValueDictionary()
+    elif not enabled:
+        _box_intern = None
+    return previous
+
+cdef void clear_box_intern():
+    """Forget interned wrappers, whose nodes are freed with the context."""
+    if _box_intern is not None:
+        _box_intern.clear()
+
+
 class box_context:
     """box context manager
 
@@ -50,6 +81,7 @@ class box_context:
     def __enter__(self):
         fb.createLibContext()
     def __exit__(self, type, value, traceback):
+        clear_box_intern()
         fb.destroyLibContext()
 
 
@@ -84,6 +116,14 @@ cdef class BoxVector:
         """Create source code in a target language from a box expression."""
         return create_source_from_boxes(name_app, self, lang, *args)
 
+    def walk(self, str order="post", bint unique=True):
+        """Iterate over the nodes of all boxes, sharing visits (see walk_box)."""
+        return walk_box(self, order, unique)
+
+    def __reduce__(self):
+        from cyfaust.serialize import deserialize, serialize
+        return deserialize, (serialize(self),)
+
 
 
 cdef class Box:
@@ -92,6 +132,7 @@ cdef class Box:
     # cdef fb.Box ptr
     # cdef public int inputs
     # cdef public int outputs
+    # cdef object __weakref__
 
     def __cinit__(self):
         self.ptr = NULL
@@ -109,17 +150,52 @@ cdef class Box:
     @staticmethod
     cdef Box from_ptr(fb.Box ptr, bint ptr_owner=False):
         """Wrap external factory from pointer"""
-        cdef Box box = Box.__new__(Box)
+        cdef Box box
+        if _box_intern is not None:
+            box = _box_intern.get(<uintptr_t>ptr)
+            if box is not None:
+                return box
+        box = Box.__new__(Box)
         box.ptr = ptr
+        if _box_intern is not None:
+            _box_intern[<uintptr_t>ptr] = box
         return box
 
+    @property
+    def id(self) -> int:
+        """Address of the tree node, the same for equal (hash-consed) boxes.
+
+        Boxes are not hashable, since `==` builds a box_eq expression: use id
+        as the dict key or set member, e.g. to memoize graph analyses.
+        """
+        return <uintptr_t>self.ptr
+
+    def is_same(self, Box other) -> bool:
+        """Return True if other wraps the same tree node.
+
+        `==` builds a box_eq expression instead.
+        """
+        return self.ptr == other.ptr
+
+    def classify(self) -> tuple:
+        """Return (kind, children, attrs) for this node (see classify_box)."""
+        return classify_box(self)
+
+    def walk(self, str order="post", bint unique=True):
+        """Iterate over the nodes of this box (see walk_box)."""
+        return walk_box(self, order, unique)
+
+    def __reduce__(self):
+        from cyfaust.serialize import deserialize, serialize
+        return deserialize, (serialize(self),)
+
     @staticmethod
     def from_int(int value) -> Box:
         """Create box from int"""
         return box_int(value)
 
     @staticmethod
-    def from_float(float value) -> Box:
+    def from_float(double value) -> Box:
         """Create box from float"""
         return box_float(value)
 
@@ -763,6 +839,7 @@ def create_lib_context():
 
 def destroy_lib_context():
     """Destroy global compilation context, has to be done last."""
+    clear_box_intern()
     fb.destroyLibContext()
 
 
@@ -818,7 +895,7 @@ def box_int(int n) -> Box:
     return Box.from_ptr(b)
 
 
-def box_float(float n) -> Box:
+def box_float(double n) -> Box:
     """Constant real : for all t, x(t) = n.
 
     n - the float/double value (depends of -single or -double compilation parameter)
@@ -906,6 +983,71 @@ def box_par5(Box a, Box b, Box c, Box d, Box e) -> Box:
     cdef fb.Box p = fb.boxPar5(a.ptr, b.ptr, c.ptr, d.ptr, e.ptr)
     return Box.from_ptr(p)
 
+
+cdef fb.tvec box_nodes(boxes) except *:
+    """Return the nodes of a BoxVector or of an iterable of boxes."""
+    cdef fb.tvec nodes
+    if isinstance(boxes, BoxVector):
+        nodes = (<BoxVector>boxes).ptr
+    else:
+        for b in boxes:
+            nodes.push_back((<Box?>b).ptr)
+    if nodes.empty():
+        raise ValueError("at least one box is needed")
+    return nodes
+
+cdef fb.Box box_tree(const fb.tvec& nodes, size_t lo, size_t hi, int op):
+    """Combine nodes[lo:hi] as a balanced tree of par (0), seq (1) or add (2)."""
+    if hi - lo == 1:
+        return nodes[lo]
+    cdef size_t mid = lo + (hi - lo) // 2
+    cdef fb.Box x = box_tree(nodes, lo, mid, op)
+    cdef fb.Box y = box_tree(nodes, mid, hi, op)
+    if op == 0:
+        return fb.boxPar(x, y)
+    if op == 1:
+        return fb.boxSeq(x, y)
+    return fb.boxAdd(x, y)
+
+def box_par_n(boxes) -> Box:
+    """The parallel composition of any number of blocks (e.g., A,B,...,Z).
+
+    boxes - a BoxVector or an iterable of boxes
+
+    The composition is built natively as a balanced tree, so large
+    compositions stay shallow.
+
+    returns the par box.
+    """
+    cdef fb.tvec nodes = box_nodes(boxes)
+    return Box.from_ptr(box_tree(nodes, 0, nodes.size(), 0))
+
+def box_seq_n(boxes) -> Box:
+    """The sequential composition of any number of blocks (e.g., A:B:...:Z).
+
+    boxes - a BoxVector or an iterable of boxes, where the outputs of each
+            box match the inputs of the next one
+
+    The composition is built natively as a balanced tree.
+
+    returns the seq box.
+    """
+    cdef fb.tvec nodes = box_nodes(boxes)
+    return Box.from_ptr(box_tree(nodes, 0, nodes.size(), 1))
+
+def box_sum_n(boxes) -> Box:
+    """The sum of any number of single-output blocks (e.g., A+B+...+Z).
+
+    boxes - a BoxVector or an iterable of boxes with one output each
+
+    The additions are built natively as a balanced tree, e.g. the sum of n
+    wires mixes n inputs down to one output with log2(n) adders per path.
+
+    returns the sum box.
+    """
+    cdef fb.tvec nodes = box_nodes(boxes)
+    return Box.from_ptr(box_tree(nodes, 0, nodes.size(), 2))
+
 def box_split(Box x, Box y) -> Box:
     """The split composition (e.g., A<:B) operator is used to distribute
     the outputs of A to the inputs of B.
@@ -2364,6 +2506,351 @@ def getparams_box_with_local_def(Box t) -> dict:
         return {}
 
 
+## ---------------------------------------------------------------------------
+## node classification and traversal
+
+cpdef enum BoxKind:
+    kBoxInt
+    kBoxReal
+    kBoxWire
+    kBoxCut
+    kBoxSeq
+    kBoxPar
+    kBoxSplit
+    kBoxMerge
+    kBoxRec
+    kBoxRoute
+    kBoxPrim
+    kBoxXtended
+    kBoxFFun
+    kBoxFConst
+    kBoxFVar
+    kBoxButton
+    kBoxCheckbox
+    kBoxHSlider
+    kBoxVSlider
+    kBoxNumEntry
+    kBoxHBargraph
+    kBoxVBargraph
+    kBoxHGroup
+    kBoxVGroup
+    kBoxTGroup
+    kBoxWaveform
+    kBoxSoundfile
+    kBoxSlot
+    kBoxSymbolic
+    kBoxIdent
+    kBoxAbstr
+    kBoxAppl
+    kBoxAccess
+    kBoxWithLocalDef
+    kBoxMetadata
+    kBoxCase
+    kBoxComponent
+    kBoxLibrary
+    kBoxEnvironment
+    kBoxIPar
+    kBoxISeq
+    kBoxISum
+    kBoxIProd
+    kBoxInputs
+    kBoxOutputs
+    kBoxError
+    kBoxOther
+
+
+cdef void push_box_branches(fb.Box b, fb.tvec& out):
+    cdef fs.tvec branches = fs.sigBranches(<fs.Signal>b)
+    cdef size_t i, n = branches.size()
+    for i in range(n):
+        out.push_back(<fb.Box>branches[i])
+
+cdef str box_label(fb.Box b):
+    """Return the string of a label box, or '' if it is not a string."""
+    try:
+        return fb.tree2str(b).decode()
+    except RuntimeError:
+        return ""
+
+cdef BoxKind box_node(fb.Box b, fb.tvec& children, dict attrs):
+    """Classify a box node, appending its box operands to children.
+
+    Scalar parameters are stored in attrs, unless attrs is None.
+    """
+    cdef int i = 0
+    cdef double r = 0.0
+    cdef const char* name = NULL
+    cdef fb.prim0 p0
+    cdef fb.prim1 p1
+    cdef fb.prim2 p2
+    cdef fb.prim3 p3
+    cdef fb.prim4 p4
+    cdef fb.prim5 p5
+    cdef fb.Box x = NULL, y = NULL, z = NULL, u = NULL, v = NULL
+    cdef BoxKind kind = kBoxOther
+    if fb.isBoxInt(b, &i):
+        if attrs is not None:
+            attrs["value"] = i
+        return kBoxInt
+    if fb.isBoxReal(b, &r):
+        if attrs is not None:
+            attrs["value"] = r
+        return kBoxReal
+    if fb.isBoxWire(b):
+        return kBoxWire
+    if fb.isBoxCut(b):
+        return kBoxCut
+    if fb.isBoxSeq(b, x, y):
+        kind = kBoxSeq
+    elif fb.isBoxPar(b, x, y):
+        kind = kBoxPar
+    elif fb.isBoxSplit(b, x, y):
+        kind = kBoxSplit
+    elif fb.isBoxMerge(b, x, y):
+        kind = kBoxMerge
+    elif fb.isBoxRec(b, x, y):
+        kind = kBoxRec
+    elif fb.isBoxAbstr(b, x, y):
+        kind = kBoxAbstr
+    elif fb.isBoxAppl(b, x, y):
+        kind = kBoxAppl
+    elif fb.isBoxAccess(b, x, y):
+        kind = kBoxAccess
+    elif fb.isBoxWithLocalDef(b, x, y):
+        kind = kBoxWithLocalDef
+    elif fb.isBoxMetadata(b, x, y):
+        kind = kBoxMetadata
+    elif fb.isBoxSymbolic(b, x, y):
+        kind = kBoxSymbolic
+    if kind != kBoxOther:
+        children.push_back(x)
+        children.push_back(y)
+        return kind
+    if fb.isBoxRoute(b, x, y, z):
+        # inputs, outputs, routing pairs
+        children.push_back(x)
+        children.push_back(y)
+        children.push_back(z)
+        return kBoxRoute
+    if fb.isBoxPrim0(b, &p0):
+        name, i = fb.prim0name(p0), 0
+    elif fb.isBoxPrim1(b, &p1):
+        name, i = fb.prim1name(p1), 1
+    elif fb.isBoxPrim2(b, &p2):
+        name, i = fb.prim2name(p2), 2
+    elif fb.isBoxPrim3(b, &p3):
+        name, i = fb.prim3name(p3), 3
+    elif fb.isBoxPrim4(b, &p4):
+        name, i = fb.prim4name(p4), 4
+    elif fb.isBoxPrim5(b, &p5):
+        name, i = fb.prim5name(p5), 5
+    if name != NULL:
+        if attrs is not None:
+            attrs["name"] = name.decode()
+            attrs["arity"] = i
+        return kBoxPrim
+    if fb.getUserData(b) != NULL:
+        if attrs is not None:
+            attrs["name"] = fs.xtendedName(<fs.Signal>b).decode()
+            attrs["arity"] = fs.xtendedArity(<fs.Signal>b)
+        return kBoxXtended
+    if fb.isBoxHSlider(b, v, x, y, z, u):
+        kind = kBoxHSlider
+    elif fb.isBoxVSlider(b, v, x, y, z, u):
+        kind = kBoxVSlider
+    elif fb.isBoxNumEntry(b, v, x, y, z, u):
+        kind = kBoxNumEntry
+    if kind != kBoxOther:
+        # init, min, max, step
+        children.push_back(x)
+        children.push_back(y)
+        children.push_back(z)
+        children.push_back(u)
+        if attrs is not None:
+            attrs["label"] = box_label(v)
+        return kind
+    if fb.isBoxButton(b, v):
+        kind = kBoxButton
+    elif fb.isBoxCheckbox(b, v):
+        kind = kBoxCheckbox
+    if kind != kBoxOther:
+        if attrs is not None:
+            attrs["label"] = box_label(v)
+        return kind
+    if fb.isBoxHBargraph(b, v, x, y):
+        kind = kBoxHBargraph
+    elif fb.isBoxVBargraph(b, v, x, y):
+        kind = kBoxVBargraph
+    if kind != kBoxOther:
+        # min, max
+        children.push_back(x)
+        children.push_back(y)
+        if attrs is not None:
+            attrs["label"] = box_label(v)
+        return kind
+    if fb.isBoxHGroup(b, v, x):
+        kind = kBoxHGroup
+    elif fb.isBoxVGroup(b, v, x):
+        kind = kBoxVGroup
+    elif fb.isBoxTGroup(b, v, x):
+        kind = kBoxTGroup
+    if kind != kBoxOther:
+        children.push_back(x)
+        if attrs is not None:
+            attrs["label"] = box_label(v)
+        return kind
+    if fb.isBoxSoundfile(b, v, x):
+        # number of channels
+        children.push_back(x)
+        if attrs is not None:
+            attrs["label"] = box_label(v)
+        return kBoxSoundfile
+    if fb.isBoxWaveform(b):
+        push_box_branches(b, children)
+        return kBoxWaveform
+    if fb.isBoxFFun(b, x):
+        if attrs is not None:
+            attrs["name"] = fb.ffname(<fb.Signal>x).decode()
+            attrs["arity"] = fb.ffarity(<fb.Signal>x)
+        return kBoxFFun
+    if fb.isBoxFConst(b, x, y, z):
+        kind = kBoxFConst
+    elif fb.isBoxFVar(b, x, y, z):
+        kind = kBoxFVar
+    if kind != kBoxOther:
+        if attrs is not None:
+            attrs["type"] = SType(fb.tree2int(x))
+            attrs["name"] = box_label(y)
+            attrs["file"] = box_label(z)
+        return kind
+    if fb.isBoxSlot(b, &i):
+        if attrs is not None:
+            attrs["id"] = i
+        return kBoxSlot
+    if fb.isBoxIdent(b, &name):
+        if attrs is not None:
+            attrs["name"] = name.decode()
+        return kBoxIdent
+    if fb.isBoxIPar(b, x, y, z):
+        kind = kBoxIPar
+    elif fb.isBoxISeq(b, x, y, z):
+        kind = kBoxISeq
+    elif fb.isBoxISum(b, x, y, z):
+        kind = kBoxISum
+    elif fb.isBoxIProd(b, x, y, z):
+        kind = kBoxIProd
+    if kind != kBoxOther:
+        # variable, count, body
+        children.push_back(x)
+        children.push_back(y)
+        children.push_back(z)
+        return kind
+    if fb.isBoxInputs(b, x):
+        kind = kBoxInputs
+    elif fb.isBoxOutputs(b, x):
+        kind = kBoxOutputs
+    elif fb.isBoxCase(b, x):
+        kind = kBoxCase
+    if kind != kBoxOther:
+        children.push_back(x)
+        return kind
+    if fb.isBoxComponent(b, x):
+        kind = kBoxComponent
+    elif fb.isBoxLibrary(b, x):
+        kind = kBoxLibrary
+    if kind != kBoxOther:
+        if attrs is not None:
+            attrs["filename"] = box_label(x)
+        return kind
+    if fb.isBoxEnvironment(b):
+        return kBoxEnvironment
+    if fb.isBoxError(b):
+        return kBoxError
+    push_box_branches(b, children)
+    return kBoxOther
+
+
+def classify_box(Box b) -> tuple:
+    """Classify a box node in one call.
+
+    b - the box
+
+    returns (kind, children, attrs): the BoxKind of the node, a tuple of its
+    box operands and a dict of its scalar parameters (value, name, arity,
+    label, ...). Primitives such as + or @ are kBoxPrim, mathematical
+    functions such as sin are kBoxXtended. Nodes of unknown kind are
+    kBoxOther with their raw tree branches as children.
+    """
+    cdef fb.tvec children
+    cdef dict attrs = {}
+    cdef BoxKind kind = box_node(b.ptr, children, attrs)
+    cdef size_t i, n = children.size()
+    return kind, tuple([Box.from_ptr(children[i]) for i in range(n)]), attrs
+
+
+def walk_box(root: Box | BoxVector, str order="post", bint unique=True):
+    """Iterate over the nodes of a box expression.
+
+    root - a box or a vector of boxes
+    order - "post" to visit operands before their node, "pre" to visit
+            nodes before their operands
+    unique - visit shared nodes once, otherwise once per path reaching them
+
+    returns a generator of boxes.
+    """
+    cdef BoxVector roots
+    if isinstance(root, BoxVector):
+        roots = root
+    elif isinstance(root, Box):
+        roots = BoxVector()
+        roots.add(root)
+    else:
+        raise TypeError("root must be a Box or a BoxVector")
+    if order not in ("pre", "post"):
+        raise ValueError(f"order must be 'pre' or 'post', not {order!r}")
+    return _walk_boxes(roots, order == "post", unique)
+
+def _walk_boxes(BoxVector roots, bint post, bint unique):
+    # Depth-first walk with an explicit stack: frame k visits its operands
+    # pending[start[k]:], the roots forming the operands of a NULL frame.
+    cdef fb.tvec pending = roots.ptr
+    cdef fb.tvec frames
+    cdef vector[size_t] start, position
+    cdef unordered_set[fb.Box] active, done
+    cdef fb.Box node
+    cdef size_t top, n
+    frames.push_back(NULL)
+    start.push_back(0)
+    position.push_back(0)
+    while frames.size():
+        top = frames.size() - 1
+        n = pending.size()
+        if start[top] + position[top] < n:
+            node = pending[start[top] + position[top]]
+            position[top] += 1
+            if active.count(node) or (unique and done.count(node)):
+                continue
+            if not post:
+                yield Box.from_ptr(node)
+            active.insert(node)
+            frames.push_back(node)
+            start.push_back(n)
+            position.push_back(0)
+            box_node(node, pending, None)
+        else:
+            node = frames[top]
+            pending.resize(start[top])
+            frames.pop_back()
+            start.pop_back()
+            position.pop_back()
+            if node != NULL:
+                active.erase(node)
+                if unique:
+                    done.insert(node)
+                if post:
+                    yield Box.from_ptr(node)
+
+
 def dsp_to_boxes(str name_app, str dsp_content, *args) -> Box:
     """Compile a DSP source code as a string in a flattened box
 
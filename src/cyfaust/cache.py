@@ -0,0 +1,226 @@
+"""Content-addressed on-disk cache for generated Faust artifacts.
+
+Artifacts (generated C++/C/Rust/codebox source, SVG diagram trees, ...) are
+stored under a key derived from the SHA key of the *expanded* DSP code, so
+any change to the DSP or to one of the libraries it imports produces a new
+key, plus whatever else determines the output (backend, compiler options,
+libfaust version).
+
+Each entry is a directory holding one or more files. Entries are written
+atomically, their modification time is refreshed on every hit, and the
+least recently used entries are evicted once the cache grows beyond its
+maximum size. The cache directory is scanned for its size once, on the
+first write; later writes add to that size, and a new scan only happens
+when eviction is due.
+
+The cache directory defaults to ``$CYFAUST_CACHE_DIR``, then
+``$XDG_CACHE_HOME/cyfaust``, then ``~/.cache/cyfaust`` (``%LOCALAPPDATA%``
+on Windows). The maximum size defaults to ``$CYFAUST_CACHE_MAX_SIZE`` bytes
+or 256 MiB.
+
+Example:
+    >>> cache = ArtifactCache()
+    >>> key = cache.key(sha_key, "cpp", "-vec")
+    >>> source = cache.get_text(key)
+    >>> if source is None:
+    ...     source = generate()
+    ...     cache.put_text(key, source)
+"""
+
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+
+# File name used for single-text entries
+_TEXT_ENTRY = "artifact"
+
+# Eviction goes down to this fraction of the maximum size, so that the cache
+# is not scanned again on each of the following writes
+_LOW_WATER = 0.9
+
+
+def default_cache_dir():
+    """Return the default cache directory (not created)."""
+    path = os.environ.get("CYFAUST_CACHE_DIR")
+    if path:
+        return path
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "cyfaust")
+
+
+def default_max_size():
+    """Return the default maximum cache size in bytes."""
+    value = os.environ.get("CYFAUST_CACHE_MAX_SIZE")
+    return int(value) if value else DEFAULT_MAX_SIZE
+
+
+class ArtifactCache:
+    """Content-addressed cache of generated artifacts.
+
+    Args:
+        directory: cache root directory (default: default_cache_dir())
+        max_size: maximum total size in bytes before the least recently
+            used entries are evicted (default: default_max_size())
+    """
+
+    def __init__(self, directory=None, max_size=None):
+        self.directory = os.path.abspath(directory or default_cache_dir())
+        self.max_size = default_max_size() if max_size is None else max_size
+        self._size = None  # total size of the entries, known after the first write
+
+    @staticmethod
+    def key(sha_key, *parts):
+        """Build an entry key from an expanded-code SHA key and output options."""
+        digest = hashlib.sha1(sha_key.encode("utf8"))
+        for part in parts:
+            digest.update(b"\0")
+            digest.update(str(part).encode("utf8"))
+        return digest.hexdigest()
+
+    def entry_path(self, key):
+        """Return the directory of an entry (which may not exist)."""
+        return os.path.join(self.directory, key[:2], key)
+
+    def _touch(self, path):
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def get_tree(self, key):
+        """Return the files of an entry as {relative/path: bytes}, or None."""
+        path = self.entry_path(key)
+        if not os.path.isdir(path):
+            return None
+        files = {}
+        try:
+            for root, _dirs, names in os.walk(path):
+                for name in names:
+                    file_path = os.path.join(root, name)
+                    rel = os.path.relpath(file_path, path).replace(os.sep, "/")
+                    with open(file_path, "rb") as f:
+                        files[rel] = f.read()
+        except OSError:
+            return None
+        self._touch(path)
+        return dict(sorted(files.items()))
+
+    def put_tree(self, key, files):
+        """Store {relative/path: bytes or str} as an entry and return its path."""
+        path = self.entry_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=".tmp-", dir=self.directory)
+        written = 0
+        try:
+            for rel, content in files.items():
+                file_path = os.path.join(staging, *rel.split("/"))
+                os.makedirs(os.path.dirname(file_path), exist_ok=True)
+                if isinstance(content, str):
+                    content = content.encode("utf8")
+                with open(file_path, "wb") as f:
+                    f.write(content)
+                written += len(content)
+            try:
+                os.replace(staging, path)
+            except OSError:
+                # Entry written concurrently by another process: keep theirs
+                shutil.rmtree(staging, ignore_errors=True)
+                written = 0
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        self._added(written)
+        return path
+
+    def _added(self, size):
+        """Account for size bytes written, evicting entries if over max_size."""
+        if self._size is None:
+            # First write: the scan includes the new entry
+            self._size = self.size()
+            self._remove_stale_staging()
+        else:
+            self._size += size
+        if self._size > self.max_size:
+            self.evict(int(self.max_size * _LOW_WATER))
+
+    def get_text(self, key):
+        """Return a text entry, or None if not cached."""
+        files = self.get_tree(key)
+        if files is None or _TEXT_ENTRY not in files:
+            return None
+        return files[_TEXT_ENTRY].decode("utf8")
+
+    def put_text(self, key, text):
+        """Store a text entry."""
+        return self.put_tree(key, {_TEXT_ENTRY: text})
+
+    def entries(self):
+        """Return (mtime, size, path) for every entry, oldest first."""
+        result = []
+        if not os.path.isdir(self.directory):
+            return result
+        for prefix in os.listdir(self.directory):
+            prefix_path = os.path.join(self.directory, prefix)
+            if prefix.startswith(".") or not os.path.isdir(prefix_path):
+                continue
+            for name in os.listdir(prefix_path):
+                path = os.path.join(prefix_path, name)
+                size = 0
+                for root, _dirs, names in os.walk(path):
+                    for file_name in names:
+                        try:
+                            size += os.path.getsize(os.path.join(root, file_name))
+                        except OSError:
+                            pass
+                try:
+                    mtime = os.path.getmtime(path)
+                except OSError:
+                    continue
+                result.append((mtime, size, path))
+        result.sort()
+        return result
+
+    def size(self):
+        """Return the total size of all entries in bytes."""
+        return sum(size for _mtime, size, _path in self.entries())
+
+    def evict(self, limit=None):
+        """Remove least recently used entries until within limit (default: max_size)."""
+        limit = self.max_size if limit is None else limit
+        entries = self.entries()
+        total = sum(size for _mtime, size, _path in entries)
+        for _mtime, size, path in entries:
+            if total <= limit:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+        self._size = total
+        self._remove_stale_staging()
+
+    def _remove_stale_staging(self, max_age=3600):
+        """Remove staging directories left behind by interrupted writes."""
+        if not os.path.isdir(self.directory):
+            return
+        now = time.time()
+        for name in os.listdir(self.directory):
+            if not name.startswith(".tmp-"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                if now - os.path.getmtime(path) > max_age:
+                    shutil.rmtree(path, ignore_errors=True)
+            except OSError:
+                pass
+
+    def clear(self):
+        """Remove every entry."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self._size = None
@@ -0,0 +1,608 @@
+"""NumPy evaluation of signal graphs, without compiling them.
+
+evaluate() interprets normal-form signals, as returned by boxes_to_signals()
+or simplify_to_normal_form2(), for a number of frames and returns their
+values. Frames are computed in blocks of block_size: feed-forward parts of
+the graph a whole block at a time with vectorized NumPy kernels, recursive
+loops, whose samples depend on their own past values, one sample at a time,
+only the nodes on a loop being stepped that way. Between blocks, only the
+past samples that delays read are kept, so memory does not grow with the
+number of frames beyond the outputs (and the delayed signals whose delay
+length cannot be bounded, which keep their whole history).
+
+Stepping a loop runs Python code for each node on it at each sample, which
+is orders of magnitude slower than compiled code: a DSP with filters or
+oscillators takes seconds per second of audio. Evaluate short signals, or
+use the interpreter or LLVM backends to render longer ones.
+
+Values follow the C semantics of the generated code: signals typed int are
+computed as int32 (with truncating casts and integer division) and signals
+typed real in the given float type. This makes evaluate() fast to iterate
+on for small graphs, e.g. in unit tests of generated signals, and a
+reference to check the outputs of the interpreter or LLVM backends against.
+NumPy is required.
+
+Example:
+    >>> import numpy as np
+    >>> from cyfaust.evaluator import evaluate
+    >>> outputs = evaluate("process = _ * 0.5, + ~ *(0.9);", 64, inputs=np.ones((2, 64)))
+"""
+
+import numpy as np
+
+from cyfaust._api import extension_module
+from cyfaust.analysis import value_bounds
+from cyfaust.transform import label_parts, path_matches, path_parts
+
+_INT = np.int32
+
+# Name of the sample rate constant (ma.SR)
+_SAMPLE_RATE = "fSamplingFreq"
+
+
+## ---------------------------------------------------------------------------
+## kernels
+
+
+def _cast(value, dtype):
+    """Convert a value to dtype, as a NumPy scalar if it is not an array."""
+    value = np.asarray(value).astype(dtype, copy=False)
+    return value[()] if value.ndim == 0 else value
+
+
+def _int_div(x, y):
+    """Integer division truncating towards zero, as in C."""
+    zero = y == 0
+    return np.where(zero, 0, np.trunc(x / np.where(zero, 1, y)))
+
+
+def _logical_shift(x, y):
+    return np.right_shift(np.asarray(x).astype(np.uint32), y)
+
+
+def _c_round(x):
+    """Round halfway cases away from zero, as C round()."""
+    return np.copysign(np.floor(np.abs(x) + 0.5), x)
+
+
+def _remainder(x, y):
+    """IEEE remainder, as C remainder()."""
+    return x - y * np.rint(x / y)
+
+
+# Mathematical functions by xtended name
+_FUNCTIONS = {
+    "abs": np.abs,
+    "acos": np.arccos,
+    "asin": np.arcsin,
+    "atan": np.arctan,
+    "atan2": np.arctan2,
+    "ceil": np.ceil,
+    "cos": np.cos,
+    "exp": np.exp,
+    "exp10": lambda x: np.power(10.0, x),
+    "floor": np.floor,
+    "fmod": np.fmod,
+    "log": np.log,
+    "log10": np.log10,
+    "max": np.maximum,
+    "min": np.minimum,
+    "pow": np.power,
+    "remainder": _remainder,
+    "rint": np.rint,
+    "round": _c_round,
+    "sin": np.sin,
+    "sqrt": np.sqrt,
+    "tan": np.tan,
+}
+
+# Functions computing ints from ints
+_INT_FUNCTIONS = frozenset(["abs", "max", "min"])
+
+
+## ---------------------------------------------------------------------------
+## evaluation
+
+
+class _Evaluator:
+    """Evaluate the signals of a graph over frames 0 to frames - 1, block by block."""
+
+    def __init__(self, api, frames, inputs, sample_rate, controls, dtype, block_size):
+        self.api = api
+        self.frames = frames
+        self.block_size = block_size
+        self.inputs = inputs
+        self.sample_rate = sample_rate
+        self.controls = controls
+        self.dtype = dtype
+        kind = self.kind = api.SigKind
+        op = api.SOperator
+        self.binops = {
+            op.kAdd: np.add,
+            op.kSub: np.subtract,
+            op.kMul: np.multiply,
+            op.kRem: np.fmod,
+            op.kLsh: np.left_shift,
+            op.kARsh: np.right_shift,
+            op.kLRsh: _logical_shift,
+            op.kGT: np.greater,
+            op.kLT: np.less,
+            op.kGE: np.greater_equal,
+            op.kLE: np.less_equal,
+            op.kEQ: np.equal,
+            op.kNE: np.not_equal,
+            op.kAND: np.bitwise_and,
+            op.kOR: np.bitwise_or,
+            op.kXOR: np.bitwise_xor,
+        }
+        self.arithmetic = {op.kAdd, op.kSub, op.kMul, op.kDiv, op.kRem}
+        self.div = op.kDiv
+        self.widgets = {
+            kind.kSigHSlider,
+            kind.kSigVSlider,
+            kind.kSigNumEntry,
+            kind.kSigButton,
+            kind.kSigCheckbox,
+        }
+        # nodes computed from all their operands
+        self.same = {
+            kind.kSigBinOp,
+            kind.kSigXtended,
+            kind.kSigIntCast,
+            kind.kSigFloatCast,
+            kind.kSigSelect2,
+            kind.kSigDelay1,
+            kind.kSigDelay,
+            kind.kSigPrefix,
+        }
+        self.nodes = {}
+        self.kinds = {}
+        self.attrs = {}
+        self.deps = {}
+        self.delayed = {}
+        self.types = {}
+        self.orders = {}
+        self.tables = {}
+        self.matched = set()
+        # the block being computed, frames [start, end): the value of a node
+        # is a scalar or an array ending at end, starting with the past
+        # samples kept for the delays reading it
+        self.start = self.end = 0
+        self.values = {}
+        self.past = {}
+        self.lengths = None
+
+    ## graph
+
+    def describe(self, node):
+        """Record a node's kind, parameters and the operands it is computed from."""
+        k = self.kind
+        key = node.id
+        kind, children, attrs = self.api.classify_signal(node)
+        self.nodes[key], self.kinds[key], self.attrs[key] = node, kind, attrs
+        delayed = None
+        if kind in self.same:
+            deps = list(children)
+            if kind in (k.kSigDelay1, k.kSigDelay):
+                delayed = 0
+            elif kind == k.kSigPrefix:
+                delayed = 1
+        elif (
+            kind in (k.kSigInt, k.kSigReal, k.kSigInput, k.kSigFConst, k.kSigFVar, k.kSigWaveform)
+            or kind in self.widgets
+        ):
+            deps = []
+        elif kind == k.kSigProj:
+            group, groups, _ = self.api.classify_signal(children[0])
+            if group != k.kSigRec:
+                raise ValueError(
+                    "recursive signals must be in normal form, see simplify_to_normal_form2()"
+                )
+            # a projection has the value of its definition
+            deps = [groups[attrs["index"]]]
+        elif kind == k.kSigReadTable:
+            _, table, _ = self.api.classify_signal(children[0])
+            # read index, and write index and signal unless read-only
+            deps = [children[1]] + list(table[2:])
+        elif kind in (k.kSigHBargraph, k.kSigVBargraph, k.kSigAssertBounds):
+            deps = [children[2]]
+        elif kind in (k.kSigOutput, k.kSigAttach):
+            deps = [children[0]]
+        elif kind in (k.kSigEnable, k.kSigControl):
+            deps = list(children)
+        else:
+            raise ValueError(f"cannot evaluate {kind.name} signals")
+        self.deps[key] = deps
+        self.delayed[key] = delayed
+
+    def components(self, roots):
+        """Return the strongly connected components of the graph, operands first.
+
+        This is Tarjan's algorithm with an explicit stack: recursive loops
+        form components of several nodes, other nodes components of one.
+        """
+        index, low = {}, {}
+        stack, on_stack, components = [], set(), []
+        for root in roots:
+            if root.id in index:
+                continue
+            work = [(root, 0)]
+            while work:
+                node, position = work.pop()
+                key = node.id
+                if position == 0:
+                    index[key] = low[key] = len(index)
+                    stack.append(key)
+                    on_stack.add(key)
+                    self.describe(node)
+                else:
+                    low[key] = min(low[key], low[self.deps[key][position - 1].id])
+                deps = self.deps[key]
+                for i in range(position, len(deps)):
+                    child = deps[i].id
+                    if child not in index:
+                        work.append((node, i + 1))
+                        work.append((deps[i], 0))
+                        break
+                    if child in on_stack:
+                        low[key] = min(low[key], index[child])
+                else:
+                    if low[key] == index[key]:
+                        component = []
+                        while not component or component[-1] != key:
+                            component.append(stack.pop())
+                            on_stack.discard(component[-1])
+                        components.append(component)
+        return components
+
+    def infer_types(self, order):
+        """Find which signals are ints, from the bottom of the int < real lattice up."""
+        k = self.kind
+        types = self.types
+        for key in order:
+            types[key] = True
+        changed = True
+        while changed:
+            changed = False
+            for key in order:
+                kind, attrs = self.kinds[key], self.attrs[key]
+                deps = [types[d.id] for d in self.deps[key]]
+                if kind in (k.kSigInt, k.kSigIntCast):
+                    is_int = True
+                elif kind == k.kSigFloatCast:
+                    is_int = False
+                elif kind in (k.kSigFConst, k.kSigFVar):
+                    is_int = attrs["type"] == self.api.SType.kSInt
+                elif kind == k.kSigBinOp:
+                    is_int = attrs["op"] not in self.arithmetic or all(deps)
+                elif kind == k.kSigXtended:
+                    is_int = attrs["name"] in _INT_FUNCTIONS and all(deps)
+                elif kind == k.kSigSelect2:
+                    is_int = all(deps[1:])
+                elif kind == k.kSigWaveform:
+                    is_int = all(isinstance(v, int) for v in self.waveform(key))
+                elif kind == k.kSigReadTable:
+                    is_int = self.table_content(key).dtype == _INT
+                elif kind in (k.kSigEnable, k.kSigControl):
+                    is_int = deps[0]
+                elif kind in self.same or kind in (
+                    k.kSigProj,
+                    k.kSigOutput,
+                    k.kSigAttach,
+                    k.kSigHBargraph,
+                    k.kSigVBargraph,
+                    k.kSigAssertBounds,
+                ):
+                    is_int = all(deps)
+                else:
+                    is_int = False
+                if is_int != types[key]:
+                    types[key] = is_int
+                    changed = True
+
+    ## values
+
+    def operand(self, dep, t0, t1):
+        value = self.values[dep.id]
+        if np.ndim(value) == 0:
+            return value
+        shift = len(value) - self.end
+        return value[t0 + shift : t1 + shift]
+
+    def delay(self, key, t0, t1, amount):
+        """Return the delayed operand of a node over [t0, t1), 0 before time 0."""
+        x = self.values[self.deps[key][self.delayed[key]].id]
+        source = np.arange(t0, t1) - np.asarray(amount).astype(np.int64)
+        if np.ndim(x) == 0:
+            return np.where(source >= 0, x, 0)
+        index = np.clip(source + len(x) - self.end, 0, len(x) - 1)
+        return np.where(source >= 0, x[index], 0)
+
+    def history_lengths(self):
+        """Return how many past samples of each delayed operand later blocks read.
+
+        Delays of a constant or control-rate length read exactly that many
+        samples, others as many as the bounds of their length allow, or the
+        whole history if it has no bounds.
+        """
+        k = self.kind
+        lengths = {}
+        for key, index in self.delayed.items():
+            if index is None:
+                continue
+            length = 1
+            if self.kinds[key] == k.kSigDelay:
+                amount = self.deps[key][1]
+                if np.ndim(self.values[amount.id]) == 0:
+                    length = int(self.values[amount.id])
+                else:
+                    bounds = value_bounds(amount)
+                    length = self.frames if bounds is None else int(bounds[1])
+            dep = self.deps[key][index].id
+            lengths[dep] = max(lengths.get(dep, 0), min(length, self.frames))
+        return lengths
+
+    def store(self, key, value):
+        """Set the value of a node over the block, after its kept past samples."""
+        if key in self.past and np.ndim(value) != 0:
+            value = np.concatenate([self.past[key], value])
+        self.values[key] = value
+
+    def keep_history(self):
+        """Keep the past samples of delayed operands that the next blocks read."""
+        if self.lengths is None:
+            # lengths of constant and control-rate delays are known from now
+            self.lengths = self.history_lengths()
+        for key, length in self.lengths.items():
+            value = self.values[key]
+            if length > 0 and np.ndim(value) != 0:
+                self.past[key] = value[-length:].copy()
+
+    def widget(self, key):
+        """Return the value of a widget: from controls, or its initial value."""
+        k = self.kind
+        parts = label_parts(self.attrs[key]["label"])
+        for path, value in self.controls.items():
+            if path_matches(parts, path):
+                self.matched.add(path)
+                return value
+        if self.kinds[key] in (k.kSigButton, k.kSigCheckbox):
+            return 0.0
+        _, children, _ = self.api.classify_signal(self.nodes[key])
+        return self.constant(children[0])
+
+    def constant(self, node):
+        kind, _, attrs = self.api.classify_signal(node)
+        if kind not in (self.kind.kSigInt, self.kind.kSigReal):
+            raise ValueError("widget parameters and table sizes must be constants")
+        return attrs["value"]
+
+    def waveform(self, key):
+        _, children, _ = self.api.classify_signal(self.nodes[key])
+        return [self.constant(c) for c in children]
+
+    def table_content(self, key):
+        """Return the initial content of the table read by a node."""
+        if key not in self.tables:
+            _, (table, _), _ = self.api.classify_signal(self.nodes[key])
+            _, children, _ = self.api.classify_signal(table)
+            size = int(self.constant(children[0]))
+            _, (init,), _ = self.api.classify_signal(children[1])
+            # tables are filled by running their generator from time 0
+            generator = _Evaluator(
+                self.api,
+                size,
+                np.zeros((0, size)),
+                self.sample_rate,
+                self.controls,
+                self.dtype,
+                self.block_size,
+            )
+            (content,) = generator.run([init])
+            self.matched |= generator.matched
+            self.tables[key] = content
+        return self.tables[key]
+
+    def read_table(self, key, t0, t1):
+        table = self.tables[key]
+        count = t1 - t0
+        deps = [np.broadcast_to(self.operand(d, t0, t1), count) for d in self.deps[key]]
+        ridx = np.clip(deps[0], 0, len(table) - 1).astype(np.int64)
+        if len(deps) == 1:
+            return table[ridx]
+        widx = np.clip(deps[1], 0, len(table) - 1).astype(np.int64)
+        result = np.empty(count, table.dtype)
+        # written before being read in the same sample
+        for i in range(count):
+            table[widx[i]] = deps[2][i]
+            result[i] = table[ridx[i]]
+        return result
+
+    def compute(self, key, t0, t1):
+        """Return the value of a node over frames [t0, t1)."""
+        k = self.kind
+        kind, attrs = self.kinds[key], self.attrs[key]
+        args = [self.operand(d, t0, t1) for d in self.deps[key]]
+        if kind in (k.kSigInt, k.kSigReal):
+            return attrs["value"]
+        if kind == k.kSigInput:
+            if attrs["index"] >= len(self.inputs):
+                raise ValueError(f"input {attrs['index']} is read, {len(self.inputs)} given")
+            return self.inputs[attrs["index"]][t0:t1]
+        if kind in self.widgets:
+            return self.widget(key)
+        if kind in (k.kSigFConst, k.kSigFVar):
+            if attrs["name"] != _SAMPLE_RATE:
+                raise ValueError(f"cannot evaluate foreign constant {attrs['name']!r}")
+            return self.sample_rate
+        if kind == k.kSigBinOp:
+            x, y = args
+            if attrs["op"] == self.div:
+                return _int_div(x, y) if self.types[key] else np.divide(x, y)
+            return self.binops[attrs["op"]](x, y)
+        if kind == k.kSigXtended:
+            if attrs["name"] not in _FUNCTIONS:
+                raise ValueError(f"cannot evaluate function {attrs['name']!r}")
+            return _FUNCTIONS[attrs["name"]](*args)
+        if kind in (k.kSigIntCast, k.kSigFloatCast):
+            return args[0]
+        if kind == k.kSigSelect2:
+            return np.where(np.asarray(args[0]) != 0, args[2], args[1])
+        if kind == k.kSigDelay1:
+            return self.delay(key, t0, t1, 1)
+        if kind == k.kSigDelay:
+            return self.delay(key, t0, t1, args[1])
+        if kind == k.kSigPrefix:
+            first = np.arange(t0, t1) == 0
+            return np.where(first, args[0], self.delay(key, t0, t1, 1))
+        if kind == k.kSigWaveform:
+            values = np.asarray(self.waveform(key))
+            return values[np.arange(t0, t1) % len(values)]
+        if kind == k.kSigReadTable:
+            return self.read_table(key, t0, t1)
+        if kind in (k.kSigEnable, k.kSigControl):
+            return np.where(np.asarray(args[1]) != 0, args[0], 0)
+        # pass-through: projections, outputs, bargraphs, ...
+        return args[0]
+
+    def step(self, component):
+        """Compute the nodes of a recursive loop over the block one sample at a time."""
+        order = self.loop_order(component)
+        for key in component:
+            self.store(key, np.zeros(self.end - self.start, self.dtype_of(key)))
+        for t in range(self.start, self.end):
+            for key in order:
+                value = self.values[key]
+                i = t + len(value) - self.end
+                value[i : i + 1] = self.compute(key, t, t + 1)
+
+    def loop_order(self, component):
+        """Order the nodes of a loop by their operands computed at the same sample."""
+        if component[0] in self.orders:
+            return self.orders[component[0]]
+        members = set(component)
+        order, done = [], set()
+        while len(order) < len(component):
+            ready = [
+                key
+                for key in component
+                if key not in done
+                and all(
+                    d.id in done or d.id not in members
+                    for i, d in enumerate(self.deps[key])
+                    if i != self.delayed[key]
+                )
+            ]
+            if not ready:
+                raise ValueError("recursive signal without delay")
+            order += ready
+            done.update(ready)
+        self.orders[component[0]] = order
+        return order
+
+    def dtype_of(self, key):
+        return _INT if self.types[key] else self.dtype
+
+    def run(self, roots):
+        """Return arrays of the values of roots over all frames."""
+        components = self.components(roots)
+        self.infer_types([key for component in components for key in component])
+        outputs = [np.empty(self.frames, self.dtype_of(r.id)) for r in roots]
+        with np.errstate(all="ignore"):
+            for start in range(0, self.frames, self.block_size):
+                self.start, self.end = start, min(start + self.block_size, self.frames)
+                for component in components:
+                    key = component[0]
+                    if len(component) > 1 or any(d.id == key for d in self.deps[key]):
+                        self.step(component)
+                    else:
+                        value = self.compute(key, self.start, self.end)
+                        self.store(key, _cast(value, self.dtype_of(key)))
+                for output, root in zip(outputs, roots):
+                    output[self.start : self.end] = self.operand(root, self.start, self.end)
+                self.keep_history()
+        return outputs
+
+
+## ---------------------------------------------------------------------------
+## public API
+
+
+def evaluate(
+    signals,
+    frames,
+    inputs=None,
+    sample_rate=48000,
+    controls=None,
+    dtype=np.float32,
+    name="FaustDSP",
+    args=(),
+    block_size=4096,
+):
+    """Compute the values of signals with NumPy, without compiling them.
+
+    Args:
+        signals: normal-form Signal or SignalVector of the current signal
+            context, as returned by boxes_to_signals() or
+            simplify_to_normal_form2(), or Faust source code, converted to
+            signals in a box context of its own
+        frames: number of frames to compute
+        inputs: array-like of [channels, frames] input samples; zeros if None
+        sample_rate: value of the sample rate constant (ma.SR)
+        controls: dict mapping widget paths, such as "/voice/freq", to
+            their values; other widgets keep their initial value
+        dtype: float type of real signals (np.float64 for -double)
+        name: name of the Faust program, for source code
+        args: Faust compiler options, for source code
+        block_size: number of frames computed at a time
+
+    Returns:
+        ndarray of [signals, frames] output samples of type dtype, or None
+        if source code fails to compile (the error is printed).
+
+    Raises:
+        ValueError: for signals that cannot be evaluated (foreign functions,
+            soundfiles, recursion not in normal form, ...), too few inputs,
+            control paths matching no widget or a block_size below 1
+    """
+    if isinstance(signals, str):
+        box_api = extension_module("box")
+        with box_api.box_context():
+            box = box_api.dsp_to_boxes(name, signals, *args)
+            if box is None:
+                return None
+            return evaluate(
+                box_api.boxes_to_signals(box),
+                frames,
+                inputs,
+                sample_rate,
+                controls,
+                dtype,
+                block_size=block_size,
+            )
+    api = extension_module("signal")
+    if isinstance(signals, api.Signal):
+        roots = [signals]
+    elif isinstance(signals, api.SignalVector):
+        roots = list(signals)
+    else:
+        raise TypeError("signals must be a Signal, a SignalVector or Faust source code")
+    inputs = np.zeros((0, frames)) if inputs is None else np.asarray(inputs)
+    if inputs.ndim != 2 or inputs.shape[1] < frames:
+        raise ValueError(f"inputs must be a [channels, {frames}] array")
+    if block_size < 1:
+        raise ValueError("block_size must be positive")
+    controls = {path_parts(path): value for path, value in (controls or {}).items()}
+
+    evaluator = _Evaluator(
+        api, frames, inputs.astype(dtype), sample_rate, controls, dtype, block_size
+    )
+    values = evaluator.run(roots)
+    unmatched = set(controls) - evaluator.matched
+    if unmatched:
+        paths = ", ".join("/" + "/".join(path) for path in sorted(unmatched))
+        raise ValueError(f"no widget matches {paths}")
+    outputs = np.empty((len(roots), frames), dtype)
+    for channel, value in enumerate(values):
+        outputs[channel] = value
+    return outputs
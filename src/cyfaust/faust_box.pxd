@@ -71,8 +71,8 @@ cdef extern from "faust/dsp/libfaust-box.h":
     void destroyLibContext()
 
     bint isNil(Box b)
-    const char* tree2str(Box b)
-    int tree2int(Box b)
+    const char* tree2str(Box b) except +
+    int tree2int(Box b) except +
     void* getUserData(Box b)
     Box boxInt(int n)
     Box boxReal(double n)
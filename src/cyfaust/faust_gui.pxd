@@ -174,6 +174,40 @@ cdef extern from "faust/gui/PrintUI.h":
         # void addSoundfile(const char* label, const char* filename,  Soundfile** sf_zone)
         void declare(FAUSTFLOAT* zone, const char* key, const char* val)
 
+cdef extern from *:
+    """
+    #include "faust/gui/JSONUI.h"
+
+    // Create a JSONUI carrying factory-level fields, leaving the optional
+    // path table, memory layout and complexity sections empty.
+    static JSONUI* newFactoryJSONUI(const std::string& name,
+                                    int inputs,
+                                    int outputs,
+                                    const std::string& sha_key,
+                                    const std::string& version,
+                                    const std::string& compile_options,
+                                    const std::vector<std::string>& library_list,
+                                    const std::vector<std::string>& include_pathnames)
+    {
+        return new JSONUI(name, "", inputs, outputs, -1, sha_key, "", version,
+                          compile_options, library_list, include_pathnames, -1,
+                          PathTableType(), MemoryLayoutType(), InstComplexity());
+    }
+    """
+    cdef cppclass JSONUI(UI):
+        JSONUI(int inputs, int outputs) except +
+        string JSON(bint flat)
+
+    JSONUI* newFactoryJSONUI(
+        const string& name,
+        int inputs,
+        int outputs,
+        const string& sha_key,
+        const string& version,
+        const string& compile_options,
+        const vector[string]& library_list,
+        const vector[string]& include_pathnames) except +
+
 # Soundfile functionality - always included for full functionality
 cdef extern from "faust/gui/Soundfile.h":
     # Constants from Soundfile.h
@@ -1,5 +1,6 @@
 from libcpp.string cimport string
 from libcpp.vector cimport vector
+from libc.stddef cimport ptrdiff_t
 
 from .faust_box cimport Box, Signal, tvec
 from .faust_gui cimport UI, Meta
@@ -158,3 +159,1044 @@ cdef extern from "faust/audio/rtaudio-dsp.h":
         int getSampleRate()
         int getNumInputs()
         int getNumOutputs()
+
+cdef extern from *:
+    """
+    #include <algorithm>
+    #include <atomic>
+    #include <vector>
+    #include "faust/dsp/dsp-combiner.h"
+    #include "faust/gui/DecoratorUI.h"
+    #include "faust/gui/MapUI.h"
+
+    // Non-owning proxy: combiners delete their inner DSPs, the wrapped
+    // DSP here stays owned by its Python object.
+    class dsp_ref : public decorator_dsp {
+    public:
+        // dsp_crossfader's destructor frees getNumInputs() output buffers
+        // of its first DSP: report the output count once it is released.
+        bool fReleased = false;
+        dsp_ref(::dsp* dsp):decorator_dsp(dsp) {}
+        virtual ~dsp_ref() { fDSP = nullptr; }
+        virtual int getNumInputs() override
+        {
+            return fReleased ? fDSP->getNumOutputs() : fDSP->getNumInputs();
+        }
+    };
+
+    // Finds the zone of the first slider, which is the crossfader's own
+    // "Crossfade" slider when the combiner uses a horizontal group layout.
+    struct crossfade_zone_finder : public GenericUI {
+        FAUSTFLOAT* fZone = nullptr;
+        void addHorizontalSlider(const char* label, FAUSTFLOAT* zone, FAUSTFLOAT init,
+                                 FAUSTFLOAT min, FAUSTFLOAT max, FAUSTFLOAT step) override
+        {
+            if (!fZone) fZone = zone;
+        }
+    };
+
+    // Swaps DSP instances while running, fading from the old to the new one
+    // with a dsp_crossfader. swap() and collect() are called from a control
+    // thread, compute() from the audio thread, which never allocates or blocks.
+    class dsp_hot_swapper : public ::dsp {
+
+        private:
+
+            struct swap_t {
+                dsp_crossfader* fFader;
+                dsp_ref* fPrevious;
+                FAUSTFLOAT* fCrossfade;
+                ::dsp* fNext;
+            };
+
+            // Fade position is updated every kFadeBlock frames
+            enum { kFadeBlock = 32 };
+
+            std::atomic<::dsp*> fCurrent;
+            std::atomic<swap_t*> fPending;
+            std::atomic<swap_t*> fRetired;
+            // Written by the audio thread only, read by both threads. A swap
+            // is stored in fActive before fPending is cleared and in fRetired
+            // before fActive is cleared, so reading fPending, fActive and
+            // fRetired in this order always finds an ongoing swap.
+            std::atomic<swap_t*> fActive;
+            int fFadeLength;
+            int fFadePosition;
+            std::vector<FAUSTFLOAT*> fInputs;
+            std::vector<FAUSTFLOAT*> fOutputs;
+
+            static void deleteSwap(swap_t* swap)
+            {
+                if (swap) {
+                    swap->fPrevious->fReleased = true;
+                    delete swap->fFader;
+                    delete swap;
+                }
+            }
+
+        public:
+
+            dsp_hot_swapper(::dsp* dsp, int fade_length)
+            :fCurrent(dsp), fPending(nullptr), fRetired(nullptr), fActive(nullptr),
+            fFadeLength(std::max(1, fade_length)), fFadePosition(0),
+            fInputs(dsp->getNumInputs()), fOutputs(dsp->getNumOutputs())
+            {}
+
+            virtual ~dsp_hot_swapper()
+            {
+                deleteSwap(fPending.load());
+                deleteSwap(fActive.load());
+                deleteSwap(fRetired.load());
+            }
+
+            // Start fading to 'next' (already initialized), copying the values
+            // of controls with the same path from the current DSP. Returns false
+            // if a previous swap is not collected yet or the channel counts differ.
+            bool swap(::dsp* next)
+            {
+                ::dsp* current = fCurrent.load();
+                if (isSwapping()) return false;
+                if (next->getNumInputs() != current->getNumInputs()
+                    || next->getNumOutputs() != current->getNumOutputs()) return false;
+
+                MapUI current_ui, next_ui;
+                current->buildUserInterface(&current_ui);
+                next->buildUserInterface(&next_ui);
+                for (const auto& it : next_ui.getFullpathMap()) {
+                    FAUSTFLOAT* zone = current_ui.getParamZone(it.first);
+                    if (zone) *it.second = *zone;
+                }
+
+                swap_t* swap = new swap_t();
+                swap->fPrevious = new dsp_ref(current);
+                swap->fFader = new dsp_crossfader(swap->fPrevious, new dsp_ref(next), kHorizontalGroup);
+                crossfade_zone_finder finder;
+                swap->fFader->buildUserInterface(&finder);
+                swap->fCrossfade = finder.fZone;
+                *swap->fCrossfade = FAUSTFLOAT(1);
+                swap->fNext = next;
+                fPending.store(swap);
+                return true;
+            }
+
+            // Release the crossfader of a finished swap. Returns true when the
+            // previous DSP is no longer used and can be deleted.
+            bool collect()
+            {
+                swap_t* swap = fRetired.exchange(nullptr);
+                deleteSwap(swap);
+                return swap != nullptr;
+            }
+
+            bool isSwapping() { return fPending.load() || fActive.load() || fRetired.load(); }
+
+            ::dsp* getCurrent() { return fCurrent.load(); }
+
+            virtual int getNumInputs() { return fCurrent.load()->getNumInputs(); }
+            virtual int getNumOutputs() { return fCurrent.load()->getNumOutputs(); }
+            virtual void buildUserInterface(UI* ui_interface) { fCurrent.load()->buildUserInterface(ui_interface); }
+            virtual int getSampleRate() { return fCurrent.load()->getSampleRate(); }
+            virtual void init(int sample_rate) { fCurrent.load()->init(sample_rate); }
+            virtual void instanceInit(int sample_rate) { fCurrent.load()->instanceInit(sample_rate); }
+            virtual void instanceConstants(int sample_rate) { fCurrent.load()->instanceConstants(sample_rate); }
+            virtual void instanceResetUserInterface() { fCurrent.load()->instanceResetUserInterface(); }
+            virtual void instanceClear() { fCurrent.load()->instanceClear(); }
+            virtual ::dsp* clone() { return fCurrent.load()->clone(); }
+            virtual void metadata(Meta* m) { fCurrent.load()->metadata(m); }
+
+            virtual void compute(int count, FAUSTFLOAT** inputs, FAUSTFLOAT** outputs)
+            {
+                swap_t* active = fActive.load();
+                if (!active) {
+                    active = fPending.load();
+                    if (!active) {
+                        fCurrent.load()->compute(count, inputs, outputs);
+                        return;
+                    }
+                    // swap() does not store a new swap while fPending is set
+                    fActive.store(active);
+                    fPending.store(nullptr);
+                    fFadePosition = 0;
+                }
+                for (int pos = 0; pos < count; pos += kFadeBlock) {
+                    int frames = std::min(int(kFadeBlock), count - pos);
+                    for (size_t chan = 0; chan < fInputs.size(); chan++) fInputs[chan] = inputs[chan] + pos;
+                    for (size_t chan = 0; chan < fOutputs.size(); chan++) fOutputs[chan] = outputs[chan] + pos;
+                    if (active) {
+                        *active->fCrossfade = FAUSTFLOAT(1) - std::min(FAUSTFLOAT(1), FAUSTFLOAT(fFadePosition) / FAUSTFLOAT(fFadeLength));
+                        active->fFader->compute(frames, fInputs.data(), fOutputs.data());
+                        fFadePosition += frames;
+                        if (fFadePosition >= fFadeLength) {
+                            fCurrent.store(active->fNext);
+                            fRetired.store(active);
+                            fActive.store(nullptr);
+                            active = nullptr;
+                        }
+                    } else {
+                        fCurrent.load()->compute(frames, fInputs.data(), fOutputs.data());
+                    }
+                }
+            }
+
+            virtual void compute(double date_usec, int count, FAUSTFLOAT** inputs, FAUSTFLOAT** outputs)
+            {
+                compute(count, inputs, outputs);
+            }
+    };
+    """
+    cdef cppclass dsp_hot_swapper(dsp):
+        dsp_hot_swapper(dsp* dsp, int fade_length) except +
+        bint swap(dsp* next)
+        bint collect()
+        bint isSwapping()
+        dsp* getCurrent()
+
+cdef extern from *:
+    """
+    #include <string>
+    #if defined(_WIN32)
+    #ifndef NOMINMAX
+    #define NOMINMAX
+    #endif
+    #include <windows.h>
+    #else
+    #include <dlfcn.h>
+    #endif
+    #include "faust/gui/CGlue.h"
+
+    // Shared library built by cyfaust.native from Faust C backend code,
+    // exporting the C DSP API under fixed 'cyfaust_' names.
+    class native_dsp_module {
+
+        private:
+
+            void* fHandle;
+
+            void* symbol(const char* name)
+            {
+            #if defined(_WIN32)
+                void* sym = (void*)GetProcAddress((HMODULE)fHandle, name);
+            #else
+                void* sym = dlsym(fHandle, name);
+            #endif
+                if (!sym && fError.empty()) fError = std::string("missing symbol: ") + name;
+                return sym;
+            }
+
+        public:
+
+            std::string fError;
+            newDspFun fNew;
+            destroyDspFun fDelete;
+            getNumInputsFun fGetNumInputs;
+            getNumOutputsFun fGetNumOutputs;
+            buildUserInterfaceFun fBuildUserInterface;
+            getSampleRateFun fGetSampleRate;
+            initFun fInit;
+            classInitFun fClassInit;
+            instanceInitFun fInstanceInit;
+            instanceConstantsFun fInstanceConstants;
+            instanceResetUserInterfaceFun fInstanceResetUserInterface;
+            instanceClearFun fInstanceClear;
+            computeFun fCompute;
+            metadataFun fMetadata;
+
+            native_dsp_module(const std::string& path):fHandle(nullptr)
+            {
+            #if defined(_WIN32)
+                fHandle = (void*)LoadLibraryA(path.c_str());
+                if (!fHandle) fError = "cannot load " + path;
+            #else
+                fHandle = dlopen(path.c_str(), RTLD_NOW | RTLD_LOCAL);
+                if (!fHandle) fError = dlerror();
+            #endif
+                if (!fHandle) return;
+                fNew = (newDspFun)symbol("cyfaust_new");
+                fDelete = (destroyDspFun)symbol("cyfaust_delete");
+                fGetNumInputs = (getNumInputsFun)symbol("cyfaust_get_num_inputs");
+                fGetNumOutputs = (getNumOutputsFun)symbol("cyfaust_get_num_outputs");
+                fBuildUserInterface = (buildUserInterfaceFun)symbol("cyfaust_build_user_interface");
+                fGetSampleRate = (getSampleRateFun)symbol("cyfaust_get_sample_rate");
+                fInit = (initFun)symbol("cyfaust_init");
+                fClassInit = (classInitFun)symbol("cyfaust_class_init");
+                fInstanceInit = (instanceInitFun)symbol("cyfaust_instance_init");
+                fInstanceConstants = (instanceConstantsFun)symbol("cyfaust_instance_constants");
+                fInstanceResetUserInterface = (instanceResetUserInterfaceFun)symbol("cyfaust_instance_reset_user_interface");
+                fInstanceClear = (instanceClearFun)symbol("cyfaust_instance_clear");
+                fCompute = (computeFun)symbol("cyfaust_compute");
+                fMetadata = (metadataFun)symbol("cyfaust_metadata");
+            }
+
+            virtual ~native_dsp_module()
+            {
+                if (!fHandle) return;
+            #if defined(_WIN32)
+                FreeLibrary((HMODULE)fHandle);
+            #else
+                dlclose(fHandle);
+            #endif
+            }
+
+            bool isValid() { return fHandle && fError.empty(); }
+    };
+
+    // dsp interface over an instance of a native_dsp_module
+    class native_dsp : public ::dsp {
+
+        private:
+
+            native_dsp_module* fModule;
+            dsp_imp* fDSP;
+
+        public:
+
+            native_dsp(native_dsp_module* module):fModule(module), fDSP(module->fNew()) {}
+            virtual ~native_dsp() { fModule->fDelete(fDSP); }
+
+            virtual int getNumInputs() { return fModule->fGetNumInputs(fDSP); }
+            virtual int getNumOutputs() { return fModule->fGetNumOutputs(fDSP); }
+            virtual void buildUserInterface(UI* ui_interface)
+            {
+                UIGlue glue;
+                buildUIGlue(&glue, ui_interface, sizeof(FAUSTFLOAT) == sizeof(double));
+                fModule->fBuildUserInterface(fDSP, &glue);
+            }
+            virtual int getSampleRate() { return fModule->fGetSampleRate(fDSP); }
+            virtual void init(int sample_rate) { fModule->fInit(fDSP, sample_rate); }
+            virtual void instanceInit(int sample_rate) { fModule->fInstanceInit(fDSP, sample_rate); }
+            virtual void instanceConstants(int sample_rate) { fModule->fInstanceConstants(fDSP, sample_rate); }
+            virtual void instanceResetUserInterface() { fModule->fInstanceResetUserInterface(fDSP); }
+            virtual void instanceClear() { fModule->fInstanceClear(fDSP); }
+            virtual native_dsp* clone() { return new native_dsp(fModule); }
+            virtual void metadata(Meta* m)
+            {
+                MetaGlue glue;
+                buildMetaGlue(&glue, m);
+                fModule->fMetadata(&glue);
+            }
+            virtual void compute(int count, FAUSTFLOAT** inputs, FAUSTFLOAT** outputs)
+            {
+                fModule->fCompute(fDSP, count, inputs, outputs);
+            }
+            virtual void compute(double date_usec, int count, FAUSTFLOAT** inputs, FAUSTFLOAT** outputs)
+            {
+                compute(count, inputs, outputs);
+            }
+    };
+    """
+    cdef cppclass native_dsp_module:
+        native_dsp_module(const string& path) except +
+        string fError
+        bint isValid()
+
+    cdef cppclass native_dsp(dsp):
+        native_dsp(native_dsp_module* module) except +
+
+cdef extern from *:
+    """
+    #include "faust/dsp/dsp-adapter.h"
+
+    // Runs a DSP at 'factor' times the sample rate with dsp_up_sampler,
+    // between lowpass filters selected by 'filter' (0 to 4, see
+    // createSRAdapter). dsp_up_sampler zero-stuffs its inputs without gain
+    // compensation, so inputs are scaled by 'factor' when filtering for the
+    // DSP to see them at their original level. compute() accepts any count:
+    // it is split in blocks since the adapter allocates its buffers on the stack.
+    class dsp_oversampler : public decorator_dsp {
+
+        private:
+
+            enum { kMaxBlock = 64 };
+
+            int fFactor;
+            FAUSTFLOAT fGain;
+            std::vector<std::vector<FAUSTFLOAT>> fScaled;
+            std::vector<FAUSTFLOAT*> fInputs;
+            std::vector<FAUSTFLOAT*> fOutputs;
+
+            // Copies its input, to measure the delay of the filters alone
+            struct passthrough_dsp : public ::dsp {
+                int fSampleRate = 0;
+                int getNumInputs() { return 1; }
+                int getNumOutputs() { return 1; }
+                void buildUserInterface(UI* ui_interface) {}
+                int getSampleRate() { return fSampleRate; }
+                void init(int sample_rate) { fSampleRate = sample_rate; }
+                void instanceInit(int sample_rate) { fSampleRate = sample_rate; }
+                void instanceConstants(int sample_rate) { fSampleRate = sample_rate; }
+                void instanceResetUserInterface() {}
+                void instanceClear() {}
+                passthrough_dsp* clone() { return new passthrough_dsp(); }
+                void metadata(Meta* m) {}
+                void compute(int count, FAUSTFLOAT** inputs, FAUSTFLOAT** outputs)
+                {
+                    memcpy(outputs[0], inputs[0], sizeof(FAUSTFLOAT) * count);
+                }
+                void compute(double date_usec, int count, FAUSTFLOAT** inputs, FAUSTFLOAT** outputs)
+                {
+                    compute(count, inputs, outputs);
+                }
+            };
+
+        public:
+
+            std::string fError;
+            // Delay added by the filters, in samples at the outer rate
+            double fLatency;
+
+            dsp_oversampler(::dsp* dsp, int factor, int filter)
+            :decorator_dsp(nullptr), fFactor(factor), fGain(filter ? factor : 1), fLatency(0)
+            {
+                dsp_ref* ref = new dsp_ref(dsp);
+                fDSP = createSRAdapter<double>(ref, fError, 0, factor, filter);
+                if (!fDSP) {
+                    delete ref;
+                    return;
+                }
+                fScaled.resize(dsp->getNumInputs(), std::vector<FAUSTFLOAT>(kMaxBlock));
+                fInputs.resize(dsp->getNumInputs());
+                fOutputs.resize(dsp->getNumOutputs());
+                fLatency = measureLatency(factor, filter);
+            }
+
+            // Group delay at DC (centroid of the impulse response) of the up/down filters
+            static double measureLatency(int factor, int filter)
+            {
+                std::string error;
+                passthrough_dsp* pass = new passthrough_dsp();
+                ::dsp* adapter = createSRAdapter<double>(pass, error, 0, factor, filter);
+                if (!adapter) {
+                    delete pass;
+                    return 0;
+                }
+                adapter->init(48000);
+                std::vector<FAUSTFLOAT> input(kMaxBlock, 0), output(kMaxBlock, 0);
+                FAUSTFLOAT* inputs[1] = { input.data() };
+                FAUSTFLOAT* outputs[1] = { output.data() };
+                input[0] = FAUSTFLOAT(1);
+                double sum = 0, moment = 0;
+                for (int block = 0; block < 16; block++) {
+                    adapter->compute(kMaxBlock, inputs, outputs);
+                    input[0] = FAUSTFLOAT(0);
+                    for (int frame = 0; frame < kMaxBlock; frame++) {
+                        sum += output[frame];
+                        moment += double(block * kMaxBlock + frame) * output[frame];
+                    }
+                }
+                delete adapter;
+                return (sum != 0) ? moment / sum : 0;
+            }
+
+            bool isValid() { return fDSP != nullptr; }
+
+            virtual int getSampleRate() { return fDSP->getSampleRate() / fFactor; }
+
+            virtual void compute(int count, FAUSTFLOAT** inputs, FAUSTFLOAT** outputs)
+            {
+                for (int pos = 0; pos < count; pos += kMaxBlock) {
+                    int frames = std::min(int(kMaxBlock), count - pos);
+                    for (size_t chan = 0; chan < fInputs.size(); chan++) {
+                        for (int frame = 0; frame < frames; frame++) {
+                            fScaled[chan][frame] = inputs[chan][pos + frame] * fGain;
+                        }
+                        fInputs[chan] = fScaled[chan].data();
+                    }
+                    for (size_t chan = 0; chan < fOutputs.size(); chan++) fOutputs[chan] = outputs[chan] + pos;
+                    fDSP->compute(frames, fInputs.data(), fOutputs.data());
+                }
+            }
+
+            virtual void compute(double date_usec, int count, FAUSTFLOAT** inputs, FAUSTFLOAT** outputs)
+            {
+                compute(count, inputs, outputs);
+            }
+    };
+    """
+    cdef cppclass dsp_oversampler(dsp):
+        dsp_oversampler(dsp* dsp, int factor, int filter) except +
+        string fError
+        double fLatency
+        bint isValid()
+
+cdef extern from *:
+    """
+    #include <cmath>
+    #include <cstddef>
+    #include <cstring>
+    #include <iostream>
+    #include <limits>
+    #include <sstream>
+    #include "faust/dsp/dsp-compute-adapter.h"
+
+    // Non-owning proxy with the channel counts of its DSP at creation, so
+    // that adapters around it can be deleted after the DSP itself.
+    class dsp_fixed_ref : public decorator_dsp {
+    public:
+        int fNumInputs;
+        int fNumOutputs;
+        dsp_fixed_ref(::dsp* dsp)
+        :decorator_dsp(dsp), fNumInputs(dsp->getNumInputs()), fNumOutputs(dsp->getNumOutputs()) {}
+        virtual ~dsp_fixed_ref() { fDSP = nullptr; }
+        virtual int getNumInputs() override { return fNumInputs; }
+        virtual int getNumOutputs() override { return fNumOutputs; }
+    };
+
+    // Computes in blocks of at most kBlock frames of REAL samples, the
+    // buffer size of dsp_sample_adapter.
+    template <typename REAL>
+    class dsp_blocked : public decorator_dsp {
+    private:
+        enum { kBlock = 4096 };
+        std::vector<REAL*> fInputs;
+        std::vector<REAL*> fOutputs;
+    public:
+        dsp_blocked(::dsp* dsp)
+        :decorator_dsp(dsp), fInputs(dsp->getNumInputs()), fOutputs(dsp->getNumOutputs()) {}
+        virtual void compute(int count, FAUSTFLOAT** inputs, FAUSTFLOAT** outputs) override
+        {
+            REAL** real_inputs = reinterpret_cast<REAL**>(inputs);
+            REAL** real_outputs = reinterpret_cast<REAL**>(outputs);
+            for (int pos = 0; pos < count; pos += kBlock) {
+                int frames = std::min(int(kBlock), count - pos);
+                for (size_t chan = 0; chan < fInputs.size(); chan++) fInputs[chan] = real_inputs[chan] + pos;
+                for (size_t chan = 0; chan < fOutputs.size(); chan++) fOutputs[chan] = real_outputs[chan] + pos;
+                fDSP->compute(frames, reinterpret_cast<FAUSTFLOAT**>(fInputs.data()),
+                              reinterpret_cast<FAUSTFLOAT**>(fOutputs.data()));
+            }
+        }
+        virtual void compute(double date_usec, int count, FAUSTFLOAT** inputs, FAUSTFLOAT** outputs) override
+        {
+            compute(count, inputs, outputs);
+        }
+    };
+
+    // Compute calls made from Python flush denormals to zero, like the audio
+    // drivers do with AVOIDDENORMALS.
+    inline void compute_no_denormals(::dsp* dsp, int count, FAUSTFLOAT** inputs, FAUSTFLOAT** outputs)
+    {
+        ScopedNoDenormals ftz_scope;
+        dsp->compute(count, inputs, outputs);
+    }
+
+    inline void frame_no_denormals(::dsp* dsp, FAUSTFLOAT* inputs, FAUSTFLOAT* outputs)
+    {
+        ScopedNoDenormals ftz_scope;
+        dsp->frame(inputs, outputs);
+    }
+
+    // Reads the -cm (compute mix) and -inpl (in place) compile options of a DSP.
+    struct compile_options_meta : public Meta {
+        bool fComputeMix = false;
+        bool fInPlace = false;
+        void declare(const char* key, const char* value)
+        {
+            if (strcmp(key, "compile_options") == 0) {
+                std::stringstream tokenizer(value);
+                std::string token;
+                while (getline(tokenizer, token, ' ')) {
+                    fComputeMix |= (token == "-cm");
+                    fInPlace |= (token == "-inpl");
+                }
+            }
+        }
+    };
+
+    // Replaces the REAL outputs of a DSP compiled with -cm instead of adding
+    // to them, like dsp_compute_mix::computeReplacing (which only clears
+    // float buffers).
+    template <typename REAL>
+    class dsp_replacing : public decorator_dsp {
+    public:
+        dsp_replacing(::dsp* dsp) : decorator_dsp(dsp) {}
+        virtual void compute(int count, FAUSTFLOAT** inputs, FAUSTFLOAT** outputs) override
+        {
+            for (int chan = 0; chan < fDSP->getNumOutputs(); chan++) {
+                memset(outputs[chan], 0, sizeof(REAL) * count);
+            }
+            fDSP->compute(count, inputs, outputs);
+        }
+    };
+
+    // Computes a DSP with float, double, interleaved or PCM buffers,
+    // flushing denormals and converting with dsp_sample_adapter where the
+    // DSP's own sample type differs. A DSP compiled with -double computes double buffers natively,
+    // and float ones through floatDsp(). Buffers with any frame and channel
+    // strides are gathered into and scattered from planar scratch buffers
+    // in blocks of kBlock frames, which computeMix() also uses to add
+    // outputs into existing buffers or to compute in place.
+    class dsp_sample_formats {
+
+        private:
+
+            enum { kBlock = 512 };
+
+            ::dsp* fDSP;
+            ::dsp* fFloat;
+            ::dsp* fDouble;
+            bool fIsDouble;
+            int fNumInputs;
+            int fNumOutputs;
+            std::vector<double> fScratch;
+            std::vector<float*> fFloatChannels;
+            std::vector<double*> fDoubleChannels;
+            std::vector<float*> fFloatBlock;
+            std::vector<double*> fDoubleBlock;
+            bool fComputeMix;
+            bool fInPlace;
+            dsp_compute_mix* fMix;
+            dsp_compute_inpl* fInPlaceDsp;
+            dsp_compute_inpl_mix* fInPlaceMix;
+
+            float** channels(float) { return fFloatChannels.data(); }
+            double** channels(double) { return fDoubleChannels.data(); }
+            float** block(float) { return fFloatBlock.data(); }
+            double** block(double) { return fDoubleBlock.data(); }
+            ::dsp* target(float) { return fFloat; }
+            ::dsp* target(double) { return fDouble; }
+
+            // Computes outputs, replacing their content even if the DSP
+            // was compiled with -cm
+            template <typename REAL>
+            void computeReplacing(::dsp* dsp, int count, REAL** inputs, REAL** outputs)
+            {
+                if (dsp == fDSP && fComputeMix) {
+                    for (int chan = 0; chan < fNumOutputs; chan++) {
+                        memset(outputs[chan], 0, sizeof(REAL) * count);
+                    }
+                }
+                dsp->compute(count, reinterpret_cast<FAUSTFLOAT**>(inputs), reinterpret_cast<FAUSTFLOAT**>(outputs));
+            }
+
+        public:
+
+            dsp_sample_formats(::dsp* dsp, bool is_double)
+            :fDSP(dsp), fFloat(dsp), fDouble(dsp), fIsDouble(is_double),
+            fNumInputs(dsp->getNumInputs()), fNumOutputs(dsp->getNumOutputs()),
+            fMix(nullptr), fInPlaceDsp(nullptr), fInPlaceMix(nullptr)
+            {
+                compile_options_meta options;
+                dsp->metadata(&options);
+                fComputeMix = options.fComputeMix;
+                fInPlace = options.fInPlace;
+                // Adapters compute into their own buffers, which are not cleared
+                ::dsp* ref = new dsp_fixed_ref(dsp);
+                if (fComputeMix && is_double) ref = new dsp_replacing<double>(ref);
+                if (fComputeMix && !is_double) ref = new dsp_replacing<float>(ref);
+                if (is_double) {
+                    fFloat = new dsp_blocked<float>(new dsp_sample_adapter<double, float>(ref));
+                } else {
+                    fDouble = new dsp_blocked<double>(new dsp_sample_adapter<float, double>(ref));
+                }
+                // One kBlock double area per channel, also used for float samples
+                int num_channels = fNumInputs + fNumOutputs;
+                fScratch.resize(num_channels * kBlock);
+                for (int chan = 0; chan < num_channels; chan++) {
+                    fDoubleChannels.push_back(&fScratch[chan * kBlock]);
+                    fFloatChannels.push_back(reinterpret_cast<float*>(&fScratch[chan * kBlock]));
+                }
+                fFloatBlock.resize(num_channels);
+                fDoubleBlock.resize(num_channels);
+            }
+
+            virtual ~dsp_sample_formats()
+            {
+                if (fFloat != fDSP) delete fFloat;
+                if (fDouble != fDSP) delete fDouble;
+                delete fMix;
+                delete fInPlaceDsp;
+                delete fInPlaceMix;
+            }
+
+            // DSP computing float buffers
+            ::dsp* floatDsp() { return fFloat; }
+
+            bool isDouble() { return fIsDouble; }
+
+            // DSP compiled with -cm, adding to its output buffers
+            bool computesMix() { return fComputeMix; }
+
+            void computeDouble(int count, double** inputs, double** outputs)
+            {
+                ScopedNoDenormals ftz_scope;
+                fDouble->compute(count, reinterpret_cast<FAUSTFLOAT**>(inputs), reinterpret_cast<FAUSTFLOAT**>(outputs));
+            }
+
+            // Computes EXT samples at inputs[frame * in_frame + chan * in_chan]
+            // (strides in samples) with REAL buffers. Samples are divided by
+            // 'scale' on input and multiplied on output, then rounded and
+            // clipped for integer types.
+            template <typename EXT, typename REAL>
+            void computeStrided(int count,
+                                const EXT* inputs, ptrdiff_t in_frame, ptrdiff_t in_chan,
+                                EXT* outputs, ptrdiff_t out_frame, ptrdiff_t out_chan,
+                                double scale)
+            {
+                ScopedNoDenormals ftz_scope;
+                REAL** ins = channels(REAL());
+                REAL** outs = ins + fNumInputs;
+                ::dsp* dsp = target(REAL());
+                const bool integral = std::numeric_limits<EXT>::is_integer;
+                const double low = integral ? double(std::numeric_limits<EXT>::min()) : 0;
+                const double high = integral ? double(std::numeric_limits<EXT>::max()) : 0;
+                for (int pos = 0; pos < count; pos += kBlock) {
+                    int frames = std::min(int(kBlock), count - pos);
+                    for (int chan = 0; chan < fNumInputs; chan++) {
+                        const EXT* in = inputs + pos * in_frame + chan * in_chan;
+                        for (int frame = 0; frame < frames; frame++) {
+                            ins[chan][frame] = REAL(double(in[frame * in_frame]) / scale);
+                        }
+                    }
+                    dsp->compute(frames, reinterpret_cast<FAUSTFLOAT**>(ins), reinterpret_cast<FAUSTFLOAT**>(outs));
+                    for (int chan = 0; chan < fNumOutputs; chan++) {
+                        EXT* out = outputs + pos * out_frame + chan * out_chan;
+                        for (int frame = 0; frame < frames; frame++) {
+                            double sample = double(outs[chan][frame]) * scale;
+                            if (integral) {
+                                sample = std::max(low, std::min(high, std::nearbyint(sample)));
+                            }
+                            out[frame * out_frame] = EXT(sample);
+                        }
+                    }
+                }
+            }
+
+            // Computes 'gain' times the DSP outputs, added to 'outputs' with
+            // 'mix', or written to them otherwise. With 'in_place', 'inputs'
+            // and 'outputs' are the same buffers, the inputs being replaced
+            // (or mixed with) the outputs. DSPs compiled with -cm or -inpl
+            // use dsp_compute_mix/dsp_compute_inpl_mix with unity gain;
+            // others compute through the scratch buffers, block by block.
+            template <typename REAL>
+            void computeMix(int count, REAL** inputs, REAL** outputs, REAL gain, bool mix, bool in_place)
+            {
+                ScopedNoDenormals ftz_scope;
+                ::dsp* dsp = target(REAL());
+                bool native = (dsp == fDSP);
+                FAUSTFLOAT** ins = reinterpret_cast<FAUSTFLOAT**>(inputs);
+                FAUSTFLOAT** outs = reinterpret_cast<FAUSTFLOAT**>(outputs);
+                if (native && gain == REAL(1)) {
+                    if (mix && fComputeMix && !in_place) {
+                        if (!fMix) fMix = new dsp_compute_mix(new dsp_fixed_ref(fDSP));
+                        fMix->computeAdding(count, ins, outs);
+                        return;
+                    }
+                    if (mix && fComputeMix && in_place && fInPlace) {
+                        if (!fInPlaceMix) fInPlaceMix = new dsp_compute_inpl_mix(new dsp_fixed_ref(fDSP));
+                        fInPlaceMix->computeAdding(count, outs);
+                        return;
+                    }
+                    if (!mix && in_place && fInPlace && !fComputeMix) {
+                        if (!fInPlaceDsp) fInPlaceDsp = new dsp_compute_inpl(new dsp_fixed_ref(fDSP));
+                        fInPlaceDsp->computeReplacing(count, outs);
+                        return;
+                    }
+                }
+                REAL** scratch_ins = channels(REAL());
+                REAL** scratch_outs = scratch_ins + fNumInputs;
+                REAL** block_ins = block(REAL());
+                REAL** block_outs = block_ins + fNumInputs;
+                for (int pos = 0; pos < count; pos += kBlock) {
+                    int frames = std::min(int(kBlock), count - pos);
+                    for (int chan = 0; chan < fNumInputs; chan++) {
+                        if (in_place) {
+                            memcpy(scratch_ins[chan], inputs[chan] + pos, sizeof(REAL) * frames);
+                            block_ins[chan] = scratch_ins[chan];
+                        } else {
+                            block_ins[chan] = inputs[chan] + pos;
+                        }
+                    }
+                    if (!mix && gain == REAL(1)) {
+                        for (int chan = 0; chan < fNumOutputs; chan++) block_outs[chan] = outputs[chan] + pos;
+                        computeReplacing(dsp, frames, block_ins, block_outs);
+                        continue;
+                    }
+                    computeReplacing(dsp, frames, block_ins, scratch_outs);
+                    for (int chan = 0; chan < fNumOutputs; chan++) {
+                        REAL* out = outputs[chan] + pos;
+                        REAL* computed = scratch_outs[chan];
+                        if (mix) {
+                            for (int frame = 0; frame < frames; frame++) out[frame] += gain * computed[frame];
+                        } else {
+                            for (int frame = 0; frame < frames; frame++) out[frame] = gain * computed[frame];
+                        }
+                    }
+                }
+            }
+    };
+    """
+    cdef cppclass dsp_sample_formats:
+        dsp_sample_formats(dsp* dsp, bint is_double) except +
+        dsp* floatDsp()
+        bint isDouble()
+        bint computesMix()
+        void computeDouble(int count, double** inputs, double** outputs)
+        void computeStrided[EXT, REAL](int count,
+                                       const EXT* inputs, ptrdiff_t in_frame, ptrdiff_t in_chan,
+                                       EXT* outputs, ptrdiff_t out_frame, ptrdiff_t out_chan,
+                                       double scale)
+        void computeMix[REAL](int count, REAL** inputs, REAL** outputs, REAL gain, bint mix, bint in_place)
+
+    void compute_no_denormals(dsp* dsp, int count, float** inputs, float** outputs)
+    void frame_no_denormals(dsp* dsp, float* inputs, float* outputs)
+
+cdef extern from *:
+    """
+    // Computes a DSP in blocks of exactly fBlockSize frames whatever the
+    // count passed to compute(): inputs are queued and outputs taken from
+    // the previous block, which delays the signal by fBlockSize frames.
+    class dsp_fixed_block : public decorator_dsp {
+
+        private:
+
+            int fBlockSize;
+            int fPos;
+            std::vector<FAUSTFLOAT> fBuffer;
+            std::vector<FAUSTFLOAT*> fInputs;
+            std::vector<FAUSTFLOAT*> fOutputs;
+
+            void reset()
+            {
+                std::fill(fBuffer.begin(), fBuffer.end(), FAUSTFLOAT(0));
+                fPos = 0;
+            }
+
+        public:
+
+            dsp_fixed_block(::dsp* dsp, int block_size)
+            :decorator_dsp(new dsp_ref(dsp)), fBlockSize(block_size), fPos(0)
+            {
+                int num_inputs = dsp->getNumInputs();
+                int num_outputs = dsp->getNumOutputs();
+                fBuffer.resize((num_inputs + num_outputs) * block_size);
+                for (int chan = 0; chan < num_inputs; chan++) {
+                    fInputs.push_back(&fBuffer[chan * block_size]);
+                }
+                for (int chan = 0; chan < num_outputs; chan++) {
+                    fOutputs.push_back(&fBuffer[(num_inputs + chan) * block_size]);
+                }
+            }
+
+            int getLatency() { return fBlockSize; }
+
+            virtual void init(int sample_rate) override
+            {
+                fDSP->init(sample_rate);
+                reset();
+            }
+
+            virtual void instanceInit(int sample_rate) override
+            {
+                fDSP->instanceInit(sample_rate);
+                reset();
+            }
+
+            virtual void instanceClear() override
+            {
+                fDSP->instanceClear();
+                reset();
+            }
+
+            virtual void compute(int count, FAUSTFLOAT** inputs, FAUSTFLOAT** outputs) override
+            {
+                for (int pos = 0; pos < count;) {
+                    int frames = std::min(fBlockSize - fPos, count - pos);
+                    // Inputs are read before outputs are written, so buffers may be shared
+                    for (size_t chan = 0; chan < fInputs.size(); chan++) {
+                        memcpy(fInputs[chan] + fPos, inputs[chan] + pos, sizeof(FAUSTFLOAT) * frames);
+                    }
+                    for (size_t chan = 0; chan < fOutputs.size(); chan++) {
+                        memcpy(outputs[chan] + pos, fOutputs[chan] + fPos, sizeof(FAUSTFLOAT) * frames);
+                    }
+                    fPos += frames;
+                    pos += frames;
+                    if (fPos == fBlockSize) {
+                        fDSP->compute(fBlockSize, fInputs.data(), fOutputs.data());
+                        fPos = 0;
+                    }
+                }
+            }
+
+            virtual void compute(double date_usec, int count, FAUSTFLOAT** inputs, FAUSTFLOAT** outputs) override
+            {
+                compute(count, inputs, outputs);
+            }
+    };
+    """
+    cdef cppclass dsp_fixed_block(dsp):
+        dsp_fixed_block(dsp* dsp, int block_size) except +
+        int getLatency()
+
+cdef extern from *:
+    """
+    #include <cstdint>
+
+    // Clears the flush-to-zero and denormals-are-zero modes that
+    // ScopedNoDenormals sets, so that denormals can be observed.
+    class ScopedDenormals {
+
+        private:
+
+            intptr_t fpsr = 0;
+
+            void setFpStatusRegister(intptr_t fpsr_aux) noexcept
+            {
+            #if defined (__arm64__) || defined (__aarch64__)
+                asm volatile("msr fpcr, %0" : : "ri" (fpsr_aux));
+            #elif defined (__SSE__)
+                volatile uint32_t fpsr_w = static_cast<uint32_t>(fpsr_aux);
+                _mm_setcsr(fpsr_w);
+            #endif
+            }
+
+            void getFpStatusRegister() noexcept
+            {
+            #if defined (__arm64__) || defined (__aarch64__)
+                asm volatile("mrs %0, fpcr" : "=r" (fpsr));
+            #elif defined (__SSE__)
+                fpsr = static_cast<intptr_t>(_mm_getcsr());
+            #endif
+            }
+
+        public:
+
+            ScopedDenormals() noexcept
+            {
+            #if defined (__arm64__) || defined (__aarch64__)
+                intptr_t mask = (1 << 24 /* FZ */);
+            #elif defined (__SSE__)
+                intptr_t mask = 0x8040;
+            #else
+                intptr_t mask = 0x0000;
+            #endif
+                getFpStatusRegister();
+                setFpStatusRegister(fpsr & ~mask);
+            }
+
+            ~ScopedDenormals() noexcept
+            {
+                setFpStatusRegister(fpsr);
+            }
+    };
+
+    // Classifies a sample from its bits as FP_NAN, FP_INFINITE, FP_SUBNORMAL
+    // or FP_NORMAL (zero included), whatever the denormals-are-zero mode
+    // in which std::fpclassify may report subnormals as zero.
+    inline int sample_class(float sample)
+    {
+        uint32_t bits;
+        memcpy(&bits, &sample, sizeof(bits));
+        uint32_t exponent = bits & 0x7F800000u;
+        uint32_t mantissa = bits & 0x007FFFFFu;
+        if (exponent == 0x7F800000u) return mantissa ? FP_NAN : FP_INFINITE;
+        return (exponent == 0 && mantissa) ? FP_SUBNORMAL : FP_NORMAL;
+    }
+
+    inline int sample_class(double sample)
+    {
+        uint64_t bits;
+        memcpy(&bits, &sample, sizeof(bits));
+        uint64_t exponent = bits & 0x7FF0000000000000ull;
+        uint64_t mantissa = bits & 0x000FFFFFFFFFFFFFull;
+        if (exponent == 0x7FF0000000000000ull) return mantissa ? FP_NAN : FP_INFINITE;
+        return (exponent == 0 && mantissa) ? FP_SUBNORMAL : FP_NORMAL;
+    }
+
+    // Like dsp_me_checker (faust/dsp/dsp-checker.h), counts NaN, infinite
+    // and subnormal output samples, but per channel and with an action on
+    // blocks holding NaN or infinite samples: kCount only counts them,
+    // kZero also clears the block, and kAbort clears it and outputs silence
+    // without computing the DSP until reset().
+    class dsp_health_checker : public decorator_dsp {
+
+        public:
+
+            enum { kCount = 0, kZero = 1, kAbort = 2 };
+
+            std::vector<long long> fNaN;
+            std::vector<long long> fInfinite;
+            std::vector<long long> fSubnormal;
+            long long fBadBlocks;
+            int fFaultChannel;
+            bool fAborted;
+            int fAction;
+            bool fFlushDenormals;
+
+            dsp_health_checker(::dsp* dsp, int action, bool flush_denormals)
+            :decorator_dsp(new dsp_ref(dsp)),
+            fNaN(dsp->getNumOutputs()), fInfinite(dsp->getNumOutputs()), fSubnormal(dsp->getNumOutputs()),
+            fAction(action), fFlushDenormals(flush_denormals)
+            {
+                reset();
+            }
+
+            void reset()
+            {
+                std::fill(fNaN.begin(), fNaN.end(), 0);
+                std::fill(fInfinite.begin(), fInfinite.end(), 0);
+                std::fill(fSubnormal.begin(), fSubnormal.end(), 0);
+                fBadBlocks = 0;
+                fFaultChannel = -1;
+                fAborted = false;
+            }
+
+            virtual void compute(int count, FAUSTFLOAT** inputs, FAUSTFLOAT** outputs) override
+            {
+                int num_outputs = int(fNaN.size());
+                if (fAborted) {
+                    for (int chan = 0; chan < num_outputs; chan++) {
+                        memset(outputs[chan], 0, sizeof(FAUSTFLOAT) * count);
+                    }
+                    return;
+                }
+                if (fFlushDenormals) {
+                    ScopedNoDenormals ftz_scope;
+                    fDSP->compute(count, inputs, outputs);
+                } else {
+                    ScopedDenormals denormals_scope;
+                    fDSP->compute(count, inputs, outputs);
+                }
+                bool bad = false;
+                for (int chan = 0; chan < num_outputs; chan++) {
+                    long long nan = 0, infinite = 0, subnormal = 0;
+                    for (int frame = 0; frame < count; frame++) {
+                        switch (sample_class(outputs[chan][frame])) {
+                            case FP_NAN: nan++; break;
+                            case FP_INFINITE: infinite++; break;
+                            case FP_SUBNORMAL: subnormal++; break;
+                            default: break;
+                        }
+                    }
+                    fNaN[chan] += nan;
+                    fInfinite[chan] += infinite;
+                    fSubnormal[chan] += subnormal;
+                    if (nan + infinite > 0 && !bad) {
+                        bad = true;
+                        if (fFaultChannel < 0) fFaultChannel = chan;
+                    }
+                }
+                if (bad) {
+                    fBadBlocks++;
+                    if (fAction != kCount) {
+                        for (int chan = 0; chan < num_outputs; chan++) {
+                            memset(outputs[chan], 0, sizeof(FAUSTFLOAT) * count);
+                        }
+                    }
+                    fAborted = (fAction == kAbort);
+                }
+            }
+
+            virtual void compute(double date_usec, int count, FAUSTFLOAT** inputs, FAUSTFLOAT** outputs) override
+            {
+                compute(count, inputs, outputs);
+            }
+    };
+    """
+    cdef cppclass dsp_health_checker(dsp):
+        dsp_health_checker(dsp* dsp, int action, bint flush_denormals) except +
+        vector[long long] fNaN
+        vector[long long] fInfinite
+        vector[long long] fSubnormal
+        long long fBadBlocks
+        int fFaultChannel
+        bint fAborted
+        void reset()
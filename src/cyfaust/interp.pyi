@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Any, Iterable
 
 from .box import Box
 from .signal import SignalVector
@@ -11,10 +11,12 @@ def expand_dsp_from_string(
 ) -> tuple[str, str] | None: ...
 def generate_auxfiles_from_file(filename: str, *args: str) -> bool: ...
 def generate_auxfiles_from_string(name_app: str, dsp_content: str, *args: str) -> bool: ...
+def generate_auxfiles_from_file2(filename: str, *args: str) -> str | None: ...
+def generate_auxfiles_from_string2(name_app: str, dsp_content: str, *args: str) -> str | None: ...
 def get_dsp_factory_from_sha_key(sha_key: str) -> InterpreterDspFactory: ...
 def create_dsp_factory_from_file(filename: str, *args: str) -> InterpreterDspFactory | None: ...
 def create_dsp_factory_from_string(
-    name_app: str, code: str, *args: str
+    name_app: str, code: str, *args: str, outputs: Iterable[int] | None = None
 ) -> InterpreterDspFactory | None: ...
 def create_dsp_factory_from_signals(
     name_app: str, signals: SignalVector, *args: str
@@ -33,10 +35,37 @@ def read_dsp_factory_from_bitcode_file(
     bitcode_path: str,
 ) -> InterpreterDspFactory | None: ...
 
+class DspFactory:
+    def get_name(self) -> str: ...
+    def get_sha_key(self) -> str: ...
+    def get_json(self, flat: bool = False) -> str | None: ...
+    def create_dsp_instance(self) -> Dsp: ...
+
+class Dsp:
+    def get_numinputs(self) -> int: ...
+    def get_numoutputs(self) -> int: ...
+    def get_samplerate(self) -> int: ...
+    def init(self, sample_rate: int) -> None: ...
+    def instance_init(self, sample_rate: int) -> None: ...
+    def instance_constants(self, sample_rate: int) -> None: ...
+    def instance_reset_user_interface(self) -> None: ...
+    def instance_clear(self) -> None: ...
+    def clone(self) -> Dsp: ...
+    def build_user_interface(self, sound_directory: str = "", sample_rate: int = -1) -> None: ...
+    def compute(
+        self, count: int, inputs: Any, outputs: Any, mix: bool = False, gain: float = 1.0
+    ) -> None: ...
+    def compute_interleaved(self, count: int, inputs: Any, outputs: Any) -> None: ...
+    def compute_pcm(self, count: int, inputs: Any, outputs: Any) -> None: ...
+    def ui_json(self, flat: bool = False) -> str: ...
+    def metadata(self) -> dict[str, str]: ...
+    @property
+    def is_double(self) -> bool: ...
+
 class RtAudioDriver:
     def __init__(self, srate: int, bsize: int) -> None: ...
-    def set_dsp(self, dsp: InterpreterDsp) -> None: ...
-    def init(self, dsp: InterpreterDsp) -> bool: ...
+    def set_dsp(self, dsp: Dsp) -> None: ...
+    def init(self, dsp: Dsp) -> bool: ...
     def start(self) -> None: ...
     def stop(self) -> None: ...
     @property
@@ -48,7 +77,7 @@ class RtAudioDriver:
     @property
     def numoutputs(self) -> int: ...
 
-class InterpreterDspFactory:
+class InterpreterDspFactory(DspFactory):
     def get_name(self) -> str: ...
     def get_sha_key(self) -> str: ...
     def get_dsp_code(self) -> str: ...
@@ -56,6 +85,7 @@ class InterpreterDspFactory:
     def get_library_list(self) -> list[str]: ...
     def get_include_pathnames(self) -> list[str]: ...
     def get_warning_messages(self) -> list[str]: ...
+    def get_json(self, flat: bool = False) -> str | None: ...
     def create_dsp_instance(self) -> InterpreterDsp: ...
     def set_memory_manager(self, manager: Any) -> None: ...
     def get_memory_manager(self) -> Any: ...
@@ -84,22 +114,87 @@ class InterpreterDspFactory:
 class MetaCollector:
     def get_metadata(self) -> dict[str, str]: ...
 
-class InterpreterDsp:
+class InterpreterDsp(Dsp):
     def delete(self) -> None: ...
-    def get_numinputs(self) -> int: ...
-    def get_numoutputs(self) -> int: ...
-    def get_samplerate(self) -> int: ...
-    def init(self, sample_rate: int) -> None: ...
-    def instance_init(self, sample_rate: int) -> None: ...
-    def instance_constants(self, sample_rate: int) -> None: ...
-    def instance_reset_user_interface(self) -> None: ...
-    def instance_clear(self) -> None: ...
     def clone(self) -> InterpreterDsp: ...
-    def build_user_interface(self, sound_directory: str = "", sample_rate: int = -1) -> None: ...
     def control(self) -> None: ...
     def frame(self, inputs: Any, outputs: Any) -> None: ...
-    def compute(self, count: int, inputs: Any, outputs: Any) -> None: ...
     def compute_timestamped(
         self, date_usec: float, count: int, inputs: Any, outputs: Any
     ) -> None: ...
-    def metadata(self) -> dict[str, str]: ...
+
+class NativeDspFactory(DspFactory):
+    @property
+    def path(self) -> str: ...
+    @property
+    def sha_key(self) -> str: ...
+    @staticmethod
+    def from_library(path: str, sha_key: str = "") -> NativeDspFactory | None: ...
+    def get_name(self) -> str: ...
+    def get_sha_key(self) -> str: ...
+    def create_dsp_instance(self) -> NativeDsp: ...
+
+class NativeDsp(Dsp):
+    def clone(self) -> NativeDsp: ...
+
+class HotSwapDsp(Dsp):
+    def __init__(self, dsp: Dsp, fade_samples: int = 4096, factory: Any = None) -> None: ...
+    def clone(self) -> HotSwapDsp: ...
+    @property
+    def dsp(self) -> Dsp: ...
+    @property
+    def factory(self) -> Any: ...
+    @property
+    def is_swapping(self) -> bool: ...
+    def swap(self, dsp: Dsp, factory: Any = None) -> bool: ...
+    def collect(self) -> bool: ...
+
+OVERSAMPLING_QUALITIES: dict[str, int]
+OVERSAMPLING_FACTORS: tuple[int, ...]
+
+class Oversampled(Dsp):
+    def __init__(self, dsp: Dsp, factor: int = 2, quality: str | int = "high") -> None: ...
+    def clone(self) -> Oversampled: ...
+    @property
+    def dsp(self) -> Dsp: ...
+    @property
+    def factor(self) -> int: ...
+    @property
+    def filter(self) -> int: ...
+    @property
+    def latency(self) -> float: ...
+
+CHECK_ACTIONS: dict[str, int]
+
+class CheckedDsp(Dsp):
+    def __init__(self, dsp: Dsp, action: str = "count", flush_denormals: bool = True) -> None: ...
+    def reset(self) -> None: ...
+    def clone(self) -> CheckedDsp: ...
+    @property
+    def dsp(self) -> Dsp: ...
+    @property
+    def action(self) -> str: ...
+    @property
+    def flush_denormals(self) -> bool: ...
+    @property
+    def nan_counts(self) -> list[int]: ...
+    @property
+    def inf_counts(self) -> list[int]: ...
+    @property
+    def denormal_counts(self) -> list[int]: ...
+    @property
+    def bad_blocks(self) -> int: ...
+    @property
+    def fault_channel(self) -> int | None: ...
+    @property
+    def aborted(self) -> bool: ...
+
+class FixedBlockDsp(Dsp):
+    def __init__(self, dsp: Dsp, block_size: int = 512) -> None: ...
+    def clone(self) -> FixedBlockDsp: ...
+    @property
+    def dsp(self) -> Dsp: ...
+    @property
+    def block_size(self) -> int: ...
+    @property
+    def latency(self) -> int: ...
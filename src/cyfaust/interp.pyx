@@ -3,6 +3,7 @@
 from libcpp.string cimport string
 from libcpp.map cimport map
 from libc.stdlib cimport malloc, free
+from libc.stddef cimport ptrdiff_t
 from cython.operator cimport dereference as deref, preincrement as inc
 
 from . cimport faust_interp as fi
@@ -20,6 +21,16 @@ from .signal cimport SignalVector
 from .signal import SignalVector
 
 
+# Sample types accepted by Dsp.compute() and Dsp.compute_pcm()
+ctypedef fused real_t:
+    float
+    double
+
+ctypedef fused pcm_t:
+    short
+    int
+
+
 ## ---------------------------------------------------------------------------
 ## faust/dsp/libfaust
 
@@ -107,6 +118,345 @@ def generate_auxfiles_from_string(name_app: str, dsp_content: str, *args) -> boo
         return
     return result
 
+def generate_auxfiles_from_file2(filename: str, *args) -> str:
+    """Generate additional files from a file, returning the result as a string.
+
+    Unlike generate_auxfiles_from_file, the generated target code is returned
+    instead of a success flag. Files such as SVG diagrams are still written
+    to disk: see cyfaust.auxfiles for fully in-memory results.
+    """
+    cdef ParamArray params = ParamArray(args)
+    cdef string error_msg
+    error_msg.reserve(4096)
+    cdef string result = fi.generateAuxFilesFromFile2(
+        filename.encode('utf8'),
+        params.argc,
+        params.argv,
+        error_msg
+    )
+    if not error_msg.empty():
+        print(error_msg.decode())
+        return
+    return result.decode()
+
+def generate_auxfiles_from_string2(name_app: str, dsp_content: str, *args) -> str:
+    """Generate additional files from a string, returning the result as a string.
+
+    Unlike generate_auxfiles_from_string, the generated target code is returned
+    instead of a success flag. Files such as SVG diagrams are still written
+    to disk: see cyfaust.auxfiles for fully in-memory results.
+    """
+    cdef ParamArray params = ParamArray(args)
+    cdef string error_msg
+    error_msg.reserve(4096)
+    cdef string result = fi.generateAuxFilesFromString2(
+        name_app.encode('utf8'),
+        dsp_content.encode('utf8'),
+        params.argc,
+        params.argv,
+        error_msg
+    )
+    if not error_msg.empty():
+        print(error_msg.decode())
+        return
+    return result.decode()
+
+## ---------------------------------------------------------------------------
+## backend-independent dsp and factory base classes
+
+
+cdef class DspFactory:
+    """Abstract base class of DSP factories (interpreter, LLVM, native)."""
+
+    def __init__(self, *args, **kwargs):
+        if type(self) is DspFactory:
+            raise TypeError("DspFactory is an abstract base class")
+
+    def get_name(self) -> str:
+        """Return factory name."""
+        raise NotImplementedError
+
+    def get_sha_key(self) -> str:
+        """Return factory SHA key."""
+        raise NotImplementedError
+
+    def get_json(self, bint flat=False) -> str:
+        """Return the factory description as a Faust JSON string."""
+        return self.create_dsp_instance().ui_json(flat)
+
+    def create_dsp_instance(self) -> Dsp:
+        """Create a new DSP instance."""
+        raise NotImplementedError
+
+
+cdef class Dsp:
+    """Abstract base class of DSP instances.
+
+    Subclasses wrap a backend-specific instance and point dsp_ptr at it,
+    so the methods below and RtAudioDriver work the same for every backend.
+    The instance itself is owned and deleted by the subclass.
+
+    An instance compiled with -double computes with double buffers: dsp_ptr
+    then points to an adapter converting from and to float buffers, and
+    compute() with float64 arrays runs it natively.
+    """
+
+    cdef fi.dsp* dsp_ptr
+    cdef fg.SoundUI* sound_ui
+    cdef fi.dsp_sample_formats* formats
+    cdef readonly bint is_double
+
+    def __cinit__(self):
+        self.dsp_ptr = NULL
+        self.sound_ui = NULL
+        self.formats = NULL
+        self.is_double = False
+
+    def __dealloc__(self):
+        if self.sound_ui:
+            del self.sound_ui
+            self.sound_ui = NULL
+        # safe after the subclass deleted the instance: adapters only keep
+        # its channel counts
+        if self.formats:
+            del self.formats
+            self.formats = NULL
+
+    cdef void set_native(self, fi.dsp* ptr, bint is_double=False):
+        """Set the wrapped instance, adapting it to float buffers if it computes in double."""
+        self.is_double = is_double
+        if is_double:
+            self.formats = new fi.dsp_sample_formats(ptr, True)
+            self.dsp_ptr = self.formats.floatDsp()
+        else:
+            self.dsp_ptr = ptr
+
+    cdef fi.dsp_sample_formats* get_formats(self):
+        if self.formats == NULL:
+            self.formats = new fi.dsp_sample_formats(self.dsp_ptr, False)
+        return self.formats
+
+    def __init__(self, *args, **kwargs):
+        if type(self) is Dsp:
+            raise TypeError("Dsp is an abstract base class")
+
+    def get_numinputs(self) -> int:
+        """Return instance number of audio inputs."""
+        return self.dsp_ptr.getNumInputs()
+
+    def get_numoutputs(self) -> int:
+        """Return instance number of audio outputs."""
+        return self.dsp_ptr.getNumOutputs()
+
+    def get_samplerate(self) -> int:
+        """Return the sample rate currently used by the instance."""
+        return self.dsp_ptr.getSampleRate()
+
+    def init(self, int sample_rate):
+        """Global init, calls static class init and instance init."""
+        self.dsp_ptr.init(sample_rate)
+
+    def instance_init(self, int sample_rate):
+        """Init instance state."""
+        self.dsp_ptr.instanceInit(sample_rate)
+
+    def instance_constants(self, int sample_rate):
+        """Init instance constant state."""
+        self.dsp_ptr.instanceConstants(sample_rate)
+
+    def instance_reset_user_interface(self):
+        """Init default control parameters values."""
+        self.dsp_ptr.instanceResetUserInterface()
+
+    def instance_clear(self):
+        """Init instance state but keep the control parameter values."""
+        self.dsp_ptr.instanceClear()
+
+    def clone(self) -> Dsp:
+        """Return a clone of the instance."""
+        raise TypeError(f"{type(self).__name__} cannot be cloned")
+
+    def build_user_interface(self, str sound_directory="", int sample_rate=-1):
+        """Trigger the ui_interface parameter with instance specific calls
+
+        Calls are made to 'openTabBox', 'addButton',
+        'addVerticalSlider'... in order to build the UI.
+
+        This method also loads any soundfiles referenced in the DSP code.
+
+        Args:
+            sound_directory: Base directory for soundfile paths (default: current directory)
+            sample_rate: Sample rate for resampling soundfiles (-1 for no resampling)
+        """
+        # Clean up previous SoundUI if it exists
+        if self.sound_ui:
+            del self.sound_ui
+            self.sound_ui = NULL
+
+        # Create SoundUI to handle soundfile loading
+        # Parameters: sound_directory, sample_rate, reader (NULL for default), is_double
+        self.sound_ui = new fg.SoundUI(
+            sound_directory.encode('utf8'),
+            sample_rate,
+            <fg.SoundfileReader*>NULL,
+            self.is_double
+        )
+        self.dsp_ptr.buildUserInterface(<fg.UI*>self.sound_ui)
+
+    def compute(self, int count, real_t[:, ::1] inputs not None, real_t[:, ::1] outputs not None,
+                bint mix=False, double gain=1.0):
+        """DSP instance computation with successive in/out audio buffers.
+
+        Buffers are either both float32 or both float64. float64 buffers are
+        computed natively by instances compiled with -double, and converted
+        in native code otherwise (and float32 ones the other way round).
+
+        With mix=True the outputs, scaled by gain, are added to the content
+        of the output buffers, as when summing DSPs into a bus. Passing the
+        same buffer as inputs and outputs computes in place, the inputs
+        being replaced by (or, with mix, mixed with) the outputs.
+
+        Args:
+            count: number of frames to compute
+            inputs: 2D input audio buffers as memoryview [channels, samples]
+            outputs: 2D output audio buffers as memoryview [channels, samples]
+            mix: add the outputs to the output buffers instead of replacing them
+            gain: gain applied to the outputs
+        """
+        cdef bint in_place = (inputs.shape[0] and inputs.shape[1] and outputs.shape[0]
+                              and outputs.shape[1] and &inputs[0, 0] == &outputs[0, 0])
+        # instances compiled with -cm add to outputs: replace them unless mixing
+        cdef bint adapted = mix or in_place or gain != 1.0 or self.get_formats().computesMix()
+        if adapted:
+            self.check_planar(count, inputs.shape[0], inputs.shape[1],
+                              outputs.shape[0], outputs.shape[1], in_place)
+
+        cdef real_t** input_ptrs = <real_t**>malloc(inputs.shape[0] * sizeof(real_t*))
+        cdef real_t** output_ptrs = <real_t**>malloc(outputs.shape[0] * sizeof(real_t*))
+
+        try:
+            for i in range(inputs.shape[0]):
+                input_ptrs[i] = &inputs[i, 0]
+            for i in range(outputs.shape[0]):
+                output_ptrs[i] = &outputs[i, 0]
+
+            if real_t is float:
+                if adapted:
+                    self.get_formats().computeMix[float](count, input_ptrs, output_ptrs, gain, mix, in_place)
+                else:
+                    fi.compute_no_denormals(self.dsp_ptr, count, input_ptrs, output_ptrs)
+            else:
+                if adapted:
+                    self.get_formats().computeMix[double](count, input_ptrs, output_ptrs, gain, mix, in_place)
+                else:
+                    self.get_formats().computeDouble(count, input_ptrs, output_ptrs)
+        finally:
+            free(input_ptrs)
+            free(output_ptrs)
+
+    cdef void check_planar(self, int count, Py_ssize_t in_channels, Py_ssize_t in_frames,
+                           Py_ssize_t out_channels, Py_ssize_t out_frames, bint in_place) except *:
+        """Validate [channels, frames] buffer shapes for mixing or in-place computation."""
+        cdef int num_inputs = self.dsp_ptr.getNumInputs()
+        cdef int num_outputs = self.dsp_ptr.getNumOutputs()
+        if in_channels != num_inputs or out_channels != num_outputs:
+            raise ValueError(f"expected [{num_inputs}, frames] inputs and [{num_outputs}, frames] outputs")
+        if in_place and (num_inputs != num_outputs or in_frames != out_frames):
+            raise ValueError("in-place computation needs as many inputs as outputs")
+        if count < 0 or count > in_frames or count > out_frames:
+            raise ValueError("count exceeds buffer frames")
+
+    cdef void check_frames(self, int count, Py_ssize_t in_frames, Py_ssize_t in_channels,
+                           Py_ssize_t out_frames, Py_ssize_t out_channels) except *:
+        """Validate [frames, channels] buffer shapes for count frames."""
+        cdef int num_inputs = self.dsp_ptr.getNumInputs()
+        cdef int num_outputs = self.dsp_ptr.getNumOutputs()
+        if in_channels != num_inputs or out_channels != num_outputs:
+            raise ValueError(f"expected [frames, {num_inputs}] inputs and [frames, {num_outputs}] outputs")
+        if count < 0 or count > in_frames or count > out_frames:
+            raise ValueError("count exceeds buffer frames")
+
+    def compute_interleaved(self, int count, real_t[:, :] inputs not None, real_t[:, :] outputs not None):
+        """DSP instance computation with interleaved or strided buffers.
+
+        Buffers are indexed [frame, channel] with any strides, so interleaved
+        arrays as well as transposed or sliced views of planar ones are used
+        in place: samples are gathered into and scattered from internal
+        planar buffers in native code, block by block.
+
+        Args:
+            count: number of frames to compute
+            inputs: float32 or float64 input buffer [frames, channels]
+            outputs: output buffer of the same type [frames, channels]
+        """
+        self.check_frames(count, inputs.shape[0], inputs.shape[1], outputs.shape[0], outputs.shape[1])
+        cdef Py_ssize_t size = sizeof(real_t)
+        cdef ptrdiff_t in_frame = inputs.strides[0] // size, in_chan = inputs.strides[1] // size
+        cdef ptrdiff_t out_frame = outputs.strides[0] // size, out_chan = outputs.strides[1] // size
+        cdef real_t* input_ptr = &inputs[0, 0] if inputs.shape[0] and inputs.shape[1] else NULL
+        cdef real_t* output_ptr = &outputs[0, 0] if outputs.shape[0] and outputs.shape[1] else NULL
+        if real_t is float:
+            self.get_formats().computeStrided[float, float](
+                count, input_ptr, in_frame, in_chan, output_ptr, out_frame, out_chan, 1.0)
+        else:
+            self.get_formats().computeStrided[double, double](
+                count, input_ptr, in_frame, in_chan, output_ptr, out_frame, out_chan, 1.0)
+
+    def compute_pcm(self, int count, pcm_t[:, :] inputs not None, pcm_t[:, :] outputs not None):
+        """DSP instance computation with interleaved integer PCM buffers.
+
+        Samples are converted in native code, full scale being 32768 for
+        int16 and 2**31 for int32; outputs are rounded and clipped. Like
+        compute_interleaved(), buffers may have any strides.
+
+        Args:
+            count: number of frames to compute
+            inputs: interleaved int16 or int32 input buffer [frames, channels]
+            outputs: interleaved output buffer of the same type [frames, channels]
+        """
+        self.check_frames(count, inputs.shape[0], inputs.shape[1], outputs.shape[0], outputs.shape[1])
+        cdef Py_ssize_t size = sizeof(pcm_t)
+        cdef ptrdiff_t in_frame = inputs.strides[0] // size, in_chan = inputs.strides[1] // size
+        cdef ptrdiff_t out_frame = outputs.strides[0] // size, out_chan = outputs.strides[1] // size
+        cdef pcm_t* input_ptr = &inputs[0, 0] if inputs.shape[0] and inputs.shape[1] else NULL
+        cdef pcm_t* output_ptr = &outputs[0, 0] if outputs.shape[0] and outputs.shape[1] else NULL
+        if pcm_t is short:
+            self.get_formats().computeStrided[short, float](
+                count, input_ptr, in_frame, in_chan, output_ptr, out_frame, out_chan, 32768.0)
+        else:
+            self.get_formats().computeStrided[int, float](
+                count, input_ptr, in_frame, in_chan, output_ptr, out_frame, out_chan, 2147483648.0)
+
+    def ui_json(self, bint flat=False) -> str:
+        """Return the instance UI and metadata as a Faust JSON string.
+
+        The JSON has 'name', 'inputs', 'outputs', 'meta' and 'ui' entries,
+        where 'ui' is the tree of groups and widgets with their addresses,
+        init values and ranges.
+
+        Args:
+            flat: if True, return the JSON on a single line
+        """
+        cdef fg.JSONUI* json_ui = new fg.JSONUI(
+            self.dsp_ptr.getNumInputs(), self.dsp_ptr.getNumOutputs())
+        try:
+            self.dsp_ptr.buildUserInterface(<fg.UI*>json_ui)
+            self.dsp_ptr.metadata(<fg.Meta*>json_ui)
+            return json_ui.JSON(flat).decode()
+        finally:
+            del json_ui
+
+    def metadata(self) -> dict:
+        """Get DSP metadata as a dictionary.
+
+        Returns:
+            dict: Dictionary of metadata key-value pairs (e.g., name, author, version, etc.)
+        """
+        cdef MetaCollector collector = MetaCollector()
+        self.dsp_ptr.metadata(<fg.Meta*>collector.ptr)
+        return collector.get_metadata()
+
+
 ## ---------------------------------------------------------------------------
 ## faust/audio/rtaudio-dsp
 
@@ -115,6 +465,7 @@ cdef class RtAudioDriver:
     """faust audio driver using rtaudio cross-platform lib."""
     cdef fi.rtaudio *ptr
     cdef bint ptr_owner
+    cdef object dsp
 
     def __dealloc__(self):
         if self.ptr and self.ptr_owner:
@@ -125,11 +476,13 @@ cdef class RtAudioDriver:
         self.ptr = new fi.rtaudio(srate, bsize)
         self.ptr_owner = True
 
-    def set_dsp(self, dsp: InterpreterDsp):
-        """"set InterpreterDsp instance."""
-        self.ptr.setDsp(<fi.dsp*>dsp.ptr)
+    def set_dsp(self, Dsp dsp not None):
+        """set dsp instance of any backend."""
+        self.ptr.setDsp(dsp.dsp_ptr)
+        # keep the instance alive while the driver uses it
+        self.dsp = dsp
 
-    def init(self, dsp: InterpreterDsp) -> bool:
+    def init(self, Dsp dsp not None) -> bool:
         """initialize with dsp instance."""
         name = "RtAudioDriver".encode('utf8')
         if self.ptr.init(name, dsp.get_numinputs(), dsp.get_numoutputs()):
@@ -175,7 +528,7 @@ def get_version():
     return fi.getCLibFaustVersion().decode()
 
 
-cdef class InterpreterDspFactory:
+cdef class InterpreterDspFactory(DspFactory):
     """Interpreter DSP factory class."""
 
     cdef fi.interpreter_dsp_factory* ptr
@@ -224,10 +577,40 @@ cdef class InterpreterDspFactory:
         """Get warning messages list for a given compilation."""
         return [msg.decode() for msg in self.ptr.getWarningMessages()]
 
+    def get_json(self, bint flat=False) -> str:
+        """Return the factory description as a Faust JSON string.
+
+        Includes name, SHA key, compile options, library list, I/O counts,
+        metadata and the full UI tree, gathered from a temporary instance.
+
+        Args:
+            flat: if True, return the JSON on a single line
+        """
+        cdef fi.interpreter_dsp* dsp = self.ptr.createDSPInstance()
+        if dsp == NULL:
+            return
+        cdef fg.JSONUI* json_ui = fg.newFactoryJSONUI(
+            self.ptr.getName(),
+            dsp.getNumInputs(),
+            dsp.getNumOutputs(),
+            self.ptr.getSHAKey(),
+            string(fi.getCLibFaustVersion()),
+            self.ptr.getCompileOptions(),
+            self.ptr.getLibraryList(),
+            self.ptr.getIncludePathnames())
+        try:
+            dsp.buildUserInterface(<fg.UI*>json_ui)
+            dsp.metadata(<fg.Meta*>json_ui)
+            return json_ui.JSON(flat).decode()
+        finally:
+            del json_ui
+            del dsp
+
     def create_dsp_instance(self) -> InterpreterDsp:
         """Create a new DSP instance, to be deleted with C++ 'delete'"""
         cdef fi.interpreter_dsp* dsp = self.ptr.createDSPInstance()
-        instance = InterpreterDsp.from_ptr(dsp)
+        is_double = "-double" in self.get_compile_options().split()
+        instance = InterpreterDsp.from_ptr(dsp, False, is_double)
         self.instances.add(instance)
         return instance
 
@@ -448,17 +831,13 @@ cdef class MetaCollector:
         return result
 
 
-cdef class InterpreterDsp:
+cdef class InterpreterDsp(Dsp):
     """DSP instance class with methods."""
 
     cdef fi.interpreter_dsp* ptr
     cdef bint ptr_owner
-    cdef fg.SoundUI* sound_ui
 
     def __dealloc__(self):
-        if self.sound_ui:
-            del self.sound_ui
-            self.sound_ui = NULL
         if self.ptr and self.ptr_owner:
             del self.ptr
             self.ptr = NULL
@@ -466,82 +845,23 @@ cdef class InterpreterDsp:
     def __cinit__(self):
         self.ptr = NULL
         self.ptr_owner = False
-        self.sound_ui = NULL
 
     def delete(self):
         del self.ptr
 
     @staticmethod
-    cdef InterpreterDsp from_ptr(fi.interpreter_dsp* ptr, bint owner=False):
+    cdef InterpreterDsp from_ptr(fi.interpreter_dsp* ptr, bint owner=False, bint is_double=False):
         """Wrap the dsp instance and manage its lifetime."""
         cdef InterpreterDsp dsp = InterpreterDsp.__new__(InterpreterDsp)
         dsp.ptr_owner = owner
         dsp.ptr = ptr
+        dsp.set_native(<fi.dsp*>ptr, is_double)
         return dsp
 
-    def get_numinputs(self) -> int:
-        """Return instance number of audio inputs."""
-        return self.ptr.getNumInputs()
-
-    def get_numoutputs(self) -> int:
-        """Return instance number of audio outputs."""
-        return self.ptr.getNumOutputs()
-
-    def get_samplerate(self) -> int:
-        """Return the sample rate currently used by the instance."""
-        return self.ptr.getSampleRate()
-
-    def init(self, int sample_rate):
-        """Global init, calls static class init and instance init."""
-        self.ptr.init(sample_rate)
-
-    def instance_init(self, int sample_rate):
-        """Init instance state."""
-        self.ptr.instanceInit(sample_rate)
-
-    def instance_constants(self, int sample_rate):
-        """Init instance constant state."""
-        self.ptr.instanceConstants(sample_rate)
-
-    def instance_reset_user_interface(self):
-        """Init default control parameters values."""
-        self.ptr.instanceResetUserInterface()
-
-    def instance_clear(self):
-        """Init instance state but keep the control parameter values."""
-        self.ptr.instanceClear()
-
     def clone(self) -> InterpreterDsp:
         """Return a clone of the instance."""
         cdef fi.interpreter_dsp* dsp = self.ptr.clone()
-        return InterpreterDsp.from_ptr(dsp)
-
-    def build_user_interface(self, str sound_directory="", int sample_rate=-1):
-        """Trigger the ui_interface parameter with instance specific calls
-
-        Calls are made to 'openTabBox', 'addButton',
-        'addVerticalSlider'... in order to build the UI.
-
-        This method also loads any soundfiles referenced in the DSP code.
-
-        Args:
-            sound_directory: Base directory for soundfile paths (default: current directory)
-            sample_rate: Sample rate for resampling soundfiles (-1 for no resampling)
-        """
-        # Clean up previous SoundUI if it exists
-        if self.sound_ui:
-            del self.sound_ui
-            self.sound_ui = NULL
-
-        # Create SoundUI to handle soundfile loading
-        # Parameters: sound_directory, sample_rate, reader (NULL for default), is_double
-        self.sound_ui = new fg.SoundUI(
-            sound_directory.encode('utf8'),
-            sample_rate,
-            <fg.SoundfileReader*>NULL,
-            False  # is_double=False for float audio
-        )
-        self.ptr.buildUserInterface(<fg.UI*>self.sound_ui)
+        return InterpreterDsp.from_ptr(dsp, False, self.is_double)
 
     def control(self):
         """Read all controllers (buttons, sliders, etc.), and update the DSP state.
@@ -560,30 +880,8 @@ cdef class InterpreterDsp:
             
         Note: This method will only be functional with the -os (--one-sample) option.
         """
-        self.ptr.frame(&inputs[0], &outputs[0])
+        fi.frame_no_denormals(<fi.dsp*>self.ptr, &inputs[0], &outputs[0])
         
-    def compute(self, int count, float[:, ::1] inputs not None, float[:, ::1] outputs not None):
-        """DSP instance computation with successive in/out audio buffers.
-
-        Args:
-            count: number of frames to compute
-            inputs: 2D input audio buffers as memoryview [channels, samples]
-            outputs: 2D output audio buffers as memoryview [channels, samples]
-        """
-        cdef float** input_ptrs = <float**>malloc(inputs.shape[0] * sizeof(float*))
-        cdef float** output_ptrs = <float**>malloc(outputs.shape[0] * sizeof(float*))
-
-        try:
-            for i in range(inputs.shape[0]):
-                input_ptrs[i] = &inputs[i, 0]
-            for i in range(outputs.shape[0]):
-                output_ptrs[i] = &outputs[i, 0]
-
-            self.ptr.compute(count, input_ptrs, output_ptrs)
-        finally:
-            free(input_ptrs)
-            free(output_ptrs)
-
     def compute_timestamped(self, double date_usec, int count, float[:, ::1] inputs not None, float[:, ::1] outputs not None):
         """DSP instance computation with timestamp for sample-accurate timing.
 
@@ -611,20 +909,366 @@ cdef class InterpreterDsp:
                 output_ptrs[i] = &outputs[i, 0]
 
             # Call the standard compute - timestamp is for API compatibility
-            self.ptr.compute(count, input_ptrs, output_ptrs)
+            fi.compute_no_denormals(<fi.dsp*>self.ptr, count, input_ptrs, output_ptrs)
         finally:
             free(input_ptrs)
             free(output_ptrs)
 
-    def metadata(self) -> dict:
-        """Get DSP metadata as a dictionary.
 
-        Returns:
-            dict: Dictionary of metadata key-value pairs (e.g., name, author, version, etc.)
+cdef class NativeDspFactory(DspFactory):
+    """Factory of DSP instances from a native shared library.
+
+    The library is built from Faust C backend code by the system compiler,
+    see cyfaust.native.compile_native(). Instances keep their factory, and
+    with it the loaded library, alive.
+    """
+
+    cdef fi.native_dsp_module* ptr
+    cdef readonly str path
+    cdef readonly str sha_key
+
+    def __cinit__(self):
+        self.ptr = NULL
+        self.path = None
+        self.sha_key = None
+
+    def __dealloc__(self):
+        if self.ptr:
+            del self.ptr
+            self.ptr = NULL
+
+    @staticmethod
+    def from_library(str path, str sha_key="") -> NativeDspFactory:
+        """Load a native DSP shared library, returning None on error."""
+        cdef NativeDspFactory factory = NativeDspFactory.__new__(NativeDspFactory)
+        factory.ptr = new fi.native_dsp_module(path.encode('utf8'))
+        if not factory.ptr.isValid():
+            print(factory.ptr.fError.decode())
+            return None
+        factory.path = path
+        factory.sha_key = sha_key
+        return factory
+
+    def get_name(self) -> str:
+        """Return the DSP name (its 'name' metadata)."""
+        return self.create_dsp_instance().metadata().get("name", "")
+
+    def get_sha_key(self) -> str:
+        """Return the SHA key of the expanded DSP code it was built from."""
+        return self.sha_key
+
+    def create_dsp_instance(self) -> NativeDsp:
+        """Create a new DSP instance."""
+        return NativeDsp.from_ptr(new fi.native_dsp(self.ptr), self)
+
+
+cdef class NativeDsp(Dsp):
+    """DSP instance running natively compiled code."""
+
+    cdef fi.native_dsp* ptr
+    cdef NativeDspFactory factory
+
+    def __cinit__(self):
+        self.ptr = NULL
+
+    def __dealloc__(self):
+        if self.ptr:
+            del self.ptr
+            self.ptr = NULL
+
+    @staticmethod
+    cdef NativeDsp from_ptr(fi.native_dsp* ptr, NativeDspFactory factory):
+        """Wrap an owned instance, keeping its factory alive."""
+        cdef NativeDsp dsp = NativeDsp.__new__(NativeDsp)
+        dsp.ptr = ptr
+        dsp.dsp_ptr = <fi.dsp*>ptr
+        dsp.factory = factory
+        return dsp
+
+    def clone(self) -> NativeDsp:
+        """Return a new instance of the same DSP."""
+        return NativeDsp.from_ptr(<fi.native_dsp*>self.ptr.clone(), self.factory)
+
+
+cdef class HotSwapDsp(Dsp):
+    """DSP container whose instance can be replaced while audio is running.
+
+    Set it as the dsp of an RtAudioDriver, then call swap() from a control
+    thread with a new, initialized instance: the audio thread fades from
+    the current instance to the new one with a dsp_crossfader, without
+    blocking or allocating. Values of controls with the same path are
+    carried over to the new instance.
+
+    Instances are deleted by their factory: pass it along with each
+    instance so that it is kept alive as long as the instance is in use,
+    which for a swapped-out instance is until collect() returns True.
+    """
+
+    cdef fi.dsp_hot_swapper* ptr
+    cdef tuple current
+    cdef tuple previous
+    cdef int fade_samples
+
+    def __cinit__(self, Dsp dsp not None, int fade_samples=4096, factory=None):
+        self.ptr = new fi.dsp_hot_swapper(dsp.dsp_ptr, fade_samples)
+        self.dsp_ptr = <fi.dsp*>self.ptr
+        self.current = (dsp, factory)
+        self.previous = None
+        self.fade_samples = fade_samples
+
+    def __dealloc__(self):
+        if self.ptr:
+            del self.ptr
+            self.ptr = NULL
+
+    def clone(self) -> HotSwapDsp:
+        """Return a new container holding a clone of the current instance."""
+        return HotSwapDsp(self.current[0].clone(), self.fade_samples, self.current[1])
+
+    @property
+    def dsp(self) -> Dsp:
+        """The most recently swapped-in instance."""
+        return self.current[0]
+
+    @property
+    def factory(self):
+        """The factory passed with the most recently swapped-in instance."""
+        return self.current[1]
+
+    @property
+    def is_swapping(self) -> bool:
+        """True while a fade is pending, running or not yet collected."""
+        return self.ptr.isSwapping()
+
+    def swap(self, Dsp dsp not None, factory=None) -> bool:
+        """Start fading to a new instance, already initialized at the same sample rate.
+
+        Returns False if the previous swap has not been collected yet or if
+        the new instance has a different number of inputs or outputs.
         """
-        cdef MetaCollector collector = MetaCollector()
-        self.ptr.metadata(<fg.Meta*>collector.ptr)
-        return collector.get_metadata()
+        if not self.ptr.swap(dsp.dsp_ptr):
+            return False
+        self.previous = self.current
+        self.current = (dsp, factory)
+        return True
+
+    def collect(self) -> bool:
+        """Release a finished fade.
+
+        Returns True once the swapped-out instance is no longer used by the
+        audio thread, which also releases it (and its factory).
+        """
+        if not self.ptr.collect():
+            return False
+        self.previous = None
+        return True
+
+
+# Oversampling filter for each Oversampled quality (createSRAdapter filter numbers)
+OVERSAMPLING_QUALITIES = {
+    "none": 0,    # no filtering
+    "low": 1,     # 3rd order Butterworth lowpass
+    "medium": 2,  # 4th order Butterworth lowpass
+    "high": 3,    # 3rd order elliptic lowpass
+    "best": 4,    # 6th order elliptic lowpass
+}
+
+# Oversampling factors supported by dsp_up_sampler
+OVERSAMPLING_FACTORS = (2, 3, 4, 8, 16, 32)
+
+
+cdef class Oversampled(Dsp):
+    """DSP wrapper running an instance at a multiple of the sample rate.
+
+    Inputs are upsampled and outputs downsampled in native code by Faust's
+    dsp_up_sampler, with a lowpass filter on each side against aliasing,
+    which is useful for nonlinear DSPs such as distortions and waveshapers.
+    init() initializes the wrapped instance at factor times the sample
+    rate. The filters delay the signal by 'latency' samples.
+
+    The wrapper can be computed, played by RtAudioDriver or wrapped again;
+    the wrapped instance is kept alive but stays owned by its factory.
+
+    Args:
+        dsp: instance to oversample
+        factor: oversampling factor, one of 2, 3, 4, 8, 16 or 32
+        quality: filter, one of "none", "low", "medium", "high", "best"
+            (or 0 to 4)
+    """
+
+    cdef fi.dsp_oversampler* ptr
+    cdef readonly Dsp dsp
+    cdef readonly int factor
+    cdef readonly int filter
+
+    def __cinit__(self, Dsp dsp not None, int factor=2, quality="high"):
+        self.ptr = NULL
+        if factor not in OVERSAMPLING_FACTORS:
+            raise ValueError(f"factor must be one of {OVERSAMPLING_FACTORS}")
+        if isinstance(quality, str):
+            if quality not in OVERSAMPLING_QUALITIES:
+                raise ValueError(f"quality must be one of {tuple(OVERSAMPLING_QUALITIES)}")
+            quality = OVERSAMPLING_QUALITIES[quality]
+        self.ptr = new fi.dsp_oversampler(dsp.dsp_ptr, factor, quality)
+        if not self.ptr.isValid():
+            error = self.ptr.fError.decode().strip()
+            del self.ptr
+            self.ptr = NULL
+            raise ValueError(error)
+        self.dsp_ptr = <fi.dsp*>self.ptr
+        self.dsp = dsp
+        self.factor = factor
+        self.filter = quality
+
+    def __dealloc__(self):
+        if self.ptr:
+            del self.ptr
+            self.ptr = NULL
+
+    def clone(self) -> Oversampled:
+        """Return a wrapper of a clone of the wrapped instance."""
+        return Oversampled(self.dsp.clone(), self.factor, self.filter)
+
+    @property
+    def latency(self) -> float:
+        """Delay added by the filters in samples at the outer sample rate."""
+        return self.ptr.fLatency
+
+
+cdef class FixedBlockDsp(Dsp):
+    """DSP wrapper computing an instance in blocks of a fixed size.
+
+    compute() accepts any count: inputs are buffered in native code and the
+    wrapped instance only ever computes block_size frames at a time, as
+    needed by FFT-based DSPs or -vec builds tuned for one block size. The
+    outputs are delayed by 'latency' (block_size) frames.
+
+    The wrapper can be computed, played by RtAudioDriver or wrapped again;
+    the wrapped instance is kept alive but stays owned by its factory.
+
+    Args:
+        dsp: instance to compute in fixed blocks
+        block_size: number of frames computed at once by the instance
+    """
+
+    cdef fi.dsp_fixed_block* ptr
+    cdef readonly Dsp dsp
+    cdef readonly int block_size
+
+    def __cinit__(self, Dsp dsp not None, int block_size=512):
+        self.ptr = NULL
+        if block_size < 1:
+            raise ValueError("block_size must be positive")
+        self.ptr = new fi.dsp_fixed_block(dsp.dsp_ptr, block_size)
+        self.dsp_ptr = <fi.dsp*>self.ptr
+        self.dsp = dsp
+        self.block_size = block_size
+
+    def __dealloc__(self):
+        if self.ptr:
+            del self.ptr
+            self.ptr = NULL
+
+    def clone(self) -> FixedBlockDsp:
+        """Return a wrapper of a clone of the wrapped instance."""
+        return FixedBlockDsp(self.dsp.clone(), self.block_size)
+
+    @property
+    def latency(self) -> int:
+        """Delay added by the buffering in frames."""
+        return self.ptr.getLatency()
+
+
+# Actions of CheckedDsp on blocks holding NaN or infinite samples
+CHECK_ACTIONS = {"count": 0, "zero": 1, "abort": 2}
+
+
+cdef class CheckedDsp(Dsp):
+    """DSP wrapper monitoring the outputs of an instance for bad samples.
+
+    NaN, infinite and subnormal (denormal) output samples are counted per
+    channel in native code. Blocks holding NaN or infinite samples are
+    counted in 'bad_blocks' and, depending on 'action', kept ("count"),
+    cleared ("zero"), or cleared with the instance no longer computed until
+    reset() ("abort"), in which case compute() raises FloatingPointError.
+
+    Denormals are flushed to zero while computing, as by every compute call
+    and by RtAudioDriver; with flush_denormals=False they are kept so that
+    the instance producing them can be found.
+
+    The wrapper can be computed, played by RtAudioDriver or wrapped again;
+    the wrapped instance is kept alive but stays owned by its factory.
+
+    Args:
+        dsp: instance to monitor
+        action: "count", "zero" or "abort"
+        flush_denormals: flush denormals to zero while computing
+    """
+
+    cdef fi.dsp_health_checker* ptr
+    cdef readonly Dsp dsp
+    cdef readonly str action
+    cdef readonly bint flush_denormals
+
+    def __cinit__(self, Dsp dsp not None, str action="count", bint flush_denormals=True):
+        self.ptr = NULL
+        if action not in CHECK_ACTIONS:
+            raise ValueError(f"action must be one of {tuple(CHECK_ACTIONS)}")
+        self.ptr = new fi.dsp_health_checker(dsp.dsp_ptr, CHECK_ACTIONS[action], flush_denormals)
+        self.dsp_ptr = <fi.dsp*>self.ptr
+        self.dsp = dsp
+        self.action = action
+        self.flush_denormals = flush_denormals
+
+    def __dealloc__(self):
+        if self.ptr:
+            del self.ptr
+            self.ptr = NULL
+
+    def compute(self, count, inputs, outputs, mix=False, gain=1.0):
+        """Compute like Dsp.compute(), raising FloatingPointError once aborted."""
+        Dsp.compute(self, count, inputs, outputs, mix, gain)
+        if self.ptr.fAborted:
+            raise FloatingPointError(
+                f"NaN or infinite output on channel {self.ptr.fFaultChannel}, computation aborted")
+
+    def reset(self):
+        """Reset the counters and resume computing after an abort."""
+        self.ptr.reset()
+
+    def clone(self) -> CheckedDsp:
+        """Return a wrapper, with new counters, of a clone of the wrapped instance."""
+        return CheckedDsp(self.dsp.clone(), self.action, self.flush_denormals)
+
+    @property
+    def nan_counts(self) -> list:
+        """Number of NaN output samples per channel."""
+        return list(self.ptr.fNaN)
+
+    @property
+    def inf_counts(self) -> list:
+        """Number of infinite output samples per channel."""
+        return list(self.ptr.fInfinite)
+
+    @property
+    def denormal_counts(self) -> list:
+        """Number of subnormal output samples per channel."""
+        return list(self.ptr.fSubnormal)
+
+    @property
+    def bad_blocks(self) -> int:
+        """Number of computed blocks holding NaN or infinite samples."""
+        return self.ptr.fBadBlocks
+
+    @property
+    def fault_channel(self):
+        """First channel with a NaN or infinite sample, or None."""
+        return self.ptr.fFaultChannel if self.ptr.fFaultChannel >= 0 else None
+
+    @property
+    def aborted(self) -> bool:
+        """True once an "abort" action stopped the computation."""
+        return self.ptr.fAborted
 
 
 def get_dsp_factory_from_sha_key(str sha_key) -> InterpreterDspFactory:
@@ -635,8 +1279,16 @@ def create_dsp_factory_from_file(filename: str, *args) -> InterpreterDspFactory:
     """Create a Faust DSP factory from a DSP source code as a file."""
     return InterpreterDspFactory.from_file(filename, *args)
 
-def create_dsp_factory_from_string(name_app: str, code: str, *args) -> InterpreterDspFactory:
-    """Create a Faust DSP factory from a DSP source code as a string."""
+def create_dsp_factory_from_string(name_app: str, code: str, *args, outputs=None) -> InterpreterDspFactory:
+    """Create a Faust DSP factory from a DSP source code as a string.
+
+    outputs - indices of the outputs to compile, in their new order; the
+              computation feeding only the other outputs is removed
+              (default: all outputs, see cyfaust.transform.select_outputs)
+    """
+    if outputs is not None:
+        from cyfaust.transform import select_outputs_source
+        code, args = select_outputs_source(code, outputs, args)
     return InterpreterDspFactory.from_string(name_app, code, *args)
 
 def create_dsp_factory_from_signals(str name_app, SignalVector signals, *args) -> InterpreterDspFactory:
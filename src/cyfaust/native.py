@@ -0,0 +1,244 @@
+"""Ahead-of-time native DSP modules built with the system C compiler.
+
+compile_native() generates C code for a Faust program with libfaust, builds
+it into a shared library with the system compiler and loads it as a
+NativeDspFactory, whose instances have the same interface as interpreter
+instances (init, compute, build_user_interface, ...) and can be played by
+RtAudioDriver. This gives native speed with the interpreter-only build.
+
+Built libraries are kept in the artifact cache (see cyfaust.cache), keyed
+by the SHA key of the expanded DSP code, the compiler, its flags, the Faust
+options and the platform, so a DSP is only compiled once. The default flags
+build portable code; with host-specific flags such as -march=native, the
+host CPU is part of the key too, so that a cache shared between machines
+never loads code built for another CPU.
+
+Example:
+    >>> from cyfaust.native import compile_native
+    >>> factory = compile_native('import("stdfaust.lib"); process = os.osc(440);')
+    >>> dsp = factory.create_dsp_instance()
+    >>> dsp.init(48000)
+"""
+
+import os
+import platform
+import shlex
+import subprocess
+import sys
+import tempfile
+
+from cyfaust._api import extension_module
+
+DEFAULT_CC = "cc"
+DEFAULT_FLAGS = "-O3"
+
+# Class name of the C backend code, changed by the -cn Faust option
+DEFAULT_CLASS_NAME = "mydsp"
+
+# File name of the shared library in a cache entry
+_LIBRARY = "dsp.dll" if sys.platform == "win32" else "dsp.so"
+
+# Exports the C backend's mydsp functions under the names native_dsp_module looks
+# up; mydsp is replaced by the class name of the code
+_EXPORTS = """
+#if defined(_WIN32)
+#define CYFAUST_EXPORT __declspec(dllexport)
+#else
+#define CYFAUST_EXPORT __attribute__((visibility("default")))
+#endif
+
+CYFAUST_EXPORT dsp_imp* cyfaust_new(void) { return (dsp_imp*)newmydsp(); }
+CYFAUST_EXPORT void cyfaust_delete(dsp_imp* dsp) { deletemydsp((mydsp*)dsp); }
+CYFAUST_EXPORT int cyfaust_get_num_inputs(dsp_imp* dsp)
+{
+    return getNumInputsmydsp((mydsp*)dsp);
+}
+CYFAUST_EXPORT int cyfaust_get_num_outputs(dsp_imp* dsp)
+{
+    return getNumOutputsmydsp((mydsp*)dsp);
+}
+CYFAUST_EXPORT void cyfaust_build_user_interface(dsp_imp* dsp, UIGlue* ui)
+{
+    buildUserInterfacemydsp((mydsp*)dsp, ui);
+}
+CYFAUST_EXPORT int cyfaust_get_sample_rate(dsp_imp* dsp)
+{
+    return getSampleRatemydsp((mydsp*)dsp);
+}
+CYFAUST_EXPORT void cyfaust_init(dsp_imp* dsp, int sample_rate)
+{
+    initmydsp((mydsp*)dsp, sample_rate);
+}
+CYFAUST_EXPORT void cyfaust_class_init(int sample_rate) { classInitmydsp(sample_rate); }
+CYFAUST_EXPORT void cyfaust_instance_init(dsp_imp* dsp, int sample_rate)
+{
+    instanceInitmydsp((mydsp*)dsp, sample_rate);
+}
+CYFAUST_EXPORT void cyfaust_instance_constants(dsp_imp* dsp, int sample_rate)
+{
+    instanceConstantsmydsp((mydsp*)dsp, sample_rate);
+}
+CYFAUST_EXPORT void cyfaust_instance_reset_user_interface(dsp_imp* dsp)
+{
+    instanceResetUserInterfacemydsp((mydsp*)dsp);
+}
+CYFAUST_EXPORT void cyfaust_instance_clear(dsp_imp* dsp)
+{
+    instanceClearmydsp((mydsp*)dsp);
+}
+CYFAUST_EXPORT void cyfaust_compute(
+    dsp_imp* dsp, int count, FAUSTFLOAT** inputs, FAUSTFLOAT** outputs)
+{
+    computemydsp((mydsp*)dsp, count, inputs, outputs);
+}
+CYFAUST_EXPORT void cyfaust_metadata(MetaGlue* meta) { metadatamydsp(meta); }
+"""
+
+
+def architecture_dir():
+    """Return the directory holding the Faust architecture headers (faust/gui/CInterface.h)."""
+    package = os.path.dirname(os.path.abspath(__file__))
+    for base in (package, os.path.dirname(os.path.dirname(package))):
+        path = os.path.join(base, "resources", "architecture")
+        if os.path.isfile(os.path.join(path, "faust", "gui", "CInterface.h")):
+            return path
+    raise FileNotFoundError("Faust architecture headers not found")
+
+
+def _class_name(args):
+    """Return the class name of the C code generated with Faust options args."""
+    name = DEFAULT_CLASS_NAME
+    for option, value in zip(args, args[1:]):
+        if option in ("-cn", "--class-name"):
+            name = value
+    return name
+
+
+def _host_cpu():
+    """Describe the host CPU model and features, for keys of host-specific builds."""
+    if sys.platform.startswith("linux"):
+        fields = ("vendor_id", "model name", "flags", "CPU implementer", "CPU part", "Features")
+        try:
+            with open("/proc/cpuinfo") as f:
+                first = f.read().split("\n\n")[0]
+        except OSError:
+            first = ""
+        lines = [line for line in first.splitlines() if line.split(":")[0].strip() in fields]
+        if lines:
+            return "\n".join(lines)
+    elif sys.platform == "darwin":
+        try:
+            result = subprocess.run(
+                ["sysctl", "-n", "machdep.cpu.brand_string", "machdep.cpu.features"],
+                capture_output=True,
+                text=True,
+            )
+            if result.returncode == 0:
+                return result.stdout
+        except OSError:
+            pass
+    return platform.processor()
+
+
+def generate_c(source, name="FaustDSP", *args):
+    """Generate the C backend code of a Faust program, or None on error."""
+    box = extension_module("box")
+    box.create_lib_context()
+    try:
+        dsp_box = box.dsp_to_boxes(name, source, *args)
+        if dsp_box is None:
+            return None
+        return box.create_source_from_boxes(name, dsp_box, "c", *args)
+    finally:
+        box.destroy_lib_context()
+
+
+def build_library(
+    c_code, output, cc=DEFAULT_CC, flags=DEFAULT_FLAGS, class_name=DEFAULT_CLASS_NAME
+):
+    """Compile C backend code into a shared library at output.
+
+    class_name is the class name of the code (see the -cn Faust option).
+    Returns True on success; on failure the compiler output is printed.
+    """
+    with tempfile.TemporaryDirectory(prefix="cyfaust-native-") as tmpdir:
+        c_path = os.path.join(tmpdir, "dsp.c")
+        with open(c_path, "w") as f:
+            f.write('#include "faust/gui/CInterface.h"\n')
+            f.write(c_code)
+            f.write(_EXPORTS.replace("mydsp", class_name))
+        command = [cc, *shlex.split(flags), "-shared", "-fPIC"]
+        command += ["-I", architecture_dir(), c_path, "-o", output, "-lm"]
+        try:
+            result = subprocess.run(command, capture_output=True, text=True)
+        except OSError as exc:
+            print(f"cannot run {cc}: {exc}")
+            return False
+        if result.returncode != 0:
+            print(result.stderr.strip())
+            return False
+    return True
+
+
+def compile_native(
+    source, cc=DEFAULT_CC, flags=DEFAULT_FLAGS, name="FaustDSP", args=(), cache=None
+):
+    """Compile Faust code to a native shared library and load it.
+
+    Args:
+        source: Faust DSP code
+        cc: C compiler command
+        flags: compiler flags (optimization and target options); host-specific
+            flags such as "-O3 -march=native" give faster code for this CPU
+        name: name of the Faust program
+        args: Faust compiler options (e.g. ("-vec",))
+        cache: cyfaust.cache.ArtifactCache keeping built libraries
+            (default: the default cache)
+
+    Returns:
+        NativeDspFactory, or None on error (the error is printed).
+    """
+    interp = extension_module("interp")
+    expanded = interp.expand_dsp_from_string(name, source, *args)
+    if expanded is None:
+        return None
+    sha_key = expanded[0]
+
+    if cache is None:
+        from cyfaust.cache import ArtifactCache
+
+        cache = ArtifactCache()
+    # Code built for the host CPU must not be loaded on another one
+    host = _host_cpu() if "native" in flags else ""
+    key = cache.key(
+        sha_key,
+        "native",
+        cc,
+        flags,
+        interp.get_version(),
+        sys.platform,
+        platform.machine(),
+        host,
+        *args,
+    )
+    path = os.path.join(cache.entry_path(key), _LIBRARY)
+    files = cache.get_tree(key)
+    if files is not None and _LIBRARY in files:
+        return interp.NativeDspFactory.from_library(path, sha_key)
+
+    c_code = generate_c(source, name, *args)
+    if c_code is None:
+        return None
+    # A loaded library cannot be removed on Windows: leave it behind then
+    with tempfile.TemporaryDirectory(
+        prefix="cyfaust-native-", ignore_cleanup_errors=True
+    ) as tmpdir:
+        library = os.path.join(tmpdir, _LIBRARY)
+        if not build_library(c_code, library, cc, flags, _class_name(args)):
+            return None
+        with open(library, "rb") as f:
+            cache.put_tree(key, {_LIBRARY: f.read()})
+        if not os.path.isfile(path):
+            # Evicted at once, by a cache smaller than the library
+            return interp.NativeDspFactory.from_library(library, sha_key)
+    return interp.NativeDspFactory.from_library(path, sha_key)
@@ -0,0 +1,471 @@
+"""Compact binary serialization of box and signal graphs.
+
+serialize() writes a Box, Signal, BoxVector or SignalVector as bytes and
+deserialize() rebuilds it in the current box or signal context. Each node of
+the DAG is written once, in post-order, with its operands referenced by
+index, so graphs with heavy sharing stay small.
+
+Nodes are rebuilt through the public Box and Signal API. serialize() checks
+that every node rebuilds to the very same tree node and raises ValueError
+for nodes the API cannot build exactly, such as foreign functions, symbolic
+recursion in normal form or unevaluated boxes, so that deserialized graphs
+are always identical to the originals.
+
+Box, Signal, BoxVector and SignalVector are picklable through these
+functions. Unpickling needs an open context, e.g. to compile graphs in a
+process pool:
+
+Example:
+    >>> from cyfaust.box import box_context, dsp_to_boxes
+    >>> from cyfaust.serialize import deserialize, serialize
+    >>> with box_context():
+    ...     data = serialize(dsp_to_boxes("osc", "process = +(1) ~ _;"))
+    ...     box = deserialize(data)
+"""
+
+import struct
+
+from cyfaust._api import extension_module
+
+MAGIC = b"CYFG"
+VERSION = 1
+
+_BOX = b"B"
+_SIGNAL = b"S"
+
+# Codes for signal nodes rebuilt from more than one tree node
+_SIG_SELF = 0x80
+_SIG_RECURSION = 0x81
+
+_FLOAT = struct.Struct("<d")
+
+
+## ---------------------------------------------------------------------------
+## encoding
+
+
+class _Writer:
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def uint(self, value):
+        while value > 0x7F:
+            self.buffer.append((value & 0x7F) | 0x80)
+            value >>= 7
+        self.buffer.append(value)
+
+    def field(self, value):
+        if isinstance(value, str):
+            data = value.encode("utf8")
+            self.buffer += b"s"
+            self.uint(len(data))
+            self.buffer += data
+        elif isinstance(value, float):
+            self.buffer += b"d"
+            self.buffer += _FLOAT.pack(value)
+        else:
+            value = int(value)
+            self.buffer += b"i"
+            self.uint(value << 1 if value >= 0 else (-value << 1) - 1)
+
+
+class _Reader:
+    def __init__(self, data):
+        self.data = memoryview(data)
+        self.pos = 0
+
+    def take(self, size):
+        if self.pos + size > len(self.data):
+            raise ValueError("invalid serialized graph: truncated data")
+        chunk = self.data[self.pos : self.pos + size]
+        self.pos += size
+        return chunk
+
+    def uint(self):
+        value = shift = 0
+        while True:
+            byte = self.take(1)[0]
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return value
+            shift += 7
+
+    def field(self):
+        tag = bytes(self.take(1))
+        if tag == b"s":
+            return str(self.take(self.uint()), "utf8")
+        if tag == b"d":
+            return _FLOAT.unpack(self.take(8))[0]
+        if tag == b"i":
+            value = self.uint()
+            return value >> 1 if not value & 1 else -((value + 1) >> 1)
+        raise ValueError(f"invalid serialized graph: unknown field tag {tag!r}")
+
+
+## ---------------------------------------------------------------------------
+## box and signal codecs
+
+
+def _unsupported(kind):
+    return ValueError(f"cannot serialize {getattr(kind, 'name', kind)} nodes")
+
+
+class BoxCodec:
+    """Describe box nodes as (code, operands, fields) and rebuild them."""
+
+    domain = _BOX
+
+    def __init__(self):
+        self.api = api = extension_module("box")
+        self.classify, self.vector = api.classify_box, api.BoxVector
+        kind = api.BoxKind
+        self.kind = kind
+        self.builders = {
+            kind.kBoxInt: api.box_int,
+            kind.kBoxReal: api.box_float,
+            kind.kBoxWire: api.box_wire,
+            kind.kBoxCut: api.box_cut,
+            kind.kBoxSeq: api.box_seq,
+            kind.kBoxPar: api.box_par,
+            kind.kBoxSplit: api.box_split,
+            kind.kBoxMerge: api.box_merge,
+            kind.kBoxRec: api.box_rec,
+            kind.kBoxRoute: api.box_route,
+            kind.kBoxButton: api.box_button,
+            kind.kBoxCheckbox: api.box_checkbox,
+            kind.kBoxHSlider: api.box_hslider,
+            kind.kBoxVSlider: api.box_vslider,
+            kind.kBoxNumEntry: api.box_numentry,
+            kind.kBoxHBargraph: api.box_hbargraph,
+            kind.kBoxVBargraph: api.box_vbargraph,
+            kind.kBoxHGroup: api.box_hgroup,
+            kind.kBoxVGroup: api.box_vgroup,
+            kind.kBoxTGroup: api.box_tgroup,
+            kind.kBoxSoundfile: lambda label, chan: api.box_soundfile(label, chan, None, None),
+            kind.kBoxWaveform: lambda *values: api.box_waveform(self.make_vector(values)),
+            kind.kBoxFConst: api.box_fconst,
+            kind.kBoxFVar: api.box_fvar,
+        }
+        # Primitives and mathematical functions by (name, arity)
+        self.primitives = {}
+        for name in dir(api):
+            if name.startswith("box_") and name.endswith("_op"):
+                op = getattr(api, name)
+                try:
+                    code, _children, attrs = api.classify_box(op())
+                except TypeError:
+                    continue
+                if code in (kind.kBoxPrim, kind.kBoxXtended):
+                    self.primitives[code, attrs["name"], attrs["arity"]] = op
+
+    def make_vector(self, nodes):
+        vector = self.vector()
+        for node in nodes:
+            vector.add(node)
+        return vector
+
+    def describe(self, node):
+        code, children, attrs = self.classify(node)
+        kind = self.kind
+        if code in (kind.kBoxInt, kind.kBoxReal):
+            fields = (attrs["value"],)
+        elif code in (kind.kBoxPrim, kind.kBoxXtended):
+            fields = (attrs["name"], attrs["arity"])
+        elif code in (kind.kBoxFConst, kind.kBoxFVar):
+            fields = (int(attrs["type"]), attrs["name"], attrs["file"])
+        elif "label" in attrs:
+            fields = (attrs["label"],)
+        else:
+            fields = ()
+        if code not in self.builders and (code, *fields) not in self.primitives:
+            raise _unsupported(code)
+        return code, children, fields
+
+    def build(self, code, operands, fields):
+        if code in self.builders:
+            return self.builders[code](*fields, *operands)
+        op = self.primitives.get((code, *fields))
+        if op is None:
+            raise ValueError(f"invalid serialized graph: unknown box {fields!r}")
+        return op()
+
+
+class SignalCodec:
+    """Describe signal nodes as (code, operands, fields) and rebuild them."""
+
+    domain = _SIGNAL
+
+    def __init__(self):
+        self.api = api = extension_module("signal")
+        self.classify, self.vector = api.classify_signal, api.SignalVector
+        kind = api.SigKind
+        self.kind = kind
+        self.builders = {
+            kind.kSigInt: api.sig_int,
+            kind.kSigReal: api.sig_real,
+            kind.kSigInput: api.sig_input,
+            kind.kSigDelay1: api.sig_delay1,
+            kind.kSigDelay: api.sig_delay,
+            kind.kSigBinOp: lambda op, x, y: api.sig_bin_op(api.SOperator(op), x, y),
+            kind.kSigIntCast: api.sig_int_cast,
+            kind.kSigFloatCast: api.sig_float_cast,
+            kind.kSigSelect2: api.sig_select2,
+            kind.kSigReadTable: self.table,
+            kind.kSigWaveform: lambda *values: api.sig_waveform(self.make_vector(values)),
+            kind.kSigButton: api.sig_button,
+            kind.kSigCheckbox: api.sig_checkbox,
+            kind.kSigHSlider: api.sig_hslider,
+            kind.kSigVSlider: api.sig_vslider,
+            kind.kSigNumEntry: api.sig_numentry,
+            kind.kSigHBargraph: api.sig_hbargraph,
+            kind.kSigVBargraph: api.sig_vbargraph,
+            kind.kSigAttach: api.sig_attach,
+            kind.kSigFConst: api.sig_fconst,
+            kind.kSigFVar: api.sig_fvar,
+            _SIG_SELF: self.self_ref,
+            _SIG_RECURSION: self.recursion,
+        }
+        # Mathematical functions by name, found by building them once
+        x = api.sig_input(0)
+        self.functions = {}
+        for name in (
+            "abs",
+            "acos",
+            "asin",
+            "atan",
+            "ceil",
+            "cos",
+            "exp",
+            "exp10",
+            "floor",
+            "log",
+            "log10",
+            "rint",
+            "sin",
+            "sqrt",
+            "tan",
+        ):
+            self.add_function(getattr(api, f"sig_{name}"), x)
+        for name in ("atan2", "fmod", "max", "min", "pow", "remainder"):
+            self.add_function(getattr(api, f"sig_{name}"), x, x)
+
+    def add_function(self, function, *args):
+        _code, _children, attrs = self.api.classify_signal(function(*args))
+        self.functions[attrs["name"]] = function
+
+    def make_vector(self, nodes):
+        vector = self.vector()
+        for node in nodes:
+            vector.add(node)
+        return vector
+
+    def table(self, *operands):
+        if len(operands) == 3:
+            return self.api.sig_readonly_table(*operands)
+        return self.api.sig_write_read_table(*operands)
+
+    def self_ref(self, index):
+        # sig_self_n() may wrap the projection, e.g. in a one-sample delay
+        node = self.api.sig_self_n(index)
+        while True:
+            code, children, _attrs = self.api.classify_signal(node)
+            if code == self.kind.kSigProj or not children:
+                return node
+            node = children[0]
+
+    def recursion(self, index, *definitions):
+        return list(self.api.sig_recursion_n(self.make_vector(definitions)))[index]
+
+    def elements(self, lst):
+        """Return the elements of a libfaust list."""
+        items = []
+        while not self.api.is_nil(lst):
+            code, children, _attrs = self.api.classify_signal(lst)
+            if code != self.kind.kSigOther or len(children) != 2:
+                raise _unsupported(code)
+            items.append(children[0])
+            lst = children[1]
+        return items
+
+    def describe(self, node):
+        api, kind = self.api, self.kind
+        code, children, attrs = self.classify(node)
+        fields = ()
+        if code in (kind.kSigInt, kind.kSigReal):
+            fields = (attrs["value"],)
+        elif code == kind.kSigInput:
+            fields = (attrs["index"],)
+        elif code == kind.kSigBinOp:
+            fields = (int(attrs["op"]),)
+        elif code == kind.kSigXtended:
+            if attrs["name"] not in self.functions:
+                raise _unsupported(f"{attrs['name']} function")
+            fields = (attrs["name"],)
+        elif code in (kind.kSigFConst, kind.kSigFVar):
+            fields = (int(attrs["type"]), attrs["name"], attrs["file"])
+        elif code == kind.kSigReadTable:
+            table, ridx = children
+            table_code, table_children, _attrs = api.classify_signal(table)
+            if table_code != kind.kSigWriteTable:
+                raise _unsupported(table_code)
+            gen_code, gen_children, _attrs = api.classify_signal(table_children[1])
+            if gen_code != kind.kSigGen:
+                raise _unsupported(gen_code)
+            children = (table_children[0], gen_children[0], *table_children[2:], ridx)
+        elif code == kind.kSigProj:
+            # De Bruijn recursion: a projection of rec(definitions) or of ref(level)
+            group_code, group_children, _attrs = api.classify_signal(children[0])
+            if group_code != kind.kSigOther or len(group_children) != 1:
+                raise _unsupported(group_code)
+            inner = group_children[0]
+            if api.classify_signal(inner)[0] == kind.kSigInt:
+                code, children = _SIG_SELF, ()
+            else:
+                code, children = _SIG_RECURSION, tuple(self.elements(inner))
+            fields = (attrs["index"],)
+        elif "label" in attrs:
+            fields = (attrs["label"],)
+        if code not in self.builders and code != kind.kSigXtended:
+            raise _unsupported(code)
+        return code, children, fields
+
+    def build(self, code, operands, fields):
+        if code == self.kind.kSigXtended:
+            function = self.functions.get(fields[0])
+            if function is None:
+                raise ValueError(f"invalid serialized graph: unknown function {fields[0]!r}")
+            return function(*operands)
+        builder = self.builders.get(code)
+        if builder is None:
+            raise ValueError(f"invalid serialized graph: unknown signal node {code}")
+        return builder(*fields, *operands)
+
+
+## ---------------------------------------------------------------------------
+## public API
+
+
+def _codec(node_or_vector):
+    box = extension_module("box")
+    if isinstance(node_or_vector, box.Box):
+        return BoxCodec(), [node_or_vector], False
+    if isinstance(node_or_vector, box.BoxVector):
+        return BoxCodec(), list(node_or_vector), True
+    signal = extension_module("signal")
+    if isinstance(node_or_vector, signal.Signal):
+        return SignalCodec(), [node_or_vector], False
+    if isinstance(node_or_vector, signal.SignalVector):
+        return SignalCodec(), list(node_or_vector), True
+    raise TypeError("expected a Box, BoxVector, Signal or SignalVector")
+
+
+def serialize(node_or_vector):
+    """Serialize a box or signal graph to bytes.
+
+    Args:
+        node_or_vector: a Box, BoxVector, Signal or SignalVector
+
+    Returns:
+        bytes holding each node of the graph once, readable by deserialize().
+
+    Raises:
+        ValueError: if the graph holds a node that the Box or Signal API
+            cannot rebuild exactly.
+    """
+    codec, roots, is_vector = _codec(node_or_vector)
+    index = {}  # node id -> record number
+    records = []
+    for root in roots:
+        stack = [(root, None)]
+        while stack:
+            node, description = stack.pop()
+            if node.id in index:
+                continue
+            if description is None:
+                description = codec.describe(node)
+                stack.append((node, description))
+                stack.extend((op, None) for op in reversed(description[1]) if op.id not in index)
+                continue
+            code, operands, fields = description
+            if not codec.build(code, operands, fields).is_same(node):
+                kind = codec.classify(node)[0]
+                raise ValueError(
+                    f"cannot serialize {getattr(kind, 'name', kind)} node: "
+                    "it is not rebuilt exactly"
+                )
+            index[node.id] = len(records)
+            records.append((code, [index[op.id] for op in operands], fields))
+
+    out = _Writer()
+    out.buffer += MAGIC
+    out.buffer.append(VERSION)
+    out.buffer += codec.domain
+    out.buffer.append(is_vector)
+    out.uint(len(records))
+    for code, operands, fields in records:
+        out.uint(int(code))
+        out.uint(len(operands))
+        for operand in operands:
+            out.uint(operand)
+        out.uint(len(fields))
+        for value in fields:
+            out.field(value)
+    out.uint(len(roots))
+    for root in roots:
+        out.uint(index[root.id])
+    return bytes(out.buffer)
+
+
+def deserialize(data):
+    """Rebuild a box or signal graph written by serialize().
+
+    The graph is built in the current context, which must be open (see
+    box_context() and signal_context()).
+
+    Args:
+        data: bytes returned by serialize()
+
+    Returns:
+        the Box, BoxVector, Signal or SignalVector that was serialized.
+
+    Raises:
+        ValueError: if data is not a serialized graph.
+    """
+    reader = _Reader(data)
+    if bytes(reader.take(len(MAGIC))) != MAGIC:
+        raise ValueError("invalid serialized graph: bad magic")
+    version = reader.take(1)[0]
+    if version != VERSION:
+        raise ValueError(f"unsupported serialized graph version {version}")
+    domain = bytes(reader.take(1))
+    if domain == _BOX:
+        codec = BoxCodec()
+    elif domain == _SIGNAL:
+        codec = SignalCodec()
+    else:
+        raise ValueError(f"invalid serialized graph: unknown domain {domain!r}")
+    is_vector = reader.take(1)[0]
+
+    nodes = []
+    for number in range(reader.uint()):
+        code = reader.uint()
+        operands = []
+        for _ in range(reader.uint()):
+            operand = reader.uint()
+            if operand >= number:
+                raise ValueError("invalid serialized graph: forward operand reference")
+            operands.append(nodes[operand])
+        fields = [reader.field() for _ in range(reader.uint())]
+        nodes.append(codec.build(code, operands, fields))
+
+    roots = []
+    for _ in range(reader.uint()):
+        root = reader.uint()
+        if root >= len(nodes):
+            raise ValueError("invalid serialized graph: bad root reference")
+        roots.append(nodes[root])
+    if is_vector:
+        return codec.make_vector(roots)
+    if len(roots) != 1:
+        raise ValueError("invalid serialized graph: expected one root")
+    return roots[0]
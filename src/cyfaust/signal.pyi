@@ -1,5 +1,5 @@
 from enum import IntEnum
-from typing import Any, Iterator
+from typing import Any, Iterable, Iterator
 
 class SType(IntEnum):
     kSInt = 0
@@ -24,6 +24,47 @@ class SOperator(IntEnum):
     kOR = 15
     kXOR = 16
 
+class SigKind(IntEnum):
+    kSigInt = 0
+    kSigReal = 1
+    kSigInput = 2
+    kSigOutput = 3
+    kSigDelay1 = 4
+    kSigDelay = 5
+    kSigPrefix = 6
+    kSigBinOp = 7
+    kSigXtended = 8
+    kSigIntCast = 9
+    kSigFloatCast = 10
+    kSigSelect2 = 11
+    kSigReadTable = 12
+    kSigWriteTable = 13
+    kSigGen = 14
+    kSigWaveform = 15
+    kSigProj = 16
+    kSigRec = 17
+    kSigButton = 18
+    kSigCheckbox = 19
+    kSigHSlider = 20
+    kSigVSlider = 21
+    kSigNumEntry = 22
+    kSigHBargraph = 23
+    kSigVBargraph = 24
+    kSigAttach = 25
+    kSigEnable = 26
+    kSigControl = 27
+    kSigSoundfile = 28
+    kSigSoundfileLength = 29
+    kSigSoundfileRate = 30
+    kSigSoundfileBuffer = 31
+    kSigFFun = 32
+    kSigFConst = 33
+    kSigFVar = 34
+    kSigAssertBounds = 35
+    kSigHighest = 36
+    kSigLowest = 37
+    kSigOther = 38
+
 # -- Context manager --
 
 class signal_context:
@@ -49,11 +90,16 @@ class SignalVector:
     def add(self, sig: Signal) -> None: ...
     def create_source(self, name_app: str, lang: str, *args: str) -> str: ...
     def simplify_to_normal_form(self) -> SignalVector: ...
+    def walk(self, order: str = "post", unique: bool = True) -> Iterator[Signal]: ...
+    def __reduce__(self) -> tuple[Any, tuple[bytes]]: ...
 
 # -- Signal --
 
 class Signal:
     def __init__(self) -> None: ...
+    @property
+    def id(self) -> int: ...
+    def is_same(self, other: Signal) -> bool: ...
     @staticmethod
     def from_input(idx: int) -> Signal: ...
     @staticmethod
@@ -106,6 +152,9 @@ class Signal:
     def print(self, shared: bool = False, max_size: int = 256) -> None: ...
     def ffname(self) -> str: ...
     def ffarity(self) -> int: ...
+    def classify(self) -> tuple[SigKind, tuple[Signal, ...], dict[str, Any]]: ...
+    def walk(self, order: str = "post", unique: bool = True) -> Iterator[Signal]: ...
+    def __reduce__(self) -> tuple[Any, tuple[bytes]]: ...
 
     # Operators
     def __add__(self, other: Signal | float | int) -> Signal: ...
@@ -220,6 +269,7 @@ def sig_or_int(var: Signal | int) -> Signal: ...
 
 def create_lib_context() -> None: ...
 def destroy_lib_context() -> None: ...
+def intern_signals(enabled: bool = True) -> bool: ...
 
 # -- Utility --
 
@@ -247,6 +297,7 @@ def sig_write_read_table(
 ) -> Signal: ...
 def sig_waveform_int(view: Any) -> Signal: ...
 def sig_waveform_float(view: Any) -> Signal: ...
+def sig_waveform(wf: SignalVector) -> Signal: ...
 def sig_soundfile(*paths: str) -> Signal: ...
 def sig_soundfile_length(sf: Signal, part: Signal) -> Signal: ...
 def sig_soundfile_rate(sf: Signal, part: Signal) -> Signal: ...
@@ -260,6 +311,7 @@ def sig_fvar(type: SType, name: str, file: str) -> Signal: ...
 
 def sig_bin_op(op: SOperator, x: Signal, y: Signal) -> Signal: ...
 def sig_add(x: Signal, y: Signal) -> Signal: ...
+def sig_add_n(signals: SignalVector | Iterable[Signal]) -> Signal: ...
 def sig_sub(x: Signal, y: Signal) -> Signal: ...
 def sig_mul(x: Signal, y: Signal) -> Signal: ...
 def sig_div(x: Signal, y: Signal) -> Signal: ...
@@ -376,3 +428,10 @@ def is_sig_soundfile(s: Signal) -> dict[str, Any]: ...
 def is_sig_soundfile_length(s: Signal) -> dict[str, Any]: ...
 def is_sig_soundfile_rate(s: Signal) -> dict[str, Any]: ...
 def is_sig_soundfile_buffer(s: Signal) -> dict[str, Any]: ...
+
+# -- Classification and traversal --
+
+def classify_signal(s: Signal) -> tuple[SigKind, tuple[Signal, ...], dict[str, Any]]: ...
+def walk_signal(
+    root: Signal | SignalVector, order: str = "post", unique: bool = True
+) -> Iterator[Signal]: ...
@@ -1,6 +1,9 @@
 # distutils: language = c++
 
+from libc.stdint cimport uintptr_t
 from libcpp.string cimport string
+from libcpp.unordered_set cimport unordered_set
+from libcpp.vector cimport vector
 
 from . cimport faust_signal as fs
 
@@ -25,12 +28,41 @@ def sig_or_int(var: Signal | int) -> Signal:
     raise TypeError("argument must be an int")
 
 
+# Signal wrappers by tree node address while interning (see intern_signals())
+cdef object _signal_intern = None
+
+def intern_signals(bint enabled=True) -> bool:
+    """Share one Signal wrapper per tree node.
+
+    libfaust trees are hash-consed: equal expressions are the same node.
+    While interning, signals returned by the signal functions are the same
+    Python object for the same node. Wrappers are held weakly and are freed
+    when unused.
+
+    returns whether interning was enabled before.
+    """
+    global _signal_intern
+    from weakref import WeakValueDictionary
+    cdef bint previous = _signal_intern is not None
+    if enabled and _signal_intern is None:
+        _signal_intern = WeakValueDictionary()
+    elif not enabled:
+        _signal_intern = None
+    return previous
+
+cdef void clear_signal_intern():
+    """Forget interned wrappers, whose nodes are freed with the context."""
+    if _signal_intern is not None:
+        _signal_intern.clear()
+
+
 class signal_context:
     def __enter__(self):
         # Create global compilation context, has to be done first.
         fs.createLibContext()
     def __exit__(self, type, value, traceback):
         # Destroy global compilation context, has to be done last.
+        clear_signal_intern()
         fs.destroyLibContext()
 
 
@@ -70,6 +102,14 @@ cdef class SignalVector:
         """
         return simplify_to_normal_form2(self)
 
+    def walk(self, str order="post", bint unique=True):
+        """Iterate over the nodes of all signals, sharing visits (see walk_signal)."""
+        return walk_signal(self, order, unique)
+
+    def __reduce__(self):
+        from cyfaust.serialize import deserialize, serialize
+        return deserialize, (serialize(self),)
+
 
 
 cdef class Interval:
@@ -107,6 +147,7 @@ cdef class Signal:
     """faust Signal wrapper.
     """
     # cdef fs.Signal ptr
+    # cdef object __weakref__
 
     def __cinit__(self):
         self.ptr = NULL
@@ -114,10 +155,33 @@ cdef class Signal:
     @staticmethod
     cdef Signal from_ptr(fs.Signal ptr, bint ptr_owner=False):
         """Wrap Signal from pointer"""
-        cdef Signal sig = Signal.__new__(Signal)
+        cdef Signal sig
+        if _signal_intern is not None:
+            sig = _signal_intern.get(<uintptr_t>ptr)
+            if sig is not None:
+                return sig
+        sig = Signal.__new__(Signal)
         sig.ptr = ptr
+        if _signal_intern is not None:
+            _signal_intern[<uintptr_t>ptr] = sig
         return sig
 
+    @property
+    def id(self) -> int:
+        """Address of the tree node, the same for equal (hash-consed) signals.
+
+        Signals are not hashable, since `==` builds a sig_eq expression: use
+        id as the dict key or set member, e.g. to memoize graph analyses.
+        """
+        return <uintptr_t>self.ptr
+
+    def is_same(self, Signal other) -> bool:
+        """Return True if other wraps the same tree node.
+
+        `==` builds a sig_eq expression instead.
+        """
+        return self.ptr == other.ptr
+
     @staticmethod
     def from_input(int idx) -> Signal:
         """Create signal from int"""
@@ -129,7 +193,7 @@ cdef class Signal:
         return sig_int(value)
 
     @staticmethod
-    def from_float(float value) -> Signal:
+    def from_float(double value) -> Signal:
         """Create signal from float"""
         return sig_real(value)
 
@@ -237,6 +301,18 @@ cdef class Signal:
         """Return the arity of a foreign function."""
         return ffarity(self)
 
+    def classify(self) -> tuple:
+        """Return (kind, children, attrs) for this node (see classify_signal)."""
+        return classify_signal(self)
+
+    def walk(self, str order="post", bint unique=True):
+        """Iterate over the nodes of this signal (see walk_signal)."""
+        return walk_signal(self, order, unique)
+
+    def __reduce__(self):
+        from cyfaust.serialize import deserialize, serialize
+        return deserialize, (serialize(self),)
+
     # get_interval / set_interval: These require signals that have been
     # through type inference (e.g. after compilation). Calling them on raw
     # signal trees causes a null dereference abort in libfaust's smart
@@ -770,6 +846,7 @@ def create_lib_context():
 def destroy_lib_context():
     """Destroy global compilation context, has to be done last.
     """
+    clear_signal_intern()
     fs.destroyLibContext()
 
 # def get_sig_interval(Signal s) -> Interval:
@@ -852,7 +929,7 @@ def sig_int(int n) -> Signal:
     return Signal.from_ptr(s)
 
 
-def sig_real(float n) -> Signal:
+def sig_real(double n) -> Signal:
     """Constant real : for all t, x(t) = n.
 
     n - the float/double value (depends of -single or -double compilation parameter)
@@ -979,6 +1056,16 @@ def sig_waveform_float(float[:] view not None) -> Signal:
     cdef fs.Signal wf = fs.sigWaveform(wfv)
     return Signal.from_ptr(wf)
 
+def sig_waveform(SignalVector wf) -> Signal:
+    """Create a waveform.
+
+    wf - the content of the waveform as a vector of sigInt or sigReal signals
+
+    returns the waveform signal.
+    """
+    cdef fs.Signal s = fs.sigWaveform(wf.ptr)
+    return Signal.from_ptr(s)
+
 
 def sig_soundfile(*paths) -> Signal:
     """Create a soundfile block.
@@ -1114,6 +1201,32 @@ def sig_add(Signal x, Signal y) -> Signal:
     cdef fs.Signal s = fs.sigAdd(x.ptr, y.ptr)
     return Signal.from_ptr(s)
 
+cdef fs.Signal sig_sum_tree(const fs.tvec& nodes, size_t lo, size_t hi):
+    """Add nodes[lo:hi] as a balanced tree."""
+    if hi - lo == 1:
+        return nodes[lo]
+    cdef size_t mid = lo + (hi - lo) // 2
+    return fs.sigAdd(sig_sum_tree(nodes, lo, mid), sig_sum_tree(nodes, mid, hi))
+
+def sig_add_n(signals) -> Signal:
+    """The sum of any number of signals.
+
+    signals - a SignalVector or an iterable of signals
+
+    The additions are built natively as a balanced tree.
+
+    returns the sum signal.
+    """
+    cdef fs.tvec nodes
+    if isinstance(signals, SignalVector):
+        nodes = (<SignalVector>signals).ptr
+    else:
+        for sig in signals:
+            nodes.push_back((<Signal?>sig).ptr)
+    if nodes.empty():
+        raise ValueError("at least one signal is needed")
+    return Signal.from_ptr(sig_sum_tree(nodes, 0, nodes.size()))
+
 def sig_sub(Signal x, Signal y) -> Signal:
     cdef fs.Signal s = fs.sigSub(x.ptr, y.ptr)
     return Signal.from_ptr(s)
@@ -1929,6 +2042,351 @@ def is_sig_soundfile_buffer(Signal s) -> dict:
         return {}
 
 
+## ---------------------------------------------------------------------------
+## node classification and traversal
+
+cpdef enum SigKind:
+    kSigInt
+    kSigReal
+    kSigInput
+    kSigOutput
+    kSigDelay1
+    kSigDelay
+    kSigPrefix
+    kSigBinOp
+    kSigXtended
+    kSigIntCast
+    kSigFloatCast
+    kSigSelect2
+    kSigReadTable
+    kSigWriteTable
+    kSigGen
+    kSigWaveform
+    kSigProj
+    kSigRec
+    kSigButton
+    kSigCheckbox
+    kSigHSlider
+    kSigVSlider
+    kSigNumEntry
+    kSigHBargraph
+    kSigVBargraph
+    kSigAttach
+    kSigEnable
+    kSigControl
+    kSigSoundfile
+    kSigSoundfileLength
+    kSigSoundfileRate
+    kSigSoundfileBuffer
+    kSigFFun
+    kSigFConst
+    kSigFVar
+    kSigAssertBounds
+    kSigHighest
+    kSigLowest
+    kSigOther
+
+
+cdef void push_branches(fs.Signal s, fs.tvec& out):
+    cdef fs.tvec branches = fs.sigBranches(s)
+    out.insert(out.end(), branches.begin(), branches.end())
+
+cdef void push_list(fs.Signal lst, fs.tvec& out):
+    """Append the elements of a libfaust list."""
+    cdef fs.tvec cell
+    while not fs.isNil(lst):
+        cell = fs.sigBranches(lst)
+        if cell.size() != 2:
+            out.push_back(lst)
+            return
+        out.push_back(cell[0])
+        lst = cell[1]
+
+cdef void push_label_parts(fs.Signal t, list parts):
+    cdef fs.tvec branches = fs.sigBranches(t)
+    cdef size_t k, n = branches.size()
+    cdef int i
+    if n:
+        for k in range(n):
+            push_label_parts(branches[k], parts)
+    elif not fs.isNil(t) and not fs.isSigInt(t, &i):
+        try:
+            parts.append(fs.tree2str(t).decode())
+        except RuntimeError:
+            pass
+
+cdef str tree_label(fs.Signal t):
+    """Return a label, with the enclosing UI groups of a label path as a/b/label."""
+    cdef list parts = []
+    push_label_parts(t, parts)
+    return "/".join(reversed(parts))
+
+cdef SigKind sig_node(fs.Signal s, fs.tvec& children, dict attrs):
+    """Classify a signal node, appending its signal operands to children.
+
+    Scalar parameters are stored in attrs, unless attrs is None.
+    """
+    cdef int i = 0
+    cdef double r = 0.0
+    cdef fs.Signal a = NULL, b = NULL, c = NULL, d = NULL, e = NULL
+    cdef SigKind kind = kSigOther
+    if fs.isSigInt(s, &i):
+        if attrs is not None:
+            attrs["value"] = i
+        return kSigInt
+    if fs.isSigReal(s, &r):
+        if attrs is not None:
+            attrs["value"] = r
+        return kSigReal
+    if fs.isSigInput(s, &i):
+        if attrs is not None:
+            attrs["index"] = i
+        return kSigInput
+    if fs.isSigBinOp(s, &i, a, b):
+        children.push_back(a)
+        children.push_back(b)
+        if attrs is not None:
+            attrs["op"] = SOperator(i)
+        return kSigBinOp
+    if fs.getUserData(s) != NULL:
+        push_branches(s, children)
+        if attrs is not None:
+            attrs["name"] = fs.xtendedName(s).decode()
+        return kSigXtended
+    if fs.isSigDelay1(s, a):
+        children.push_back(a)
+        return kSigDelay1
+    if fs.isSigDelay(s, a, b):
+        children.push_back(a)
+        children.push_back(b)
+        return kSigDelay
+    if fs.isSigPrefix(s, a, b):
+        children.push_back(a)
+        children.push_back(b)
+        return kSigPrefix
+    if fs.isSigIntCast(s, a):
+        children.push_back(a)
+        return kSigIntCast
+    if fs.isSigFloatCast(s, a):
+        children.push_back(a)
+        return kSigFloatCast
+    if fs.isSigSelect2(s, a, b, c):
+        children.push_back(a)
+        children.push_back(b)
+        children.push_back(c)
+        return kSigSelect2
+    if fs.isProj(s, &i, a):
+        children.push_back(a)
+        if attrs is not None:
+            attrs["index"] = i
+        return kSigProj
+    if fs.isRec(s, a, b):
+        push_list(b, children)
+        if attrs is not None:
+            attrs["var"] = tree_label(a)
+        return kSigRec
+    if fs.isSigOutput(s, &i, a):
+        children.push_back(a)
+        if attrs is not None:
+            attrs["index"] = i
+        return kSigOutput
+    if fs.isSigRDTbl(s, a, b):
+        children.push_back(a)
+        children.push_back(b)
+        return kSigReadTable
+    if fs.isSigWRTbl(s, a, b, c, d):
+        # size, generator, and the write index and signal unless read-only
+        children.push_back(a)
+        children.push_back(b)
+        if not fs.isNil(c):
+            children.push_back(c)
+            children.push_back(d)
+        return kSigWriteTable
+    if fs.isSigGen(s, a):
+        children.push_back(a)
+        return kSigGen
+    if fs.isSigWaveform(s):
+        push_branches(s, children)
+        return kSigWaveform
+    if fs.isSigHSlider(s, e, a, b, c, d):
+        kind = kSigHSlider
+    elif fs.isSigVSlider(s, e, a, b, c, d):
+        kind = kSigVSlider
+    elif fs.isSigNumEntry(s, e, a, b, c, d):
+        kind = kSigNumEntry
+    if kind != kSigOther:
+        # init, min, max, step
+        children.push_back(a)
+        children.push_back(b)
+        children.push_back(c)
+        children.push_back(d)
+        if attrs is not None:
+            attrs["label"] = tree_label(e)
+        return kind
+    if fs.isSigButton(s, e):
+        kind = kSigButton
+    elif fs.isSigCheckbox(s, e):
+        kind = kSigCheckbox
+    elif fs.isSigSoundfile(s, e):
+        kind = kSigSoundfile
+    if kind != kSigOther:
+        if attrs is not None:
+            attrs["label"] = tree_label(e)
+        return kind
+    if fs.isSigHBargraph(s, e, a, b, c):
+        kind = kSigHBargraph
+    elif fs.isSigVBargraph(s, e, a, b, c):
+        kind = kSigVBargraph
+    if kind != kSigOther:
+        # min, max, displayed signal
+        children.push_back(a)
+        children.push_back(b)
+        children.push_back(c)
+        if attrs is not None:
+            attrs["label"] = tree_label(e)
+        return kind
+    if fs.isSigAttach(s, a, b):
+        children.push_back(a)
+        children.push_back(b)
+        return kSigAttach
+    if fs.isSigEnable(s, a, b):
+        children.push_back(a)
+        children.push_back(b)
+        return kSigEnable
+    if fs.isSigControl(s, a, b):
+        children.push_back(a)
+        children.push_back(b)
+        return kSigControl
+    if fs.isSigSoundfileLength(s, a, b):
+        children.push_back(a)
+        children.push_back(b)
+        return kSigSoundfileLength
+    if fs.isSigSoundfileRate(s, a, b):
+        children.push_back(a)
+        children.push_back(b)
+        return kSigSoundfileRate
+    if fs.isSigSoundfileBuffer(s, a, b, c, d):
+        children.push_back(a)
+        children.push_back(b)
+        children.push_back(c)
+        children.push_back(d)
+        return kSigSoundfileBuffer
+    if fs.isSigFFun(s, e, a):
+        push_list(a, children)
+        if attrs is not None:
+            attrs["name"] = fs.ffname(e).decode()
+            attrs["arity"] = fs.ffarity(e)
+        return kSigFFun
+    if fs.isSigFConst(s, a, b, c):
+        kind = kSigFConst
+    elif fs.isSigFVar(s, a, b, c):
+        kind = kSigFVar
+    if kind != kSigOther:
+        if attrs is not None:
+            i = 0
+            fs.isSigInt(a, &i)
+            attrs["type"] = SType(i)
+            attrs["name"] = tree_label(b)
+            attrs["file"] = tree_label(c)
+        return kind
+    if fs.isSigAssertBounds(s, a, b, c):
+        children.push_back(a)
+        children.push_back(b)
+        children.push_back(c)
+        return kSigAssertBounds
+    if fs.isSigHighest(s, a):
+        children.push_back(a)
+        return kSigHighest
+    if fs.isSigLowest(s, a):
+        children.push_back(a)
+        return kSigLowest
+    push_branches(s, children)
+    return kSigOther
+
+
+def classify_signal(Signal s) -> tuple:
+    """Classify a signal node in one call.
+
+    s - the signal
+
+    returns (kind, children, attrs): the SigKind of the node, a tuple of its
+    signal operands and a dict of its scalar parameters (value, index, op,
+    name, label, ...). Nodes of unknown kind are kSigOther with their raw
+    tree branches as children.
+    """
+    cdef fs.tvec children
+    cdef dict attrs = {}
+    cdef SigKind kind = sig_node(s.ptr, children, attrs)
+    cdef size_t i, n = children.size()
+    return kind, tuple([Signal.from_ptr(children[i]) for i in range(n)]), attrs
+
+
+def walk_signal(root: Signal | SignalVector, str order="post", bint unique=True):
+    """Iterate over the nodes of a signal graph.
+
+    root - a signal or a vector of signals
+    order - "post" to visit operands before their node, "pre" to visit
+            nodes before their operands
+    unique - visit shared nodes once, otherwise once per path reaching them
+
+    Recursive definitions are not entered again from inside themselves, so
+    the walk also ends for recursive signals.
+
+    returns a generator of signals.
+    """
+    cdef SignalVector roots
+    if isinstance(root, SignalVector):
+        roots = root
+    elif isinstance(root, Signal):
+        roots = SignalVector()
+        roots.add(root)
+    else:
+        raise TypeError("root must be a Signal or a SignalVector")
+    if order not in ("pre", "post"):
+        raise ValueError(f"order must be 'pre' or 'post', not {order!r}")
+    return _walk_signals(roots, order == "post", unique)
+
+def _walk_signals(SignalVector roots, bint post, bint unique):
+    # Depth-first walk with an explicit stack: frame k visits its operands
+    # pending[start[k]:], the roots forming the operands of a NULL frame.
+    cdef fs.tvec pending = roots.ptr
+    cdef fs.tvec frames
+    cdef vector[size_t] start, position
+    cdef unordered_set[fs.Signal] active, done
+    cdef fs.Signal node
+    cdef size_t top, n
+    frames.push_back(NULL)
+    start.push_back(0)
+    position.push_back(0)
+    while frames.size():
+        top = frames.size() - 1
+        n = pending.size()
+        if start[top] + position[top] < n:
+            node = pending[start[top] + position[top]]
+            position[top] += 1
+            if active.count(node) or (unique and done.count(node)):
+                continue
+            if not post:
+                yield Signal.from_ptr(node)
+            active.insert(node)
+            frames.push_back(node)
+            start.push_back(n)
+            position.push_back(0)
+            sig_node(node, pending, None)
+        else:
+            node = frames[top]
+            pending.resize(start[top])
+            frames.pop_back()
+            start.pop_back()
+            position.pop_back()
+            if node != NULL:
+                active.erase(node)
+                if unique:
+                    done.insert(node)
+                if post:
+                    yield Signal.from_ptr(node)
+
+
 def simplify_to_normal_form(Signal s) -> Signal:
     """Simplify a signal to its normal form, where:
      
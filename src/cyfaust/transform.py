@@ -0,0 +1,533 @@
+"""Box-level transformations of compiled Faust programs.
+
+The functions here rewrite the flattened box returned by dsp_to_boxes()
+before it is compiled. Only the nodes on the way from the root to a
+rewritten node are rebuilt; everything else is shared with the original
+box.
+
+UI widgets are selected by path: the labels of their enclosing groups and
+their own label, without [metadata], e.g. "/voice/freq". Paths match on
+their trailing components, so "/freq" selects every widget labelled freq,
+and full addresses as shown in the JSON description, which start with the
+top-level group, match too.
+
+specialize() bakes fixed control values into constants, so that libfaust's
+normal-form simplification folds the computation depending on them,
+widgets_to_inputs() turns controls into audio inputs for sample-accurate
+automation, select_outputs() removes unneeded outputs and fuse() compiles
+several copies of a DSP as one:
+
+Example:
+    >>> from cyfaust.transform import specialize
+    >>> code = 'process = _ * hslider("gain", 0.5, 0, 1, 0.01) : sin;'
+    >>> factory = specialize(code, {"/gain": 0.25})
+"""
+
+import re
+
+from cyfaust._api import extension_module
+from cyfaust.serialize import BoxCodec
+
+# Widget labels may hold [metadata] and group prefixes such as "h:"
+_METADATA = re.compile(r"\[[^\]]*\]")
+_GROUP_PREFIX = re.compile(r"^[hvt]:")
+
+
+def label_parts(label):
+    """Split a widget or group label into path components."""
+    parts = []
+    for part in _METADATA.sub("", label).split("/"):
+        part = _GROUP_PREFIX.sub("", part.strip()).strip()
+        if part:
+            parts.append(part)
+    return tuple(parts)
+
+
+def path_parts(path):
+    """Split a widget path, e.g. "/voice/freq", into path components."""
+    return tuple(part for part in path.split("/") if part)
+
+
+def path_matches(widget, path):
+    """Return True if a path selects the widget with the given components."""
+    return widget[-len(path) :] == path or widget == path[1:]
+
+
+def _widget_kinds(kind):
+    return {
+        "slider": (kind.kBoxHSlider, kind.kBoxVSlider, kind.kBoxNumEntry),
+        "checkbox": (kind.kBoxCheckbox,),
+        "button": (kind.kBoxButton,),
+        "group": (kind.kBoxHGroup, kind.kBoxVGroup, kind.kBoxTGroup),
+    }
+
+
+def _fold_box(codec, root, visit, combine):
+    """Compute a result for root bottom-up, once per node and enclosing UI groups.
+
+    visit(node, kind, attrs, groups), where groups are the path components
+    of the enclosing UI groups, returns the result of a node without looking
+    at its operands, or None to descend. combine(node, kind, children, attrs,
+    groups, results) then computes it from the results of its operands.
+    """
+    groups_of = _widget_kinds(codec.kind)["group"]
+    done = {}  # (node id, groups) -> result
+    stack = [(root, (), None)]
+    while stack:
+        node, groups, node_info = stack.pop()
+        key = (node.id, groups)
+        if key in done:
+            continue
+        if node_info is None:
+            kind, children, attrs = codec.classify(node)
+            result = visit(node, kind, attrs, groups)
+            if result is not None:
+                done[key] = result
+                continue
+            inner = groups + label_parts(attrs["label"]) if kind in groups_of else groups
+            stack.append((node, groups, (kind, children, attrs, inner)))
+            stack.extend(
+                (child, inner, None) for child in children if (child.id, inner) not in done
+            )
+            continue
+        kind, children, attrs, inner = node_info
+        results = [done[child.id, inner] for child in children]
+        done[key] = combine(node, kind, children, attrs, groups, results)
+    return done[root.id, ()]
+
+
+def _map_box(codec, root, replace):
+    """Rebuild root, replacing the nodes for which replace() returns a box.
+
+    replace is called as replace(node, kind, attrs, groups) and returns a box
+    or None to keep the node. Nodes below which nothing is replaced are shared.
+    """
+
+    def rebuild(node, kind, children, attrs, groups, rebuilt):
+        if all(new.is_same(old) for new, old in zip(rebuilt, children)):
+            return node
+        code, _children, fields = codec.describe(node)
+        return codec.build(code, rebuilt, fields)
+
+    return _fold_box(codec, root, replace, rebuild)
+
+
+def widget_paths(box):
+    """Return the paths of the input widgets (sliders, buttons, ...) of a box.
+
+    Args:
+        box: a box, e.g. returned by dsp_to_boxes()
+
+    Returns:
+        list of "/group/.../label" paths, in depth-first order.
+    """
+    codec = BoxCodec()
+    kinds = _widget_kinds(codec.kind)
+    widgets = kinds["slider"] + kinds["checkbox"] + kinds["button"]
+    paths = []
+
+    def collect(node, kind, attrs, groups):
+        if kind in widgets:
+            path = "/" + "/".join(groups + label_parts(attrs["label"]))
+            if path not in paths:
+                paths.append(path)
+            return node
+        return None
+
+    _map_box(codec, box, collect)
+    return paths
+
+
+def specialize_box(box, values):
+    """Replace sliders, numeric entries and checkboxes by constant values.
+
+    Args:
+        box: a box, e.g. returned by dsp_to_boxes()
+        values: dict mapping widget paths to their fixed values
+
+    Returns:
+        the rewritten box.
+
+    Raises:
+        ValueError: if a path matches no slider, numeric entry or checkbox.
+    """
+    codec = BoxCodec()
+    kinds = _widget_kinds(codec.kind)
+    widgets = kinds["slider"] + kinds["checkbox"]
+    paths = {path_parts(path): value for path, value in values.items()}
+    unused = set(paths)
+
+    def constant(node, kind, attrs, groups):
+        if kind not in widgets:
+            return None
+        widget = groups + label_parts(attrs["label"])
+        for path, value in paths.items():
+            if path_matches(widget, path):
+                unused.discard(path)
+                # Widgets are real-valued: keep the type downstream math sees
+                return codec.api.box_float(float(value))
+        return None
+
+    result = _map_box(codec, box, constant)
+    if unused:
+        missing = ", ".join(sorted("/" + "/".join(path) for path in unused))
+        raise ValueError(f"no slider, numeric entry or checkbox matches {missing}")
+    return result
+
+
+def specialize(source_or_box, values, name="FaustDSP", args=()):
+    """Compile a DSP with some controls fixed to constant values.
+
+    The selected sliders, numeric entries and checkboxes are replaced by
+    their values before compilation, so the computation depending only on
+    them is folded by libfaust and they are no longer controls of the DSP.
+
+    Args:
+        source_or_box: Faust source code, compiled with dsp_to_boxes() in a
+            box context of its own, or a box of the current box context
+        values: dict mapping widget paths (e.g. "/voice/freq") to values
+        name: name of the Faust program
+        args: Faust compiler options (e.g. ("-vec",))
+
+    Returns:
+        DspFactory, or None on error (the error is printed).
+
+    Raises:
+        ValueError: if a path matches no slider, numeric entry or checkbox.
+    """
+    box_api = extension_module("box")
+    interp = extension_module("interp")
+    if not isinstance(source_or_box, str):
+        box = specialize_box(source_or_box, values)
+        return interp.create_dsp_factory_from_boxes(name, box, *args)
+    with box_api.box_context():
+        box = box_api.dsp_to_boxes(name, source_or_box, *args)
+        if box is None:
+            return None
+        return interp.create_dsp_factory_from_boxes(name, specialize_box(box, values), *args)
+
+
+## ---------------------------------------------------------------------------
+## widgets to inputs
+
+
+def _bus(api, n):
+    """Return n wires in parallel."""
+    return api.box_par_n([api.box_wire()] * n)
+
+
+def _route(api, n, m, pairs):
+    """Return a route box from n to m channels for 0-based (input, output) pairs."""
+    numbers = [api.box_int(i + 1) for pair in pairs for i in pair]
+    return api.box_route(api.box_int(n), api.box_int(m), api.box_par_n(numbers))
+
+
+def _permute(api, order):
+    """Return a box whose output i is its input order[i], or None for the identity."""
+    if order == list(range(len(order))):
+        return None
+    return _route(api, len(order), len(order), [(src, dst) for dst, src in enumerate(order)])
+
+
+def _then(api, first, second):
+    """Return first : second, where either may be None for no box."""
+    if first is None or second is None:
+        return second if first is None else first
+    return api.box_seq(first, second)
+
+
+class _InputThreader:
+    """Thread the inputs replacing widgets through the combinators above them.
+
+    Results are (box, extras): box has the inputs of the original node
+    followed by one input per widget path in extras.
+    """
+
+    def __init__(self, codec, paths):
+        self.codec = codec
+        self.api = codec.api
+        kind = codec.kind
+        self.kind = kind
+        kinds = _widget_kinds(kind)
+        self.widgets = kinds["slider"] + kinds["checkbox"] + kinds["button"]
+        self.groups = kinds["group"]
+        self.paths = paths
+        self.unused = set(paths)
+
+    def visit(self, node, kind, attrs, groups):
+        if kind not in self.widgets:
+            return None
+        widget = groups + label_parts(attrs["label"])
+        for path in self.paths:
+            if path_matches(widget, path):
+                self.unused.discard(path)
+                return self.api.box_wire(), ("/" + "/".join(widget),)
+        return node, ()
+
+    def combine(self, node, kind, children, attrs, groups, results):
+        if not any(extras for _box, extras in results):
+            return node, ()
+        api, k = self.api, self.kind
+        if kind in self.groups:
+            ((inner, extras),) = results
+            code, _children, fields = self.codec.describe(node)
+            return self.codec.build(code, [inner], fields), extras
+        if kind not in (k.kBoxSeq, k.kBoxPar, k.kBoxSplit, k.kBoxMerge, k.kBoxRec):
+            raise ValueError(f"cannot turn widgets below {kind.name} nodes into inputs")
+        (x, x_extras), (y, y_extras) = results
+        kx, ky = len(x_extras), len(y_extras)
+        x_ins, x_outs = api.get_box_type(children[0])
+        y_ins, y_outs = api.get_box_type(children[1])
+        extras = x_extras + y_extras
+
+        if kind == k.kBoxPar:
+            # [x inputs, y inputs, x extras, y extras] -> [x inputs, x extras, ...]
+            order = (
+                list(range(x_ins))
+                + list(range(x_ins + y_ins, x_ins + y_ins + kx))
+                + list(range(x_ins, x_ins + y_ins))
+                + list(range(x_ins + y_ins + kx, x_ins + y_ins + kx + ky))
+            )
+            return _then(api, _permute(api, order), api.box_par(x, y)), extras
+
+        if kind == k.kBoxRec:
+            if not ky:
+                return api.box_rec(x, children[1]), extras
+            # Pass the y extras through x, placed where the feedback path takes y's inputs
+            order = (
+                list(range(y_ins)) + list(range(x_outs, x_outs + ky)) + list(range(y_ins, x_outs))
+            )
+            x = _then(api, api.box_par(x, _bus(api, ky)), _permute(api, order))
+            loop = api.box_rec(x, y)
+            # Drop the extras from the outputs
+            kept = [i for i in range(x_outs + ky) if not y_ins <= i < y_ins + ky]
+            drop = _route(api, x_outs + ky, x_outs, [(src, dst) for dst, src in enumerate(kept)])
+            return api.box_seq(loop, drop), extras
+
+        if kind == k.kBoxSeq:
+            head = x
+        elif kind == k.kBoxSplit:
+            head = api.box_split(x, _bus(api, y_ins))
+        else:
+            head = api.box_merge(x, _bus(api, y_ins))
+        if not ky:
+            return api.box_seq(head, y), extras
+        return api.box_seq(api.box_par(head, _bus(api, ky)), y), extras
+
+
+def widgets_to_inputs(box, paths):
+    """Replace UI widgets by audio inputs, for sample-accurate automation.
+
+    The selected sliders, numeric entries, checkboxes and buttons become
+    inputs added after the inputs of the box, so that automation curves can
+    be computed as ordinary input channels. A widget used in several places
+    is fed by a single input.
+
+    Args:
+        box: a box, e.g. returned by dsp_to_boxes()
+        paths: widget paths (e.g. ["/voice/freq"])
+
+    Returns:
+        (box, inputs): the rewritten box and a dict mapping each new input
+        channel to the path of the widget it replaces.
+
+    Raises:
+        ValueError: if a path matches no widget, or a widget is below a
+            node through which inputs cannot be threaded.
+    """
+    codec = BoxCodec()
+    api = codec.api
+    threader = _InputThreader(codec, [path_parts(path) for path in paths])
+    result, extras = _fold_box(codec, box, threader.visit, threader.combine)
+    if threader.unused:
+        missing = ", ".join(sorted("/" + "/".join(path) for path in threader.unused))
+        raise ValueError(f"no widget matches {missing}")
+
+    ins, _outs = api.get_box_type(box)
+    unique = list(dict.fromkeys(extras))
+    if len(unique) < len(extras):
+        # Feed every use of a widget from its single input
+        pairs = [(i, i) for i in range(ins)]
+        pairs += [(ins + unique.index(path), ins + i) for i, path in enumerate(extras)]
+        result = api.box_seq(_route(api, ins + len(unique), ins + len(extras), pairs), result)
+    return result, {ins + i: path for i, path in enumerate(unique)}
+
+
+## ---------------------------------------------------------------------------
+## output selection
+
+# Name of the process selecting outputs in select_outputs_source()
+_SELECTED_PROCESS = "cyfaust_selected_outputs"
+
+
+def _output_indices(outputs, count=None):
+    indices = [int(i) for i in outputs]
+    if count is not None:
+        for i in indices:
+            if not 0 <= i < count:
+                raise ValueError(f"output {i} out of range for {count} outputs")
+    elif any(i < 0 for i in indices):
+        raise ValueError("output indices must not be negative")
+    return indices
+
+
+def select_outputs(box_or_signals, outputs):
+    """Keep only some outputs of a box or signal vector.
+
+    Dropped outputs are cut, so libfaust removes the computation that only
+    feeds them when the result is compiled.
+
+    Args:
+        box_or_signals: a box, or a SignalVector (e.g. from boxes_to_signals())
+        outputs: indices of the outputs to keep, in their new order
+            (an output may be repeated)
+
+    Returns:
+        a box or SignalVector with len(outputs) outputs.
+
+    Raises:
+        ValueError: if an index is out of range.
+    """
+    signal = extension_module("signal")
+    if isinstance(box_or_signals, signal.SignalVector):
+        signals = list(box_or_signals)
+        selected = signal.SignalVector()
+        for i in _output_indices(outputs, len(signals)):
+            selected.add(signals[i])
+        return selected
+
+    api = extension_module("box")
+    if not isinstance(box_or_signals, api.Box):
+        raise TypeError("expected a Box or a SignalVector")
+    _ins, count = api.get_box_type(box_or_signals)
+    indices = _output_indices(outputs, count)
+    if indices == list(range(count)):
+        return box_or_signals
+    if indices == sorted(set(indices)):
+        # Wires for the kept outputs, cuts for the others
+        kept = set(indices)
+        selector = api.box_par_n(
+            [api.box_wire() if i in kept else api.box_cut() for i in range(count)]
+        )
+    else:
+        selector = _route(api, count, len(indices), [(i, k) for k, i in enumerate(indices)])
+    return api.box_seq(box_or_signals, selector)
+
+
+def select_outputs_source(code, outputs, args=()):
+    """Rewrite Faust code and options to compile only some outputs.
+
+    A process routing the selected outputs of the original one is appended
+    to the code and chosen with -pn, so the result compiles with any backend.
+
+    Args:
+        code: Faust source code
+        outputs: indices of the outputs to keep, in their new order
+        args: Faust compiler options, possibly naming the process with -pn
+
+    Returns:
+        (code, args) to compile instead. Indices must be below the number
+        of outputs of the process, which is only known once compiled.
+    """
+    args = list(args)
+    process = "process"
+    if "-pn" in args:
+        position = args.index("-pn")
+        process = args[position + 1]
+        del args[position : position + 2]
+    indices = _output_indices(outputs)
+    if indices:
+        pairs = ", ".join(f"({i + 1}, {k + 1})" for k, i in enumerate(indices))
+        selector = f"route(outputs({process}), {len(indices)}, {pairs})"
+    else:
+        selector = f"par(i, outputs({process}), !)"
+    code = f"{code}\n{_SELECTED_PROCESS} = {process} : {selector};\n"
+    return code, tuple(args) + ("-pn", _SELECTED_PROCESS)
+
+
+## ---------------------------------------------------------------------------
+## fusion
+
+
+def _factory_from_box(name, box, args, backend):
+    """Compile a box with the interpreter or LLVM, returning a DspFactory or None."""
+    from cyfaust.backends import available_backends
+
+    interp = extension_module("interp")
+    if backend == "auto":
+        backend = available_backends()[0]
+    if backend == "interp":
+        return interp.create_dsp_factory_from_boxes(name, box, *args)
+    if backend == "llvm":
+        if not hasattr(interp, "llvm_create_dsp_factory_from_boxes"):
+            print("LLVM backend not available in this build")
+            return None
+        return interp.llvm_create_dsp_factory_from_boxes(name, box, "", -1, *args)
+    raise ValueError(f"unknown backend {backend!r}, expected 'auto', 'interp' or 'llvm'")
+
+
+def fuse_box(box, n, group="copy"):
+    """Put n copies of a box in parallel, each in a UI group of its own.
+
+    Args:
+        box: a box, e.g. returned by dsp_to_boxes()
+        n: number of copies
+        group: prefix of the group labels (copies are in group0, group1, ...)
+
+    Returns:
+        (box, channels, params): the fused box; for each copy a dict with
+        its "inputs" and "outputs" channel indices in the fused box; and for
+        each copy a dict mapping the widget paths of the original box to
+        their paths in the fused box.
+    """
+    if n < 1:
+        raise ValueError("n must be at least 1")
+    api = extension_module("box")
+    ins, outs = api.get_box_type(box)
+    paths = widget_paths(box)
+    copies, channels, params = [], [], []
+    for k in range(n):
+        label = f"{group}{k}"
+        copies.append(api.box_vgroup(label, box))
+        channels.append(
+            {
+                "inputs": list(range(k * ins, (k + 1) * ins)),
+                "outputs": list(range(k * outs, (k + 1) * outs)),
+            }
+        )
+        params.append({path: f"/{label}{path}" for path in paths})
+    return api.box_par_n(copies), channels, params
+
+
+def fuse(source_or_box, n, name="FaustDSP", args=(), group="copy", backend="auto"):
+    """Compile n copies of a DSP as one wide DSP.
+
+    Computing one instance of the fused DSP replaces n compute calls, which
+    amortizes the per-call overhead of the interpreter for small DSPs and
+    small blocks; with LLVM and -vec, the copies can also be vectorized.
+
+    Args:
+        source_or_box: Faust source code, compiled with dsp_to_boxes() in a
+            box context of its own, or a box of the current box context
+        n: number of copies
+        name: name of the Faust program
+        args: Faust compiler options (e.g. ("-vec",))
+        group: prefix of the UI groups holding the copies
+        backend: "auto" (LLVM when available), "interp" or "llvm"
+
+    Returns:
+        (factory, channels, params) as returned by fuse_box() with the
+        compiled DspFactory, or None on error (the error is printed).
+    """
+    if not isinstance(source_or_box, str):
+        box, channels, params = fuse_box(source_or_box, n, group)
+        factory = _factory_from_box(name, box, args, backend)
+        return None if factory is None else (factory, channels, params)
+    box_api = extension_module("box")
+    with box_api.box_context():
+        box = box_api.dsp_to_boxes(name, source_or_box, *args)
+        if box is None:
+            return None
+        box, channels, params = fuse_box(box, n, group)
+        factory = _factory_from_box(name, box, args, backend)
+        return None if factory is None else (factory, channels, params)
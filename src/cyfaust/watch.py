@@ -0,0 +1,134 @@
+"""Hot reloading of Faust DSP files for ``cyfaust play --watch``.
+
+A background thread polls the DSP file and every file it includes (as
+reported by ``get_include_pathnames()``). When one of them changes, the DSP
+is recompiled on that thread and the new instance is handed to a
+``HotSwapDsp``, which crossfades to it on the audio thread. Compilation
+never runs on the audio thread, and a failed compilation leaves the
+previous version playing.
+
+Example:
+    >>> swapper = HotSwapDsp(dsp, factory=factory)
+    >>> driver.init(swapper)
+    >>> reloader = HotReloader("synth.dsp", swapper, 44100, create_dsp_factory_from_file)
+    >>> reloader.start()
+"""
+
+import os
+import threading
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def dependencies(path, factory):
+    """Return a DSP file and the files it includes, as compiled in factory."""
+    paths = [path]
+    for name in factory.get_include_pathnames():
+        if isinstance(name, bytes):
+            name = name.decode("utf8")
+        if name and name not in paths:
+            paths.append(name)
+    return paths
+
+
+class FileWatcher:
+    """Detects modifications of a set of files by polling their mtimes."""
+
+    def __init__(self, paths=()):
+        self.mtimes = {}
+        self.watch(paths)
+
+    def watch(self, paths, mtimes=None):
+        """Watch paths, comparing against mtimes where given (default: current)."""
+        mtimes = mtimes or {}
+        self.mtimes = {p: mtimes[p] if p in mtimes else _mtime(p) for p in paths}
+
+    def snapshot(self):
+        """Return the current mtimes of the watched files."""
+        return {p: _mtime(p) for p in self.mtimes}
+
+    def changed(self):
+        """Return the watched files modified (or removed) since watch()."""
+        return [p for p, mtime in self.mtimes.items() if _mtime(p) != mtime]
+
+
+class HotReloader:
+    """Recompiles a DSP file when it changes and swaps it into a HotSwapDsp.
+
+    Args:
+        path: DSP file being played
+        swapper: HotSwapDsp set on the running audio driver, created with
+            the factory of the instance it plays
+        sample_rate: sample rate to initialize new instances with
+        create_factory: function compiling a DSP file into a factory, or
+            returning None on error
+        interval: polling interval in seconds
+        log: function called with status messages
+    """
+
+    def __init__(self, path, swapper, sample_rate, create_factory, interval=0.25, log=print):
+        self.path = path
+        self.swapper = swapper
+        self.sample_rate = sample_rate
+        self.create_factory = create_factory
+        self.interval = interval
+        self.log = log
+        self.watcher = FileWatcher(dependencies(path, swapper.factory))
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="cyfaust-watch", daemon=True)
+
+    def start(self):
+        """Start watching on a background thread."""
+        self._thread.start()
+
+    def stop(self):
+        """Stop watching and wait for a running compilation to finish."""
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.poll()
+
+    def poll(self):
+        """Release a finished fade, then reload if a watched file changed.
+
+        Returns True if a new version was swapped in.
+        """
+        if self.swapper.is_swapping and not self.swapper.collect():
+            return False
+        if not self.watcher.changed():
+            return False
+        return self.reload()
+
+    def reload(self):
+        """Recompile the DSP file and swap the new instance in.
+
+        Returns True if a new version was swapped in.
+        """
+        # Taken before compiling, so edits made meanwhile trigger another reload
+        before = self.watcher.snapshot()
+
+        factory = self.create_factory(self.path)
+        if factory is None:
+            self.watcher.watch(list(before), before)
+            self.log(f"Reload failed: {self.path} (still playing the previous version)")
+            return False
+
+        dsp = factory.create_dsp_instance()
+        dsp.init(self.sample_rate)
+        dsp.build_user_interface()
+        self.watcher.watch(dependencies(self.path, factory), before)
+
+        if not self.swapper.swap(dsp, factory):
+            self.log("Reload skipped: the number of inputs or outputs changed (restart to apply)")
+            return False
+
+        self.log(f"Reloaded: {self.path}")
+        return True
@@ -1,4 +1,3 @@
-# ruff: noqa: F405
 # cyfaust - Python bindings for the Faust DSP language
 #
 # This module provides Python access to:
@@ -7,29 +6,20 @@
 #   - RtAudio integration for real-time audio playback
 #   - Sound file players for audio file processing
 
-# Import everything from the compiled Cython module
-from .cyfaust import *  # noqa: F403
+import importlib
 
-# Import specific items we need to reference
-from .cyfaust import get_version as get_version
+# The compiled extension (and with it libfaust and, when enabled, LLVM) is
+# loaded lazily on first attribute access (PEP 562), so that ``import cyfaust``
+# and ``python -m cyfaust --help`` do not pay for it.
+_EXTENSION = ".cyfaust"
 
-# -----------------------------------------------------------------------------
-# LLVM Backend Detection
-# -----------------------------------------------------------------------------
-# Check if LLVM backend classes are available (built with CMAKE_ARGS="-DLLVM=ON")
-try:
-    from .cyfaust import LlvmDspFactory as LlvmDspFactory  # noqa: F811
-    from .cyfaust import LlvmDsp as LlvmDsp  # noqa: F811
 
-    LLVM_BACKEND = True
-except ImportError:
-    LLVM_BACKEND = False
+def _extension():
+    return importlib.import_module(_EXTENSION, __name__)
 
-# Version info
-__version__ = get_version()
 
 # Explicitly define key exports for documentation/IDE support
-__all__ = [
+_BASE_ALL = [
     # Version
     "__version__",
     "get_version",
@@ -42,9 +32,25 @@ __all__ = [
     "expand_dsp_from_string",
     "generate_auxfiles_from_file",
     "generate_auxfiles_from_string",
+    "generate_auxfiles_from_file2",
+    "generate_auxfiles_from_string2",
+    # Backend-independent compilation (pure Python, see cyfaust.backends;
+    # compile() is not exported here so as not to shadow the builtin)
+    "available_backends",
+    "DspFactory",
+    "Dsp",
     # Interpreter backend (always available)
     "InterpreterDspFactory",
     "InterpreterDsp",
+    "NativeDspFactory",
+    "NativeDsp",
+    "HotSwapDsp",
+    "Oversampled",
+    "OVERSAMPLING_QUALITIES",
+    "OVERSAMPLING_FACTORS",
+    "FixedBlockDsp",
+    "CheckedDsp",
+    "CHECK_ACTIONS",
     "MetaCollector",
     "RtAudioDriver",
     "get_dsp_factory_from_sha_key",
@@ -67,11 +73,19 @@ __all__ = [
     "destroy_lib_context",
     "dsp_to_boxes",
     "boxes_to_signals",
+    "intern_boxes",
+    "BoxKind",
+    "classify_box",
+    "walk_box",
     # Signal API
     "Signal",
     "SignalVector",
     "create_source_from_signals",
     "simplify_to_normal_form",
+    "intern_signals",
+    "SigKind",
+    "classify_signal",
+    "walk_signal",
     # Sound players
     "SoundBasePlayer",
     "SoundMemoryPlayer",
@@ -82,33 +96,68 @@ __all__ = [
     "create_position_manager",
 ]
 
-# Add LLVM exports to __all__ if available
-if LLVM_BACKEND:
-    __all__.extend(
-        [
-            # LLVM backend classes
-            "LlvmDspFactory",
-            "LlvmDsp",
-            "LlvmRtAudioDriver",
-            # LLVM-specific utilities
-            "get_dsp_machine_target",
-            "register_foreign_function",
-            # LLVM factory functions
-            "llvm_get_version",
-            "llvm_get_dsp_factory_from_sha_key",
-            "llvm_create_dsp_factory_from_file",
-            "llvm_create_dsp_factory_from_string",
-            "llvm_create_dsp_factory_from_signals",
-            "llvm_create_dsp_factory_from_boxes",
-            "llvm_delete_all_dsp_factories",
-            "llvm_get_all_dsp_factories",
-            "llvm_start_multithreaded_access_mode",
-            "llvm_stop_multithreaded_access_mode",
-            "llvm_read_dsp_factory_from_bitcode",
-            "llvm_read_dsp_factory_from_bitcode_file",
-            "llvm_read_dsp_factory_from_ir",
-            "llvm_read_dsp_factory_from_ir_file",
-            "llvm_read_dsp_factory_from_machine",
-            "llvm_read_dsp_factory_from_machine_file",
-        ]
-    )
+# Exported in addition to _BASE_ALL when built with the LLVM backend
+_LLVM_ALL = [
+    # LLVM backend classes
+    "LlvmDspFactory",
+    "LlvmDsp",
+    "LlvmRtAudioDriver",
+    # LLVM-specific utilities
+    "get_dsp_machine_target",
+    "register_foreign_function",
+    # LLVM factory functions
+    "llvm_get_version",
+    "llvm_get_dsp_factory_from_sha_key",
+    "llvm_create_dsp_factory_from_file",
+    "llvm_create_dsp_factory_from_string",
+    "llvm_create_dsp_factory_from_signals",
+    "llvm_create_dsp_factory_from_boxes",
+    "llvm_create_cached_dsp_factory_from_file",
+    "llvm_create_cached_dsp_factory_from_string",
+    "llvm_delete_all_dsp_factories",
+    "llvm_get_all_dsp_factories",
+    "llvm_start_multithreaded_access_mode",
+    "llvm_stop_multithreaded_access_mode",
+    "llvm_read_dsp_factory_from_bitcode",
+    "llvm_read_dsp_factory_from_bitcode_file",
+    "llvm_read_dsp_factory_from_ir",
+    "llvm_read_dsp_factory_from_ir_file",
+    "llvm_read_dsp_factory_from_machine",
+    "llvm_read_dsp_factory_from_machine_file",
+]
+
+
+# Top-level names re-exported from pure Python submodules
+_PY_ATTRS = {
+    "available_backends": "backends",
+}
+
+
+def __getattr__(name):
+    # -------------------------------------------------------------------------
+    # LLVM Backend Detection
+    # -------------------------------------------------------------------------
+    # LLVM backend classes are only present when built with CMAKE_ARGS="-DLLVM=ON"
+    if name == "LLVM_BACKEND":
+        value = hasattr(_extension(), "LlvmDspFactory")
+    elif name == "__version__":
+        value = _extension().get_version()
+    elif name == "__all__":
+        value = list(_BASE_ALL)
+        if __getattr__("LLVM_BACKEND"):
+            value.extend(_LLVM_ALL)
+    elif name in _PY_ATTRS:
+        value = getattr(importlib.import_module(f".{_PY_ATTRS[name]}", __name__), name)
+    elif name.startswith("__") or name == "cyfaust":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    else:
+        try:
+            value = getattr(_extension(), name)
+        except AttributeError:
+            raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__getattr__("__all__")))
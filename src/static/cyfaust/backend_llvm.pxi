@@ -44,7 +44,7 @@ def register_foreign_function(str function_name):
 # LlvmDspFactory - LLVM DSP factory class
 # -----------------------------------------------------------------------------
 
-cdef class LlvmDspFactory:
+cdef class LlvmDspFactory(DspFactory):
     """LLVM DSP factory class.
 
     Creates DSP instances compiled to native machine code via LLVM JIT.
@@ -109,6 +109,35 @@ cdef class LlvmDspFactory:
         """Get warning messages list for a given compilation."""
         return [msg.decode() for msg in self.ptr.getWarningMessages()]
 
+    def get_json(self, bint flat=False) -> str:
+        """Return the factory description as a Faust JSON string.
+
+        Includes name, SHA key, compile options, library list, I/O counts,
+        metadata and the full UI tree, gathered from a temporary instance.
+
+        Args:
+            flat: if True, return the JSON on a single line
+        """
+        cdef fl.llvm_dsp* dsp = self.ptr.createDSPInstance()
+        if dsp == NULL:
+            return
+        cdef fg.JSONUI* json_ui = fg.newFactoryJSONUI(
+            self.ptr.getName(),
+            dsp.getNumInputs(),
+            dsp.getNumOutputs(),
+            self.ptr.getSHAKey(),
+            string(fl.getCLibFaustVersion()),
+            self.ptr.getCompileOptions(),
+            self.ptr.getLibraryList(),
+            self.ptr.getIncludePathnames())
+        try:
+            dsp.buildUserInterface(<fg.UI*>json_ui)
+            dsp.metadata(<fg.Meta*>json_ui)
+            return json_ui.JSON(flat).decode()
+        finally:
+            del json_ui
+            del dsp
+
     # -------------------------------------------------------------------------
     # DSP instance creation
     # -------------------------------------------------------------------------
@@ -119,7 +148,8 @@ cdef class LlvmDspFactory:
         The factory keeps track of all allocated instances.
         """
         cdef fl.llvm_dsp* dsp = self.ptr.createDSPInstance()
-        instance = LlvmDsp.from_ptr(dsp)
+        is_double = "-double" in self.get_compile_options().split()
+        instance = LlvmDsp.from_ptr(dsp, False, is_double)
         self.instances.add(instance)
         return instance
 
@@ -586,7 +616,7 @@ cdef class LlvmDspFactory:
 # LlvmDsp - LLVM DSP instance class
 # -----------------------------------------------------------------------------
 
-cdef class LlvmDsp:
+cdef class LlvmDsp(Dsp):
     """LLVM DSP instance class with methods.
 
     Represents a DSP instance compiled to native machine code via LLVM JIT.
@@ -594,12 +624,8 @@ cdef class LlvmDsp:
 
     cdef fl.llvm_dsp* ptr
     cdef bint ptr_owner
-    cdef fg.SoundUI* sound_ui
 
     def __dealloc__(self):
-        if self.sound_ui:
-            del self.sound_ui
-            self.sound_ui = NULL
         if self.ptr and self.ptr_owner:
             del self.ptr
             self.ptr = NULL
@@ -607,204 +633,36 @@ cdef class LlvmDsp:
     def __cinit__(self):
         self.ptr = NULL
         self.ptr_owner = False
-        self.sound_ui = NULL
 
     def delete(self):
         """Manually delete the DSP instance."""
         del self.ptr
 
     @staticmethod
-    cdef LlvmDsp from_ptr(fl.llvm_dsp* ptr, bint owner=False):
+    cdef LlvmDsp from_ptr(fl.llvm_dsp* ptr, bint owner=False, bint is_double=False):
         """Wrap the dsp instance and manage its lifetime."""
         cdef LlvmDsp dsp = LlvmDsp.__new__(LlvmDsp)
         dsp.ptr_owner = owner
         dsp.ptr = ptr
+        dsp.set_native(<fi.dsp*>ptr, is_double)
         return dsp
 
-    # -------------------------------------------------------------------------
-    # DSP properties
-    # -------------------------------------------------------------------------
-
-    def get_numinputs(self) -> int:
-        """Return instance number of audio inputs."""
-        return self.ptr.getNumInputs()
-
-    def get_numoutputs(self) -> int:
-        """Return instance number of audio outputs."""
-        return self.ptr.getNumOutputs()
-
-    def get_samplerate(self) -> int:
-        """Return the sample rate currently used by the instance."""
-        return self.ptr.getSampleRate()
-
-    # -------------------------------------------------------------------------
-    # Initialization
-    # -------------------------------------------------------------------------
-
-    def init(self, int sample_rate):
-        """Global init, calls static class init and instance init.
-
-        Args:
-            sample_rate: The sample rate in Hz
-        """
-        self.ptr.init(sample_rate)
-
-    def instance_init(self, int sample_rate):
-        """Init instance state.
-
-        Args:
-            sample_rate: The sample rate in Hz
-        """
-        self.ptr.instanceInit(sample_rate)
-
-    def instance_constants(self, int sample_rate):
-        """Init instance constant state.
-
-        Args:
-            sample_rate: The sample rate in Hz
-        """
-        self.ptr.instanceConstants(sample_rate)
-
-    def instance_reset_user_interface(self):
-        """Init default control parameters values."""
-        self.ptr.instanceResetUserInterface()
-
-    def instance_clear(self):
-        """Init instance state but keep the control parameter values."""
-        self.ptr.instanceClear()
-
-    # -------------------------------------------------------------------------
-    # Clone and metadata
-    # -------------------------------------------------------------------------
-
     def clone(self) -> LlvmDsp:
         """Return a clone of the instance."""
         cdef fl.llvm_dsp* dsp = self.ptr.clone()
-        return LlvmDsp.from_ptr(dsp)
-
-    def metadata(self) -> dict:
-        """Get DSP metadata as a dictionary.
-
-        Returns:
-            dict: Dictionary of metadata key-value pairs
-        """
-        cdef MetaCollector collector = MetaCollector()
-        self.ptr.metadata(<fg.Meta*>collector.ptr)
-        return collector.get_metadata()
-
-    # -------------------------------------------------------------------------
-    # User interface
-    # -------------------------------------------------------------------------
-
-    def build_user_interface(self, str sound_directory="", int sample_rate=-1):
-        """Trigger the ui_interface parameter with instance specific calls.
-
-        Calls are made to 'openTabBox', 'addButton',
-        'addVerticalSlider'... in order to build the UI.
-
-        This method also loads any soundfiles referenced in the DSP code.
-
-        Args:
-            sound_directory: Base directory for soundfile paths (default: current directory)
-            sample_rate: Sample rate for resampling soundfiles (-1 for no resampling)
-        """
-        if self.sound_ui:
-            del self.sound_ui
-            self.sound_ui = NULL
-
-        self.sound_ui = new fg.SoundUI(
-            sound_directory.encode('utf8'),
-            sample_rate,
-            <fg.SoundfileReader*>NULL,
-            False  # is_double=False for float audio
-        )
-        self.ptr.buildUserInterface(<fg.UI*>self.sound_ui)
-
-    # -------------------------------------------------------------------------
-    # Audio computation
-    # -------------------------------------------------------------------------
-
-    def compute(self, int count, float[:, ::1] inputs not None, float[:, ::1] outputs not None):
-        """DSP instance computation with successive in/out audio buffers.
-
-        Args:
-            count: Number of frames to compute
-            inputs: 2D input audio buffers as memoryview [channels, samples]
-            outputs: 2D output audio buffers as memoryview [channels, samples]
-        """
-        cdef float** input_ptrs = <float**>malloc(inputs.shape[0] * sizeof(float*))
-        cdef float** output_ptrs = <float**>malloc(outputs.shape[0] * sizeof(float*))
-
-        try:
-            for i in range(inputs.shape[0]):
-                input_ptrs[i] = &inputs[i, 0]
-            for i in range(outputs.shape[0]):
-                output_ptrs[i] = &outputs[i, 0]
-
-            self.ptr.compute(count, input_ptrs, output_ptrs)
-        finally:
-            free(input_ptrs)
-            free(output_ptrs)
+        return LlvmDsp.from_ptr(dsp, False, self.is_double)
 
 
 # -----------------------------------------------------------------------------
 # RtAudioDriver for LLVM DSP
 # -----------------------------------------------------------------------------
 
-cdef class LlvmRtAudioDriver:
-    """Faust audio driver using rtaudio cross-platform lib for LLVM DSP."""
-    cdef fl.rtaudio *ptr
-    cdef bint ptr_owner
-
-    def __dealloc__(self):
-        if self.ptr and self.ptr_owner:
-            del self.ptr
-            self.ptr = NULL
+cdef class LlvmRtAudioDriver(RtAudioDriver):
+    """Faust audio driver using rtaudio cross-platform lib for LLVM DSP.
 
-    def __cinit__(self, int srate, int bsize):
-        self.ptr = new fl.rtaudio(srate, bsize)
-        self.ptr_owner = True
-
-    def set_dsp(self, dsp: LlvmDsp):
-        """Set LlvmDsp instance."""
-        self.ptr.setDsp(<fl.dsp*>dsp.ptr)
-
-    def init(self, dsp: LlvmDsp) -> bool:
-        """Initialize with dsp instance."""
-        name = "LlvmRtAudioDriver".encode('utf8')
-        if self.ptr.init(name, dsp.get_numinputs(), dsp.get_numoutputs()):
-            self.set_dsp(dsp)
-            return True
-        return False
-
-    def start(self):
-        """Start audio driver."""
-        if not self.ptr.start():
-            print("LlvmRtAudioDriver: could not start")
-
-    def stop(self):
-        """Stop audio driver."""
-        self.ptr.stop()
-
-    @property
-    def buffersize(self):
-        """Get buffersize."""
-        return self.ptr.getBufferSize()
-
-    @property
-    def samplerate(self):
-        """Get samplerate."""
-        return self.ptr.getSampleRate()
-
-    @property
-    def numinputs(self):
-        """Get number of inputs."""
-        return self.ptr.getNumInputs()
-
-    @property
-    def numoutputs(self):
-        """Get number of outputs."""
-        return self.ptr.getNumOutputs()
+    Kept for backward compatibility: RtAudioDriver accepts DSP instances
+    of every backend.
+    """
 
 
 # -----------------------------------------------------------------------------
@@ -850,6 +708,71 @@ def llvm_create_dsp_factory_from_boxes(str name_app, Box box, str target="", int
     """Create an LLVM DSP factory from a box expression."""
     return LlvmDspFactory.from_boxes(name_app, box, target, opt_level, *args)
 
+def _llvm_cached_factory(expanded, jit, str target, int opt_level, tuple args, cache):
+    """Load a factory from the machine code cache, or JIT it and cache it.
+
+    Entries are keyed by the expanded DSP SHA key, the machine target, the
+    optimization level, the libfaust version and the compiler options. The
+    target recorded with an entry is checked before loading it; on any
+    mismatch or load failure the DSP is JIT-compiled again and the entry
+    replaced.
+    """
+    if expanded is None:
+        return None
+    if cache is None:
+        from cyfaust.cache import ArtifactCache
+        cache = ArtifactCache()
+    machine_target = target or get_dsp_machine_target()
+    key = cache.key(
+        expanded[0], "llvm-machine", machine_target, opt_level, llvm_get_version(), *args)
+
+    files = cache.get_tree(key)
+    if files and "machine" in files and files.get("target", b"").decode() == machine_target:
+        factory = LlvmDspFactory.from_machine(files["machine"].decode(), target)
+        if factory is not None:
+            return factory
+
+    factory = jit()
+    if factory is not None:
+        if files is not None:
+            # put_tree() keeps an existing entry: remove the stale one first
+            from shutil import rmtree
+            rmtree(cache.entry_path(key), ignore_errors=True)
+        cache.put_tree(key, {
+            "machine": factory.write_to_machine(target),
+            "target": machine_target,
+        })
+    return factory
+
+def llvm_create_cached_dsp_factory_from_file(str filename, str target="", int opt_level=-1, *args, cache=None) -> LlvmDspFactory:
+    """Create an LLVM DSP factory from a DSP file, reusing cached machine code.
+
+    The DSP is expanded to get its SHA key; machine code previously compiled
+    for the same expanded code, target, optimization level and options is
+    loaded instead of JIT-compiling again.
+
+    Args:
+        filename: Path to the DSP source file
+        target: LLVM target (empty string = current machine)
+        opt_level: LLVM optimization level (-1 to 4, -1 = max)
+        *args: Additional Faust compiler arguments
+        cache: cyfaust.cache.ArtifactCache to use (default: the default cache)
+    """
+    return _llvm_cached_factory(
+        expand_dsp_from_file(filename, *args),
+        lambda: LlvmDspFactory.from_file(filename, target, opt_level, *args),
+        target, opt_level, args, cache)
+
+def llvm_create_cached_dsp_factory_from_string(str name_app, str code, str target="", int opt_level=-1, *args, cache=None) -> LlvmDspFactory:
+    """Create an LLVM DSP factory from a DSP string, reusing cached machine code.
+
+    See llvm_create_cached_dsp_factory_from_file.
+    """
+    return _llvm_cached_factory(
+        expand_dsp_from_string(name_app, code, *args),
+        lambda: LlvmDspFactory.from_string(name_app, code, target, opt_level, *args),
+        target, opt_level, args, cache)
+
 def llvm_delete_all_dsp_factories():
     """Delete all Faust DSP factories kept in the library cache."""
     fl.deleteAllDSPFactories()
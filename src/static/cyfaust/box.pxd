@@ -40,6 +40,7 @@ cdef class Box:
     cdef fb.Box ptr
     cdef public int inputs
     cdef public int outputs
+    cdef object __weakref__
 
     @staticmethod
     cdef Box from_ptr(fb.Box ptr, bint ptr_owner=?)
@@ -14,6 +14,7 @@ from libc.stdlib cimport malloc, free
 from libcpp.string cimport string
 from libcpp.vector cimport vector
 from libcpp.map cimport map
+from libcpp.unordered_set cimport unordered_set
 from cython.operator cimport dereference as deref, preincrement as inc
 
 # -----------------------------------------------------------------------------
@@ -125,6 +126,7 @@ cdef class ParamArray:
 ## ======================================================================
 
 from libc.stdlib cimport malloc, free
+from libc.stddef cimport ptrdiff_t
 
 
 
@@ -132,6 +134,16 @@ from libc.stdlib cimport malloc, free
 
 
 
+# Sample types accepted by Dsp.compute() and Dsp.compute_pcm()
+ctypedef fused real_t:
+    float
+    double
+
+ctypedef fused pcm_t:
+    short
+    int
+
+
 ## ---------------------------------------------------------------------------
 ## faust/dsp/libfaust
 
@@ -219,6 +231,345 @@ def generate_auxfiles_from_string(name_app: str, dsp_content: str, *args) -> boo
         return
     return result
 
+def generate_auxfiles_from_file2(filename: str, *args) -> str:
+    """Generate additional files from a file, returning the result as a string.
+
+    Unlike generate_auxfiles_from_file, the generated target code is returned
+    instead of a success flag. Files such as SVG diagrams are still written
+    to disk: see cyfaust.auxfiles for fully in-memory results.
+    """
+    cdef ParamArray params = ParamArray(args)
+    cdef string error_msg
+    error_msg.reserve(4096)
+    cdef string result = fi.generateAuxFilesFromFile2(
+        filename.encode('utf8'),
+        params.argc,
+        params.argv,
+        error_msg
+    )
+    if not error_msg.empty():
+        print(error_msg.decode())
+        return
+    return result.decode()
+
+def generate_auxfiles_from_string2(name_app: str, dsp_content: str, *args) -> str:
+    """Generate additional files from a string, returning the result as a string.
+
+    Unlike generate_auxfiles_from_string, the generated target code is returned
+    instead of a success flag. Files such as SVG diagrams are still written
+    to disk: see cyfaust.auxfiles for fully in-memory results.
+    """
+    cdef ParamArray params = ParamArray(args)
+    cdef string error_msg
+    error_msg.reserve(4096)
+    cdef string result = fi.generateAuxFilesFromString2(
+        name_app.encode('utf8'),
+        dsp_content.encode('utf8'),
+        params.argc,
+        params.argv,
+        error_msg
+    )
+    if not error_msg.empty():
+        print(error_msg.decode())
+        return
+    return result.decode()
+
+## ---------------------------------------------------------------------------
+## backend-independent dsp and factory base classes
+
+
+cdef class DspFactory:
+    """Abstract base class of DSP factories (interpreter, LLVM, native)."""
+
+    def __init__(self, *args, **kwargs):
+        if type(self) is DspFactory:
+            raise TypeError("DspFactory is an abstract base class")
+
+    def get_name(self) -> str:
+        """Return factory name."""
+        raise NotImplementedError
+
+    def get_sha_key(self) -> str:
+        """Return factory SHA key."""
+        raise NotImplementedError
+
+    def get_json(self, bint flat=False) -> str:
+        """Return the factory description as a Faust JSON string."""
+        return self.create_dsp_instance().ui_json(flat)
+
+    def create_dsp_instance(self) -> Dsp:
+        """Create a new DSP instance."""
+        raise NotImplementedError
+
+
+cdef class Dsp:
+    """Abstract base class of DSP instances.
+
+    Subclasses wrap a backend-specific instance and point dsp_ptr at it,
+    so the methods below and RtAudioDriver work the same for every backend.
+    The instance itself is owned and deleted by the subclass.
+
+    An instance compiled with -double computes with double buffers: dsp_ptr
+    then points to an adapter converting from and to float buffers, and
+    compute() with float64 arrays runs it natively.
+    """
+
+    cdef fi.dsp* dsp_ptr
+    cdef fg.SoundUI* sound_ui
+    cdef fi.dsp_sample_formats* formats
+    cdef readonly bint is_double
+
+    def __cinit__(self):
+        self.dsp_ptr = NULL
+        self.sound_ui = NULL
+        self.formats = NULL
+        self.is_double = False
+
+    def __dealloc__(self):
+        if self.sound_ui:
+            del self.sound_ui
+            self.sound_ui = NULL
+        # safe after the subclass deleted the instance: adapters only keep
+        # its channel counts
+        if self.formats:
+            del self.formats
+            self.formats = NULL
+
+    cdef void set_native(self, fi.dsp* ptr, bint is_double=False):
+        """Set the wrapped instance, adapting it to float buffers if it computes in double."""
+        self.is_double = is_double
+        if is_double:
+            self.formats = new fi.dsp_sample_formats(ptr, True)
+            self.dsp_ptr = self.formats.floatDsp()
+        else:
+            self.dsp_ptr = ptr
+
+    cdef fi.dsp_sample_formats* get_formats(self):
+        if self.formats == NULL:
+            self.formats = new fi.dsp_sample_formats(self.dsp_ptr, False)
+        return self.formats
+
+    def __init__(self, *args, **kwargs):
+        if type(self) is Dsp:
+            raise TypeError("Dsp is an abstract base class")
+
+    def get_numinputs(self) -> int:
+        """Return instance number of audio inputs."""
+        return self.dsp_ptr.getNumInputs()
+
+    def get_numoutputs(self) -> int:
+        """Return instance number of audio outputs."""
+        return self.dsp_ptr.getNumOutputs()
+
+    def get_samplerate(self) -> int:
+        """Return the sample rate currently used by the instance."""
+        return self.dsp_ptr.getSampleRate()
+
+    def init(self, int sample_rate):
+        """Global init, calls static class init and instance init."""
+        self.dsp_ptr.init(sample_rate)
+
+    def instance_init(self, int sample_rate):
+        """Init instance state."""
+        self.dsp_ptr.instanceInit(sample_rate)
+
+    def instance_constants(self, int sample_rate):
+        """Init instance constant state."""
+        self.dsp_ptr.instanceConstants(sample_rate)
+
+    def instance_reset_user_interface(self):
+        """Init default control parameters values."""
+        self.dsp_ptr.instanceResetUserInterface()
+
+    def instance_clear(self):
+        """Init instance state but keep the control parameter values."""
+        self.dsp_ptr.instanceClear()
+
+    def clone(self) -> Dsp:
+        """Return a clone of the instance."""
+        raise TypeError(f"{type(self).__name__} cannot be cloned")
+
+    def build_user_interface(self, str sound_directory="", int sample_rate=-1):
+        """Trigger the ui_interface parameter with instance specific calls
+
+        Calls are made to 'openTabBox', 'addButton',
+        'addVerticalSlider'... in order to build the UI.
+
+        This method also loads any soundfiles referenced in the DSP code.
+
+        Args:
+            sound_directory: Base directory for soundfile paths (default: current directory)
+            sample_rate: Sample rate for resampling soundfiles (-1 for no resampling)
+        """
+        # Clean up previous SoundUI if it exists
+        if self.sound_ui:
+            del self.sound_ui
+            self.sound_ui = NULL
+
+        # Create SoundUI to handle soundfile loading
+        # Parameters: sound_directory, sample_rate, reader (NULL for default), is_double
+        self.sound_ui = new fg.SoundUI(
+            sound_directory.encode('utf8'),
+            sample_rate,
+            <fg.SoundfileReader*>NULL,
+            self.is_double
+        )
+        self.dsp_ptr.buildUserInterface(<fg.UI*>self.sound_ui)
+
+    def compute(self, int count, real_t[:, ::1] inputs not None, real_t[:, ::1] outputs not None,
+                bint mix=False, double gain=1.0):
+        """DSP instance computation with successive in/out audio buffers.
+
+        Buffers are either both float32 or both float64. float64 buffers are
+        computed natively by instances compiled with -double, and converted
+        in native code otherwise (and float32 ones the other way round).
+
+        With mix=True the outputs, scaled by gain, are added to the content
+        of the output buffers, as when summing DSPs into a bus. Passing the
+        same buffer as inputs and outputs computes in place, the inputs
+        being replaced by (or, with mix, mixed with) the outputs.
+
+        Args:
+            count: number of frames to compute
+            inputs: 2D input audio buffers as memoryview [channels, samples]
+            outputs: 2D output audio buffers as memoryview [channels, samples]
+            mix: add the outputs to the output buffers instead of replacing them
+            gain: gain applied to the outputs
+        """
+        cdef bint in_place = (inputs.shape[0] and inputs.shape[1] and outputs.shape[0]
+                              and outputs.shape[1] and &inputs[0, 0] == &outputs[0, 0])
+        # instances compiled with -cm add to outputs: replace them unless mixing
+        cdef bint adapted = mix or in_place or gain != 1.0 or self.get_formats().computesMix()
+        if adapted:
+            self.check_planar(count, inputs.shape[0], inputs.shape[1],
+                              outputs.shape[0], outputs.shape[1], in_place)
+
+        cdef real_t** input_ptrs = <real_t**>malloc(inputs.shape[0] * sizeof(real_t*))
+        cdef real_t** output_ptrs = <real_t**>malloc(outputs.shape[0] * sizeof(real_t*))
+
+        try:
+            for i in range(inputs.shape[0]):
+                input_ptrs[i] = &inputs[i, 0]
+            for i in range(outputs.shape[0]):
+                output_ptrs[i] = &outputs[i, 0]
+
+            if real_t is float:
+                if adapted:
+                    self.get_formats().computeMix[float](count, input_ptrs, output_ptrs, gain, mix, in_place)
+                else:
+                    fi.compute_no_denormals(self.dsp_ptr, count, input_ptrs, output_ptrs)
+            else:
+                if adapted:
+                    self.get_formats().computeMix[double](count, input_ptrs, output_ptrs, gain, mix, in_place)
+                else:
+                    self.get_formats().computeDouble(count, input_ptrs, output_ptrs)
+        finally:
+            free(input_ptrs)
+            free(output_ptrs)
+
+    cdef void check_planar(self, int count, Py_ssize_t in_channels, Py_ssize_t in_frames,
+                           Py_ssize_t out_channels, Py_ssize_t out_frames, bint in_place) except *:
+        """Validate [channels, frames] buffer shapes for mixing or in-place computation."""
+        cdef int num_inputs = self.dsp_ptr.getNumInputs()
+        cdef int num_outputs = self.dsp_ptr.getNumOutputs()
+        if in_channels != num_inputs or out_channels != num_outputs:
+            raise ValueError(f"expected [{num_inputs}, frames] inputs and [{num_outputs}, frames] outputs")
+        if in_place and (num_inputs != num_outputs or in_frames != out_frames):
+            raise ValueError("in-place computation needs as many inputs as outputs")
+        if count < 0 or count > in_frames or count > out_frames:
+            raise ValueError("count exceeds buffer frames")
+
+    cdef void check_frames(self, int count, Py_ssize_t in_frames, Py_ssize_t in_channels,
+                           Py_ssize_t out_frames, Py_ssize_t out_channels) except *:
+        """Validate [frames, channels] buffer shapes for count frames."""
+        cdef int num_inputs = self.dsp_ptr.getNumInputs()
+        cdef int num_outputs = self.dsp_ptr.getNumOutputs()
+        if in_channels != num_inputs or out_channels != num_outputs:
+            raise ValueError(f"expected [frames, {num_inputs}] inputs and [frames, {num_outputs}] outputs")
+        if count < 0 or count > in_frames or count > out_frames:
+            raise ValueError("count exceeds buffer frames")
+
+    def compute_interleaved(self, int count, real_t[:, :] inputs not None, real_t[:, :] outputs not None):
+        """DSP instance computation with interleaved or strided buffers.
+
+        Buffers are indexed [frame, channel] with any strides, so interleaved
+        arrays as well as transposed or sliced views of planar ones are used
+        in place: samples are gathered into and scattered from internal
+        planar buffers in native code, block by block.
+
+        Args:
+            count: number of frames to compute
+            inputs: float32 or float64 input buffer [frames, channels]
+            outputs: output buffer of the same type [frames, channels]
+        """
+        self.check_frames(count, inputs.shape[0], inputs.shape[1], outputs.shape[0], outputs.shape[1])
+        cdef Py_ssize_t size = sizeof(real_t)
+        cdef ptrdiff_t in_frame = inputs.strides[0] // size, in_chan = inputs.strides[1] // size
+        cdef ptrdiff_t out_frame = outputs.strides[0] // size, out_chan = outputs.strides[1] // size
+        cdef real_t* input_ptr = &inputs[0, 0] if inputs.shape[0] and inputs.shape[1] else NULL
+        cdef real_t* output_ptr = &outputs[0, 0] if outputs.shape[0] and outputs.shape[1] else NULL
+        if real_t is float:
+            self.get_formats().computeStrided[float, float](
+                count, input_ptr, in_frame, in_chan, output_ptr, out_frame, out_chan, 1.0)
+        else:
+            self.get_formats().computeStrided[double, double](
+                count, input_ptr, in_frame, in_chan, output_ptr, out_frame, out_chan, 1.0)
+
+    def compute_pcm(self, int count, pcm_t[:, :] inputs not None, pcm_t[:, :] outputs not None):
+        """DSP instance computation with interleaved integer PCM buffers.
+
+        Samples are converted in native code, full scale being 32768 for
+        int16 and 2**31 for int32; outputs are rounded and clipped. Like
+        compute_interleaved(), buffers may have any strides.
+
+        Args:
+            count: number of frames to compute
+            inputs: interleaved int16 or int32 input buffer [frames, channels]
+            outputs: interleaved output buffer of the same type [frames, channels]
+        """
+        self.check_frames(count, inputs.shape[0], inputs.shape[1], outputs.shape[0], outputs.shape[1])
+        cdef Py_ssize_t size = sizeof(pcm_t)
+        cdef ptrdiff_t in_frame = inputs.strides[0] // size, in_chan = inputs.strides[1] // size
+        cdef ptrdiff_t out_frame = outputs.strides[0] // size, out_chan = outputs.strides[1] // size
+        cdef pcm_t* input_ptr = &inputs[0, 0] if inputs.shape[0] and inputs.shape[1] else NULL
+        cdef pcm_t* output_ptr = &outputs[0, 0] if outputs.shape[0] and outputs.shape[1] else NULL
+        if pcm_t is short:
+            self.get_formats().computeStrided[short, float](
+                count, input_ptr, in_frame, in_chan, output_ptr, out_frame, out_chan, 32768.0)
+        else:
+            self.get_formats().computeStrided[int, float](
+                count, input_ptr, in_frame, in_chan, output_ptr, out_frame, out_chan, 2147483648.0)
+
+    def ui_json(self, bint flat=False) -> str:
+        """Return the instance UI and metadata as a Faust JSON string.
+
+        The JSON has 'name', 'inputs', 'outputs', 'meta' and 'ui' entries,
+        where 'ui' is the tree of groups and widgets with their addresses,
+        init values and ranges.
+
+        Args:
+            flat: if True, return the JSON on a single line
+        """
+        cdef fg.JSONUI* json_ui = new fg.JSONUI(
+            self.dsp_ptr.getNumInputs(), self.dsp_ptr.getNumOutputs())
+        try:
+            self.dsp_ptr.buildUserInterface(<fg.UI*>json_ui)
+            self.dsp_ptr.metadata(<fg.Meta*>json_ui)
+            return json_ui.JSON(flat).decode()
+        finally:
+            del json_ui
+
+    def metadata(self) -> dict:
+        """Get DSP metadata as a dictionary.
+
+        Returns:
+            dict: Dictionary of metadata key-value pairs (e.g., name, author, version, etc.)
+        """
+        cdef MetaCollector collector = MetaCollector()
+        self.dsp_ptr.metadata(<fg.Meta*>collector.ptr)
+        return collector.get_metadata()
+
+
 ## ---------------------------------------------------------------------------
 ## faust/audio/rtaudio-dsp
 
@@ -227,6 +578,7 @@ cdef class RtAudioDriver:
     """faust audio driver using rtaudio cross-platform lib."""
     cdef fi.rtaudio *ptr
     cdef bint ptr_owner
+    cdef object dsp
 
     def __dealloc__(self):
         if self.ptr and self.ptr_owner:
@@ -237,11 +589,13 @@ cdef class RtAudioDriver:
         self.ptr = new fi.rtaudio(srate, bsize)
         self.ptr_owner = True
 
-    def set_dsp(self, dsp: InterpreterDsp):
-        """"set InterpreterDsp instance."""
-        self.ptr.setDsp(<fi.dsp*>dsp.ptr)
+    def set_dsp(self, Dsp dsp not None):
+        """set dsp instance of any backend."""
+        self.ptr.setDsp(dsp.dsp_ptr)
+        # keep the instance alive while the driver uses it
+        self.dsp = dsp
 
-    def init(self, dsp: InterpreterDsp) -> bool:
+    def init(self, Dsp dsp not None) -> bool:
         """initialize with dsp instance."""
         name = "RtAudioDriver".encode('utf8')
         if self.ptr.init(name, dsp.get_numinputs(), dsp.get_numoutputs()):
@@ -287,7 +641,7 @@ def get_version():
     return fi.getCLibFaustVersion().decode()
 
 
-cdef class InterpreterDspFactory:
+cdef class InterpreterDspFactory(DspFactory):
     """Interpreter DSP factory class."""
 
     cdef fi.interpreter_dsp_factory* ptr
@@ -336,10 +690,40 @@ cdef class InterpreterDspFactory:
         """Get warning messages list for a given compilation."""
         return [msg.decode() for msg in self.ptr.getWarningMessages()]
 
+    def get_json(self, bint flat=False) -> str:
+        """Return the factory description as a Faust JSON string.
+
+        Includes name, SHA key, compile options, library list, I/O counts,
+        metadata and the full UI tree, gathered from a temporary instance.
+
+        Args:
+            flat: if True, return the JSON on a single line
+        """
+        cdef fi.interpreter_dsp* dsp = self.ptr.createDSPInstance()
+        if dsp == NULL:
+            return
+        cdef fg.JSONUI* json_ui = fg.newFactoryJSONUI(
+            self.ptr.getName(),
+            dsp.getNumInputs(),
+            dsp.getNumOutputs(),
+            self.ptr.getSHAKey(),
+            string(fi.getCLibFaustVersion()),
+            self.ptr.getCompileOptions(),
+            self.ptr.getLibraryList(),
+            self.ptr.getIncludePathnames())
+        try:
+            dsp.buildUserInterface(<fg.UI*>json_ui)
+            dsp.metadata(<fg.Meta*>json_ui)
+            return json_ui.JSON(flat).decode()
+        finally:
+            del json_ui
+            del dsp
+
     def create_dsp_instance(self) -> InterpreterDsp:
         """Create a new DSP instance, to be deleted with C++ 'delete'"""
         cdef fi.interpreter_dsp* dsp = self.ptr.createDSPInstance()
-        instance = InterpreterDsp.from_ptr(dsp)
+        is_double = "-double" in self.get_compile_options().split()
+        instance = InterpreterDsp.from_ptr(dsp, False, is_double)
         self.instances.add(instance)
         return instance
 
@@ -560,17 +944,13 @@ cdef class MetaCollector:
         return result
 
 
-cdef class InterpreterDsp:
+cdef class InterpreterDsp(Dsp):
     """DSP instance class with methods."""
 
     cdef fi.interpreter_dsp* ptr
     cdef bint ptr_owner
-    cdef fg.SoundUI* sound_ui
 
     def __dealloc__(self):
-        if self.sound_ui:
-            del self.sound_ui
-            self.sound_ui = NULL
         if self.ptr and self.ptr_owner:
             del self.ptr
             self.ptr = NULL
@@ -578,82 +958,23 @@ cdef class InterpreterDsp:
     def __cinit__(self):
         self.ptr = NULL
         self.ptr_owner = False
-        self.sound_ui = NULL
 
     def delete(self):
         del self.ptr
 
     @staticmethod
-    cdef InterpreterDsp from_ptr(fi.interpreter_dsp* ptr, bint owner=False):
+    cdef InterpreterDsp from_ptr(fi.interpreter_dsp* ptr, bint owner=False, bint is_double=False):
         """Wrap the dsp instance and manage its lifetime."""
         cdef InterpreterDsp dsp = InterpreterDsp.__new__(InterpreterDsp)
         dsp.ptr_owner = owner
         dsp.ptr = ptr
+        dsp.set_native(<fi.dsp*>ptr, is_double)
         return dsp
 
-    def get_numinputs(self) -> int:
-        """Return instance number of audio inputs."""
-        return self.ptr.getNumInputs()
-
-    def get_numoutputs(self) -> int:
-        """Return instance number of audio outputs."""
-        return self.ptr.getNumOutputs()
-
-    def get_samplerate(self) -> int:
-        """Return the sample rate currently used by the instance."""
-        return self.ptr.getSampleRate()
-
-    def init(self, int sample_rate):
-        """Global init, calls static class init and instance init."""
-        self.ptr.init(sample_rate)
-
-    def instance_init(self, int sample_rate):
-        """Init instance state."""
-        self.ptr.instanceInit(sample_rate)
-
-    def instance_constants(self, int sample_rate):
-        """Init instance constant state."""
-        self.ptr.instanceConstants(sample_rate)
-
-    def instance_reset_user_interface(self):
-        """Init default control parameters values."""
-        self.ptr.instanceResetUserInterface()
-
-    def instance_clear(self):
-        """Init instance state but keep the control parameter values."""
-        self.ptr.instanceClear()
-
     def clone(self) -> InterpreterDsp:
         """Return a clone of the instance."""
         cdef fi.interpreter_dsp* dsp = self.ptr.clone()
-        return InterpreterDsp.from_ptr(dsp)
-
-    def build_user_interface(self, str sound_directory="", int sample_rate=-1):
-        """Trigger the ui_interface parameter with instance specific calls
-
-        Calls are made to 'openTabBox', 'addButton',
-        'addVerticalSlider'... in order to build the UI.
-
-        This method also loads any soundfiles referenced in the DSP code.
-
-        Args:
-            sound_directory: Base directory for soundfile paths (default: current directory)
-            sample_rate: Sample rate for resampling soundfiles (-1 for no resampling)
-        """
-        # Clean up previous SoundUI if it exists
-        if self.sound_ui:
-            del self.sound_ui
-            self.sound_ui = NULL
-
-        # Create SoundUI to handle soundfile loading
-        # Parameters: sound_directory, sample_rate, reader (NULL for default), is_double
-        self.sound_ui = new fg.SoundUI(
-            sound_directory.encode('utf8'),
-            sample_rate,
-            <fg.SoundfileReader*>NULL,
-            False  # is_double=False for float audio
-        )
-        self.ptr.buildUserInterface(<fg.UI*>self.sound_ui)
+        return InterpreterDsp.from_ptr(dsp, False, self.is_double)
 
     def control(self):
         """Read all controllers (buttons, sliders, etc.), and update the DSP state.
@@ -672,30 +993,8 @@ cdef class InterpreterDsp:
             
         Note: This method will only be functional with the -os (--one-sample) option.
         """
-        self.ptr.frame(&inputs[0], &outputs[0])
+        fi.frame_no_denormals(<fi.dsp*>self.ptr, &inputs[0], &outputs[0])
         
-    def compute(self, int count, float[:, ::1] inputs not None, float[:, ::1] outputs not None):
-        """DSP instance computation with successive in/out audio buffers.
-
-        Args:
-            count: number of frames to compute
-            inputs: 2D input audio buffers as memoryview [channels, samples]
-            outputs: 2D output audio buffers as memoryview [channels, samples]
-        """
-        cdef float** input_ptrs = <float**>malloc(inputs.shape[0] * sizeof(float*))
-        cdef float** output_ptrs = <float**>malloc(outputs.shape[0] * sizeof(float*))
-
-        try:
-            for i in range(inputs.shape[0]):
-                input_ptrs[i] = &inputs[i, 0]
-            for i in range(outputs.shape[0]):
-                output_ptrs[i] = &outputs[i, 0]
-
-            self.ptr.compute(count, input_ptrs, output_ptrs)
-        finally:
-            free(input_ptrs)
-            free(output_ptrs)
-
     def compute_timestamped(self, double date_usec, int count, float[:, ::1] inputs not None, float[:, ::1] outputs not None):
         """DSP instance computation with timestamp for sample-accurate timing.
 
@@ -723,20 +1022,366 @@ cdef class InterpreterDsp:
                 output_ptrs[i] = &outputs[i, 0]
 
             # Call the standard compute - timestamp is for API compatibility
-            self.ptr.compute(count, input_ptrs, output_ptrs)
+            fi.compute_no_denormals(<fi.dsp*>self.ptr, count, input_ptrs, output_ptrs)
         finally:
             free(input_ptrs)
             free(output_ptrs)
 
-    def metadata(self) -> dict:
-        """Get DSP metadata as a dictionary.
 
-        Returns:
-            dict: Dictionary of metadata key-value pairs (e.g., name, author, version, etc.)
+cdef class NativeDspFactory(DspFactory):
+    """Factory of DSP instances from a native shared library.
+
+    The library is built from Faust C backend code by the system compiler,
+    see cyfaust.native.compile_native(). Instances keep their factory, and
+    with it the loaded library, alive.
+    """
+
+    cdef fi.native_dsp_module* ptr
+    cdef readonly str path
+    cdef readonly str sha_key
+
+    def __cinit__(self):
+        self.ptr = NULL
+        self.path = None
+        self.sha_key = None
+
+    def __dealloc__(self):
+        if self.ptr:
+            del self.ptr
+            self.ptr = NULL
+
+    @staticmethod
+    def from_library(str path, str sha_key="") -> NativeDspFactory:
+        """Load a native DSP shared library, returning None on error."""
+        cdef NativeDspFactory factory = NativeDspFactory.__new__(NativeDspFactory)
+        factory.ptr = new fi.native_dsp_module(path.encode('utf8'))
+        if not factory.ptr.isValid():
+            print(factory.ptr.fError.decode())
+            return None
+        factory.path = path
+        factory.sha_key = sha_key
+        return factory
+
+    def get_name(self) -> str:
+        """Return the DSP name (its 'name' metadata)."""
+        return self.create_dsp_instance().metadata().get("name", "")
+
+    def get_sha_key(self) -> str:
+        """Return the SHA key of the expanded DSP code it was built from."""
+        return self.sha_key
+
+    def create_dsp_instance(self) -> NativeDsp:
+        """Create a new DSP instance."""
+        return NativeDsp.from_ptr(new fi.native_dsp(self.ptr), self)
+
+
+cdef class NativeDsp(Dsp):
+    """DSP instance running natively compiled code."""
+
+    cdef fi.native_dsp* ptr
+    cdef NativeDspFactory factory
+
+    def __cinit__(self):
+        self.ptr = NULL
+
+    def __dealloc__(self):
+        if self.ptr:
+            del self.ptr
+            self.ptr = NULL
+
+    @staticmethod
+    cdef NativeDsp from_ptr(fi.native_dsp* ptr, NativeDspFactory factory):
+        """Wrap an owned instance, keeping its factory alive."""
+        cdef NativeDsp dsp = NativeDsp.__new__(NativeDsp)
+        dsp.ptr = ptr
+        dsp.dsp_ptr = <fi.dsp*>ptr
+        dsp.factory = factory
+        return dsp
+
+    def clone(self) -> NativeDsp:
+        """Return a new instance of the same DSP."""
+        return NativeDsp.from_ptr(<fi.native_dsp*>self.ptr.clone(), self.factory)
+
+
+cdef class HotSwapDsp(Dsp):
+    """DSP container whose instance can be replaced while audio is running.
+
+    Set it as the dsp of an RtAudioDriver, then call swap() from a control
+    thread with a new, initialized instance: the audio thread fades from
+    the current instance to the new one with a dsp_crossfader, without
+    blocking or allocating. Values of controls with the same path are
+    carried over to the new instance.
+
+    Instances are deleted by their factory: pass it along with each
+    instance so that it is kept alive as long as the instance is in use,
+    which for a swapped-out instance is until collect() returns True.
+    """
+
+    cdef fi.dsp_hot_swapper* ptr
+    cdef tuple current
+    cdef tuple previous
+    cdef int fade_samples
+
+    def __cinit__(self, Dsp dsp not None, int fade_samples=4096, factory=None):
+        self.ptr = new fi.dsp_hot_swapper(dsp.dsp_ptr, fade_samples)
+        self.dsp_ptr = <fi.dsp*>self.ptr
+        self.current = (dsp, factory)
+        self.previous = None
+        self.fade_samples = fade_samples
+
+    def __dealloc__(self):
+        if self.ptr:
+            del self.ptr
+            self.ptr = NULL
+
+    def clone(self) -> HotSwapDsp:
+        """Return a new container holding a clone of the current instance."""
+        return HotSwapDsp(self.current[0].clone(), self.fade_samples, self.current[1])
+
+    @property
+    def dsp(self) -> Dsp:
+        """The most recently swapped-in instance."""
+        return self.current[0]
+
+    @property
+    def factory(self):
+        """The factory passed with the most recently swapped-in instance."""
+        return self.current[1]
+
+    @property
+    def is_swapping(self) -> bool:
+        """True while a fade is pending, running or not yet collected."""
+        return self.ptr.isSwapping()
+
+    def swap(self, Dsp dsp not None, factory=None) -> bool:
+        """Start fading to a new instance, already initialized at the same sample rate.
+
+        Returns False if the previous swap has not been collected yet or if
+        the new instance has a different number of inputs or outputs.
         """
-        cdef MetaCollector collector = MetaCollector()
-        self.ptr.metadata(<fg.Meta*>collector.ptr)
-        return collector.get_metadata()
+        if not self.ptr.swap(dsp.dsp_ptr):
+            return False
+        self.previous = self.current
+        self.current = (dsp, factory)
+        return True
+
+    def collect(self) -> bool:
+        """Release a finished fade.
+
+        Returns True once the swapped-out instance is no longer used by the
+        audio thread, which also releases it (and its factory).
+        """
+        if not self.ptr.collect():
+            return False
+        self.previous = None
+        return True
+
+
+# Oversampling filter for each Oversampled quality (createSRAdapter filter numbers)
+OVERSAMPLING_QUALITIES = {
+    "none": 0,    # no filtering
+    "low": 1,     # 3rd order Butterworth lowpass
+    "medium": 2,  # 4th order Butterworth lowpass
+    "high": 3,    # 3rd order elliptic lowpass
+    "best": 4,    # 6th order elliptic lowpass
+}
+
+# Oversampling factors supported by dsp_up_sampler
+OVERSAMPLING_FACTORS = (2, 3, 4, 8, 16, 32)
+
+
+cdef class Oversampled(Dsp):
+    """DSP wrapper running an instance at a multiple of the sample rate.
+
+    Inputs are upsampled and outputs downsampled in native code by Faust's
+    dsp_up_sampler, with a lowpass filter on each side against aliasing,
+    which is useful for nonlinear DSPs such as distortions and waveshapers.
+    init() initializes the wrapped instance at factor times the sample
+    rate. The filters delay the signal by 'latency' samples.
+
+    The wrapper can be computed, played by RtAudioDriver or wrapped again;
+    the wrapped instance is kept alive but stays owned by its factory.
+
+    Args:
+        dsp: instance to oversample
+        factor: oversampling factor, one of 2, 3, 4, 8, 16 or 32
+        quality: filter, one of "none", "low", "medium", "high", "best"
+            (or 0 to 4)
+    """
+
+    cdef fi.dsp_oversampler* ptr
+    cdef readonly Dsp dsp
+    cdef readonly int factor
+    cdef readonly int filter
+
+    def __cinit__(self, Dsp dsp not None, int factor=2, quality="high"):
+        self.ptr = NULL
+        if factor not in OVERSAMPLING_FACTORS:
+            raise ValueError(f"factor must be one of {OVERSAMPLING_FACTORS}")
+        if isinstance(quality, str):
+            if quality not in OVERSAMPLING_QUALITIES:
+                raise ValueError(f"quality must be one of {tuple(OVERSAMPLING_QUALITIES)}")
+            quality = OVERSAMPLING_QUALITIES[quality]
+        self.ptr = new fi.dsp_oversampler(dsp.dsp_ptr, factor, quality)
+        if not self.ptr.isValid():
+            error = self.ptr.fError.decode().strip()
+            del self.ptr
+            self.ptr = NULL
+            raise ValueError(error)
+        self.dsp_ptr = <fi.dsp*>self.ptr
+        self.dsp = dsp
+        self.factor = factor
+        self.filter = quality
+
+    def __dealloc__(self):
+        if self.ptr:
+            del self.ptr
+            self.ptr = NULL
+
+    def clone(self) -> Oversampled:
+        """Return a wrapper of a clone of the wrapped instance."""
+        return Oversampled(self.dsp.clone(), self.factor, self.filter)
+
+    @property
+    def latency(self) -> float:
+        """Delay added by the filters in samples at the outer sample rate."""
+        return self.ptr.fLatency
+
+
+cdef class FixedBlockDsp(Dsp):
+    """DSP wrapper computing an instance in blocks of a fixed size.
+
+    compute() accepts any count: inputs are buffered in native code and the
+    wrapped instance only ever computes block_size frames at a time, as
+    needed by FFT-based DSPs or -vec builds tuned for one block size. The
+    outputs are delayed by 'latency' (block_size) frames.
+
+    The wrapper can be computed, played by RtAudioDriver or wrapped again;
+    the wrapped instance is kept alive but stays owned by its factory.
+
+    Args:
+        dsp: instance to compute in fixed blocks
+        block_size: number of frames computed at once by the instance
+    """
+
+    cdef fi.dsp_fixed_block* ptr
+    cdef readonly Dsp dsp
+    cdef readonly int block_size
+
+    def __cinit__(self, Dsp dsp not None, int block_size=512):
+        self.ptr = NULL
+        if block_size < 1:
+            raise ValueError("block_size must be positive")
+        self.ptr = new fi.dsp_fixed_block(dsp.dsp_ptr, block_size)
+        self.dsp_ptr = <fi.dsp*>self.ptr
+        self.dsp = dsp
+        self.block_size = block_size
+
+    def __dealloc__(self):
+        if self.ptr:
+            del self.ptr
+            self.ptr = NULL
+
+    def clone(self) -> FixedBlockDsp:
+        """Return a wrapper of a clone of the wrapped instance."""
+        return FixedBlockDsp(self.dsp.clone(), self.block_size)
+
+    @property
+    def latency(self) -> int:
+        """Delay added by the buffering in frames."""
+        return self.ptr.getLatency()
+
+
+# Actions of CheckedDsp on blocks holding NaN or infinite samples
+CHECK_ACTIONS = {"count": 0, "zero": 1, "abort": 2}
+
+
+cdef class CheckedDsp(Dsp):
+    """DSP wrapper monitoring the outputs of an instance for bad samples.
+
+    NaN, infinite and subnormal (denormal) output samples are counted per
+    channel in native code. Blocks holding NaN or infinite samples are
+    counted in 'bad_blocks' and, depending on 'action', kept ("count"),
+    cleared ("zero"), or cleared with the instance no longer computed until
+    reset() ("abort"), in which case compute() raises FloatingPointError.
+
+    Denormals are flushed to zero while computing, as by every compute call
+    and by RtAudioDriver; with flush_denormals=False they are kept so that
+    the instance producing them can be found.
+
+    The wrapper can be computed, played by RtAudioDriver or wrapped again;
+    the wrapped instance is kept alive but stays owned by its factory.
+
+    Args:
+        dsp: instance to monitor
+        action: "count", "zero" or "abort"
+        flush_denormals: flush denormals to zero while computing
+    """
+
+    cdef fi.dsp_health_checker* ptr
+    cdef readonly Dsp dsp
+    cdef readonly str action
+    cdef readonly bint flush_denormals
+
+    def __cinit__(self, Dsp dsp not None, str action="count", bint flush_denormals=True):
+        self.ptr = NULL
+        if action not in CHECK_ACTIONS:
+            raise ValueError(f"action must be one of {tuple(CHECK_ACTIONS)}")
+        self.ptr = new fi.dsp_health_checker(dsp.dsp_ptr, CHECK_ACTIONS[action], flush_denormals)
+        self.dsp_ptr = <fi.dsp*>self.ptr
+        self.dsp = dsp
+        self.action = action
+        self.flush_denormals = flush_denormals
+
+    def __dealloc__(self):
+        if self.ptr:
+            del self.ptr
+            self.ptr = NULL
+
+    def compute(self, count, inputs, outputs, mix=False, gain=1.0):
+        """Compute like Dsp.compute(), raising FloatingPointError once aborted."""
+        Dsp.compute(self, count, inputs, outputs, mix, gain)
+        if self.ptr.fAborted:
+            raise FloatingPointError(
+                f"NaN or infinite output on channel {self.ptr.fFaultChannel}, computation aborted")
+
+    def reset(self):
+        """Reset the counters and resume computing after an abort."""
+        self.ptr.reset()
+
+    def clone(self) -> CheckedDsp:
+        """Return a wrapper, with new counters, of a clone of the wrapped instance."""
+        return CheckedDsp(self.dsp.clone(), self.action, self.flush_denormals)
+
+    @property
+    def nan_counts(self) -> list:
+        """Number of NaN output samples per channel."""
+        return list(self.ptr.fNaN)
+
+    @property
+    def inf_counts(self) -> list:
+        """Number of infinite output samples per channel."""
+        return list(self.ptr.fInfinite)
+
+    @property
+    def denormal_counts(self) -> list:
+        """Number of subnormal output samples per channel."""
+        return list(self.ptr.fSubnormal)
+
+    @property
+    def bad_blocks(self) -> int:
+        """Number of computed blocks holding NaN or infinite samples."""
+        return self.ptr.fBadBlocks
+
+    @property
+    def fault_channel(self):
+        """First channel with a NaN or infinite sample, or None."""
+        return self.ptr.fFaultChannel if self.ptr.fFaultChannel >= 0 else None
+
+    @property
+    def aborted(self) -> bool:
+        """True once an "abort" action stopped the computation."""
+        return self.ptr.fAborted
 
 
 def get_dsp_factory_from_sha_key(str sha_key) -> InterpreterDspFactory:
@@ -747,8 +1392,16 @@ def create_dsp_factory_from_file(filename: str, *args) -> InterpreterDspFactory:
     """Create a Faust DSP factory from a DSP source code as a file."""
     return InterpreterDspFactory.from_file(filename, *args)
 
-def create_dsp_factory_from_string(name_app: str, code: str, *args) -> InterpreterDspFactory:
-    """Create a Faust DSP factory from a DSP source code as a string."""
+def create_dsp_factory_from_string(name_app: str, code: str, *args, outputs=None) -> InterpreterDspFactory:
+    """Create a Faust DSP factory from a DSP source code as a string.
+
+    outputs - indices of the outputs to compile, in their new order; the
+              computation feeding only the other outputs is removed
+              (default: all outputs, see cyfaust.transform.select_outputs)
+    """
+    if outputs is not None:
+        from cyfaust.transform import select_outputs_source
+        code, args = select_outputs_source(code, outputs, args)
     return InterpreterDspFactory.from_string(name_app, code, *args)
 
 def create_dsp_factory_from_signals(str name_app, SignalVector signals, *args) -> InterpreterDspFactory:
@@ -789,6 +1442,7 @@ def read_dsp_factory_from_bitcode_file(str bitcode_path) -> InterpreterDspFactor
 ## ======================================================================
 
 from libc.stdlib cimport malloc, free
+from libc.stdint cimport uintptr_t
 
 
 
@@ -823,6 +1477,34 @@ def box_or_number(var: Box | float | int) -> Box:
     raise TypeError("argument must be of type float or int or boxReal or boxInt")
 
 
+# Box wrappers by tree node address while interning (see intern_boxes())
+cdef object _box_intern = None
+
+def intern_boxes(bint enabled=True) -> bool:
+    """Share one Box wrapper per tree node.
+
+    libfaust trees are hash-consed: equal expressions are the same node.
+    While interning, boxes returned by the box functions are the same Python
+    object for the same node, so that Python-side state and identity checks
+    follow the node. Wrappers are held weakly and are freed when unused.
+
+    returns whether interning was enabled before.
+    """
+    global _box_intern
+    from weakref import WeakValueDictionary
+    cdef bint previous = _box_intern is not None
+    if enabled and _box_intern is None:
+        _box_intern = WeakValueDictionary()
+    elif not enabled:
+        _box_intern = None
+    return previous
+
+cdef void clear_box_intern():
+    """Forget interned wrappers, whose nodes are freed with the context."""
+    if _box_intern is not None:
+        _box_intern.clear()
+
+
 class box_context:
     """box context manager
 
@@ -831,6 +1513,7 @@ class box_context:
     def __enter__(self):
         fb.createLibContext()
     def __exit__(self, type, value, traceback):
+        clear_box_intern()
         fb.destroyLibContext()
 
 
@@ -865,6 +1548,14 @@ cdef class BoxVector:
         """Create source code in a target language from a box expression."""
         return create_source_from_boxes(name_app, self, lang, *args)
 
+    def walk(self, str order="post", bint unique=True):
+        """Iterate over the nodes of all boxes, sharing visits (see walk_box)."""
+        return walk_box(self, order, unique)
+
+    def __reduce__(self):
+        from cyfaust.serialize import deserialize, serialize
+        return deserialize, (serialize(self),)
+
 
 
 cdef class Box:
@@ -873,6 +1564,7 @@ cdef class Box:
     cdef fb.Box ptr
     cdef public int inputs
     cdef public int outputs
+    cdef object __weakref__
 
     def __cinit__(self):
         self.ptr = NULL
@@ -890,17 +1582,52 @@ cdef class Box:
     @staticmethod
     cdef Box from_ptr(fb.Box ptr, bint ptr_owner=False):
         """Wrap external factory from pointer"""
-        cdef Box box = Box.__new__(Box)
+        cdef Box box
+        if _box_intern is not None:
+            box = _box_intern.get(<uintptr_t>ptr)
+            if box is not None:
+                return box
+        box = Box.__new__(Box)
         box.ptr = ptr
+        if _box_intern is not None:
+            _box_intern[<uintptr_t>ptr] = box
         return box
 
+    @property
+    def id(self) -> int:
+        """Address of the tree node, the same for equal (hash-consed) boxes.
+
+        Boxes are not hashable, since `==` builds a box_eq expression: use id
+        as the dict key or set member, e.g. to memoize graph analyses.
+        """
+        return <uintptr_t>self.ptr
+
+    def is_same(self, Box other) -> bool:
+        """Return True if other wraps the same tree node.
+
+        `==` builds a box_eq expression instead.
+        """
+        return self.ptr == other.ptr
+
+    def classify(self) -> tuple:
+        """Return (kind, children, attrs) for this node (see classify_box)."""
+        return classify_box(self)
+
+    def walk(self, str order="post", bint unique=True):
+        """Iterate over the nodes of this box (see walk_box)."""
+        return walk_box(self, order, unique)
+
+    def __reduce__(self):
+        from cyfaust.serialize import deserialize, serialize
+        return deserialize, (serialize(self),)
+
     @staticmethod
     def from_int(int value) -> Box:
         """Create box from int"""
         return box_int(value)
 
     @staticmethod
-    def from_float(float value) -> Box:
+    def from_float(double value) -> Box:
         """Create box from float"""
         return box_float(value)
 
@@ -1544,6 +2271,7 @@ def create_lib_context():
 
 def destroy_lib_context():
     """Destroy global compilation context, has to be done last."""
+    clear_box_intern()
     fb.destroyLibContext()
 
 
@@ -1599,7 +2327,7 @@ def box_int(int n) -> Box:
     return Box.from_ptr(b)
 
 
-def box_float(float n) -> Box:
+def box_float(double n) -> Box:
     """Constant real : for all t, x(t) = n.
 
     n - the float/double value (depends of -single or -double compilation parameter)
@@ -1687,6 +2415,71 @@ def box_par5(Box a, Box b, Box c, Box d, Box e) -> Box:
     cdef fb.Box p = fb.boxPar5(a.ptr, b.ptr, c.ptr, d.ptr, e.ptr)
     return Box.from_ptr(p)
 
+
+cdef fb.tvec box_nodes(boxes) except *:
+    """Return the nodes of a BoxVector or of an iterable of boxes."""
+    cdef fb.tvec nodes
+    if isinstance(boxes, BoxVector):
+        nodes = (<BoxVector>boxes).ptr
+    else:
+        for b in boxes:
+            nodes.push_back((<Box?>b).ptr)
+    if nodes.empty():
+        raise ValueError("at least one box is needed")
+    return nodes
+
+cdef fb.Box box_tree(const fb.tvec& nodes, size_t lo, size_t hi, int op):
+    """Combine nodes[lo:hi] as a balanced tree of par (0), seq (1) or add (2)."""
+    if hi - lo == 1:
+        return nodes[lo]
+    cdef size_t mid = lo + (hi - lo) // 2
+    cdef fb.Box x = box_tree(nodes, lo, mid, op)
+    cdef fb.Box y = box_tree(nodes, mid, hi, op)
+    if op == 0:
+        return fb.boxPar(x, y)
+    if op == 1:
+        return fb.boxSeq(x, y)
+    return fb.boxAdd(x, y)
+
+def box_par_n(boxes) -> Box:
+    """The parallel composition of any number of blocks (e.g., A,B,...,Z).
+
+    boxes - a BoxVector or an iterable of boxes
+
+    The composition is built natively as a balanced tree, so large
+    compositions stay shallow.
+
+    returns the par box.
+    """
+    cdef fb.tvec nodes = box_nodes(boxes)
+    return Box.from_ptr(box_tree(nodes, 0, nodes.size(), 0))
+
+def box_seq_n(boxes) -> Box:
+    """The sequential composition of any number of blocks (e.g., A:B:...:Z).
+
+    boxes - a BoxVector or an iterable of boxes, where the outputs of each
+            box match the inputs of the next one
+
+    The composition is built natively as a balanced tree.
+
+    returns the seq box.
+    """
+    cdef fb.tvec nodes = box_nodes(boxes)
+    return Box.from_ptr(box_tree(nodes, 0, nodes.size(), 1))
+
+def box_sum_n(boxes) -> Box:
+    """The sum of any number of single-output blocks (e.g., A+B+...+Z).
+
+    boxes - a BoxVector or an iterable of boxes with one output each
+
+    The additions are built natively as a balanced tree, e.g. the sum of n
+    wires mixes n inputs down to one output with log2(n) adders per path.
+
+    returns the sum box.
+    """
+    cdef fb.tvec nodes = box_nodes(boxes)
+    return Box.from_ptr(box_tree(nodes, 0, nodes.size(), 2))
+
 def box_split(Box x, Box y) -> Box:
     """The split composition (e.g., A<:B) operator is used to distribute
     the outputs of A to the inputs of B.
@@ -3145,6 +3938,351 @@ def getparams_box_with_local_def(Box t) -> dict:
         return {}
 
 
+## ---------------------------------------------------------------------------
+## node classification and traversal
+
+cpdef enum BoxKind:
+    kBoxInt
+    kBoxReal
+    kBoxWire
+    kBoxCut
+    kBoxSeq
+    kBoxPar
+    kBoxSplit
+    kBoxMerge
+    kBoxRec
+    kBoxRoute
+    kBoxPrim
+    kBoxXtended
+    kBoxFFun
+    kBoxFConst
+    kBoxFVar
+    kBoxButton
+    kBoxCheckbox
+    kBoxHSlider
+    kBoxVSlider
+    kBoxNumEntry
+    kBoxHBargraph
+    kBoxVBargraph
+    kBoxHGroup
+    kBoxVGroup
+    kBoxTGroup
+    kBoxWaveform
+    kBoxSoundfile
+    kBoxSlot
+    kBoxSymbolic
+    kBoxIdent
+    kBoxAbstr
+    kBoxAppl
+    kBoxAccess
+    kBoxWithLocalDef
+    kBoxMetadata
+    kBoxCase
+    kBoxComponent
+    kBoxLibrary
+    kBoxEnvironment
+    kBoxIPar
+    kBoxISeq
+    kBoxISum
+    kBoxIProd
+    kBoxInputs
+    kBoxOutputs
+    kBoxError
+    kBoxOther
+
+
+cdef void push_box_branches(fb.Box b, fb.tvec& out):
+    cdef fs.tvec branches = fs.sigBranches(<fs.Signal>b)
+    cdef size_t i, n = branches.size()
+    for i in range(n):
+        out.push_back(<fb.Box>branches[i])
+
+cdef str box_label(fb.Box b):
+    """Return the string of a label box, or '' if it is not a string."""
+    try:
+        return fb.tree2str(b).decode()
+    except RuntimeError:
+        return ""
+
+cdef BoxKind box_node(fb.Box b, fb.tvec& children, dict attrs):
+    """Classify a box node, appending its box operands to children.
+
+    Scalar parameters are stored in attrs, unless attrs is None.
+    """
+    cdef int i = 0
+    cdef double r = 0.0
+    cdef const char* name = NULL
+    cdef fb.prim0 p0
+    cdef fb.prim1 p1
+    cdef fb.prim2 p2
+    cdef fb.prim3 p3
+    cdef fb.prim4 p4
+    cdef fb.prim5 p5
+    cdef fb.Box x = NULL, y = NULL, z = NULL, u = NULL, v = NULL
+    cdef BoxKind kind = kBoxOther
+    if fb.isBoxInt(b, &i):
+        if attrs is not None:
+            attrs["value"] = i
+        return kBoxInt
+    if fb.isBoxReal(b, &r):
+        if attrs is not None:
+            attrs["value"] = r
+        return kBoxReal
+    if fb.isBoxWire(b):
+        return kBoxWire
+    if fb.isBoxCut(b):
+        return kBoxCut
+    if fb.isBoxSeq(b, x, y):
+        kind = kBoxSeq
+    elif fb.isBoxPar(b, x, y):
+        kind = kBoxPar
+    elif fb.isBoxSplit(b, x, y):
+        kind = kBoxSplit
+    elif fb.isBoxMerge(b, x, y):
+        kind = kBoxMerge
+    elif fb.isBoxRec(b, x, y):
+        kind = kBoxRec
+    elif fb.isBoxAbstr(b, x, y):
+        kind = kBoxAbstr
+    elif fb.isBoxAppl(b, x, y):
+        kind = kBoxAppl
+    elif fb.isBoxAccess(b, x, y):
+        kind = kBoxAccess
+    elif fb.isBoxWithLocalDef(b, x, y):
+        kind = kBoxWithLocalDef
+    elif fb.isBoxMetadata(b, x, y):
+        kind = kBoxMetadata
+    elif fb.isBoxSymbolic(b, x, y):
+        kind = kBoxSymbolic
+    if kind != kBoxOther:
+        children.push_back(x)
+        children.push_back(y)
+        return kind
+    if fb.isBoxRoute(b, x, y, z):
+        # inputs, outputs, routing pairs
+        children.push_back(x)
+        children.push_back(y)
+        children.push_back(z)
+        return kBoxRoute
+    if fb.isBoxPrim0(b, &p0):
+        name, i = fb.prim0name(p0), 0
+    elif fb.isBoxPrim1(b, &p1):
+        name, i = fb.prim1name(p1), 1
+    elif fb.isBoxPrim2(b, &p2):
+        name, i = fb.prim2name(p2), 2
+    elif fb.isBoxPrim3(b, &p3):
+        name, i = fb.prim3name(p3), 3
+    elif fb.isBoxPrim4(b, &p4):
+        name, i = fb.prim4name(p4), 4
+    elif fb.isBoxPrim5(b, &p5):
+        name, i = fb.prim5name(p5), 5
+    if name != NULL:
+        if attrs is not None:
+            attrs["name"] = name.decode()
+            attrs["arity"] = i
+        return kBoxPrim
+    if fb.getUserData(b) != NULL:
+        if attrs is not None:
+            attrs["name"] = fs.xtendedName(<fs.Signal>b).decode()
+            attrs["arity"] = fs.xtendedArity(<fs.Signal>b)
+        return kBoxXtended
+    if fb.isBoxHSlider(b, v, x, y, z, u):
+        kind = kBoxHSlider
+    elif fb.isBoxVSlider(b, v, x, y, z, u):
+        kind = kBoxVSlider
+    elif fb.isBoxNumEntry(b, v, x, y, z, u):
+        kind = kBoxNumEntry
+    if kind != kBoxOther:
+        # init, min, max, step
+        children.push_back(x)
+        children.push_back(y)
+        children.push_back(z)
+        children.push_back(u)
+        if attrs is not None:
+            attrs["label"] = box_label(v)
+        return kind
+    if fb.isBoxButton(b, v):
+        kind = kBoxButton
+    elif fb.isBoxCheckbox(b, v):
+        kind = kBoxCheckbox
+    if kind != kBoxOther:
+        if attrs is not None:
+            attrs["label"] = box_label(v)
+        return kind
+    if fb.isBoxHBargraph(b, v, x, y):
+        kind = kBoxHBargraph
+    elif fb.isBoxVBargraph(b, v, x, y):
+        kind = kBoxVBargraph
+    if kind != kBoxOther:
+        # min, max
+        children.push_back(x)
+        children.push_back(y)
+        if attrs is not None:
+            attrs["label"] = box_label(v)
+        return kind
+    if fb.isBoxHGroup(b, v, x):
+        kind = kBoxHGroup
+    elif fb.isBoxVGroup(b, v, x):
+        kind = kBoxVGroup
+    elif fb.isBoxTGroup(b, v, x):
+        kind = kBoxTGroup
+    if kind != kBoxOther:
+        children.push_back(x)
+        if attrs is not None:
+            attrs["label"] = box_label(v)
+        return kind
+    if fb.isBoxSoundfile(b, v, x):
+        # number of channels
+        children.push_back(x)
+        if attrs is not None:
+            attrs["label"] = box_label(v)
+        return kBoxSoundfile
+    if fb.isBoxWaveform(b):
+        push_box_branches(b, children)
+        return kBoxWaveform
+    if fb.isBoxFFun(b, x):
+        if attrs is not None:
+            attrs["name"] = fb.ffname(<fb.Signal>x).decode()
+            attrs["arity"] = fb.ffarity(<fb.Signal>x)
+        return kBoxFFun
+    if fb.isBoxFConst(b, x, y, z):
+        kind = kBoxFConst
+    elif fb.isBoxFVar(b, x, y, z):
+        kind = kBoxFVar
+    if kind != kBoxOther:
+        if attrs is not None:
+            attrs["type"] = SType(fb.tree2int(x))
+            attrs["name"] = box_label(y)
+            attrs["file"] = box_label(z)
+        return kind
+    if fb.isBoxSlot(b, &i):
+        if attrs is not None:
+            attrs["id"] = i
+        return kBoxSlot
+    if fb.isBoxIdent(b, &name):
+        if attrs is not None:
+            attrs["name"] = name.decode()
+        return kBoxIdent
+    if fb.isBoxIPar(b, x, y, z):
+        kind = kBoxIPar
+    elif fb.isBoxISeq(b, x, y, z):
+        kind = kBoxISeq
+    elif fb.isBoxISum(b, x, y, z):
+        kind = kBoxISum
+    elif fb.isBoxIProd(b, x, y, z):
+        kind = kBoxIProd
+    if kind != kBoxOther:
+        # variable, count, body
+        children.push_back(x)
+        children.push_back(y)
+        children.push_back(z)
+        return kind
+    if fb.isBoxInputs(b, x):
+        kind = kBoxInputs
+    elif fb.isBoxOutputs(b, x):
+        kind = kBoxOutputs
+    elif fb.isBoxCase(b, x):
+        kind = kBoxCase
+    if kind != kBoxOther:
+        children.push_back(x)
+        return kind
+    if fb.isBoxComponent(b, x):
+        kind = kBoxComponent
+    elif fb.isBoxLibrary(b, x):
+        kind = kBoxLibrary
+    if kind != kBoxOther:
+        if attrs is not None:
+            attrs["filename"] = box_label(x)
+        return kind
+    if fb.isBoxEnvironment(b):
+        return kBoxEnvironment
+    if fb.isBoxError(b):
+        return kBoxError
+    push_box_branches(b, children)
+    return kBoxOther
+
+
+def classify_box(Box b) -> tuple:
+    """Classify a box node in one call.
+
+    b - the box
+
+    returns (kind, children, attrs): the BoxKind of the node, a tuple of its
+    box operands and a dict of its scalar parameters (value, name, arity,
+    label, ...). Primitives such as + or @ are kBoxPrim, mathematical
+    functions such as sin are kBoxXtended. Nodes of unknown kind are
+    kBoxOther with their raw tree branches as children.
+    """
+    cdef fb.tvec children
+    cdef dict attrs = {}
+    cdef BoxKind kind = box_node(b.ptr, children, attrs)
+    cdef size_t i, n = children.size()
+    return kind, tuple([Box.from_ptr(children[i]) for i in range(n)]), attrs
+
+
+def walk_box(root: Box | BoxVector, str order="post", bint unique=True):
+    """Iterate over the nodes of a box expression.
+
+    root - a box or a vector of boxes
+    order - "post" to visit operands before their node, "pre" to visit
+            nodes before their operands
+    unique - visit shared nodes once, otherwise once per path reaching them
+
+    returns a generator of boxes.
+    """
+    cdef BoxVector roots
+    if isinstance(root, BoxVector):
+        roots = root
+    elif isinstance(root, Box):
+        roots = BoxVector()
+        roots.add(root)
+    else:
+        raise TypeError("root must be a Box or a BoxVector")
+    if order not in ("pre", "post"):
+        raise ValueError(f"order must be 'pre' or 'post', not {order!r}")
+    return _walk_boxes(roots, order == "post", unique)
+
+def _walk_boxes(BoxVector roots, bint post, bint unique):
+    # Depth-first walk with an explicit stack: frame k visits its operands
+    # pending[start[k]:], the roots forming the operands of a NULL frame.
+    cdef fb.tvec pending = roots.ptr
+    cdef fb.tvec frames
+    cdef vector[size_t] start, position
+    cdef unordered_set[fb.Box] active, done
+    cdef fb.Box node
+    cdef size_t top, n
+    frames.push_back(NULL)
+    start.push_back(0)
+    position.push_back(0)
+    while frames.size():
+        top = frames.size() - 1
+        n = pending.size()
+        if start[top] + position[top] < n:
+            node = pending[start[top] + position[top]]
+            position[top] += 1
+            if active.count(node) or (unique and done.count(node)):
+                continue
+            if not post:
+                yield Box.from_ptr(node)
+            active.insert(node)
+            frames.push_back(node)
+            start.push_back(n)
+            position.push_back(0)
+            box_node(node, pending, None)
+        else:
+            node = frames[top]
+            pending.resize(start[top])
+            frames.pop_back()
+            start.pop_back()
+            position.pop_back()
+            if node != NULL:
+                active.erase(node)
+                if unique:
+                    done.insert(node)
+                if post:
+                    yield Box.from_ptr(node)
+
+
 def dsp_to_boxes(str name_app, str dsp_content, *args) -> Box:
     """Compile a DSP source code as a string in a flattened box
 
@@ -3243,6 +4381,7 @@ def create_source_from_boxes(str name_app, Box box, str lang, *args) -> str:
 ## Module: signal
 ## ======================================================================
 
+from libc.stdint cimport uintptr_t
 
 
 
@@ -3264,12 +4403,41 @@ def sig_or_int(var: Signal | int) -> Signal:
     raise TypeError("argument must be an int")
 
 
+# Signal wrappers by tree node address while interning (see intern_signals())
+cdef object _signal_intern = None
+
+def intern_signals(bint enabled=True) -> bool:
+    """Share one Signal wrapper per tree node.
+
+    libfaust trees are hash-consed: equal expressions are the same node.
+    While interning, signals returned by the signal functions are the same
+    Python object for the same node. Wrappers are held weakly and are freed
+    when unused.
+
+    returns whether interning was enabled before.
+    """
+    global _signal_intern
+    from weakref import WeakValueDictionary
+    cdef bint previous = _signal_intern is not None
+    if enabled and _signal_intern is None:
+        _signal_intern = WeakValueDictionary()
+    elif not enabled:
+        _signal_intern = None
+    return previous
+
+cdef void clear_signal_intern():
+    """Forget interned wrappers, whose nodes are freed with the context."""
+    if _signal_intern is not None:
+        _signal_intern.clear()
+
+
 class signal_context:
     def __enter__(self):
         # Create global compilation context, has to be done first.
         fs.createLibContext()
     def __exit__(self, type, value, traceback):
         # Destroy global compilation context, has to be done last.
+        clear_signal_intern()
         fs.destroyLibContext()
 
 
@@ -3309,6 +4477,14 @@ cdef class SignalVector:
         """
         return simplify_to_normal_form2(self)
 
+    def walk(self, str order="post", bint unique=True):
+        """Iterate over the nodes of all signals, sharing visits (see walk_signal)."""
+        return walk_signal(self, order, unique)
+
+    def __reduce__(self):
+        from cyfaust.serialize import deserialize, serialize
+        return deserialize, (serialize(self),)
+
 
 
 cdef class Interval:
@@ -3346,6 +4522,7 @@ cdef class Signal:
     """faust Signal wrapper.
     """
     cdef fs.Signal ptr
+    cdef object __weakref__
 
     def __cinit__(self):
         self.ptr = NULL
@@ -3353,10 +4530,33 @@ cdef class Signal:
     @staticmethod
     cdef Signal from_ptr(fs.Signal ptr, bint ptr_owner=False):
         """Wrap Signal from pointer"""
-        cdef Signal sig = Signal.__new__(Signal)
+        cdef Signal sig
+        if _signal_intern is not None:
+            sig = _signal_intern.get(<uintptr_t>ptr)
+            if sig is not None:
+                return sig
+        sig = Signal.__new__(Signal)
         sig.ptr = ptr
+        if _signal_intern is not None:
+            _signal_intern[<uintptr_t>ptr] = sig
         return sig
 
+    @property
+    def id(self) -> int:
+        """Address of the tree node, the same for equal (hash-consed) signals.
+
+        Signals are not hashable, since `==` builds a sig_eq expression: use
+        id as the dict key or set member, e.g. to memoize graph analyses.
+        """
+        return <uintptr_t>self.ptr
+
+    def is_same(self, Signal other) -> bool:
+        """Return True if other wraps the same tree node.
+
+        `==` builds a sig_eq expression instead.
+        """
+        return self.ptr == other.ptr
+
     @staticmethod
     def from_input(int idx) -> Signal:
         """Create signal from int"""
@@ -3368,7 +4568,7 @@ cdef class Signal:
         return sig_int(value)
 
     @staticmethod
-    def from_float(float value) -> Signal:
+    def from_float(double value) -> Signal:
         """Create signal from float"""
         return sig_real(value)
 
@@ -3476,14 +4676,33 @@ cdef class Signal:
         """Return the arity of a foreign function."""
         return ffarity(self)
 
-    # def get_interval(self) -> Interval:
-    #     """Get the signal interval."""
-    #     cdef fs.Interval *ival = <fs.Interval*>fs.getSigInterval(self.ptr)
-    #     return Interval.from_ptr(ival)
+    def classify(self) -> tuple:
+        """Return (kind, children, attrs) for this node (see classify_signal)."""
+        return classify_signal(self)
+
+    def walk(self, str order="post", bint unique=True):
+        """Iterate over the nodes of this signal (see walk_signal)."""
+        return walk_signal(self, order, unique)
 
+    def __reduce__(self):
+        from cyfaust.serialize import deserialize, serialize
+        return deserialize, (serialize(self),)
+
+    # get_interval / set_interval: These require signals that have been
+    # through type inference (e.g. after compilation). Calling them on raw
+    # signal trees causes a null dereference abort in libfaust's smart
+    # pointer layer. Uncomment when there's a safe way to check whether
+    # a signal has been type-annotated.
+    #
+    # def get_interval(self) -> Interval:
+    #     """Get the signal interval (lo, hi, lsb)."""
+    #     cdef fs.Interval* heap_ival = new fs.Interval(0, 0.0, 0)
+    #     heap_ival[0] = fs.getSigInterval(self.ptr)
+    #     return Interval.from_ptr(heap_ival)
+    #
     # def set_interval(self, Interval iv):
     #     """Set the signal interval."""
-    #     fs.setSigInterval(self.ptr, iv.ptr)
+    #     fs.setSigInterval(self.ptr, iv.ptr[0])
 
     def attach(self, Signal other) -> Signal:
         """Create an attached signal from another signal
@@ -4002,6 +5221,7 @@ def create_lib_context():
 def destroy_lib_context():
     """Destroy global compilation context, has to be done last.
     """
+    clear_signal_intern()
     fs.destroyLibContext()
 
 # def get_sig_interval(Signal s) -> Interval:
@@ -4084,7 +5304,7 @@ def sig_int(int n) -> Signal:
     return Signal.from_ptr(s)
 
 
-def sig_real(float n) -> Signal:
+def sig_real(double n) -> Signal:
     """Constant real : for all t, x(t) = n.
 
     n - the float/double value (depends of -single or -double compilation parameter)
@@ -4211,6 +5431,16 @@ def sig_waveform_float(float[:] view not None) -> Signal:
     cdef fs.Signal wf = fs.sigWaveform(wfv)
     return Signal.from_ptr(wf)
 
+def sig_waveform(SignalVector wf) -> Signal:
+    """Create a waveform.
+
+    wf - the content of the waveform as a vector of sigInt or sigReal signals
+
+    returns the waveform signal.
+    """
+    cdef fs.Signal s = fs.sigWaveform(wf.ptr)
+    return Signal.from_ptr(s)
+
 
 def sig_soundfile(*paths) -> Signal:
     """Create a soundfile block.
@@ -4346,6 +5576,32 @@ def sig_add(Signal x, Signal y) -> Signal:
     cdef fs.Signal s = fs.sigAdd(x.ptr, y.ptr)
     return Signal.from_ptr(s)
 
+cdef fs.Signal sig_sum_tree(const fs.tvec& nodes, size_t lo, size_t hi):
+    """Add nodes[lo:hi] as a balanced tree."""
+    if hi - lo == 1:
+        return nodes[lo]
+    cdef size_t mid = lo + (hi - lo) // 2
+    return fs.sigAdd(sig_sum_tree(nodes, lo, mid), sig_sum_tree(nodes, mid, hi))
+
+def sig_add_n(signals) -> Signal:
+    """The sum of any number of signals.
+
+    signals - a SignalVector or an iterable of signals
+
+    The additions are built natively as a balanced tree.
+
+    returns the sum signal.
+    """
+    cdef fs.tvec nodes
+    if isinstance(signals, SignalVector):
+        nodes = (<SignalVector>signals).ptr
+    else:
+        for sig in signals:
+            nodes.push_back((<Signal?>sig).ptr)
+    if nodes.empty():
+        raise ValueError("at least one signal is needed")
+    return Signal.from_ptr(sig_sum_tree(nodes, 0, nodes.size()))
+
 def sig_sub(Signal x, Signal y) -> Signal:
     cdef fs.Signal s = fs.sigSub(x.ptr, y.ptr)
     return Signal.from_ptr(s)
@@ -4823,8 +6079,8 @@ def is_sig_doc_access_tbl(Signal t) -> dict:
     cdef fs.Signal ridx = NULL
     if fs.isSigDocAccessTbl(t.ptr, tbl, ridx):
         return dict(
-            n=Signal.from_ptr(tbl),
-            widx=Signal.from_ptr(ridx),
+            tbl=Signal.from_ptr(tbl),
+            ridx=Signal.from_ptr(ridx),
         )
     else:
         return {}
@@ -5161,6 +6417,351 @@ def is_sig_soundfile_buffer(Signal s) -> dict:
         return {}
 
 
+## ---------------------------------------------------------------------------
+## node classification and traversal
+
+cpdef enum SigKind:
+    kSigInt
+    kSigReal
+    kSigInput
+    kSigOutput
+    kSigDelay1
+    kSigDelay
+    kSigPrefix
+    kSigBinOp
+    kSigXtended
+    kSigIntCast
+    kSigFloatCast
+    kSigSelect2
+    kSigReadTable
+    kSigWriteTable
+    kSigGen
+    kSigWaveform
+    kSigProj
+    kSigRec
+    kSigButton
+    kSigCheckbox
+    kSigHSlider
+    kSigVSlider
+    kSigNumEntry
+    kSigHBargraph
+    kSigVBargraph
+    kSigAttach
+    kSigEnable
+    kSigControl
+    kSigSoundfile
+    kSigSoundfileLength
+    kSigSoundfileRate
+    kSigSoundfileBuffer
+    kSigFFun
+    kSigFConst
+    kSigFVar
+    kSigAssertBounds
+    kSigHighest
+    kSigLowest
+    kSigOther
+
+
+cdef void push_branches(fs.Signal s, fs.tvec& out):
+    cdef fs.tvec branches = fs.sigBranches(s)
+    out.insert(out.end(), branches.begin(), branches.end())
+
+cdef void push_list(fs.Signal lst, fs.tvec& out):
+    """Append the elements of a libfaust list."""
+    cdef fs.tvec cell
+    while not fs.isNil(lst):
+        cell = fs.sigBranches(lst)
+        if cell.size() != 2:
+            out.push_back(lst)
+            return
+        out.push_back(cell[0])
+        lst = cell[1]
+
+cdef void push_label_parts(fs.Signal t, list parts):
+    cdef fs.tvec branches = fs.sigBranches(t)
+    cdef size_t k, n = branches.size()
+    cdef int i
+    if n:
+        for k in range(n):
+            push_label_parts(branches[k], parts)
+    elif not fs.isNil(t) and not fs.isSigInt(t, &i):
+        try:
+            parts.append(fs.tree2str(t).decode())
+        except RuntimeError:
+            pass
+
+cdef str tree_label(fs.Signal t):
+    """Return a label, with the enclosing UI groups of a label path as a/b/label."""
+    cdef list parts = []
+    push_label_parts(t, parts)
+    return "/".join(reversed(parts))
+
+cdef SigKind sig_node(fs.Signal s, fs.tvec& children, dict attrs):
+    """Classify a signal node, appending its signal operands to children.
+
+    Scalar parameters are stored in attrs, unless attrs is None.
+    """
+    cdef int i = 0
+    cdef double r = 0.0
+    cdef fs.Signal a = NULL, b = NULL, c = NULL, d = NULL, e = NULL
+    cdef SigKind kind = kSigOther
+    if fs.isSigInt(s, &i):
+        if attrs is not None:
+            attrs["value"] = i
+        return kSigInt
+    if fs.isSigReal(s, &r):
+        if attrs is not None:
+            attrs["value"] = r
+        return kSigReal
+    if fs.isSigInput(s, &i):
+        if attrs is not None:
+            attrs["index"] = i
+        return kSigInput
+    if fs.isSigBinOp(s, &i, a, b):
+        children.push_back(a)
+        children.push_back(b)
+        if attrs is not None:
+            attrs["op"] = SOperator(i)
+        return kSigBinOp
+    if fs.getUserData(s) != NULL:
+        push_branches(s, children)
+        if attrs is not None:
+            attrs["name"] = fs.xtendedName(s).decode()
+        return kSigXtended
+    if fs.isSigDelay1(s, a):
+        children.push_back(a)
+        return kSigDelay1
+    if fs.isSigDelay(s, a, b):
+        children.push_back(a)
+        children.push_back(b)
+        return kSigDelay
+    if fs.isSigPrefix(s, a, b):
+        children.push_back(a)
+        children.push_back(b)
+        return kSigPrefix
+    if fs.isSigIntCast(s, a):
+        children.push_back(a)
+        return kSigIntCast
+    if fs.isSigFloatCast(s, a):
+        children.push_back(a)
+        return kSigFloatCast
+    if fs.isSigSelect2(s, a, b, c):
+        children.push_back(a)
+        children.push_back(b)
+        children.push_back(c)
+        return kSigSelect2
+    if fs.isProj(s, &i, a):
+        children.push_back(a)
+        if attrs is not None:
+            attrs["index"] = i
+        return kSigProj
+    if fs.isRec(s, a, b):
+        push_list(b, children)
+        if attrs is not None:
+            attrs["var"] = tree_label(a)
+        return kSigRec
+    if fs.isSigOutput(s, &i, a):
+        children.push_back(a)
+        if attrs is not None:
+            attrs["index"] = i
+        return kSigOutput
+    if fs.isSigRDTbl(s, a, b):
+        children.push_back(a)
+        children.push_back(b)
+        return kSigReadTable
+    if fs.isSigWRTbl(s, a, b, c, d):
+        # size, generator, and the write index and signal unless read-only
+        children.push_back(a)
+        children.push_back(b)
+        if not fs.isNil(c):
+            children.push_back(c)
+            children.push_back(d)
+        return kSigWriteTable
+    if fs.isSigGen(s, a):
+        children.push_back(a)
+        return kSigGen
+    if fs.isSigWaveform(s):
+        push_branches(s, children)
+        return kSigWaveform
+    if fs.isSigHSlider(s, e, a, b, c, d):
+        kind = kSigHSlider
+    elif fs.isSigVSlider(s, e, a, b, c, d):
+        kind = kSigVSlider
+    elif fs.isSigNumEntry(s, e, a, b, c, d):
+        kind = kSigNumEntry
+    if kind != kSigOther:
+        # init, min, max, step
+        children.push_back(a)
+        children.push_back(b)
+        children.push_back(c)
+        children.push_back(d)
+        if attrs is not None:
+            attrs["label"] = tree_label(e)
+        return kind
+    if fs.isSigButton(s, e):
+        kind = kSigButton
+    elif fs.isSigCheckbox(s, e):
+        kind = kSigCheckbox
+    elif fs.isSigSoundfile(s, e):
+        kind = kSigSoundfile
+    if kind != kSigOther:
+        if attrs is not None:
+            attrs["label"] = tree_label(e)
+        return kind
+    if fs.isSigHBargraph(s, e, a, b, c):
+        kind = kSigHBargraph
+    elif fs.isSigVBargraph(s, e, a, b, c):
+        kind = kSigVBargraph
+    if kind != kSigOther:
+        # min, max, displayed signal
+        children.push_back(a)
+        children.push_back(b)
+        children.push_back(c)
+        if attrs is not None:
+            attrs["label"] = tree_label(e)
+        return kind
+    if fs.isSigAttach(s, a, b):
+        children.push_back(a)
+        children.push_back(b)
+        return kSigAttach
+    if fs.isSigEnable(s, a, b):
+        children.push_back(a)
+        children.push_back(b)
+        return kSigEnable
+    if fs.isSigControl(s, a, b):
+        children.push_back(a)
+        children.push_back(b)
+        return kSigControl
+    if fs.isSigSoundfileLength(s, a, b):
+        children.push_back(a)
+        children.push_back(b)
+        return kSigSoundfileLength
+    if fs.isSigSoundfileRate(s, a, b):
+        children.push_back(a)
+        children.push_back(b)
+        return kSigSoundfileRate
+    if fs.isSigSoundfileBuffer(s, a, b, c, d):
+        children.push_back(a)
+        children.push_back(b)
+        children.push_back(c)
+        children.push_back(d)
+        return kSigSoundfileBuffer
+    if fs.isSigFFun(s, e, a):
+        push_list(a, children)
+        if attrs is not None:
+            attrs["name"] = fs.ffname(e).decode()
+            attrs["arity"] = fs.ffarity(e)
+        return kSigFFun
+    if fs.isSigFConst(s, a, b, c):
+        kind = kSigFConst
+    elif fs.isSigFVar(s, a, b, c):
+        kind = kSigFVar
+    if kind != kSigOther:
+        if attrs is not None:
+            i = 0
+            fs.isSigInt(a, &i)
+            attrs["type"] = SType(i)
+            attrs["name"] = tree_label(b)
+            attrs["file"] = tree_label(c)
+        return kind
+    if fs.isSigAssertBounds(s, a, b, c):
+        children.push_back(a)
+        children.push_back(b)
+        children.push_back(c)
+        return kSigAssertBounds
+    if fs.isSigHighest(s, a):
+        children.push_back(a)
+        return kSigHighest
+    if fs.isSigLowest(s, a):
+        children.push_back(a)
+        return kSigLowest
+    push_branches(s, children)
+    return kSigOther
+
+
+def classify_signal(Signal s) -> tuple:
+    """Classify a signal node in one call.
+
+    s - the signal
+
+    returns (kind, children, attrs): the SigKind of the node, a tuple of its
+    signal operands and a dict of its scalar parameters (value, index, op,
+    name, label, ...). Nodes of unknown kind are kSigOther with their raw
+    tree branches as children.
+    """
+    cdef fs.tvec children
+    cdef dict attrs = {}
+    cdef SigKind kind = sig_node(s.ptr, children, attrs)
+    cdef size_t i, n = children.size()
+    return kind, tuple([Signal.from_ptr(children[i]) for i in range(n)]), attrs
+
+
+def walk_signal(root: Signal | SignalVector, str order="post", bint unique=True):
+    """Iterate over the nodes of a signal graph.
+
+    root - a signal or a vector of signals
+    order - "post" to visit operands before their node, "pre" to visit
+            nodes before their operands
+    unique - visit shared nodes once, otherwise once per path reaching them
+
+    Recursive definitions are not entered again from inside themselves, so
+    the walk also ends for recursive signals.
+
+    returns a generator of signals.
+    """
+    cdef SignalVector roots
+    if isinstance(root, SignalVector):
+        roots = root
+    elif isinstance(root, Signal):
+        roots = SignalVector()
+        roots.add(root)
+    else:
+        raise TypeError("root must be a Signal or a SignalVector")
+    if order not in ("pre", "post"):
+        raise ValueError(f"order must be 'pre' or 'post', not {order!r}")
+    return _walk_signals(roots, order == "post", unique)
+
+def _walk_signals(SignalVector roots, bint post, bint unique):
+    # Depth-first walk with an explicit stack: frame k visits its operands
+    # pending[start[k]:], the roots forming the operands of a NULL frame.
+    cdef fs.tvec pending = roots.ptr
+    cdef fs.tvec frames
+    cdef vector[size_t] start, position
+    cdef unordered_set[fs.Signal] active, done
+    cdef fs.Signal node
+    cdef size_t top, n
+    frames.push_back(NULL)
+    start.push_back(0)
+    position.push_back(0)
+    while frames.size():
+        top = frames.size() - 1
+        n = pending.size()
+        if start[top] + position[top] < n:
+            node = pending[start[top] + position[top]]
+            position[top] += 1
+            if active.count(node) or (unique and done.count(node)):
+                continue
+            if not post:
+                yield Signal.from_ptr(node)
+            active.insert(node)
+            frames.push_back(node)
+            start.push_back(n)
+            position.push_back(0)
+            sig_node(node, pending, None)
+        else:
+            node = frames[top]
+            pending.resize(start[top])
+            frames.pop_back()
+            start.pop_back()
+            position.pop_back()
+            if node != NULL:
+                active.erase(node)
+                if unique:
+                    done.insert(node)
+                if post:
+                    yield Signal.from_ptr(node)
+
+
 def simplify_to_normal_form(Signal s) -> Signal:
     """Simplify a signal to its normal form, where:
      
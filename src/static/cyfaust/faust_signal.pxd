@@ -83,7 +83,7 @@ cdef extern from "faust/dsp/libfaust-signal.h":
 
     bint isNil(Signal s)
 
-    const char* tree2str(Signal s)
+    const char* tree2str(Signal s) except +
 
     void* getUserData(Signal s)
 
@@ -39,6 +39,7 @@ cdef class SignalVector:
 
 cdef class Signal:
     cdef fs.Signal ptr
+    cdef object __weakref__
 
     @staticmethod
     cdef Signal from_ptr(fs.Signal ptr, bint ptr_owner=?)
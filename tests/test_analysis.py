@@ -0,0 +1,105 @@
+"""Tests for static cost estimation of signal graphs."""
+
+import pytest
+
+from cyfaust.analysis import DEFAULT_WEIGHTS, calibrate, estimate_cost, value_bounds
+
+try:
+    from cyfaust.signal import (
+        SignalVector,
+        sig_add,
+        sig_delay,
+        sig_div,
+        sig_hslider,
+        sig_input,
+        sig_int,
+        sig_mul,
+        sig_real,
+        sig_sin,
+        signal_context,
+        simplify_to_normal_form2,
+    )
+except (ModuleNotFoundError, ImportError):
+    from cyfaust.cyfaust import (
+        SignalVector,
+        sig_add,
+        sig_delay,
+        sig_div,
+        sig_hslider,
+        sig_input,
+        sig_int,
+        sig_mul,
+        sig_real,
+        sig_sin,
+        signal_context,
+        simplify_to_normal_form2,
+    )
+
+
+def test_estimate_signals():
+    with signal_context():
+        gain = sig_hslider("gain", sig_real(0.5), sig_real(0), sig_real(1), sig_real(0.1))
+        x = sig_input(0)
+        vector = SignalVector()
+        vector.add(sig_div(sig_sin(x), sig_add(sig_input(1), sig_real(1))))
+        vector.add(sig_add(sig_delay(x, sig_int(10)), sig_delay(x, sig_int(64))))
+        vector.add(sig_mul(x, sig_mul(gain, sig_real(2))))
+        cost = estimate_cost(simplify_to_normal_form2(vector))
+        assert cost["operations"]["transcendental"] == 1
+        assert cost["operations"]["division"] == 1
+        assert cost["operations"]["delay"] == 2
+        assert cost["control_operations"]["arithmetic"] >= 1
+        assert cost["delay_lines"] == 1
+        assert cost["delay_memory"] == 64
+        assert cost["rates"]["control"] >= 2
+        assert cost["recursions"] == 0
+        assert cost["cost"] > DEFAULT_WEIGHTS["transcendental"]
+
+
+def test_estimate_source():
+    cost = estimate_cost('process = + ~ (_ <: _, @(hslider("d", 10, 1, 100, 1)) :> *(0.5));')
+    assert cost["recursions"] == 1
+    assert cost["recursion_depth"] == 1
+    assert cost["delay_memory"] >= 100
+    assert cost["unbounded_delays"] == 0
+
+    nested = estimate_cost("process = (+ : (+ ~ *(0.5))) ~ *(0.25);")
+    assert nested["recursions"] == 2
+    assert nested["recursion_depth"] == 2
+
+    # two loops in series within a third: three recursions, nested two deep
+    series = estimate_cost("process = (+ : (+ ~ *(0.5)) : (+ ~ *(0.25))) ~ *(0.125);")
+    assert series["recursions"] == 3
+    assert series["recursion_depth"] == 2
+
+    table = estimate_cost("process = waveform{0, 0.5, 1, 0.5}, int(_) : rdtable;")
+    assert table["tables"] == [4]
+    assert table["table_memory"] == 4
+    assert table["operations"]["table_read"] == 1
+
+
+def test_value_bounds():
+    with signal_context():
+        gain = sig_hslider("gain", sig_real(0.5), sig_real(0), sig_real(1), sig_real(0.1))
+        assert value_bounds(sig_add(sig_mul(gain, sig_real(2)), sig_int(1))) == (1, 3)
+        assert value_bounds(sig_mul(gain, sig_input(0))) is None
+    with pytest.raises(TypeError):
+        value_bounds(1)
+
+
+def test_estimate_errors(capsys):
+    assert estimate_cost("process = ;") is None
+    with pytest.raises(TypeError):
+        estimate_cost(1)
+
+
+def test_calibrate():
+    weights = calibrate(
+        ["process = _ : sin;", "process = _ <: _, @(100) :> /(2);"], backend="interp"
+    )
+    assert sorted(weights) == sorted(DEFAULT_WEIGHTS)
+    assert all(w > 0 for w in weights.values())
+    cost = estimate_cost("process = _ : sin;", weights)
+    assert cost["cost"] > 0
+    with pytest.raises(ValueError):
+        calibrate(["process = ;"])
@@ -0,0 +1,51 @@
+"""Tests for in-memory auxiliary file generation."""
+
+from pathlib import Path
+
+from cyfaust.auxfiles import (
+    auxfiles_from_file,
+    auxfiles_from_string,
+    diagram_from_file,
+    diagram_from_string,
+)
+
+from testutils import print_entry
+
+
+OSC_DSP = "tests/dsp/osc.dsp"
+
+
+def test_auxfiles_from_string():
+    print_entry("test_auxfiles_from_string")
+    files = auxfiles_from_string("auxdsp", "process = _,3.14 : +;", "-svg", "-json")
+    assert files is not None
+    assert "auxdsp-svg/process.svg" in files
+    assert isinstance(files["auxdsp-svg/process.svg"], bytes)
+    assert any(path.endswith(".json") for path in files)
+    assert not Path("auxdsp-svg").exists()
+
+
+def test_auxfiles_from_file():
+    print_entry("test_auxfiles_from_file")
+    files = auxfiles_from_file(OSC_DSP, "-svg")
+    assert files is not None
+    assert "osc-svg/process.svg" in files
+    assert not Path("osc-svg").exists()
+
+
+def test_diagram_from_string():
+    print_entry("test_diagram_from_string")
+    svgs = diagram_from_string("diagdsp", "process = _,3.14 : +;")
+    assert "process.svg" in svgs
+    assert "<svg" in svgs["process.svg"]
+
+
+def test_diagram_from_file():
+    print_entry("test_diagram_from_file")
+    svgs = diagram_from_file(OSC_DSP)
+    assert "process.svg" in svgs
+
+
+def test_auxfiles_invalid_source():
+    print_entry("test_auxfiles_invalid_source")
+    assert auxfiles_from_string("bad", "process = ;", "-svg") is None
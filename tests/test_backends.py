@@ -0,0 +1,77 @@
+"""Tests for the backend-independent Dsp/DspFactory classes and compile()."""
+
+import numpy as np
+import pytest
+
+import cyfaust
+from cyfaust.backends import available_backends, compile, time_factory
+
+try:
+    from cyfaust.interp import Dsp, DspFactory, HotSwapDsp, InterpreterDsp, RtAudioDriver
+except (ModuleNotFoundError, ImportError):
+    from cyfaust.cyfaust import Dsp, DspFactory, HotSwapDsp, InterpreterDsp, RtAudioDriver
+
+CODE = 'process = hslider("gain", 0.5, 0, 1, 0.01) <: _, _;'
+
+
+def test_abstract_base_classes():
+    with pytest.raises(TypeError):
+        Dsp()
+    with pytest.raises(TypeError):
+        DspFactory()
+
+
+def test_available_backends():
+    backends = available_backends()
+    assert backends[-1] == "interp"
+    assert ("llvm" in backends) == getattr(cyfaust, "LLVM_BACKEND", False)
+
+
+def test_compile_interp():
+    factory = compile(CODE, backend="interp")
+    assert isinstance(factory, DspFactory)
+    dsp = factory.create_dsp_instance()
+    assert isinstance(dsp, Dsp)
+    assert isinstance(dsp, InterpreterDsp)
+    dsp.init(48000)
+    assert dsp.get_numoutputs() == 2
+    assert '"gain"' in factory.get_json()
+
+
+def test_compile_auto():
+    factory = compile(CODE)
+    assert isinstance(factory, DspFactory)
+    dsp = factory.create_dsp_instance()
+    dsp.init(48000)
+
+    outputs = np.zeros((2, 64), dtype=np.float32)
+    dsp.compute(64, np.zeros((0, 64), dtype=np.float32), outputs)
+    assert outputs[1, 10] == pytest.approx(0.5)
+
+
+def test_compile_benchmark():
+    factory = compile(CODE, benchmark=True)
+    assert isinstance(factory, DspFactory)
+    assert time_factory(factory, blocks=4) > 0
+
+
+def test_compile_errors(capsys):
+    assert compile("process = ;", backend="interp") is None
+    with pytest.raises(ValueError):
+        compile(CODE, backend="wasm")
+
+
+def test_shared_driver_and_hot_swap():
+    factory = compile(CODE)
+    dsp = factory.create_dsp_instance()
+    dsp.init(48000)
+    swapper = HotSwapDsp(dsp, 64, factory)
+    assert isinstance(swapper, Dsp)
+    assert swapper.get_numoutputs() == 2
+    assert swapper.metadata() == dsp.metadata()
+
+    driver = RtAudioDriver(48000, 256)
+    driver.set_dsp(swapper)
+    driver.set_dsp(dsp)
+    with pytest.raises(TypeError):
+        driver.set_dsp(factory)
@@ -0,0 +1,115 @@
+"""Tests for the batch processing helpers used by the CLI."""
+
+import pytest
+
+from cyfaust import batch
+
+
+@pytest.fixture
+def dsp_tree(tmp_path):
+    """A small directory tree of DSP and non-DSP files."""
+    (tmp_path / "a" / "b").mkdir(parents=True)
+    for name in ("one.dsp", "a/two.dsp", "a/b/three.dsp", "a/notes.txt"):
+        (tmp_path / name).write_text("process = _;\n")
+    return tmp_path
+
+
+class TestExpandInputs:
+    def test_directory_is_recursive(self, dsp_tree):
+        paths = batch.expand_inputs([str(dsp_tree)])
+        assert sorted(p.replace(str(dsp_tree), "") for p in paths) == [
+            "/a/b/three.dsp",
+            "/a/two.dsp",
+            "/one.dsp",
+        ]
+
+    def test_glob_pattern(self, dsp_tree):
+        paths = batch.expand_inputs([str(dsp_tree / "**" / "t*.dsp")])
+        assert len(paths) == 2
+
+    def test_missing_file_kept(self):
+        assert batch.expand_inputs(["missing.dsp"]) == ["missing.dsp"]
+
+    def test_repeated_arguments_dropped(self, dsp_tree):
+        one = str(dsp_tree / "one.dsp")
+        assert batch.expand_inputs([one, one]) == [one]
+
+
+class TestOutputPaths:
+    def test_mirrors_layout(self, dsp_tree, tmp_path):
+        paths = batch.expand_inputs([str(dsp_tree)])
+        outputs = batch.output_paths(paths, "out", ".cpp")
+        rel = sorted(o.replace("\\", "/") for o in outputs.values())
+        assert rel == ["out/a/b/three.cpp", "out/a/two.cpp", "out/one.cpp"]
+
+    def test_single_file(self, dsp_tree):
+        outputs = batch.output_paths([str(dsp_tree / "a" / "two.dsp")], "out", ".fbc")
+        assert list(outputs.values()) == [str(batch.Path("out") / "two.fbc")]
+
+
+class TestRunBatch:
+    @pytest.fixture(autouse=True)
+    def fake_sha(self, monkeypatch):
+        """Use the file content as its expanded SHA key."""
+        monkeypatch.setattr(batch, "expanded_sha", lambda path: open(path).read())
+
+    def test_duplicates_reported(self, tmp_path):
+        for name, code in (("x.dsp", "a"), ("y.dsp", "b"), ("z.dsp", "a")):
+            (tmp_path / name).write_text(code)
+        tasks = [(str(tmp_path / name), ()) for name in ("x.dsp", "y.dsp", "z.dsp")]
+        processed = []
+        results = []
+
+        def work(path, sha_key=None):
+            processed.append((path, sha_key))
+            return {"file": path, "status": "ok"}
+
+        batch.run_batch(tasks, work, batch.same_duplicate, results.append)
+        # the SHA key computed for deduplication is passed on, not recomputed
+        assert processed == [(tasks[0][0], "a"), (tasks[1][0], "b")]
+        assert sorted(r["file"] for r in results) == [path for path, _ in tasks]
+        assert [r.get("duplicate_of") for r in results].count(tasks[0][0]) == 1
+
+    def test_failures_reported(self, tmp_path):
+        (tmp_path / "x.dsp").write_text("a")
+        (tmp_path / "y.dsp").write_text("bad")
+        (tmp_path / "z.dsp").write_text("bad")
+        (tmp_path / "w.dsp").write_bytes(b"\xff\xfe")
+        tasks = [(str(tmp_path / name), ()) for name in ("x.dsp", "y.dsp", "z.dsp", "w.dsp")]
+        results = []
+
+        def work(path, sha_key=None):
+            if sha_key == "bad":
+                raise RuntimeError("compilation failed")
+            return {"file": path, "status": "ok"}
+
+        batch.run_batch(tasks, work, batch.same_duplicate, results.append)
+        by_file = {r["file"]: r for r in results}
+        assert sorted(by_file) == sorted(path for path, _ in tasks)
+        assert by_file[tasks[0][0]]["status"] == "ok"
+        assert by_file[tasks[1][0]]["error"] == "RuntimeError: compilation failed"
+        assert by_file[tasks[2][0]]["duplicate_of"] == tasks[1][0]
+        assert by_file[tasks[3][0]]["status"] == "error"
+        assert by_file[tasks[3][0]]["error"].startswith("UnicodeDecodeError")
+
+    def test_copy_duplicate(self, tmp_path):
+        original = tmp_path / "out" / "x.cpp"
+        original.parent.mkdir()
+        original.write_text("code")
+        outputs = {"y.dsp": str(tmp_path / "out" / "sub" / "y.cpp")}
+        result = batch.copy_duplicate(
+            {"file": "x.dsp", "status": "ok", "output": str(original)}, "y.dsp", outputs
+        )
+        assert result["output"] == outputs["y.dsp"]
+        assert (tmp_path / "out" / "sub" / "y.cpp").read_text() == "code"
+
+
+def test_resolve_jobs():
+    assert batch.resolve_jobs(3) == 3
+    assert batch.resolve_jobs(0) >= 1
+
+
+def test_call_quietly():
+    result, output = batch.call_quietly(lambda: print("error") or 42)
+    assert result == 42
+    assert output == "error"
@@ -164,11 +164,18 @@ try:
         get_box_type,
         boxes_to_signals,
         create_source_from_boxes,
+        intern_boxes,
+        classify_box,
+        walk_box,
+        box_par_n,
+        box_seq_n,
+        box_sum_n,
         # classes
         Box,
         BoxVector,
         SType,
         SOperator,
+        BoxKind,
     )
     from cyfaust.signal import SignalVector
 except (ModuleNotFoundError, ImportError):
@@ -209,6 +216,8 @@ except (ModuleNotFoundError, ImportError):
             is_box_hslider, is_box_ident,
             getparams_box_button, getparams_box_hslider,
             dsp_to_boxes, get_box_type, boxes_to_signals, create_source_from_boxes,
+            intern_boxes, classify_box, walk_box, BoxKind,
+            box_par_n, box_seq_n, box_sum_n,
             Box, BoxVector, SignalVector, SType, SOperator,
         )
     except (ModuleNotFoundError, ImportError):
@@ -1039,3 +1048,123 @@ class TestBoxVector:
         code = b.create_source("test_dsp", "cpp")
         assert isinstance(code, str)
         assert len(code) > 0
+
+
+# ---------------------------------------------------------------------------
+# Node identity
+# ---------------------------------------------------------------------------
+
+
+class TestNodeIdentity:
+    def test_hash_consed_nodes(self):
+        a = box_add(box_wire(), box_int(1))
+        b = box_add(box_wire(), box_int(1))
+        c = box_add(box_wire(), box_int(2))
+        assert a is not b
+        assert a.is_same(b) and not a.is_same(c)
+        assert a.id == b.id != c.id
+        with pytest.raises(TypeError):
+            hash(a)
+        assert len({a.id, b.id, c.id}) == 2
+        assert {a.id: 1}[b.id] == 1
+
+    def test_interning(self):
+        assert not intern_boxes()
+        try:
+            a = box_seq(box_wire(), box_int(1))
+            assert a is box_seq(box_wire(), box_int(1))
+            assert box_int(5) is box_int(5)
+        finally:
+            assert intern_boxes(False)
+        assert box_int(5) is not box_int(5)
+
+
+# ---------------------------------------------------------------------------
+# Classification and traversal
+# ---------------------------------------------------------------------------
+
+
+class TestClassifyWalk:
+    def test_classify_constants(self):
+        assert classify_box(box_int(3)) == (BoxKind.kBoxInt, (), {"value": 3})
+        assert classify_box(box_real(0.5)) == (BoxKind.kBoxReal, (), {"value": 0.5})
+        assert box_wire().classify() == (BoxKind.kBoxWire, (), {})
+
+    def test_classify_composition(self):
+        x, y = box_wire(), box_int(1)
+        kind, children, attrs = classify_box(box_par(x, y))
+        assert kind == BoxKind.kBoxPar and attrs == {}
+        assert children[0].is_same(x) and children[1].is_same(y)
+
+        # box_add(x, y) is (x, y) : +
+        kind, children, _ = classify_box(box_add(x, y))
+        assert kind == BoxKind.kBoxSeq
+        kind, _, attrs = classify_box(children[1])
+        assert kind == BoxKind.kBoxPrim and attrs["arity"] == 2
+
+        kind, _, attrs = classify_box(box_sin(x))[1][1].classify()
+        assert kind == BoxKind.kBoxXtended and attrs["name"] == "sin"
+
+    def test_classify_slider(self):
+        b = box_hslider("freq", box_real(440.0), box_real(20.0), box_real(2000.0), box_real(1.0))
+        kind, children, attrs = classify_box(b)
+        assert kind == BoxKind.kBoxHSlider
+        assert attrs == {"label": "freq"}
+        assert [c.classify()[2]["value"] for c in children] == [440.0, 20.0, 2000.0, 1.0]
+
+    def test_walk(self):
+        x = box_seq(box_wire(), box_int(1))
+        b = box_par(x, x)
+        nodes = list(walk_box(b))
+        assert [n.classify()[0] for n in nodes] == [
+            BoxKind.kBoxWire, BoxKind.kBoxInt, BoxKind.kBoxSeq, BoxKind.kBoxPar,
+        ]
+        assert len(list(b.walk(unique=False))) == 7
+        assert next(b.walk(order="pre")).is_same(b)
+
+        bv = BoxVector()
+        bv.add(b)
+        bv.add(x)
+        assert len(list(bv.walk())) == 4
+
+    def test_walk_errors(self):
+        with pytest.raises(ValueError):
+            walk_box(box_int(1), order="in")
+        with pytest.raises(TypeError):
+            walk_box(1)
+
+
+# ---------------------------------------------------------------------------
+# N-ary combinators
+# ---------------------------------------------------------------------------
+
+
+class TestNaryCombinators:
+    def test_box_par_n(self):
+        b = box_par_n([box_wire()] * 5)
+        assert get_box_type(b) == (5, 5)
+        # balanced: ((_,_),(_,(_,_)))
+        kind, (left, right), _ = classify_box(b)
+        assert kind == BoxKind.kBoxPar
+        assert get_box_type(left) == (2, 2) and get_box_type(right) == (3, 3)
+
+    def test_box_par_n_vector(self):
+        bv = BoxVector()
+        for i in range(3):
+            bv.add(box_int(i))
+        assert get_box_type(box_par_n(bv)) == (0, 3)
+
+    def test_box_seq_n(self):
+        b = box_seq_n([box_par(box_wire(), box_wire()), box_add_op(), box_wire()])
+        assert get_box_type(b) == (2, 1)
+
+    def test_box_sum_n(self):
+        b = box_sum_n(box_wire() for _ in range(256))
+        assert get_box_type(b) == (256, 1)
+        assert box_sum_n([box_int(1)]).is_same(box_int(1))
+
+    def test_errors(self):
+        with pytest.raises(ValueError):
+            box_par_n([])
+        with pytest.raises(TypeError):
+            box_par_n([box_wire(), 1])
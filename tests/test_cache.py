@@ -0,0 +1,95 @@
+"""Tests for the content-addressed artifact cache."""
+
+import os
+import time
+
+import pytest
+
+from cyfaust.cache import ArtifactCache, default_cache_dir
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ArtifactCache(tmp_path / "cache", max_size=1024 * 1024)
+
+
+def test_key_depends_on_all_parts():
+    key = ArtifactCache.key("ABC", "cpp", "-vec")
+    assert key == ArtifactCache.key("ABC", "cpp", "-vec")
+    assert key != ArtifactCache.key("ABC", "c", "-vec")
+    assert key != ArtifactCache.key("ABD", "cpp", "-vec")
+    assert key != ArtifactCache.key("ABC", "cpp-vec")
+
+
+def test_text_roundtrip(cache):
+    key = cache.key("ABC", "cpp")
+    assert cache.get_text(key) is None
+    cache.put_text(key, "int main() {}\n")
+    assert cache.get_text(key) == "int main() {}\n"
+
+
+def test_tree_roundtrip(cache):
+    key = cache.key("ABC", "svg")
+    files = {"process.svg": "<svg/>", "sub/noise-0x1.svg": b"<svg></svg>"}
+    cache.put_tree(key, files)
+    assert cache.get_tree(key) == {
+        "process.svg": b"<svg/>",
+        "sub/noise-0x1.svg": b"<svg></svg>",
+    }
+
+
+def test_existing_entry_is_kept(cache):
+    key = cache.key("ABC", "cpp")
+    cache.put_text(key, "first")
+    cache.put_text(key, "second")
+    assert cache.get_text(key) == "first"
+    assert not [name for name in os.listdir(cache.directory) if name.startswith(".tmp-")]
+
+
+def test_eviction_removes_least_recently_used(tmp_path):
+    cache = ArtifactCache(tmp_path / "cache", max_size=2500)
+    keys = [cache.key("SHA", str(i)) for i in range(3)]
+    for i, key in enumerate(keys[:2]):
+        cache.put_text(key, "x" * 1000)
+        past = time.time() - 100 + i
+        os.utime(cache.entry_path(key), (past, past))
+
+    # A hit refreshes the entry, so the other one becomes the oldest
+    assert cache.get_text(keys[0]) is not None
+    cache.put_text(keys[2], "x" * 1000)
+
+    assert cache.get_text(keys[1]) is None
+    assert cache.get_text(keys[0]) is not None
+    assert cache.get_text(keys[2]) is not None
+    assert cache.size() <= 2500
+
+
+def test_writes_do_not_rescan(cache, monkeypatch):
+    scans = []
+    entries = cache.entries
+    monkeypatch.setattr(cache, "entries", lambda: scans.append(1) or entries())
+    for i in range(20):
+        cache.put_text(cache.key("SHA", str(i)), "x" * 100)
+    assert len(scans) == 1
+    assert cache.size() == 2000
+
+
+def test_eviction_goes_below_max_size(tmp_path):
+    cache = ArtifactCache(tmp_path / "cache", max_size=10000)
+    for i in range(11):
+        cache.put_text(cache.key("SHA", str(i)), "x" * 1000)
+    # 11000 bytes triggered eviction down to 90% of max_size
+    assert cache.size() == 9000
+
+
+def test_clear(cache):
+    key = cache.key("ABC", "cpp")
+    cache.put_text(key, "code")
+    cache.clear()
+    assert cache.get_text(key) is None
+    assert cache.size() == 0
+
+
+def test_default_cache_dir(monkeypatch, tmp_path):
+    monkeypatch.setenv("CYFAUST_CACHE_DIR", str(tmp_path))
+    assert default_cache_dir() == str(tmp_path)
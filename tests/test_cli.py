@@ -117,6 +117,55 @@ class TestCompileCommand:
         assert "unknown backend" in result.stderr.lower() or "error" in result.stderr.lower()
 
 
+class TestArtifactCache:
+    """Tests for cached compile and diagram output."""
+
+    def test_compile_uses_cache(self, sample_dsp, temp_dir):
+        """Test a second compile is served from the cache."""
+        cache_dir = temp_dir / "cache"
+        first = run_cli("compile", str(sample_dsp), "--cache-dir", str(cache_dir))
+        assert first.returncode == 0
+        assert any(cache_dir.rglob("artifact"))
+        second = run_cli("compile", str(sample_dsp), "--cache-dir", str(cache_dir))
+        assert second.returncode == 0
+        assert second.stdout == first.stdout
+
+    def test_compile_cache_keyed_by_backend(self, sample_dsp, temp_dir):
+        """Test different backends get different cache entries."""
+        cache_dir = temp_dir / "cache"
+        cpp = run_cli("compile", str(sample_dsp), "-b", "cpp", "--cache-dir", str(cache_dir))
+        c = run_cli("compile", str(sample_dsp), "-b", "c", "--cache-dir", str(cache_dir))
+        assert cpp.returncode == 0 and c.returncode == 0
+        assert cpp.stdout != c.stdout
+        assert len(list(cache_dir.rglob("artifact"))) == 2
+
+    def test_compile_cache_invalidated_by_change(self, sample_dsp, temp_dir):
+        """Test editing the DSP produces a new cache entry."""
+        cache_dir = temp_dir / "cache"
+        run_cli("compile", str(sample_dsp), "--cache-dir", str(cache_dir))
+        sample_dsp.write_text('import("stdfaust.lib");\nprocess = no.noise * 0.25;\n')
+        result = run_cli("compile", str(sample_dsp), "--cache-dir", str(cache_dir))
+        assert result.returncode == 0
+        assert "0.25" in result.stdout
+        assert len(list(cache_dir.rglob("artifact"))) == 2
+
+    def test_no_cache(self, sample_dsp, temp_dir):
+        """Test --no-cache leaves the cache untouched."""
+        cache_dir = temp_dir / "cache"
+        result = run_cli("compile", str(sample_dsp), "--no-cache", "--cache-dir", str(cache_dir))
+        assert result.returncode == 0
+        assert not cache_dir.exists()
+
+    def test_diagram_uses_cache(self, sample_dsp, temp_dir):
+        """Test cached diagrams match freshly generated ones."""
+        cache_dir = temp_dir / "cache"
+        first = run_cli("diagram", str(sample_dsp), "--stdout", "--cache-dir", str(cache_dir))
+        second = run_cli("diagram", str(sample_dsp), "--stdout", "--cache-dir", str(cache_dir))
+        assert first.returncode == 0 and second.returncode == 0
+        assert "<svg" in second.stdout
+        assert second.stdout == first.stdout
+
+
 class TestDiagramCommand:
     """Tests for the diagram command."""
 
@@ -128,6 +177,14 @@ class TestDiagramCommand:
         svg_dirs = list(temp_dir.glob("*-svg"))
         assert len(svg_dirs) >= 0  # May or may not create directory depending on Faust version
 
+    def test_diagram_stdout(self, sample_dsp, temp_dir):
+        """Test SVG diagram written to stdout without creating files."""
+        result = run_cli("diagram", str(sample_dsp), "--stdout")
+        assert result.returncode == 0
+        assert "<svg" in result.stdout
+        assert not list(Path(PROJECT_ROOT).glob("test-svg"))
+        assert not list(temp_dir.glob("*-svg"))
+
     def test_diagram_nonexistent_file(self):
         """Test diagram generation for non-existent file."""
         result = run_cli("diagram", "/nonexistent/file.dsp", check=False)
@@ -233,6 +290,20 @@ class TestParamsCommand:
         assert result.returncode == 0
         assert "No parameters" in result.stdout or "0" in result.stdout
 
+    def test_params_nested_groups(self, temp_dir):
+        """Test params finds widgets inside groups and computed labels."""
+        dsp_file = temp_dir / "groups.dsp"
+        dsp_file.write_text("""
+import("stdfaust.lib");
+voice(i) = os.osc(hslider("freq%i", 440, 50, 2000, 1));
+process = hgroup("bank", par(i, 2, voice(i))) :> _;
+""")
+        result = run_cli("params", str(dsp_file), "-v")
+        assert result.returncode == 0
+        assert "freq0" in result.stdout
+        assert "freq1" in result.stdout
+        assert "/bank/freq1" in result.stdout
+
     def test_params_nonexistent_file(self):
         """Test params for non-existent file."""
         result = run_cli("params", "/nonexistent/file.dsp", check=False)
@@ -300,6 +371,62 @@ class TestBitcodeCommand:
         assert result.returncode != 0
 
 
+class TestBatchMode:
+    """Tests for batch validate/compile/bitcode over several files."""
+
+    @pytest.fixture
+    def dsp_tree(self, temp_dir, sample_dsp):
+        """A directory of DSP files, two of them with the same expanded code.
+
+        The file name is part of the expanded code, so duplicates share it.
+        """
+        root = temp_dir / "dsp"
+        (root / "sub").mkdir(parents=True)
+        (root / "noise.dsp").write_text(sample_dsp.read_text())
+        (root / "sub" / "noise.dsp").write_text(sample_dsp.read_text())
+        (root / "sub" / "osc.dsp").write_text('import("stdfaust.lib");\nprocess = os.osc(440);\n')
+        return root
+
+    def test_validate_jsonl(self, dsp_tree):
+        """Test streaming validation results as JSON lines."""
+        result = run_cli("validate", "-j", "2", "--jsonl", str(dsp_tree))
+        records = [json.loads(line) for line in result.stdout.splitlines()]
+        assert len(records) == 3
+        assert all(r["status"] == "valid" for r in records)
+        duplicates = [r for r in records if "duplicate_of" in r]
+        assert len(duplicates) == 1
+
+    def test_validate_batch_with_invalid(self, dsp_tree, invalid_dsp):
+        """Test that one invalid file fails the whole batch."""
+        result = run_cli("validate", str(dsp_tree), str(invalid_dsp), check=False)
+        assert result.returncode != 0
+        assert "INVALID" in result.stdout
+        assert "4 file(s) processed, 1 failed" in result.stdout
+
+    def test_compile_outdir(self, dsp_tree, temp_dir):
+        """Test compiling a directory in parallel, mirroring its layout."""
+        outdir = temp_dir / "build"
+        result = run_cli("compile", "-j", "2", "--outdir", str(outdir), str(dsp_tree))
+        assert result.returncode == 0
+        assert (outdir / "noise.cpp").exists()
+        assert (outdir / "sub" / "noise.cpp").read_text() == (outdir / "noise.cpp").read_text()
+        assert (outdir / "sub" / "osc.cpp").exists()
+
+    def test_compile_batch_requires_outdir(self, dsp_tree):
+        """Test that compiling several files needs --outdir."""
+        result = run_cli("compile", str(dsp_tree), check=False)
+        assert result.returncode != 0
+        assert "--outdir" in result.stderr
+
+    def test_bitcode_save_glob(self, dsp_tree, temp_dir):
+        """Test saving bitcode for a glob pattern."""
+        outdir = temp_dir / "fbc"
+        pattern = str(dsp_tree / "**" / "*.dsp")
+        result = run_cli("bitcode", "save", "--outdir", str(outdir), pattern)
+        assert result.returncode == 0
+        assert (outdir / "sub" / "osc.fbc").stat().st_size > 0
+
+
 class TestJsonCommand:
     """Tests for the json command."""
 
@@ -341,6 +468,17 @@ class TestJsonCommand:
         param_labels = [p["label"] for p in data["parameters"]]
         assert "volume" in param_labels
 
+    def test_json_parameter_ranges(self, sample_dsp):
+        """Test JSON parameters carry numeric ranges and addresses."""
+        result = run_cli("json", str(sample_dsp))
+        assert result.returncode == 0
+        data = json.loads(result.stdout)
+        volume = next(p for p in data["parameters"] if p["label"] == "volume")
+        assert volume["type"] == "hslider"
+        assert volume["init"] == 0.5
+        assert volume["address"].endswith("/volume")
+        assert data["ui"][0]["type"] in ("vgroup", "hgroup", "tgroup")
+
     def test_json_nonexistent_file(self):
         """Test JSON for non-existent file."""
         result = run_cli("json", "/nonexistent/file.dsp", check=False)
@@ -8,6 +8,10 @@ from pathlib import Path
 try:
     from cyfaust.interp import (
         RtAudioDriver,
+        HotSwapDsp,
+        Oversampled,
+        FixedBlockDsp,
+        CheckedDsp,
         InterpreterDspFactory,
         get_version,
         create_dsp_factory_from_file,
@@ -22,6 +26,7 @@ try:
         expand_dsp_from_file,
         expand_dsp_from_string,
         generate_auxfiles_from_file,
+        generate_auxfiles_from_string2,
     )
     from cyfaust.signal import (
         signal_context,
@@ -39,6 +44,10 @@ try:
 except (ModuleNotFoundError, ImportError):
     from cyfaust.cyfaust import (
         RtAudioDriver,
+        HotSwapDsp,
+        Oversampled,
+        FixedBlockDsp,
+        CheckedDsp,
         InterpreterDspFactory,
         get_version,
         create_dsp_factory_from_file,
@@ -52,6 +61,7 @@ except (ModuleNotFoundError, ImportError):
         expand_dsp_from_file,
         expand_dsp_from_string,
         generate_auxfiles_from_file,
+        generate_auxfiles_from_string2,
         signal_context,
         SignalVector,
         sig_input,
@@ -253,6 +263,14 @@ def test_interp_generate_auxfiles_from_string():
     svg_folder.rmdir()
 
 
+def test_interp_generate_auxfiles_from_string2():
+    print_entry("test_interp_generate_auxfiles_from_string2")
+    eg = "process = _,3.14 : +;"
+    code = generate_auxfiles_from_string2("auxdsp", eg, "-lang", "cpp")
+    assert isinstance(code, str)
+    assert generate_auxfiles_from_string2("auxdsp", "process = ;") is None
+
+
 def test_create_dsp_factory_from_boxes():
     print_entry("test_create_dsp_factory_from_boxes")
     with box_context():
@@ -344,6 +362,336 @@ def test_generate_auxfiles_from_file():
     shutil.rmtree(svg_folder)
 
 
+def test_hot_swap_dsp():
+    print_entry("test_hot_swap_dsp")
+    import numpy as np
+
+    old = create_dsp_factory_from_string("old", 'process = hslider("gain", 0.5, 0, 1, 0.01) * 0;')
+    new = create_dsp_factory_from_string(
+        "new", 'process = hslider("gain", 0.5, 0, 1, 0.01) + 0 * _;'
+    )
+    assert old and new
+    dsp1 = old.create_dsp_instance()
+    dsp1.init(48000)
+    swapper = HotSwapDsp(dsp1, 64, old)
+    assert swapper.dsp is dsp1
+    assert swapper.get_numoutputs() == 1
+
+    # different number of inputs: refused
+    dsp2 = new.create_dsp_instance()
+    dsp2.init(48000)
+    assert not swapper.swap(dsp2, new)
+
+    # same I/O: fades from 0 to the new gain over 64 frames
+    same = create_dsp_factory_from_string("same", 'process = hslider("gain", 0.5, 0, 1, 0.01);')
+    dsp3 = same.create_dsp_instance()
+    dsp3.init(48000)
+    assert swapper.swap(dsp3, same)
+    assert swapper.is_swapping
+    assert not swapper.swap(dsp3, same)
+    inputs = np.zeros((0, 128), dtype=np.float32)
+    outputs = np.zeros((1, 128), dtype=np.float32)
+    swapper.compute(128, inputs, outputs)
+    assert outputs[0, 0] == 0.0
+    assert 0.0 < outputs[0, 32] < 0.5
+    assert outputs[0, 127] == np.float32(0.5)
+    assert swapper.collect()
+    assert not swapper.is_swapping
+    assert swapper.dsp is dsp3
+    assert swapper.factory is same
+
+
+def test_oversampled():
+    print_entry("test_oversampled")
+    import numpy as np
+    import pytest
+
+    factory = create_dsp_factory_from_string("rate", 'import("stdfaust.lib"); process = _, ma.SR;')
+    assert factory
+    dsp = factory.create_dsp_instance()
+    oversampled = Oversampled(dsp, 4, "best")
+    assert oversampled.dsp is dsp
+    assert oversampled.factor == 4
+    assert oversampled.filter == 4
+    assert oversampled.latency > 0
+
+    oversampled.init(48000)
+    assert oversampled.get_samplerate() == 48000
+    assert dsp.get_samplerate() == 192000
+
+    # unity gain on a low frequency sine, delayed by the filters
+    count = 1000
+    t = np.arange(count, dtype=np.float32)
+    inputs = np.sin(2 * np.pi * 500 * t / 48000).astype(np.float32).reshape(1, count)
+    outputs = np.zeros((2, count), dtype=np.float32)
+    oversampled.compute(count, inputs, outputs)
+    delay = int(round(oversampled.latency))
+    assert np.abs(outputs[0, 500:] - inputs[0, 500 - delay : count - delay]).max() < 0.1
+    assert outputs[1, 999] == pytest.approx(192000, rel=1e-3)
+
+    assert Oversampled(dsp, 2, "none").latency == 0
+    with pytest.raises(ValueError):
+        Oversampled(dsp, 5)
+    with pytest.raises(ValueError):
+        Oversampled(dsp, 2, "ultra")
+    with pytest.raises(ValueError):
+        Oversampled(dsp, 2, 7)
+
+
+def test_fixed_block_dsp():
+    print_entry("test_fixed_block_dsp")
+    import numpy as np
+    import pytest
+
+    factory = create_dsp_factory_from_string("fixed", "process = _ <: _, *(2);")
+    assert factory
+    dsp = factory.create_dsp_instance()
+    fixed = FixedBlockDsp(dsp, 512)
+    assert fixed.dsp is dsp
+    assert fixed.block_size == 512
+    assert fixed.latency == 512
+    assert fixed.get_numinputs() == 1 and fixed.get_numoutputs() == 2
+    fixed.init(48000)
+
+    # chunks of any size give the outputs delayed by one block
+    count = 5000
+    inputs = np.arange(1, count + 1, dtype=np.float32).reshape(1, count)
+    outputs = np.zeros((2, count), dtype=np.float32)
+    pos = 0
+    for size in [441, 1, 0, 1000, 37, 2000, 1521]:
+        chunk_in = np.ascontiguousarray(inputs[:, pos : pos + size])
+        chunk_out = np.zeros((2, size), dtype=np.float32)
+        fixed.compute(size, chunk_in, chunk_out)
+        outputs[:, pos : pos + size] = chunk_out
+        pos += size
+    assert pos == count
+    assert not outputs[:, :512].any()
+    assert np.array_equal(outputs[0, 512:], inputs[0, :-512])
+    assert np.array_equal(outputs[1, 512:], 2 * inputs[0, :-512])
+
+    fixed.instance_clear()
+    outputs = np.ones((2, 100), dtype=np.float32)
+    fixed.compute(100, np.ones((1, 100), dtype=np.float32), outputs)
+    assert not outputs.any()
+
+    with pytest.raises(ValueError):
+        FixedBlockDsp(dsp, 0)
+
+
+def test_checked_dsp():
+    print_entry("test_checked_dsp")
+    import numpy as np
+    import pytest
+
+    # log(0) is -inf, log(-1) is NaN, and a tiny gain gives denormals
+    factory = create_dsp_factory_from_string(
+        "checked", "process = _ <: log, *(1e-30) : _, *(1e-10);"
+    )
+    assert factory
+    dsp = factory.create_dsp_instance()
+    inputs = np.array([[1.0, 2.0, 0.0, -1.0]], dtype=np.float32)
+    ones = np.ones((1, 4), dtype=np.float32)
+
+    checked = CheckedDsp(dsp, "count", flush_denormals=False)
+    assert checked.dsp is dsp
+    checked.init(48000)
+    outputs = np.zeros((2, 4), dtype=np.float32)
+    checked.compute(4, inputs, outputs)
+    assert checked.nan_counts == [1, 0]
+    assert checked.inf_counts == [1, 0]
+    assert checked.denormal_counts == [0, 3]
+    assert checked.bad_blocks == 1
+    assert checked.fault_channel == 0
+    assert np.isnan(outputs[0, 3])
+    checked.reset()
+    assert checked.nan_counts == [0, 0] and checked.fault_channel is None
+
+    checked = CheckedDsp(dsp, "zero")
+    checked.compute(4, inputs, outputs)
+    assert not outputs.any()
+    assert checked.denormal_counts == [0, 0]
+    checked.compute(4, ones, outputs)
+    assert outputs[0].tolist() == [0.0] * 4
+
+    checked = CheckedDsp(dsp, "abort")
+    with pytest.raises(FloatingPointError):
+        checked.compute(4, inputs, outputs)
+    assert checked.aborted
+    outputs[:] = 1
+    with pytest.raises(FloatingPointError):
+        checked.compute(4, ones, outputs)
+    assert not outputs.any()
+    assert checked.bad_blocks == 1
+    checked.reset()
+    checked.compute(4, ones, outputs)
+    assert not checked.aborted
+
+    with pytest.raises(ValueError):
+        CheckedDsp(dsp, "ignore")
+
+
+def test_wrapper_clone():
+    print_entry("test_wrapper_clone")
+    factory = create_dsp_factory_from_string("gain", "process = *(0.5);")
+    assert factory
+    dsp = factory.create_dsp_instance()
+
+    oversampled = Oversampled(dsp, 4, "low").clone()
+    assert isinstance(oversampled, Oversampled)
+    assert oversampled.dsp is not dsp
+    assert (oversampled.factor, oversampled.filter) == (4, 1)
+
+    fixed = FixedBlockDsp(dsp, 64).clone()
+    assert isinstance(fixed, FixedBlockDsp)
+    assert fixed.dsp is not dsp and fixed.block_size == 64
+
+    checked = CheckedDsp(dsp, "zero", False).clone()
+    assert isinstance(checked, CheckedDsp)
+    assert checked.dsp is not dsp
+    assert (checked.action, checked.flush_denormals) == ("zero", False)
+
+    swapper = HotSwapDsp(dsp, 256, factory).clone()
+    assert isinstance(swapper, HotSwapDsp)
+    assert swapper.dsp is not dsp and swapper.factory is factory
+
+    # wrappers of wrappers clone all the way down
+    nested = FixedBlockDsp(CheckedDsp(dsp), 32).clone()
+    assert isinstance(nested.dsp, CheckedDsp) and nested.dsp.dsp is not dsp
+    nested.init(48000)
+    assert nested.get_numinputs() == 1 and nested.get_numoutputs() == 1
+
+
+def test_compute_sample_formats():
+    print_entry("test_compute_sample_formats")
+    import numpy as np
+
+    code = "process = *(0.5), *(0.25);"
+    for options in [(), ("-double",)]:
+        factory = create_dsp_factory_from_string("formats", code, *options)
+        assert factory
+        dsp = factory.create_dsp_instance()
+        assert dsp.is_double == bool(options)
+        assert dsp.clone().is_double == dsp.is_double
+        dsp.init(48000)
+
+        count = 5000
+        ramp = np.linspace(-1, 1, count)
+        for dtype in (np.float32, np.float64):
+            inputs = np.ascontiguousarray(np.stack([ramp, ramp]), dtype=dtype)
+            outputs = np.zeros((2, count), dtype=dtype)
+            dsp.compute(count, inputs, outputs)
+            assert np.allclose(outputs[0], 0.5 * inputs[0], atol=1e-6)
+            assert np.allclose(outputs[1], 0.25 * inputs[1], atol=1e-6)
+
+        pcm_in = np.array([[16384, -32768]] * count, dtype=np.int16)
+        pcm_out = np.zeros((count, 2), dtype=np.int16)
+        dsp.compute_pcm(count, pcm_in, pcm_out)
+        assert pcm_out[-1].tolist() == [8192, -8192]
+
+        pcm32 = np.zeros((count, 2), dtype=np.int32)
+        dsp.compute_pcm(count, pcm_in.astype(np.int32) << 16, pcm32)
+        assert pcm32[-1].tolist() == [8192 << 16, -8192 << 16]
+
+        try:
+            dsp.compute_pcm(count, pcm_in[:, :1].copy(), pcm_out)
+            assert False, "channel mismatch not detected"
+        except ValueError:
+            pass
+
+
+def test_compute_interleaved():
+    print_entry("test_compute_interleaved")
+    import numpy as np
+
+    factory = create_dsp_factory_from_string("interleaved", "process = *(0.5), *(0.25);")
+    assert factory
+    dsp = factory.create_dsp_instance()
+    dsp.init(48000)
+
+    count = 1500
+    ramp = np.linspace(-1, 1, count)
+    for dtype in (np.float32, np.float64):
+        planar = np.ascontiguousarray(np.stack([ramp, -ramp]), dtype=dtype)
+        expected = np.zeros((2, count), dtype=dtype)
+        dsp.compute(count, planar, expected)
+
+        # interleaved buffers
+        outputs = np.zeros((count, 2), dtype=dtype)
+        dsp.compute_interleaved(count, np.ascontiguousarray(planar.T), outputs)
+        assert np.array_equal(outputs, expected.T)
+
+        # transposed planar views, used in place
+        outputs = np.zeros((2, count), dtype=dtype)
+        dsp.compute_interleaved(count, planar.T, outputs.T)
+        assert np.array_equal(outputs, expected)
+
+        # channels of a wider interleaved buffer
+        frames = np.zeros((count, 4), dtype=dtype)
+        frames[:, 0], frames[:, 2] = planar
+        dsp.compute_interleaved(count, frames[:, ::2], frames[:, 1::2])
+        assert np.array_equal(frames[:, 1::2], expected.T)
+
+    try:
+        dsp.compute_interleaved(
+            count + 1,
+            np.zeros((count, 2), dtype=np.float32),
+            np.zeros((count, 2), dtype=np.float32),
+        )
+        assert False, "count overflow not detected"
+    except ValueError:
+        pass
+
+
+def test_compute_mix():
+    print_entry("test_compute_mix")
+    import numpy as np
+
+    count = 1500
+    ramp = np.linspace(-1, 1, count)
+    for options in [(), ("-double",), ("-cm",), ("-cm", "-inpl")]:
+        factory = create_dsp_factory_from_string("mix", "process = *(0.5), *(0.25);", *options)
+        assert factory
+        dsp = factory.create_dsp_instance()
+        dsp.init(48000)
+        for dtype in (np.float32, np.float64):
+            inputs = np.ascontiguousarray(np.stack([ramp, -ramp]), dtype=dtype)
+            expected = np.stack([0.5 * inputs[0], 0.25 * inputs[1]])
+
+            outputs = np.ones((2, count), dtype=dtype)
+            dsp.compute(count, inputs, outputs)
+            assert np.allclose(outputs, expected, atol=1e-6)
+
+            outputs = np.ones((2, count), dtype=dtype)
+            dsp.compute(count, inputs, outputs, mix=True)
+            assert np.allclose(outputs, 1 + expected, atol=1e-6)
+
+            outputs = np.ones((2, count), dtype=dtype)
+            dsp.compute(count, inputs, outputs, mix=True, gain=0.5)
+            assert np.allclose(outputs, 1 + 0.5 * expected, atol=1e-6)
+
+            buffers = inputs.copy()
+            dsp.compute(count, buffers, buffers)
+            assert np.allclose(buffers, expected, atol=1e-6)
+
+            buffers = inputs.copy()
+            dsp.compute(count, buffers, buffers, mix=True)
+            assert np.allclose(buffers, inputs + expected, atol=1e-6)
+
+    factory = create_dsp_factory_from_string("split", "process = _ <: _, _;")
+    dsp = factory.create_dsp_instance()
+    dsp.init(48000)
+    try:
+        dsp.compute(
+            count,
+            np.zeros((1, count), dtype=np.float32),
+            np.zeros((1, count), dtype=np.float32),
+            mix=True,
+        )
+        assert False, "channel mismatch not detected"
+    except ValueError:
+        pass
+
+
 if __name__ == "__main__":
     print_section("testing cyfaust.interp")
     if "TRACE" in os.environ:
@@ -360,6 +708,7 @@ if __name__ == "__main__":
     test_interp_warning_message()
     test_interp_read_dsp_factory_from_bitcode_file()
     test_interp_generate_auxfiles_from_string()
+    test_interp_generate_auxfiles_from_string2()
     test_create_dsp_factory_from_boxes()
     test_create_dsp_factory_from_signals1()
     test_create_dsp_factory_from_signals2()
@@ -368,6 +717,13 @@ if __name__ == "__main__":
     test_expand_dsp_from_file()
     test_expand_dsp_from_string()
     test_generate_auxfiles_from_file()
+    test_hot_swap_dsp()
+    test_oversampled()
+    test_fixed_block_dsp()
+    test_checked_dsp()
+    test_compute_sample_formats()
+    test_compute_interleaved()
+    test_compute_mix()
     if "TRACE" in os.environ:
         print_entry("TRACEMALLOC ANALYSIS")
         snapshot = tracemalloc.take_snapshot()
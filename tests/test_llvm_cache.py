@@ -0,0 +1,62 @@
+"""Tests for the LLVM machine code cache (LLVM builds only)."""
+
+import pytest
+
+import cyfaust
+
+if not getattr(cyfaust, "LLVM_BACKEND", False):
+    pytest.skip("cyfaust built without the LLVM backend", allow_module_level=True)
+
+from cyfaust.cache import ArtifactCache
+from cyfaust.cyfaust import (
+    get_dsp_machine_target,
+    llvm_create_cached_dsp_factory_from_string,
+)
+
+CODE = 'import("stdfaust.lib"); process = os.osc(hslider("freq", 440, 20, 2000, 1));'
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ArtifactCache(str(tmp_path / "cache"))
+
+
+def test_machine_code_is_cached(cache):
+    factory = llvm_create_cached_dsp_factory_from_string("osc", CODE, cache=cache)
+    assert factory is not None
+    entries = cache.entries()
+    assert len(entries) == 1
+
+    # second creation loads the cached machine code
+    factory2 = llvm_create_cached_dsp_factory_from_string("osc", CODE, cache=cache)
+    assert factory2 is not None
+    dsp = factory2.create_dsp_instance()
+    dsp.init(48000)
+    assert dsp.get_numoutputs() == 1
+    assert len(cache.entries()) == 1
+
+
+def test_key_includes_options(cache):
+    llvm_create_cached_dsp_factory_from_string("osc", CODE, "", -1, cache=cache)
+    llvm_create_cached_dsp_factory_from_string("osc", CODE, "", 1, cache=cache)
+    llvm_create_cached_dsp_factory_from_string("osc", CODE, "", -1, "-vec", cache=cache)
+    assert len(cache.entries()) == 3
+
+
+def test_target_mismatch_falls_back_to_jit(cache):
+    llvm_create_cached_dsp_factory_from_string("osc", CODE, cache=cache)
+    (_mtime, _size, path) = cache.entries()[0]
+    with open(f"{path}/target", "w") as f:
+        f.write("other-target")
+    factory = llvm_create_cached_dsp_factory_from_string("osc", CODE, cache=cache)
+    assert factory is not None
+    assert get_dsp_machine_target()
+    # the stale entry was replaced, so the next call loads it
+    with open(f"{path}/target") as f:
+        assert f.read() == get_dsp_machine_target()
+    assert len(cache.entries()) == 1
+
+
+def test_invalid_code(cache):
+    assert llvm_create_cached_dsp_factory_from_string("bad", "process = ;", cache=cache) is None
+    assert cache.entries() == []
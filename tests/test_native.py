@@ -0,0 +1,107 @@
+"""Tests for native DSP modules built with the system C compiler."""
+
+import shutil
+import sys
+
+import numpy as np
+import pytest
+
+from cyfaust.cache import ArtifactCache
+from cyfaust.native import architecture_dir, build_library, compile_native
+
+CC = shutil.which("cc")
+
+pytestmark = pytest.mark.skipif(
+    CC is None or sys.platform == "win32", reason="needs a POSIX C compiler"
+)
+
+# Hand-written stand-in for Faust C backend output
+FAKE_C = """
+#include <stdlib.h>
+typedef struct { FAUSTFLOAT fHslider0; int fSampleRate; } mydsp;
+mydsp* newmydsp() { return (mydsp*)calloc(1, sizeof(mydsp)); }
+void deletemydsp(mydsp* dsp) { free(dsp); }
+void metadatamydsp(MetaGlue* m) { m->declare(m->metaInterface, "name", "fake"); }
+int getSampleRatemydsp(mydsp* dsp) { return dsp->fSampleRate; }
+int getNumInputsmydsp(mydsp* dsp) { return 0; }
+int getNumOutputsmydsp(mydsp* dsp) { return 1; }
+void classInitmydsp(int sample_rate) {}
+void instanceResetUserInterfacemydsp(mydsp* dsp) { dsp->fHslider0 = 0.5f; }
+void instanceClearmydsp(mydsp* dsp) {}
+void instanceConstantsmydsp(mydsp* dsp, int sample_rate) { dsp->fSampleRate = sample_rate; }
+void instanceInitmydsp(mydsp* dsp, int sample_rate) {
+    instanceConstantsmydsp(dsp, sample_rate);
+    instanceResetUserInterfacemydsp(dsp);
+}
+void initmydsp(mydsp* dsp, int sample_rate) { instanceInitmydsp(dsp, sample_rate); }
+void buildUserInterfacemydsp(mydsp* dsp, UIGlue* ui) {
+    ui->openVerticalBox(ui->uiInterface, "fake");
+    ui->addHorizontalSlider(ui->uiInterface, "gain", &dsp->fHslider0, 0.5f, 0.f, 1.f, 0.01f);
+    ui->closeBox(ui->uiInterface);
+}
+void computemydsp(mydsp* dsp, int count, FAUSTFLOAT** inputs, FAUSTFLOAT** outputs) {
+    for (int i = 0; i < count; i++) outputs[0][i] = dsp->fHslider0;
+}
+"""
+
+
+def test_architecture_dir():
+    assert architecture_dir().endswith("architecture")
+
+
+def test_build_library(tmp_path):
+    output = tmp_path / "fake.so"
+    assert build_library(FAKE_C, str(output), flags="-O2")
+    assert output.stat().st_size > 0
+
+
+def test_build_library_class_name(tmp_path):
+    # C code generated with the -cn othername Faust option
+    output = tmp_path / "other.so"
+    code = FAKE_C.replace("mydsp", "othername")
+    assert build_library(code, str(output), flags="-O2", class_name="othername")
+    assert output.stat().st_size > 0
+
+
+def test_build_library_error(tmp_path, capsys):
+    assert not build_library("this is not C", str(tmp_path / "bad.so"))
+    assert "error" in capsys.readouterr().out
+
+
+def test_compile_native(tmp_path):
+    cache = ArtifactCache(str(tmp_path / "cache"))
+    code = 'process = hslider("gain", 0.5, 0, 1, 0.01) * (1, 2);'
+    factory = compile_native(code, flags="-O2", cache=cache)
+    assert factory is not None
+    assert factory.get_sha_key()
+
+    dsp = factory.create_dsp_instance()
+    dsp.init(48000)
+    assert dsp.get_numinputs() == 0
+    assert dsp.get_numoutputs() == 2
+    assert dsp.get_samplerate() == 48000
+    assert '"gain"' in dsp.ui_json()
+
+    outputs = np.zeros((2, 64), dtype=np.float32)
+    dsp.compute(64, np.zeros((0, 64), dtype=np.float32), outputs)
+    assert outputs[0, 10] == pytest.approx(0.5)
+    assert outputs[1, 10] == pytest.approx(1.0)
+
+    # second call reuses the cached library
+    assert len(cache.entries()) == 1
+    assert compile_native(code, flags="-O2", cache=cache) is not None
+    assert len(cache.entries()) == 1
+
+
+def test_compile_native_evicted_at_once(tmp_path):
+    # the library is loaded even if the cache is too small to keep it
+    cache = ArtifactCache(str(tmp_path / "cache"), max_size=1)
+    factory = compile_native("process = 0.25;", flags="-O2", cache=cache)
+    assert factory is not None
+    assert cache.entries() == []
+    assert factory.create_dsp_instance().get_numoutputs() == 1
+
+
+def test_compile_native_invalid_code(tmp_path):
+    cache = ArtifactCache(str(tmp_path / "cache"))
+    assert compile_native("process = ;", cache=cache) is None
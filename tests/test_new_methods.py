@@ -3,6 +3,8 @@ Test suite for newly implemented methods in cyfaust.
 Tests control(), frame(), compute() variants and factory methods.
 """
 
+import json
+
 import numpy as np
 
 
@@ -259,6 +261,35 @@ class TestNewDSPMethods:
         del factory
 
 
+class TestJsonUIMethods:
+    """Test ui_json() on DSP instances"""
+
+    def test_ui_json(self):
+        """Test ui_json() returns the UI tree and I/O counts"""
+        print_entry("test_ui_json")
+
+        dsp_code = """
+        gain = vslider("gain", 0.3, 0, 1, 0.01);
+        gate = button("gate");
+        process = _ * gain * gate;
+        """
+
+        factory = create_dsp_factory_from_string("test_ui_json", dsp_code)
+        dsp = factory.create_dsp_instance()
+        dsp.init(44100)
+
+        data = json.loads(dsp.ui_json())
+        assert data["inputs"] == 1
+        assert data["outputs"] == 1
+
+        items = data["ui"][0]["items"]
+        types = {item["label"]: item["type"] for item in items}
+        assert types == {"gain": "vslider", "gate": "button"}
+
+        del dsp
+        del factory
+
+
 class TestNewFactoryMethods:
     """Test newly implemented factory methods"""
 
@@ -316,6 +347,40 @@ class TestNewFactoryMethods:
         # Clean up
         del factory
 
+    def test_get_json(self):
+        """Test get_json() factory description"""
+        print_entry("test_get_json")
+
+        dsp_code = """
+        import("stdfaust.lib");
+        declare author "tester";
+        freq = hslider("h:osc/frequency", 440, 50, 2000, 1);
+        process = os.osc(freq) * 0.1;
+        """
+
+        factory = create_dsp_factory_from_string("test_get_json", dsp_code)
+        assert factory is not None, "Failed to create factory"
+
+        data = json.loads(factory.get_json())
+        assert data["name"] == "test_get_json"
+        assert data["sha_key"] == factory.get_sha_key()
+        assert data["inputs"] == 0
+        assert data["outputs"] == 1
+        assert {"author": "tester"} in data["meta"]
+
+        group = data["ui"][0]["items"][0]
+        assert group["type"] == "hgroup"
+        slider = group["items"][0]
+        assert slider["type"] == "hslider"
+        assert slider["label"] == "frequency"
+        assert slider["address"].endswith("/osc/frequency")
+        assert slider["init"] == 440
+        assert (slider["min"], slider["max"], slider["step"]) == (50, 2000, 1)
+
+        assert "\n" not in factory.get_json(flat=True)
+
+        del factory
+
 
 class TestIntegrationWithNewMethods:
     """Integration tests using the new methods"""
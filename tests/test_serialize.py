@@ -0,0 +1,159 @@
+"""Tests for binary serialization and pickling of box and signal graphs."""
+
+import pickle
+
+import pytest
+
+from cyfaust.serialize import deserialize, serialize
+
+try:
+    from cyfaust.box import (
+        BoxVector,
+        box_add_op,
+        box_context,
+        box_float,
+        box_hgroup,
+        box_hslider,
+        box_int,
+        box_par_n,
+        box_seq,
+        box_wire,
+        boxes_to_signals,
+        dsp_to_boxes,
+        get_box_type,
+    )
+    from cyfaust.signal import (
+        SignalVector,
+        sig_add,
+        sig_delay,
+        sig_hslider,
+        sig_input,
+        sig_int,
+        sig_mul,
+        sig_readonly_table,
+        sig_real,
+        sig_recursion,
+        sig_self,
+        sig_sin,
+        sig_waveform,
+        signal_context,
+    )
+except (ModuleNotFoundError, ImportError):
+    from cyfaust.cyfaust import (
+        BoxVector,
+        SignalVector,
+        box_add_op,
+        box_context,
+        box_float,
+        box_hgroup,
+        box_hslider,
+        box_int,
+        box_par_n,
+        box_seq,
+        box_wire,
+        boxes_to_signals,
+        dsp_to_boxes,
+        get_box_type,
+        sig_add,
+        sig_delay,
+        sig_hslider,
+        sig_input,
+        sig_int,
+        sig_mul,
+        sig_readonly_table,
+        sig_real,
+        sig_recursion,
+        sig_self,
+        sig_sin,
+        sig_waveform,
+        signal_context,
+    )
+
+CODE = """
+import("stdfaust.lib");
+gain = hslider("gain[style:knob]", 0.5, 0, 1, 0.01);
+process = hgroup("voice", os.osc(hslider("freq", 440, 20, 2000, 1)) * gain : fi.lowpass(2, 1000)) <: _, _;
+"""
+
+
+def test_box_round_trip():
+    with box_context():
+        box = dsp_to_boxes("serialize", CODE)
+        data = serialize(box)
+        assert data.startswith(b"CYFG")
+        copy = deserialize(data)
+        assert copy.is_same(box)
+        assert get_box_type(copy) == (0, 2)
+
+
+def test_box_sharing():
+    with box_context():
+        shared = box_seq(
+            box_hslider("x", box_float(0), box_float(0), box_float(1), box_float(0.1)), box_wire()
+        )
+        small = serialize(shared)
+        large = serialize(box_par_n([shared] * 64))
+        # shared subtrees are written once
+        assert len(large) < len(small) + 64
+        vector = BoxVector()
+        vector.add(shared)
+        vector.add(box_hgroup("g", shared))
+        copy = deserialize(serialize(vector))
+        assert isinstance(copy, BoxVector)
+        assert [b.id for b in copy] == [b.id for b in vector]
+
+
+def test_box_pickle():
+    with box_context():
+        box = box_seq(box_int(1), box_add_op())
+        assert pickle.loads(pickle.dumps(box)).is_same(box)
+
+
+def test_signal_round_trip():
+    with signal_context():
+        freq = sig_hslider("freq", sig_real(440), sig_real(20), sig_real(2000), sig_real(1))
+        phase = sig_recursion(sig_add(sig_self(), sig_mul(freq, sig_real(1 / 48000))))
+        table = sig_readonly_table(
+            sig_int(4), sig_waveform(_vector([sig_real(v) for v in (0, 0.5, 1, 0.5)])), sig_int(2)
+        )
+        out = sig_add(sig_sin(phase), sig_delay(sig_mul(sig_input(0), table), sig_int(3)))
+        vector = _vector([out, phase])
+        copy = deserialize(serialize(vector))
+        assert [s.id for s in copy] == [s.id for s in vector]
+        assert pickle.loads(pickle.dumps(out)).is_same(out)
+
+
+def test_real_constants_keep_double_precision():
+    # 0.1 and 440.1 are not exact in float32: they must round-trip as doubles
+    with box_context():
+        box = box_par_n([box_float(0.1), box_float(440.1)])
+        assert deserialize(serialize(box)).is_same(box)
+    with signal_context():
+        vector = _vector([sig_real(0.1), sig_real(440.1)])
+        copy = deserialize(serialize(vector))
+        assert [s.id for s in copy] == [s.id for s in vector]
+
+
+def test_signal_normal_form_unsupported():
+    with box_context():
+        signals = boxes_to_signals(dsp_to_boxes("rec", "process = +(1) ~ _;"))
+        with pytest.raises(ValueError):
+            serialize(signals)
+
+
+def test_errors():
+    with pytest.raises(TypeError):
+        serialize(1)
+    with pytest.raises(ValueError):
+        deserialize(b"not a graph")
+    with box_context():
+        data = serialize(box_par_n([box_wire(), box_int(3)]))
+        with pytest.raises(ValueError):
+            deserialize(data[:-2])
+
+
+def _vector(signals):
+    vector = SignalVector()
+    for s in signals:
+        vector.add(s)
+    return vector
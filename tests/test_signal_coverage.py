@@ -30,6 +30,7 @@ try:
         sig_write_read_table,
         sig_waveform_int,
         sig_waveform_float,
+        sig_waveform,
         # soundfile
         sig_soundfile,
         sig_soundfile_length,
@@ -136,12 +137,17 @@ try:
         is_sig_soundfile_rate,
         is_sig_soundfile_buffer,
         is_sig_waveform,
+        intern_signals,
+        classify_signal,
+        walk_signal,
+        sig_add_n,
         # classes
         Signal,
         SignalVector,
         Interval,
         SType,
         SOperator,
+        SigKind,
     )
     from cyfaust.interp import create_dsp_factory_from_signals
 except (ModuleNotFoundError, ImportError):
@@ -151,7 +157,7 @@ except (ModuleNotFoundError, ImportError):
             sig_int, sig_real, sig_float, sig_input,
             sig_delay, sig_delay1, sig_int_cast, sig_float_cast,
             sig_readonly_table, sig_write_read_table,
-            sig_waveform_int, sig_waveform_float,
+            sig_waveform_int, sig_waveform_float, sig_waveform,
             sig_soundfile, sig_soundfile_length, sig_soundfile_rate, sig_soundfile_buffer,
             sig_select2, sig_select3,
             sig_add, sig_sub, sig_mul, sig_div, sig_rem, sig_bin_op,
@@ -179,7 +185,8 @@ except (ModuleNotFoundError, ImportError):
             is_sig_select2, is_sig_readonly_table, is_sig_read_write_table,
             is_sig_soundfile, is_sig_soundfile_length,
             is_sig_soundfile_rate, is_sig_soundfile_buffer, is_sig_waveform,
-            Signal, SignalVector, Interval, SType, SOperator,
+            intern_signals, classify_signal, walk_signal, sig_add_n,
+            Signal, SignalVector, Interval, SType, SOperator, SigKind,
         )
     except (ModuleNotFoundError, ImportError):
         pytest.skip("cyfaust not available", allow_module_level=True)
@@ -994,3 +1001,129 @@ class TestEnums:
         assert int(SOperator.kSub) == 1
         assert int(SOperator.kMul) == 2
         assert int(SOperator.kDiv) == 3
+
+
+# ---------------------------------------------------------------------------
+# Node identity
+# ---------------------------------------------------------------------------
+
+
+class TestNodeIdentity:
+    def test_hash_consed_nodes(self):
+        a = sig_add(sig_input(0), sig_real(0.5))
+        b = sig_add(sig_input(0), sig_real(0.5))
+        c = sig_add(sig_input(1), sig_real(0.5))
+        assert a is not b
+        assert a.is_same(b) and not a.is_same(c)
+        assert a.id == b.id != c.id
+        with pytest.raises(TypeError):
+            hash(a)
+        assert len({a.id, b.id, c.id}) == 2
+        assert {a.id: 1}[b.id] == 1
+
+    def test_interning(self):
+        assert not intern_signals()
+        try:
+            a = sig_mul(sig_input(0), sig_int(2))
+            b = sig_mul(sig_input(0), sig_int(2))
+            assert a is b
+            sv = SignalVector()
+            sv.add(a)
+            assert next(iter(sv)) is a
+        finally:
+            assert intern_signals(False)
+        assert sig_int(3) is not sig_int(3)
+
+
+# ---------------------------------------------------------------------------
+# Classification and traversal
+# ---------------------------------------------------------------------------
+
+
+class TestClassifyWalk:
+    def test_classify_constants(self):
+        assert classify_signal(sig_int(3)) == (SigKind.kSigInt, (), {"value": 3})
+        assert classify_signal(sig_real(0.5)) == (SigKind.kSigReal, (), {"value": 0.5})
+        assert sig_input(2).classify() == (SigKind.kSigInput, (), {"index": 2})
+
+    def test_classify_operators(self):
+        x, y = sig_input(0), sig_real(0.5)
+        kind, children, attrs = classify_signal(sig_add(x, y))
+        assert kind == SigKind.kSigBinOp
+        assert attrs == {"op": SOperator.kAdd}
+        assert children[0].is_same(x) and children[1].is_same(y)
+
+        kind, children, attrs = classify_signal(sig_sin(x))
+        assert kind == SigKind.kSigXtended
+        assert attrs["name"] == "sin"
+        assert len(children) == 1 and children[0].is_same(x)
+
+    def test_classify_slider(self):
+        s = sig_hslider("freq", sig_real(440.0), sig_real(20.0), sig_real(2000.0), sig_real(1.0))
+        kind, children, attrs = classify_signal(s)
+        assert kind == SigKind.kSigHSlider
+        assert attrs == {"label": "freq"}
+        assert [c.classify()[2]["value"] for c in children] == [440.0, 20.0, 2000.0, 1.0]
+
+    def test_walk_shared(self):
+        x = sig_mul(sig_input(0), sig_int(2))
+        s = sig_add(x, x)
+        nodes = list(walk_signal(s))
+        assert [n.classify()[0] for n in nodes] == [
+            SigKind.kSigInput, SigKind.kSigInt, SigKind.kSigBinOp, SigKind.kSigBinOp,
+        ]
+        assert nodes[-1].is_same(s)
+        assert len(list(s.walk(unique=False))) == 7
+        assert s.walk(order="pre").__next__().is_same(s)
+
+    def test_walk_vector(self):
+        x = sig_mul(sig_input(0), sig_int(2))
+        sv = SignalVector()
+        sv.add(sig_add(x, sig_int(1)))
+        sv.add(sig_sub(x, sig_int(1)))
+        ids = [n.id for n in sv.walk()]
+        assert len(ids) == len(set(ids)) == 6
+
+    def test_walk_recursive(self):
+        rec = sig_recursion(sig_add(sig_self(), sig_input(0)))
+        kinds = {n.classify()[0] for n in walk_signal(simplify_to_normal_form(rec))}
+        assert SigKind.kSigInput in kinds
+
+    def test_walk_errors(self):
+        with pytest.raises(ValueError):
+            walk_signal(sig_int(1), order="in")
+        with pytest.raises(TypeError):
+            walk_signal(1)
+
+
+# ---------------------------------------------------------------------------
+# N-ary combinators
+# ---------------------------------------------------------------------------
+
+
+class TestNaryCombinators:
+    def test_sig_add_n(self):
+        inputs = [sig_input(i) for i in range(8)]
+        s = sig_add_n(inputs)
+        kinds = [n.classify()[0] for n in s.walk()]
+        assert kinds.count(SigKind.kSigInput) == 8
+        assert kinds.count(SigKind.kSigBinOp) == 7
+        # balanced: the first input is three additions deep
+        depth, node = 0, s
+        while node.classify()[0] == SigKind.kSigBinOp:
+            node = node.classify()[1][0]
+            depth += 1
+        assert depth == 3
+
+    def test_sig_add_n_vector(self):
+        sv = SignalVector()
+        sv.add(sig_input(0))
+        sv.add(sig_input(1))
+        assert sig_add_n(sv).is_same(sig_add(sig_input(0), sig_input(1)))
+        assert sig_add_n([sig_input(0)]).is_same(sig_input(0))
+
+    def test_errors(self):
+        with pytest.raises(ValueError):
+            sig_add_n([])
+        with pytest.raises(TypeError):
+            sig_add_n([sig_input(0), 1.0])
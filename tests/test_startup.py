@@ -0,0 +1,125 @@
+"""Tests for lazy submodule loading and CLI startup.
+
+Set BENCHMARK in the environment to also report the import time of the CLI
+with and without lazy loading.
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Extension modules that link against libfaust (dynamic and static builds)
+EXTENSION_MODULES = (
+    "cyfaust.common",
+    "cyfaust.interp",
+    "cyfaust.box",
+    "cyfaust.signal",
+    "cyfaust.player",
+    "cyfaust.cyfaust",
+)
+
+
+def run_python(code):
+    """Run a Python snippet in a fresh interpreter and return stdout."""
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        cwd=str(PROJECT_ROOT),
+    )
+    assert result.returncode == 0, result.stderr
+    return result.stdout.strip()
+
+
+def import_times(code):
+    """Run a snippet with -X importtime, returning {module: cumulative microseconds}."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        cwd=str(PROJECT_ROOT),
+    )
+    assert result.returncode == 0, result.stderr
+    times = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "cumulative" not in line:
+            _self, cumulative, name = line[len("import time:") :].split("|")
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def loaded_extensions(code):
+    """Return the extension modules loaded after running a snippet."""
+    out = run_python(
+        code + "\nimport sys\n"
+        f"print(','.join(m for m in {EXTENSION_MODULES!r} if m in sys.modules))"
+    )
+    return [m for m in out.split(",") if m]
+
+
+class TestLazyImport:
+    """`import cyfaust` must not load libfaust."""
+
+    def test_import_package_is_lazy(self):
+        assert loaded_extensions("import cyfaust") == []
+
+    def test_import_main_is_lazy(self):
+        assert loaded_extensions("import cyfaust.__main__") == []
+
+    def test_attribute_access_loads_extension(self):
+        loaded = loaded_extensions("import cyfaust\ncyfaust.get_version()")
+        assert loaded
+        assert set(loaded) <= {"cyfaust.interp", "cyfaust.cyfaust"}
+
+    def test_get_version(self):
+        import cyfaust
+
+        version = cyfaust.get_version()
+        assert isinstance(version, str)
+        assert "get_version" in dir(cyfaust)
+
+    def test_unknown_attribute(self):
+        import cyfaust
+
+        with pytest.raises(AttributeError):
+            cyfaust.no_such_attribute
+
+
+class TestStartup:
+    """CLI commands that do not need libfaust must not load it."""
+
+    def test_help_does_not_load_extension(self):
+        loaded = loaded_extensions(
+            "import contextlib, io, sys\n"
+            "sys.argv = ['cyfaust', '--help']\n"
+            "from cyfaust.__main__ import main\n"
+            "with contextlib.redirect_stdout(io.StringIO()):\n"
+            "    try:\n"
+            "        main()\n"
+            "    except SystemExit:\n"
+            "        pass"
+        )
+        assert loaded == []
+
+    def test_main_imports_no_heavy_modules(self):
+        imported = set(import_times("import cyfaust.__main__"))
+        assert "cyfaust.__main__" in imported
+        assert not imported & {"numpy", *EXTENSION_MODULES}
+
+    @pytest.mark.skipif("BENCHMARK" not in os.environ, reason="set BENCHMARK to time imports")
+    def test_lazy_import_time(self):
+        lazy = import_times("import cyfaust.__main__")
+        eager = import_times("import cyfaust.__main__, cyfaust.interp")
+        lazy_us = lazy["cyfaust.__main__"]
+        eager_us = lazy_us + eager["cyfaust.interp"]
+        print(
+            f"\nimport cyfaust.__main__: {len(lazy)} modules, {lazy_us / 1000:.1f} ms"
+            f"\nwith cyfaust.interp: {len(eager)} modules, {eager_us / 1000:.1f} ms"
+        )
+        assert len(lazy) < len(eager)
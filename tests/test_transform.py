@@ -0,0 +1,180 @@
+"""Tests for box-level transformations (specialization, ...)."""
+
+import numpy as np
+import pytest
+
+from cyfaust.transform import (
+    fuse,
+    fuse_box,
+    select_outputs,
+    select_outputs_source,
+    specialize,
+    specialize_box,
+    widget_paths,
+    widgets_to_inputs,
+)
+
+try:
+    from cyfaust.box import (
+        box_context,
+        box_float,
+        box_hslider,
+        boxes_to_signals,
+        dsp_to_boxes,
+        get_box_type,
+    )
+    from cyfaust.interp import create_dsp_factory_from_boxes, create_dsp_factory_from_string
+except (ModuleNotFoundError, ImportError):
+    from cyfaust.cyfaust import (
+        box_context,
+        box_float,
+        box_hslider,
+        boxes_to_signals,
+        create_dsp_factory_from_boxes,
+        create_dsp_factory_from_string,
+        dsp_to_boxes,
+        get_box_type,
+    )
+
+CODE = """
+gain = hslider("gain[style:knob]", 0.5, 0, 1, 0.01);
+voice = vgroup("voice", _ * hslider("freq", 440, 20, 2000, 1) * checkbox("on"));
+process = voice * gain, nentry("h:mix/level", 1, 0, 2, 0.1);
+"""
+
+
+def _render(factory, inputs, frames=16):
+    dsp = factory.create_dsp_instance()
+    dsp.init(48000)
+    outputs = np.zeros((dsp.get_numoutputs(), frames), dtype=np.float32)
+    dsp.compute(frames, np.full((inputs, frames), 1.0, dtype=np.float32), outputs)
+    return outputs
+
+
+def test_widget_paths():
+    with box_context():
+        box = dsp_to_boxes("paths", CODE)
+        assert sorted(widget_paths(box)) == ["/gain", "/mix/level", "/voice/freq", "/voice/on"]
+
+
+def test_specialize_box():
+    with box_context():
+        box = dsp_to_boxes("spec", CODE)
+        fixed = specialize_box(box, {"/voice/freq": 100, "/on": True})
+        assert get_box_type(fixed) == get_box_type(box)
+        assert sorted(widget_paths(fixed)) == ["/gain", "/mix/level"]
+        assert specialize_box(box, {}).is_same(box)
+
+
+def test_specialize_box_double_precision():
+    # 440.1 is not exact in float32: the constant must keep double precision
+    with box_context():
+        slider = box_hslider("freq", box_float(440), box_float(20), box_float(2000), box_float(0.1))
+        fixed = specialize_box(slider, {"/freq": 440.1})
+        assert fixed.is_same(box_float(440.1))
+        assert not fixed.is_same(box_float(float(np.float32(440.1))))
+
+
+def test_specialize():
+    factory = specialize(CODE, {"/FaustDSP/voice/freq": 2, "/on": 1, "/gain": 0.25, "/level": 1.5})
+    assert factory is not None
+    assert "freq" not in factory.get_json()
+    outputs = _render(factory, 1)
+    assert outputs[0, 5] == pytest.approx(0.5)
+    assert outputs[1, 5] == pytest.approx(1.5)
+
+
+def test_specialize_errors(capsys):
+    with pytest.raises(ValueError):
+        specialize(CODE, {"/voice/volume": 0.1})
+    assert specialize("process = ;", {}) is None
+
+
+def test_widgets_to_inputs():
+    with box_context():
+        box = dsp_to_boxes("automate", CODE)
+        new, inputs = widgets_to_inputs(box, ["/freq", "/on", "/gain"])
+        assert sorted(inputs) == [1, 2, 3]
+        assert sorted(inputs.values()) == ["/gain", "/voice/freq", "/voice/on"]
+        assert get_box_type(new) == (4, 2)
+        assert widget_paths(new) == ["/mix/level"]
+
+        factory = create_dsp_factory_from_boxes("automate", new)
+        dsp = factory.create_dsp_instance()
+        dsp.init(48000)
+        frames = 8
+        ramp = np.linspace(0, 1, frames, dtype=np.float32)
+        values = {"/voice/freq": ramp, "/voice/on": np.ones(frames), "/gain": np.full(frames, 0.5)}
+        buffers = np.zeros((4, frames), dtype=np.float32)
+        buffers[0] = 2.0
+        for channel, path in inputs.items():
+            buffers[channel] = values[path]
+        outputs = np.zeros((2, frames), dtype=np.float32)
+        dsp.compute(frames, buffers, outputs)
+        assert np.allclose(outputs[0], 2.0 * ramp * 0.5)
+
+
+def test_widgets_to_inputs_shared():
+    with box_context():
+        box = dsp_to_boxes("shared", 'g = hslider("g", 0, 0, 1, 0.1); process = _ * g, _ + g;')
+        new, inputs = widgets_to_inputs(box, ["/g"])
+        assert inputs == {2: "/g"}
+        assert get_box_type(new) == (3, 2)
+        with pytest.raises(ValueError):
+            widgets_to_inputs(box, ["/h"])
+
+
+OUTPUTS = "process = _ <: *(1), *(2), *(3), sin;"
+
+
+def test_select_outputs_box():
+    with box_context():
+        box = dsp_to_boxes("select", OUTPUTS)
+        assert select_outputs(box, [0, 1, 2, 3]).is_same(box)
+        assert get_box_type(select_outputs(box, [1, 3])) == (1, 2)
+        reordered = select_outputs(box, [2, 0, 2])
+        assert get_box_type(reordered) == (1, 3)
+        factory = create_dsp_factory_from_boxes("select", reordered)
+        outputs = _render(factory, 1)
+        assert outputs[:, 5] == pytest.approx([3.0, 1.0, 3.0])
+        with pytest.raises(ValueError):
+            select_outputs(box, [4])
+
+
+def test_select_outputs_signals():
+    with box_context():
+        signals = boxes_to_signals(dsp_to_boxes("select", OUTPUTS))
+        selected = select_outputs(signals, [3, 1])
+        assert [s.id for s in selected] == [list(signals)[3].id, list(signals)[1].id]
+
+
+def test_create_dsp_factory_outputs():
+    factory = create_dsp_factory_from_string("select", OUTPUTS, outputs=[1])
+    assert _render(factory, 1)[:, 5] == pytest.approx([2.0])
+    code, args = select_outputs_source("p = _, _; ", [1, 0], ("-pn", "p", "-vec"))
+    assert args == ("-vec", "-pn", "cyfaust_selected_outputs")
+    assert "p : route(outputs(p), 2, (2, 1), (1, 2))" in code
+
+
+def test_fuse_box():
+    with box_context():
+        box = dsp_to_boxes("voice", CODE)
+        fused, channels, params = fuse_box(box, 5)
+        assert get_box_type(fused) == (5, 10)
+        assert channels[3] == {"inputs": [3], "outputs": [6, 7]}
+        assert params[4]["/voice/freq"] == "/copy4/voice/freq"
+        assert len(widget_paths(fused)) == 5 * 4
+        with pytest.raises(ValueError):
+            fuse_box(box, 0)
+
+
+def test_fuse():
+    factory, channels, params = fuse(
+        'process = _ * hslider("g", 0.5, 0, 1, 0.1);', 3, backend="interp"
+    )
+    assert params == [{"/g": f"/copy{k}/g"} for k in range(3)]
+    assert [c["outputs"] for c in channels] == [[0], [1], [2]]
+    assert '"copy2"' in factory.get_json()
+    outputs = _render(factory, 3)
+    assert outputs[:, 5] == pytest.approx([0.5, 0.5, 0.5])
+    assert fuse("process = ;", 2) is None
@@ -0,0 +1,138 @@
+"""Tests for the file watching and hot reloading used by `cyfaust play --watch`."""
+
+import os
+
+import pytest
+
+from cyfaust.watch import FileWatcher, HotReloader, dependencies
+
+
+def touch(path, mtime_ns):
+    """Set the modification time of path."""
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+class FakeDsp:
+    def __init__(self):
+        self.sample_rate = None
+
+    def init(self, sample_rate):
+        self.sample_rate = sample_rate
+
+    def build_user_interface(self):
+        pass
+
+
+class FakeFactory:
+    def __init__(self, includes=()):
+        self.includes = [name.encode("utf8") for name in includes]
+
+    def get_include_pathnames(self):
+        return self.includes
+
+    def create_dsp_instance(self):
+        return FakeDsp()
+
+
+class FakeSwapper:
+    """Stands in for HotSwapDsp, finishing each fade at the first collect()."""
+
+    def __init__(self, factory, accept=True):
+        self.factory = factory
+        self.accept = accept
+        self.is_swapping = False
+        self.swapped = []
+
+    def swap(self, dsp, factory):
+        if not self.accept:
+            return False
+        self.swapped.append((dsp, factory))
+        self.factory = factory
+        self.is_swapping = True
+        return True
+
+    def collect(self):
+        self.is_swapping = False
+        return True
+
+
+@pytest.fixture
+def dsp_file(tmp_path):
+    path = tmp_path / "synth.dsp"
+    path.write_text("process = os.osc(440);\n")
+    touch(path, 1_000_000_000)
+    return str(path)
+
+
+class TestFileWatcher:
+    def test_detects_modification(self, dsp_file):
+        watcher = FileWatcher([dsp_file])
+        assert watcher.changed() == []
+        touch(dsp_file, 2_000_000_000)
+        assert watcher.changed() == [dsp_file]
+
+    def test_detects_removal(self, dsp_file):
+        watcher = FileWatcher([dsp_file])
+        os.remove(dsp_file)
+        assert watcher.changed() == [dsp_file]
+
+    def test_watch_with_previous_mtimes(self, dsp_file):
+        watcher = FileWatcher([dsp_file])
+        before = watcher.snapshot()
+        touch(dsp_file, 2_000_000_000)
+        watcher.watch([dsp_file], before)
+        assert watcher.changed() == [dsp_file]
+
+
+def test_dependencies(dsp_file):
+    factory = FakeFactory([dsp_file, "/usr/share/faust/stdfaust.lib"])
+    assert dependencies(dsp_file, factory) == [dsp_file, "/usr/share/faust/stdfaust.lib"]
+
+
+class TestHotReloader:
+    def test_reload_on_change(self, dsp_file):
+        swapper = FakeSwapper(FakeFactory())
+        new_factory = FakeFactory()
+        reloader = HotReloader(
+            dsp_file, swapper, 48000, lambda path: new_factory, log=lambda msg: None
+        )
+        assert not reloader.poll()
+        touch(dsp_file, 2_000_000_000)
+        assert reloader.poll()
+        dsp, factory = swapper.swapped[0]
+        assert factory is new_factory
+        assert dsp.sample_rate == 48000
+        # nothing changed since
+        assert not reloader.poll()
+
+    def test_failed_compilation_keeps_playing(self, dsp_file):
+        messages = []
+        swapper = FakeSwapper(FakeFactory())
+        reloader = HotReloader(dsp_file, swapper, 48000, lambda path: None, log=messages.append)
+        touch(dsp_file, 2_000_000_000)
+        assert not reloader.poll()
+        assert swapper.swapped == []
+        assert "Reload failed" in messages[0]
+        # not retried until the file changes again
+        assert not reloader.poll()
+
+    def test_channel_change_is_skipped(self, dsp_file):
+        messages = []
+        swapper = FakeSwapper(FakeFactory(), accept=False)
+        reloader = HotReloader(
+            dsp_file, swapper, 48000, lambda path: FakeFactory(), log=messages.append
+        )
+        touch(dsp_file, 2_000_000_000)
+        assert not reloader.poll()
+        assert "restart" in messages[0]
+
+    def test_watches_includes(self, dsp_file, tmp_path):
+        lib = tmp_path / "mylib.lib"
+        lib.write_text("gain = 0.5;\n")
+        touch(lib, 1_000_000_000)
+        swapper = FakeSwapper(FakeFactory([str(lib)]))
+        reloader = HotReloader(
+            dsp_file, swapper, 48000, lambda path: FakeFactory([str(lib)]), log=lambda msg: None
+        )
+        touch(lib, 2_000_000_000)
+        assert reloader.poll()